@@ -1,3 +1,5 @@
+from typing import Optional
+
 from bittensor import Synapse
 
 
@@ -16,3 +18,33 @@ class EventPredictionSynapse(Synapse):
         #     "end_date"
         # }
     }
+
+    # Opt-in delta protocol, ignored by the miners not acknowledging epochs.
+    # The validator versions the events it sends with epoch_id. A miner setting
+    # acknowledged_epoch_id to the epoch_id received gets on the next queries only the events
+    # changed since that epoch, with base_epoch_id set and the keys of the events no longer
+    # to predict in removed_events.
+    # Answering only the events received is enough: the validator keeps the miner's last
+    # predictions of the events unchanged. A miner can also answer apply_delta(known_events)
+    # to predict all the events again.
+    epoch_id: Optional[int] = None
+    base_epoch_id: Optional[int] = None
+    removed_events: list[str] = []
+    acknowledged_epoch_id: Optional[int] = None
+
+    def apply_delta(self, known_events: dict) -> dict:
+        """
+        Returns all the events to predict, merging the events received into the ones known
+        at base_epoch_id. A full synapse replaces the known events.
+        A miner may set events to the result to predict the events unchanged again.
+        """
+
+        if self.base_epoch_id is None:
+            return dict(self.events)
+
+        removed_events = set(self.removed_events)
+
+        events = {key: event for key, event in known_events.items() if key not in removed_events}
+        events.update(self.events)
+
+        return events
@@ -9,6 +9,7 @@ from sqlalchemy import engine_from_config
 
 def run_migrations(
     db_file_name: str,
+    revision: str = "head",
 ):
     db_url = f"sqlite:///{db_file_name}"
     current_dir = os.path.dirname(os.path.abspath(__file__))
@@ -40,5 +41,5 @@ def run_migrations(
             transaction_per_migration=True,
         )
 
-        # Upgrade to head
-        command.upgrade(alembic_cfg, "head")
+        # Upgrade to head, or to the given revision
+        command.upgrade(alembic_cfg, revision)
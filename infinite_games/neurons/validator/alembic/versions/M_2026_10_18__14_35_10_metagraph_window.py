@@ -0,0 +1,42 @@
+"""Metagraph window
+
+Revision ID: 5c1d7e2a9f04
+Revises: 19b6be55ae16
+Create Date: 2026-10-18 14:35:10.412870
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "5c1d7e2a9f04"
+down_revision: Union[str, None] = "19b6be55ae16"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # Events in the metagraph scoring moving average window
+    op.execute(
+        """
+            CREATE TABLE IF NOT EXISTS metagraph_window_events (
+                event_id TEXT PRIMARY KEY,
+                event_min_row INTEGER NOT NULL
+            )
+        """
+    )
+
+    # Running sums of the peer scores of the events in the window
+    op.execute(
+        """
+            CREATE TABLE IF NOT EXISTS metagraph_window_scores (
+                miner_uid INTEGER NOT NULL,
+                miner_hotkey TEXT NOT NULL,
+                sum_peer_score REAL NOT NULL,
+                count_peer_score INTEGER NOT NULL,
+                PRIMARY KEY (miner_uid, miner_hotkey)
+            )
+        """
+    )
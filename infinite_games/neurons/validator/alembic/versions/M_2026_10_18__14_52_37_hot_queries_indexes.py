@@ -0,0 +1,97 @@
+"""Hot queries indexes
+
+Revision ID: e4a8b16c03d9
+Revises: 5c1d7e2a9f04
+Create Date: 2026-10-18 14:52:37.208114
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "e4a8b16c03d9"
+down_revision: Union[str, None] = "5c1d7e2a9f04"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # Partial indexes: WHERE clauses have to match the queries ones to be used
+
+    # Events lookups by event_id: delete / resolve events, scores export join
+    op.execute(
+        """
+            CREATE INDEX IF NOT EXISTS idx_events_event_id
+            ON events (event_id)
+        """
+    )
+
+    # Pending events to predict and MIN(created_at) of pending events
+    op.execute(
+        """
+            CREATE INDEX IF NOT EXISTS idx_events_status_created_at
+            ON events (status, created_at)
+        """
+    )
+
+    # MAX(created_at) of events
+    op.execute(
+        """
+            CREATE INDEX IF NOT EXISTS idx_events_created_at
+            ON events (created_at)
+        """
+    )
+
+    # MAX(resolved_at) of events
+    op.execute(
+        """
+            CREATE INDEX IF NOT EXISTS idx_events_resolved_at
+            ON events (resolved_at)
+        """
+    )
+
+    # Settled events to peer score, in resolved_at order
+    op.execute(
+        """
+            CREATE INDEX IF NOT EXISTS idx_events_to_score
+            ON events (status, resolved_at)
+            WHERE processed = false
+        """
+    )
+
+    # Predictions to export and to delete, in ROWID order
+    op.execute(
+        """
+            CREATE INDEX IF NOT EXISTS idx_predictions_exported
+            ON predictions (exported)
+        """
+    )
+
+    # Peer scored events to metagraph score: GROUP BY event_id, MIN(ROWID)
+    op.execute(
+        """
+            CREATE INDEX IF NOT EXISTS idx_scores_not_processed
+            ON scores (event_id)
+            WHERE processed = false
+        """
+    )
+
+    # Metagraph scored events to export: GROUP BY event_id, MIN(ROWID)
+    op.execute(
+        """
+            CREATE INDEX IF NOT EXISTS idx_scores_to_export
+            ON scores (event_id)
+            WHERE processed = 1 AND exported = 0
+        """
+    )
+
+    # Last metagraph score of each miner: GROUP BY miner, MAX(ROWID) on recent scores
+    op.execute(
+        """
+            CREATE INDEX IF NOT EXISTS idx_scores_processed_miner
+            ON scores (miner_uid, miner_hotkey, created_at)
+            WHERE processed = 1
+        """
+    )
@@ -0,0 +1,57 @@
+"""Outbox
+
+Revision ID: b56c3306f0d1
+Revises: e4a8b16c03d9
+Create Date: 2026-10-18 16:05:41.530297
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "b56c3306f0d1"
+down_revision: Union[str, None] = "e4a8b16c03d9"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # Serialized payloads of the backend exports left to deliver
+    op.execute(
+        """
+            CREATE TABLE IF NOT EXISTS outbox (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                kind TEXT NOT NULL,
+                payload BLOB NOT NULL,
+                attempts INTEGER NOT NULL DEFAULT 0,
+                next_attempt_at DATETIME NOT NULL DEFAULT CURRENT_TIMESTAMP,
+                last_error TEXT,
+                created_at DATETIME NOT NULL DEFAULT CURRENT_TIMESTAMP
+            )
+        """
+    )
+
+    # Payloads due for delivery
+    op.execute(
+        """
+            CREATE INDEX IF NOT EXISTS idx_outbox_next_attempt_at
+            ON outbox (next_attempt_at)
+        """
+    )
+
+    # Payloads given up on after too many attempts, kept for inspection
+    op.execute(
+        """
+            CREATE TABLE IF NOT EXISTS outbox_dead_letters (
+                id INTEGER PRIMARY KEY,
+                kind TEXT NOT NULL,
+                payload BLOB NOT NULL,
+                attempts INTEGER NOT NULL,
+                last_error TEXT,
+                created_at DATETIME NOT NULL,
+                dead_at DATETIME NOT NULL DEFAULT CURRENT_TIMESTAMP
+            )
+        """
+    )
@@ -11,6 +11,7 @@ from neurons.validator.api.middlewares import (
 )
 from neurons.validator.api.routes.root_router import router as root_router
 from neurons.validator.db.operations import DatabaseOperations
+from neurons.validator.scheduler.tasks_scheduler import TasksScheduler
 from neurons.validator.utils.logger.logger import set_uvicorn_logger
 
 
@@ -20,9 +21,15 @@ class API:
     fast_api: FastAPI | None
     server: Server | None
     db_operations: DatabaseOperations
+    scheduler: TasksScheduler | None
 
     def __init__(
-        self, host: str, port: int, db_operations: DatabaseOperations, api_access_keys: str | None
+        self,
+        host: str,
+        port: int,
+        db_operations: DatabaseOperations,
+        api_access_keys: str | None,
+        scheduler: TasksScheduler | None = None,
     ):
         if not isinstance(host, str):
             raise ValueError("host must be a string")
@@ -36,12 +43,16 @@ class API:
         if api_access_keys is not None and not isinstance(api_access_keys, str):
             raise ValueError("api_access_keys must be a string or None")
 
+        if scheduler is not None and not isinstance(scheduler, TasksScheduler):
+            raise ValueError("scheduler must be an instance of TasksScheduler or None")
+
         self.host = host
         self.port = port
         self.fast_api = None
         self.server = None
         self.db_operations = db_operations
         self.api_access_keys = api_access_keys
+        self.scheduler = scheduler
         self.api_key_header = "X-API-Key"
 
     def _get_db_operations(self):
@@ -81,6 +92,8 @@ class API:
         # Rate limiter
         limiter = Limiter(key_func=self._get_rate_limiter_key, application_limits=["4/1seconds"])
         fast_api.state.limiter = limiter
+        # Read by the scheduler route
+        fast_api.state.scheduler = self.scheduler
 
         fast_api.add_middleware(DbOperationsMiddleware, db_operations=self.db_operations)
 
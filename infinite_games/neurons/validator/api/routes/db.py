@@ -0,0 +1,18 @@
+from fastapi import APIRouter
+
+from neurons.validator.api.types import ApiRequest
+from neurons.validator.db.operations import DatabaseOperations
+
+router = APIRouter()
+
+
+@router.get(
+    "/stats",
+)
+async def get_db_stats(request: ApiRequest) -> dict:
+    db_operations: DatabaseOperations = request.state.db_operations
+
+    return {
+        "writer": db_operations.get_writer_stats(),
+        "outbox": await db_operations.get_outbox_counts(),
+    }
@@ -1,9 +1,13 @@
 from fastapi import APIRouter
 
+from neurons.validator.api.routes.db import router as db_router
 from neurons.validator.api.routes.events import router as events_router
 from neurons.validator.api.routes.health import router as health_router
+from neurons.validator.api.routes.scheduler import router as scheduler_router
 
 router = APIRouter()
 
 router.include_router(health_router, prefix="/health")
 router.include_router(events_router, prefix="/events")
+router.include_router(scheduler_router, prefix="/scheduler")
+router.include_router(db_router, prefix="/db")
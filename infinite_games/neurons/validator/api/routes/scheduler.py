@@ -0,0 +1,18 @@
+from fastapi import APIRouter, HTTPException
+
+from neurons.validator.api.types import ApiRequest
+from neurons.validator.scheduler.tasks_scheduler import TasksScheduler
+
+router = APIRouter()
+
+
+@router.get(
+    "/stats",
+)
+async def get_scheduler_stats(request: ApiRequest) -> dict:
+    scheduler: TasksScheduler | None = request.app.state.scheduler
+
+    if scheduler is None:
+        raise HTTPException(status_code=404, detail="Scheduler not available")
+
+    return scheduler.snapshot()
@@ -0,0 +1,181 @@
+"""
+Benchmark the IfGamesClient requests per second against a local stand-in of the API,
+with a session per request and with the shared session of the client.
+
+The stand-in server answers the events pages and the scores posts on localhost and counts
+the connections opened. Over plain HTTP on localhost only the TCP handshake is saved,
+against the API the TLS handshake and the DNS lookup are saved too.
+Reports the requests per second, latency percentiles and connections of each mode as JSON.
+
+Usage:
+    python -m neurons.validator.benchmarks.api_client --requests 2000 --concurrency 16
+"""
+
+import argparse
+import asyncio
+import json
+import time
+from unittest.mock import MagicMock
+
+from aiohttp import web
+from bittensor_wallet import Wallet
+
+from neurons.validator.if_games.client import IfGamesClient
+from neurons.validator.utils.common.histogram import LatencyHistogram
+from neurons.validator.utils.logger.logger import InfiniteGamesLogger
+
+EVENTS_PAGE = {
+    "count": 50,
+    "items": [
+        {
+            "event_id": f"event_{i}",
+            "market_type": "LLM",
+            "title": "Will it happen?",
+            "description": "desc",
+            "cutoff": 1733616000,
+            "start_date": 1733600000,
+            "end_date": 1733620000,
+            "answer": None,
+        }
+        for i in range(50)
+    ],
+}
+
+
+def make_stand_in_app(connections: set) -> web.Application:
+    async def get_events(request: web.Request) -> web.Response:
+        connections.add(request.transport.get_extra_info("peername"))
+
+        return web.json_response(EVENTS_PAGE)
+
+    async def post_scores(request: web.Request) -> web.Response:
+        connections.add(request.transport.get_extra_info("peername"))
+
+        await request.read()
+
+        return web.json_response({})
+
+    app = web.Application()
+    app.router.add_get("/api/v2/events", get_events)
+    app.router.add_post("/api/v1/validators/results", post_scores)
+
+    return app
+
+
+def make_client(base_url: str) -> IfGamesClient:
+    hotkey = MagicMock(
+        sign=MagicMock(side_effect=lambda body: body),
+        ss58_address="ss58_address",
+        public_key=b"public_key",
+    )
+    bt_wallet = MagicMock(spec=Wallet, get_hotkey=MagicMock(return_value=hotkey), hotkey=hotkey)
+
+    return IfGamesClient(
+        env="test",
+        logger=MagicMock(spec=InfiniteGamesLogger),
+        bt_wallet=bt_wallet,
+        base_url=base_url,
+    )
+
+
+async def request_with_own_session(client: IfGamesClient, index: int) -> None:
+    # Session, connector and connection per request, as before the shared session
+    async with client.create_session() as session:
+        if index % 2 == 0:
+            path = f"/api/v2/events?from_date=0&offset={index}&limit=50"
+
+            async with session.get(path) as response:
+                response.raise_for_status()
+                await response.json()
+        else:
+            body = client.encode_body({"results": [{"event_id": f"event_{index}", "score": 0.5}]})
+
+            async with session.post(
+                "/api/v1/validators/results",
+                data=body,
+                headers=client.make_auth_headers(body=body),
+            ) as response:
+                response.raise_for_status()
+                await response.json()
+
+
+async def request_with_shared_session(client: IfGamesClient, index: int) -> None:
+    if index % 2 == 0:
+        await client.get_events(from_date=0, offset=index, limit=50)
+    else:
+        await client.post_scores(scores={"results": [{"event_id": f"event_{index}", "score": 0.5}]})
+
+
+async def run_mode(mode: str, n_requests: int, concurrency: int) -> dict:
+    connections = set()
+
+    runner = web.AppRunner(make_stand_in_app(connections=connections), access_log=None)
+    await runner.setup()
+
+    site = web.TCPSite(runner, host="127.0.0.1", port=0)
+    await site.start()
+
+    port = runner.addresses[0][1]
+    client = make_client(base_url=f"http://127.0.0.1:{port}")
+
+    if mode == "session_per_request":
+        request = request_with_own_session
+    else:
+        request = request_with_shared_session
+
+    latency = LatencyHistogram()
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def timed_request(index: int) -> None:
+        async with semaphore:
+            start_time = time.perf_counter()
+
+            await request(client=client, index=index)
+
+            latency.observe(time.perf_counter() - start_time)
+
+    try:
+        start_time = time.perf_counter()
+
+        await asyncio.gather(*[timed_request(index=index) for index in range(n_requests)])
+
+        wall_seconds = time.perf_counter() - start_time
+    finally:
+        await client.close()
+        await runner.cleanup()
+
+    snapshot = latency.snapshot()
+
+    return {
+        "wall_ms": round(wall_seconds * 1000, 1),
+        "requests_per_second": round(n_requests / wall_seconds, 1),
+        "latency_p50_ms": round(snapshot["p50"] * 1000, 2),
+        "latency_p99_ms": round(snapshot["p99"] * 1000, 2),
+        "connections": len(connections),
+    }
+
+
+def run_benchmark(n_requests: int, concurrency: int) -> dict:
+    results = {}
+
+    for mode in ["session_per_request", "shared_session"]:
+        results[mode] = asyncio.run(
+            run_mode(mode=mode, n_requests=n_requests, concurrency=concurrency)
+        )
+
+    return {"n_requests": n_requests, "concurrency": concurrency, "results": results}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--requests", type=int, default=2000)
+    parser.add_argument("--concurrency", type=int, default=16)
+    args = parser.parse_args()
+
+    result = run_benchmark(n_requests=args.requests, concurrency=args.concurrency)
+
+    print(json.dumps(result, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,205 @@
+"""
+Benchmark the hot DatabaseOperations queries before and after the hot queries indexes.
+
+Seeds a database migrated up to the revision preceding the indexes, records the query plan
+and the timings of each method, upgrades to head and records them again.
+Writes run inside a transaction rolled back after each run.
+
+Usage:
+    python -m neurons.validator.benchmarks.db_indexes --miners 256 --events 5000 --intervals 6
+"""
+
+import argparse
+import asyncio
+import json
+import sqlite3
+import statistics
+import tempfile
+import time
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any, Awaitable, Callable
+from unittest.mock import MagicMock
+
+from neurons.validator.alembic.migrate import run_migrations
+from neurons.validator.benchmarks.fakes import RecordingDatabaseClient
+from neurons.validator.benchmarks.synthetic_data import seed_database
+from neurons.validator.db.operations import DatabaseOperations
+from neurons.validator.utils.common.interval import align_to_interval, minutes_since_epoch
+from neurons.validator.utils.logger.logger import InfiniteGamesLogger
+
+# Revision preceding the hot queries indexes one
+BEFORE_INDEXES_REVISION = "5c1d7e2a9f04"
+
+
+class Rollback(Exception):
+    pass
+
+
+def explain(db_path: str, statements: list[tuple[str, Any]]) -> list[list[str]]:
+    connection = sqlite3.connect(db_path)
+
+    try:
+        return [
+            [row[3] for row in connection.execute(f"EXPLAIN QUERY PLAN {sql}", parameters or [])]
+            for sql, parameters in statements
+        ]
+    finally:
+        connection.close()
+
+
+def make_cases(
+    db_operations: DatabaseOperations, seeded: dict[str, Any]
+) -> dict[str, Callable[[], Awaitable[Any]]]:
+    current_interval = align_to_interval(minutes_since_epoch(datetime.now(timezone.utc)))
+
+    async def rolled_back(operation: Callable[[], Awaitable[Any]]) -> None:
+        try:
+            async with db_operations.transaction():
+                await operation()
+
+                raise Rollback()
+        except Rollback:
+            pass
+
+    return {
+        "get_event": lambda: db_operations.get_event(seeded["pending_unique_event_id"]),
+        "get_events_last_resolved_at": db_operations.get_events_last_resolved_at,
+        "get_events_pending_first_created_at": db_operations.get_events_pending_first_created_at,
+        "get_events_to_predict": db_operations.get_events_to_predict,
+        "get_last_event_from": db_operations.get_last_event_from,
+        "get_events_for_scoring": lambda: db_operations.get_events_for_scoring(max_events=100),
+        "get_predictions_for_scoring": lambda: db_operations.get_predictions_for_scoring(
+            seeded["scored_unique_event_id"]
+        ),
+        "get_miners_last_registration": db_operations.get_miners_last_registration,
+        "get_events_for_metagraph_scoring": db_operations.get_events_for_metagraph_scoring,
+        "get_peer_scored_events_for_export": lambda: (
+            db_operations.get_peer_scored_events_for_export(max_events=1)
+        ),
+        "get_peer_scores_for_export": lambda: db_operations.get_peer_scores_for_export(
+            seeded["scored_event_id"]
+        ),
+        "get_last_metagraph_scores": db_operations.get_last_metagraph_scores,
+        "get_predictions_to_export": lambda: db_operations.get_predictions_to_export(
+            current_interval_minutes=current_interval, batch_size=500
+        ),
+        "get_wa_prediction_event": lambda: db_operations.get_wa_prediction_event(
+            seeded["pending_unique_event_id"], current_interval
+        ),
+        "delete_predictions": lambda: rolled_back(
+            lambda: db_operations.delete_predictions(batch_size=4000)
+        ),
+        "resolve_event": lambda: rolled_back(
+            lambda: db_operations.resolve_event(
+                seeded["pending_unique_event_id"].removeprefix("ifgames-"),
+                "1",
+                datetime.now(timezone.utc).isoformat(),
+            )
+        ),
+    }
+
+
+async def measure(db_path: str, seeded: dict[str, Any], repeat: int) -> dict[str, dict]:
+    logger = MagicMock(spec=InfiniteGamesLogger)
+    db_client = RecordingDatabaseClient(db_path=db_path, logger=logger)
+    db_operations = DatabaseOperations(db_client=db_client, logger=logger)
+
+    results = {}
+
+    try:
+        for name, case in make_cases(db_operations, seeded).items():
+            # First run warms the page cache and records the statements
+            db_client.statements = []
+            await case()
+            statements = list(db_client.statements)
+
+            timings = []
+
+            for _ in range(repeat):
+                start_time = time.perf_counter()
+                await case()
+                timings.append((time.perf_counter() - start_time) * 1000)
+
+            results[name] = {
+                "median_ms": round(statistics.median(timings), 3),
+                "max_ms": round(max(timings), 3),
+                "plans": explain(db_path, statements),
+            }
+    finally:
+        await db_client.close()
+
+    return results
+
+
+def run_benchmark(n_miners: int, n_events: int, n_intervals: int, repeat: int, seed: int) -> dict:
+    with tempfile.TemporaryDirectory() as temp_dir:
+        db_path = str(Path(temp_dir, "benchmark.db"))
+
+        run_migrations(db_file_name=db_path, revision=BEFORE_INDEXES_REVISION)
+
+        start_time = time.perf_counter()
+        seeded = seed_database(
+            db_path=db_path,
+            n_miners=n_miners,
+            n_events=n_events,
+            n_intervals=n_intervals,
+            seed=seed,
+        )
+        seed_seconds = time.perf_counter() - start_time
+
+        before = asyncio.run(measure(db_path=db_path, seeded=seeded, repeat=repeat))
+
+        start_time = time.perf_counter()
+        run_migrations(db_file_name=db_path)
+        migration_seconds = time.perf_counter() - start_time
+
+        after = asyncio.run(measure(db_path=db_path, seeded=seeded, repeat=repeat))
+
+    return {
+        "n_miners": n_miners,
+        "n_events": n_events,
+        "n_intervals": n_intervals,
+        "repeat": repeat,
+        "seeded": {
+            "events": seeded["events"],
+            "predictions": seeded["predictions"],
+            "scores": seeded["scores"],
+        },
+        "seed_s": round(seed_seconds, 1),
+        "migration_s": round(migration_seconds, 1),
+        "methods": {
+            name: {
+                "before": before[name],
+                "after": after[name],
+                "speedup": round(
+                    before[name]["median_ms"] / max(after[name]["median_ms"], 0.001), 1
+                ),
+            }
+            for name in before
+        },
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--miners", type=int, default=256)
+    parser.add_argument("--events", type=int, default=5000)
+    parser.add_argument("--intervals", type=int, default=6)
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    result = run_benchmark(
+        n_miners=args.miners,
+        n_events=args.events,
+        n_intervals=args.intervals,
+        repeat=args.repeat,
+        seed=args.seed,
+    )
+
+    print(json.dumps(result, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,161 @@
+"""
+Benchmark the event loop lag of a peer scoring run, with its compute stages inline and in a
+process pool.
+
+A probe coroutine sleeps every few milliseconds next to the task and records how late it
+wakes up, which is how long the other tasks, the dendrite responses and the API would wait.
+Reports the lag percentiles and the wall time of each mode as JSON.
+
+Usage:
+    python -m neurons.validator.benchmarks.event_loop_lag --miners 256 --events 5000 --workers 2
+"""
+
+import argparse
+import asyncio
+import json
+import multiprocessing
+import shutil
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from typing import Optional
+from unittest.mock import MagicMock
+
+from neurons.validator.alembic.migrate import run_migrations
+from neurons.validator.benchmarks.fakes import make_metagraph
+from neurons.validator.benchmarks.synthetic_data import seed_database
+from neurons.validator.db.client import DatabaseClient
+from neurons.validator.db.operations import DatabaseOperations
+from neurons.validator.tasks.peer_scoring import PeerScoring
+from neurons.validator.utils.common.histogram import LatencyHistogram
+from neurons.validator.utils.logger.logger import InfiniteGamesLogger
+
+PROBE_INTERVAL_SECONDS = 0.005
+
+LAG_BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0)
+
+
+async def probe_lag(histogram: LatencyHistogram, stop: asyncio.Event) -> None:
+    while not stop.is_set():
+        start_time = time.perf_counter()
+
+        await asyncio.sleep(PROBE_INTERVAL_SECONDS)
+
+        histogram.observe(max(0.0, time.perf_counter() - start_time - PROBE_INTERVAL_SECONDS))
+
+
+async def run_peer_scoring(
+    db_path: str, n_miners: int, executor: Optional[ProcessPoolExecutor]
+) -> dict:
+    logger = MagicMock(spec=InfiniteGamesLogger)
+    db_client = DatabaseClient(db_path=db_path, logger=logger)
+    db_operations = DatabaseOperations(db_client=db_client, logger=logger)
+
+    task = PeerScoring(
+        interval_seconds=307.0,
+        db_operations=db_operations,
+        metagraph=make_metagraph(n_miners=n_miners),
+        logger=logger,
+        page_size=100,
+    )
+    task.compute_executor = executor
+
+    histogram = LatencyHistogram(buckets=LAG_BUCKETS)
+    stop = asyncio.Event()
+    probe = asyncio.create_task(probe_lag(histogram=histogram, stop=stop))
+
+    try:
+        start_time = time.perf_counter()
+        await task.run()
+        wall_seconds = time.perf_counter() - start_time
+    finally:
+        stop.set()
+        await probe
+        await db_client.close()
+
+    def to_ms(value: Optional[float]) -> Optional[float]:
+        return None if value is None else round(value * 1000, 2)
+
+    lag = histogram.snapshot()
+
+    return {
+        "wall_ms": round(wall_seconds * 1000, 1),
+        "lag_p50_ms": to_ms(lag["p50"]),
+        "lag_p95_ms": to_ms(lag["p95"]),
+        "lag_p99_ms": to_ms(lag["p99"]),
+        "lag_max_ms": to_ms(lag["max"]),
+        "lag_total_ms": to_ms(lag["sum"]),
+        "errors_logged": logger.exception.call_count + logger.error.call_count,
+    }
+
+
+def run_benchmark(n_miners: int, n_events: int, n_intervals: int, workers: int, seed: int) -> dict:
+    with tempfile.TemporaryDirectory() as temp_dir:
+        seeded_db_path = str(Path(temp_dir, "seeded.db"))
+
+        run_migrations(db_file_name=seeded_db_path)
+
+        seeded = seed_database(
+            db_path=seeded_db_path,
+            n_miners=n_miners,
+            n_events=n_events,
+            n_intervals=n_intervals,
+            seed=seed,
+        )
+
+        results = {}
+
+        for mode in ["inline", "process_pool"]:
+            # Each mode scores the same events
+            db_path = str(Path(temp_dir, f"{mode}.db"))
+            shutil.copyfile(seeded_db_path, db_path)
+
+            if mode == "inline":
+                results[mode] = asyncio.run(
+                    run_peer_scoring(db_path=db_path, n_miners=n_miners, executor=None)
+                )
+                continue
+
+            with ProcessPoolExecutor(
+                max_workers=workers, mp_context=multiprocessing.get_context("spawn")
+            ) as executor:
+                # Warm up the workers, their imports are not part of a run
+                list(executor.map(abs, range(workers)))
+
+                results[mode] = asyncio.run(
+                    run_peer_scoring(db_path=db_path, n_miners=n_miners, executor=executor)
+                )
+
+    return {
+        "n_miners": n_miners,
+        "n_events": n_events,
+        "n_intervals": n_intervals,
+        "workers": workers,
+        "events_to_score": seeded["events"]["not_peer_scored"],
+        "results": results,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--miners", type=int, default=256)
+    parser.add_argument("--events", type=int, default=5000)
+    parser.add_argument("--intervals", type=int, default=12)
+    parser.add_argument("--workers", type=int, default=2)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    result = run_benchmark(
+        n_miners=args.miners,
+        n_events=args.events,
+        n_intervals=args.intervals,
+        workers=args.workers,
+        seed=args.seed,
+    )
+
+    print(json.dumps(result, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,175 @@
+"""
+Offline fakes of the validator dependencies for the benchmarks: metagraph, dendrite,
+IfGamesClient, and a database client recording the statements executed and their duration.
+"""
+
+import asyncio
+import json
+import random
+import time
+from typing import Any, Iterable, Optional, Union
+from unittest.mock import AsyncMock, MagicMock
+
+import torch
+from bittensor.core.chain_data import AxonInfo
+from bittensor.core.dendrite import DendriteMixin
+from bittensor.core.metagraph import MetagraphMixin
+from bittensor_wallet import Wallet
+
+from neurons.protocol import EventPredictionSynapse
+from neurons.validator.benchmarks.synthetic_data import miner_hotkey
+from neurons.validator.db.client import DatabaseClient
+from neurons.validator.if_games.client import IfGamesClient
+from neurons.validator.utils.logger.logger import InfiniteGamesLogger
+
+
+class RecordingDatabaseClient(DatabaseClient):
+    """Database client recording the statements executed and the time spent on them"""
+
+    statements: list[tuple[str, Any]]
+    sql_seconds: float
+
+    def __init__(self, db_path: str, logger: InfiniteGamesLogger) -> None:
+        super().__init__(db_path=db_path, logger=logger)
+
+        self.statements = []
+        self.sql_seconds = 0.0
+
+    async def __record(self, sql: str, parameters: Any, execution) -> Any:
+        self.statements.append((sql, parameters))
+
+        start_time = time.perf_counter()
+
+        try:
+            return await execution
+        finally:
+            self.sql_seconds += time.perf_counter() - start_time
+
+    async def insert(self, sql: str, parameters: Optional[Iterable[Any]] = None):
+        return await self.__record(sql, parameters, super().insert(sql, parameters))
+
+    async def insert_many(self, sql: str, parameters: Iterable[Iterable[Any]]):
+        return await self.__record(sql, None, super().insert_many(sql, parameters))
+
+    async def delete(self, sql: str, parameters: Optional[Iterable[Any]] = None):
+        return await self.__record(sql, parameters, super().delete(sql, parameters))
+
+    async def update(self, sql: str, parameters: Optional[Iterable[Any]] = None):
+        return await self.__record(sql, parameters, super().update(sql, parameters))
+
+    async def one(self, sql: str, parameters: Optional[Iterable[Any]] = None, **kwargs):
+        return await self.__record(sql, parameters, super().one(sql, parameters, **kwargs))
+
+    async def many(self, sql: str, parameters: Optional[Iterable[Any]] = None, **kwargs):
+        return await self.__record(sql, parameters, super().many(sql, parameters, **kwargs))
+
+
+class FakeIfGamesClient(IfGamesClient):
+    """IfGamesClient answering the posts locally after the given latency"""
+
+    latency_seconds: float
+    posted: dict[str, int]
+
+    def __init__(self, logger: InfiniteGamesLogger, latency_seconds: float = 0.0) -> None:
+        hotkey = MagicMock()
+        hotkey.public_key = b"fake_public_key"
+        bt_wallet = MagicMock(spec=Wallet, hotkey=hotkey)
+
+        super().__init__(env="test", logger=logger, bt_wallet=bt_wallet)
+
+        self.latency_seconds = latency_seconds
+        self.posted = {"predictions": 0, "scores": 0}
+
+    async def post_predictions(self, predictions: Union[dict[any], bytes]):
+        await asyncio.sleep(self.latency_seconds)
+
+        if isinstance(predictions, bytes):
+            predictions = json.loads(predictions)
+
+        self.posted["predictions"] += len(predictions["submissions"])
+
+        return {}
+
+    async def post_scores(self, scores: Union[dict, bytes]):
+        await asyncio.sleep(self.latency_seconds)
+
+        if isinstance(scores, bytes):
+            scores = json.loads(scores)
+
+        self.posted["scores"] += len(scores["results"])
+
+        return {}
+
+
+def make_metagraph(n_miners: int, block: int = 4_000_000) -> MetagraphMixin:
+    """Metagraph of n_miners serving miners, matching the synthetic data hotkeys"""
+
+    metagraph = MagicMock(spec=MetagraphMixin)
+    metagraph.sync = MagicMock()
+    metagraph.block = torch.tensor(block)
+    metagraph.uids = torch.arange(n_miners, dtype=torch.int32)
+    metagraph.hotkeys = [miner_hotkey(uid) for uid in range(n_miners)]
+    metagraph.axons = [
+        AxonInfo(
+            hotkey=miner_hotkey(uid),
+            coldkey=f"coldkey{uid}",
+            version=1,
+            ip=f"10.0.{uid // 256}.{uid % 256}",
+            port=8091,
+            ip_type=4,
+        )
+        for uid in range(n_miners)
+    ]
+    metagraph.validator_trust = torch.zeros(n_miners)
+    metagraph.validator_permit = torch.zeros(n_miners)
+
+    return metagraph
+
+
+def make_dendrite(
+    answer_rate: float = 0.8, latency_seconds: float = 0.0, seed: int = 0
+) -> DendriteMixin:
+    """
+    Dendrite whose miners answer a random probability on a share of the events.
+    Miners latencies are log-normally distributed around latency_seconds,
+    forward() answers after the slowest one as the real dendrite.
+    """
+
+    rng = random.Random(seed)
+
+    def miner_latency() -> float:
+        return latency_seconds * rng.lognormvariate(0, 0.75)
+
+    def miner_response(synapse: EventPredictionSynapse) -> EventPredictionSynapse:
+        events = {}
+
+        for key, event in synapse.events.items():
+            answered = rng.random() < answer_rate
+
+            events[key] = {
+                **event,
+                "probability": round(rng.random(), 3) if answered else None,
+                "miner_answered": answered,
+            }
+
+        return EventPredictionSynapse(events=events)
+
+    async def forward(
+        axons: list, synapse: EventPredictionSynapse, deserialize: bool, timeout: float
+    ) -> list[EventPredictionSynapse]:
+        await asyncio.sleep(min(max((miner_latency() for _ in axons), default=0), timeout))
+
+        return [miner_response(synapse) for _ in axons]
+
+    async def call(
+        target_axon: AxonInfo, synapse: EventPredictionSynapse, timeout: float, deserialize: bool
+    ) -> EventPredictionSynapse:
+        await asyncio.sleep(min(miner_latency(), timeout))
+
+        return miner_response(synapse)
+
+    dendrite = MagicMock(spec=DendriteMixin)
+    dendrite.forward = AsyncMock(side_effect=forward)
+    dendrite.call = AsyncMock(side_effect=call)
+
+    return dendrite
@@ -0,0 +1,389 @@
+"""
+Benchmark the vectorized peer scoring engine against the pandas pipeline it replaced,
+kept in this module as the reference of the engine parity tests.
+
+Usage:
+    python -m neurons.validator.benchmarks.peer_scoring_engine --miners 256 --intervals 84
+"""
+
+import argparse
+import json
+import math
+import statistics
+import time
+from functools import partial
+
+import numpy as np
+import pandas as pd
+
+from neurons.validator.scoring.peer_scoring_engine import (
+    CLIP_EPS,
+    UPTIME_PENALTY_DISTANCE,
+    build_event_matrix,
+    reverse_exponential_weights,
+    score_event,
+)
+from neurons.validator.tasks.peer_scoring import PSNames
+from neurons.validator.utils.common.interval import AGGREGATION_INTERVAL_LENGTH_MINUTES
+
+
+def make_event_frames(
+    n_miners: int, n_intervals: int, answer_rate: float, seed: int
+) -> tuple[pd.DataFrame, pd.DataFrame, pd.DataFrame]:
+    rng = np.random.default_rng(seed)
+
+    interval_starts = (
+        100_080 + np.arange(n_intervals, dtype=np.int64) * AGGREGATION_INTERVAL_LENGTH_MINUTES
+    )
+    miner_uids = np.arange(n_miners, dtype=np.int64)
+    hotkeys = [f"hotkey{uid}" for uid in miner_uids]
+
+    miners = pd.DataFrame(
+        {
+            PSNames.miner_uid: pd.array(miner_uids, dtype=pd.Int64Dtype()),
+            PSNames.miner_hotkey: hotkeys,
+            PSNames.miner_registered_minutes: np.full(n_miners, 99_000, dtype=np.int64),
+        }
+    )
+    intervals = pd.DataFrame(
+        {
+            PSNames.interval_idx: np.arange(n_intervals),
+            PSNames.interval_start: interval_starts,
+            PSNames.interval_end: interval_starts + AGGREGATION_INTERVAL_LENGTH_MINUTES,
+            PSNames.weight: reverse_exponential_weights(n_intervals),
+        }
+    )
+
+    miner_idx, interval_idx = np.nonzero(rng.random((n_miners, n_intervals)) < answer_rate)
+    predictions_df = pd.DataFrame(
+        {
+            PSNames.miner_uid: pd.array(miner_uids[miner_idx], dtype=pd.Int64Dtype()),
+            PSNames.miner_hotkey: [hotkeys[idx] for idx in miner_idx],
+            PSNames.interval_start: interval_starts[interval_idx],
+            PSNames.interval_agg_prediction: np.clip(
+                rng.random(len(miner_idx)), CLIP_EPS, 1 - CLIP_EPS
+            ),
+        }
+    )
+
+    return miners, intervals, predictions_df
+
+
+# Reference pandas pipeline the engine replaced, one frame row per miner and interval
+
+
+def reverse_exponential_weight(idx, n_intervals):
+    # first 2 intervals are 1, then it decays exponentially
+    if idx < 2:
+        return 1
+    else:
+        return math.exp(-(n_intervals / (n_intervals - idx)) + 1)
+
+
+def get_interval_scores_base(
+    predictions_df: pd.DataFrame, miners: pd.DataFrame, intervals: pd.DataFrame
+) -> pd.DataFrame:
+    # all miners should have a row for each interval, then left join with predictions
+    miners["key"] = 1
+    intervals["key"] = 1
+    miners_intervals = pd.merge(
+        miners[
+            [
+                "key",
+                PSNames.miner_uid,
+                PSNames.miner_hotkey,
+                PSNames.miner_registered_minutes,
+            ]
+        ],
+        intervals,
+        on="key",
+    )
+
+    interval_scores_df = pd.merge(
+        miners_intervals,
+        predictions_df,
+        on=[PSNames.miner_uid, PSNames.miner_hotkey, PSNames.interval_start],
+        how="left",
+    )
+    # keep only columns needed for scoring
+    interval_scores_df = interval_scores_df[
+        [
+            PSNames.miner_uid,
+            PSNames.miner_hotkey,
+            PSNames.miner_registered_minutes,
+            PSNames.interval_idx,
+            PSNames.interval_start,
+            PSNames.interval_end,
+            PSNames.weight,
+            PSNames.interval_agg_prediction,
+        ]
+    ]
+    return interval_scores_df
+
+
+def log_score(
+    prediction: float,
+    outcome: int,
+) -> float:
+    if outcome == 1:
+        return np.log(prediction)
+    else:
+        return np.log(1 - prediction)
+
+
+def inverse_log_score(
+    log_score: float,
+    outcome: int,
+) -> float:
+    if outcome == 1:
+        return np.exp(log_score)
+    else:
+        return 1 - np.exp(log_score)
+
+
+def fill_unresponsive_miners(interval_scores: pd.DataFrame, outcome_round: int) -> pd.DataFrame:
+    interval_scores_df = interval_scores.copy()
+    interval_scores_df[PSNames.interval_agg_prediction] = interval_scores_df[
+        PSNames.interval_agg_prediction
+    ].astype("Float64")
+
+    wrong_outcome = 1 - abs(outcome_round - CLIP_EPS)
+    # for miners with registered_date_minutes < interval_start but no answer:
+    unresponsive_miners = (
+        interval_scores_df[PSNames.miner_registered_minutes]
+        < interval_scores_df[PSNames.interval_start]
+    ) & (interval_scores_df[PSNames.interval_agg_prediction].isnull())
+
+    grouped = interval_scores_df.groupby(PSNames.interval_idx)
+    mean_prediction = grouped[PSNames.interval_agg_prediction].transform("mean")
+    # Determine the worst prediction per interval:
+    # - If outcome_round is 1, a lower prediction is worse so we use the minimum.
+    # - If outcome_round is 0, a higher prediction is worse so we use the maximum.
+    if outcome_round == 1:
+        worst_prediction = grouped[PSNames.interval_agg_prediction].transform("min")
+    else:
+        worst_prediction = grouped[PSNames.interval_agg_prediction].transform("max")
+
+    # imputed prediction is the mean plus 1/3 of the difference between worst and mean.
+    imputed_prediction = (
+        mean_prediction + (worst_prediction - mean_prediction) * UPTIME_PENALTY_DISTANCE
+    )
+
+    # In case there are no responsive miners in an interval, fallback to the totally wrong answer.
+    imputed_prediction = imputed_prediction.fillna(wrong_outcome)
+
+    interval_scores_df.loc[
+        unresponsive_miners, PSNames.interval_agg_prediction
+    ] = imputed_prediction[unresponsive_miners]
+
+    return interval_scores_df
+
+
+def peer_score_intervals(interval_scores: pd.DataFrame, outcome_round: int) -> pd.DataFrame:
+    worst_log_score = np.log(CLIP_EPS)  # worst possible log score
+
+    # fill unresponsive miners
+    interval_scores_df = fill_unresponsive_miners(interval_scores, outcome_round)
+
+    # calculate the log score for each interval
+    partial_log_score = partial(log_score, outcome=outcome_round)
+    interval_scores_df[PSNames.log_score] = interval_scores_df[
+        PSNames.interval_agg_prediction
+    ].apply(partial_log_score)
+
+    # group by interval and calculate mean_log_score of other miners except the current one
+    interval_scores_df[PSNames.group_sum] = interval_scores_df.groupby(PSNames.interval_idx)[
+        PSNames.log_score
+    ].transform("sum")
+    # use count not size to avoid NaNs!!!
+    interval_scores_df[PSNames.group_count] = interval_scores_df.groupby(PSNames.interval_idx)[
+        PSNames.log_score
+    ].transform("count")
+
+    interval_scores_df[PSNames.mean_log_score_others] = np.where(
+        interval_scores_df[PSNames.log_score].isna(),
+        # For null log_score, use the full group's mean (if count > 0)
+        np.where(
+            interval_scores_df[PSNames.group_count] > 0,
+            interval_scores_df[PSNames.group_sum] / interval_scores_df[PSNames.group_count],
+            worst_log_score,  # should not happen - in case all miners are new for an interval
+        ),
+        # For non-null log_score, subtract current value and reduce the count by one,
+        # but only if there is at least one "other" value
+        np.where(
+            interval_scores_df[PSNames.group_count] > 1,
+            (interval_scores_df[PSNames.group_sum] - interval_scores_df[PSNames.log_score])
+            / (interval_scores_df[PSNames.group_count] - 1),
+            worst_log_score,  # in case all miners but one are new for an interval
+        ),
+    )
+
+    # fill null log_scores with mean_log_score_others
+    interval_scores_df[PSNames.log_score] = interval_scores_df[PSNames.log_score].astype("Float64")
+    interval_scores_df[PSNames.log_score] = interval_scores_df[PSNames.log_score].fillna(
+        interval_scores_df[PSNames.mean_log_score_others]
+    )
+    # fill null interval_agg_predictions with reverse of log_scores
+    partial_inverse_log_score = partial(inverse_log_score, outcome=outcome_round)
+    interval_scores_df[PSNames.interval_agg_prediction] = interval_scores_df[
+        PSNames.interval_agg_prediction
+    ].fillna(interval_scores_df[PSNames.log_score].apply(partial_inverse_log_score))
+
+    # calculate the peer score
+    interval_scores_df[PSNames.peer_score] = (
+        interval_scores_df[PSNames.log_score] - interval_scores_df[PSNames.mean_log_score_others]
+    )
+    interval_scores_df[PSNames.weighted_peer_score] = (
+        interval_scores_df[PSNames.peer_score] * interval_scores_df[PSNames.weight]
+    )
+    interval_scores_df[PSNames.weighted_prediction] = (
+        interval_scores_df[PSNames.interval_agg_prediction] * interval_scores_df[PSNames.weight]
+    )
+
+    return interval_scores_df
+
+
+def reduce_scored_intervals_df(scored_intervals_df: pd.DataFrame) -> pd.DataFrame:
+    # group by miner and calculate the reverse exponential MA of peer scores
+    scores_df = (
+        scored_intervals_df.groupby([PSNames.miner_uid, PSNames.miner_hotkey])
+        .agg(
+            weighted_prediction_sum=(PSNames.weighted_prediction, "sum"),
+            weighted_peer_score_sum=(PSNames.weighted_peer_score, "sum"),
+            weight_sum=(PSNames.weight, "sum"),
+        )
+        .reset_index()
+    )
+    scores_df[PSNames.rema_prediction] = (
+        scores_df[PSNames.weighted_prediction_sum] / scores_df[PSNames.weight_sum]
+    )
+    scores_df[PSNames.rema_peer_score] = (
+        scores_df[PSNames.weighted_peer_score_sum] / scores_df[PSNames.weight_sum]
+    )
+
+    return scores_df[
+        [
+            PSNames.miner_uid,
+            PSNames.miner_hotkey,
+            PSNames.rema_prediction,
+            PSNames.rema_peer_score,
+        ]
+    ]
+
+
+def score_intervals_pandas(
+    predictions_df: pd.DataFrame,
+    miners: pd.DataFrame,
+    intervals: pd.DataFrame,
+    outcome_round: int,
+) -> pd.DataFrame:
+    interval_scores_df = get_interval_scores_base(
+        predictions_df=predictions_df, miners=miners.copy(), intervals=intervals.copy()
+    )
+    scored_intervals_df = peer_score_intervals(
+        interval_scores=interval_scores_df, outcome_round=outcome_round
+    )
+
+    return reduce_scored_intervals_df(scored_intervals_df)
+
+
+def time_runs(fn, repeat: int) -> tuple[list[float], pd.DataFrame]:
+    timings = []
+    result = None
+
+    for _ in range(repeat):
+        start_time = time.perf_counter()
+        result = fn()
+        timings.append((time.perf_counter() - start_time) * 1000)
+
+    return timings, result
+
+
+def summarize(timings: list[float]) -> dict:
+    return {
+        "min_ms": round(min(timings), 3),
+        "median_ms": round(statistics.median(timings), 3),
+        "max_ms": round(max(timings), 3),
+    }
+
+
+def run_benchmark(
+    n_miners: int, n_intervals: int, answer_rate: float, outcome: int, repeat: int, seed: int
+) -> dict:
+    miners, intervals, predictions_df = make_event_frames(
+        n_miners=n_miners, n_intervals=n_intervals, answer_rate=answer_rate, seed=seed
+    )
+    predictions_df = pd.merge(
+        miners[[PSNames.miner_uid, PSNames.miner_hotkey]],
+        predictions_df,
+        on=[PSNames.miner_uid, PSNames.miner_hotkey],
+        how="left",
+    )
+
+    def pandas_path():
+        return score_intervals_pandas(
+            predictions_df=predictions_df,
+            miners=miners,
+            intervals=intervals,
+            outcome_round=outcome,
+        )
+
+    def numpy_path():
+        event_matrix = build_event_matrix(
+            miners=miners, intervals=intervals, predictions=predictions_df
+        )
+
+        return score_event(event_matrix, outcome_round=outcome)
+
+    pandas_timings, pandas_result = time_runs(pandas_path, repeat)
+    numpy_timings, numpy_result = time_runs(numpy_path, repeat)
+
+    max_abs_diff = max(
+        float(
+            np.max(
+                np.abs(
+                    pandas_result[column].to_numpy(dtype=np.float64)
+                    - numpy_result[column].to_numpy(dtype=np.float64)
+                )
+            )
+        )
+        for column in [PSNames.rema_prediction, PSNames.rema_peer_score]
+    )
+
+    return {
+        "n_miners": n_miners,
+        "n_intervals": n_intervals,
+        "n_predictions": int(predictions_df[PSNames.interval_agg_prediction].notna().sum()),
+        "outcome": outcome,
+        "repeat": repeat,
+        "pandas": summarize(pandas_timings),
+        "numpy": summarize(numpy_timings),
+        "speedup": round(statistics.median(pandas_timings) / statistics.median(numpy_timings), 1),
+        "max_abs_diff": max_abs_diff,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--miners", type=int, default=256)
+    parser.add_argument("--intervals", type=int, default=84)
+    parser.add_argument("--answer-rate", type=float, default=0.8)
+    parser.add_argument("--outcome", type=int, choices=[0, 1], default=1)
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    result = run_benchmark(
+        n_miners=args.miners,
+        n_intervals=args.intervals,
+        answer_rate=args.answer_rate,
+        outcome=args.outcome,
+        repeat=args.repeat,
+        seed=args.seed,
+    )
+
+    print(json.dumps(result, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,290 @@
+"""
+Benchmark the validator pipeline tasks on synthetic subnet data, fully offline.
+
+Seeds a database once, then runs each task on its own copy of it, in a fresh process to
+measure its peak RSS. Reports the wall time, the time spent in SQL and the peak RSS of each
+task run() as JSON.
+
+Usage:
+    python -m neurons.validator.benchmarks.pipeline --miners 256 --events 2000 --intervals 6
+"""
+
+import argparse
+import asyncio
+import json
+import multiprocessing
+import resource
+import shutil
+import statistics
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from unittest.mock import MagicMock
+
+from neurons.validator.alembic.migrate import run_migrations
+from neurons.validator.benchmarks.fakes import (
+    FakeIfGamesClient,
+    RecordingDatabaseClient,
+    make_dendrite,
+    make_metagraph,
+)
+from neurons.validator.benchmarks.synthetic_data import seed_database
+from neurons.validator.db.operations import DatabaseOperations
+from neurons.validator.scheduler.task import AbstractTask
+from neurons.validator.tasks.db_cleaner import DbCleaner
+from neurons.validator.tasks.export_predictions import ExportPredictions
+from neurons.validator.tasks.export_scores import ExportScores
+from neurons.validator.tasks.metagraph_scoring import MetagraphScoring
+from neurons.validator.tasks.peer_scoring import PeerScoring
+from neurons.validator.tasks.query_miners import QueryMiners
+from neurons.validator.utils.logger.logger import InfiniteGamesLogger
+
+TASKS = [
+    "query-miners",
+    "query-miners-batch",
+    "export-predictions",
+    "peer-scoring",
+    "metagraph-scoring",
+    "export-scores",
+    "db-cleaner",
+]
+
+VALIDATOR_UID = 0
+VALIDATOR_HOTKEY = "validator_hotkey"
+
+
+def make_task(
+    task_name: str,
+    db_operations: DatabaseOperations,
+    api_client: FakeIfGamesClient,
+    n_miners: int,
+    latency_seconds: float,
+    logger: InfiniteGamesLogger,
+) -> AbstractTask:
+    # Same settings as in the validator main
+    if task_name == "query-miners":
+        return QueryMiners(
+            interval_seconds=180.0,
+            db_operations=db_operations,
+            dendrite=make_dendrite(latency_seconds=latency_seconds),
+            metagraph=make_metagraph(n_miners=n_miners),
+            logger=logger,
+            streaming=True,
+            max_concurrency=256,
+            store_batch_size=32,
+        )
+
+    if task_name == "query-miners-batch":
+        return QueryMiners(
+            interval_seconds=180.0,
+            db_operations=db_operations,
+            dendrite=make_dendrite(latency_seconds=latency_seconds),
+            metagraph=make_metagraph(n_miners=n_miners),
+            logger=logger,
+        )
+
+    if task_name == "export-predictions":
+        return ExportPredictions(
+            interval_seconds=180.0,
+            db_operations=db_operations,
+            api_client=api_client,
+            batch_size=300,
+            validator_uid=VALIDATOR_UID,
+            validator_hotkey=VALIDATOR_HOTKEY,
+            logger=logger,
+        )
+
+    if task_name == "peer-scoring":
+        return PeerScoring(
+            interval_seconds=307.0,
+            db_operations=db_operations,
+            metagraph=make_metagraph(n_miners=n_miners),
+            logger=logger,
+            page_size=100,
+        )
+
+    if task_name == "metagraph-scoring":
+        return MetagraphScoring(
+            interval_seconds=347.0,
+            db_operations=db_operations,
+            page_size=1000,
+            logger=logger,
+        )
+
+    if task_name == "export-scores":
+        return ExportScores(
+            interval_seconds=373.0,
+            page_size=500,
+            db_operations=db_operations,
+            api_client=api_client,
+            logger=logger,
+            validator_uid=VALIDATOR_UID,
+            validator_hotkey=VALIDATOR_HOTKEY,
+        )
+
+    if task_name == "db-cleaner":
+        return DbCleaner(
+            interval_seconds=53.0, db_operations=db_operations, batch_size=4000, logger=logger
+        )
+
+    raise ValueError(f"Unknown task {task_name}.")
+
+
+def peak_rss_mb() -> float:
+    # ru_maxrss is in kilobytes on Linux
+    return round(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024, 1)
+
+
+async def run_task(task_name: str, db_path: str, n_miners: int, latency_seconds: float) -> dict:
+    logger = MagicMock(spec=InfiniteGamesLogger)
+    db_client = RecordingDatabaseClient(db_path=db_path, logger=logger)
+    db_operations = DatabaseOperations(db_client=db_client, logger=logger)
+    api_client = FakeIfGamesClient(logger=logger, latency_seconds=latency_seconds)
+
+    task = make_task(
+        task_name=task_name,
+        db_operations=db_operations,
+        api_client=api_client,
+        n_miners=n_miners,
+        latency_seconds=latency_seconds,
+        logger=logger,
+    )
+
+    rss_before_mb = peak_rss_mb()
+
+    try:
+        start_time = time.perf_counter()
+        await task.run()
+        wall_seconds = time.perf_counter() - start_time
+    finally:
+        await db_client.close()
+
+    return {
+        "wall_ms": round(wall_seconds * 1000, 1),
+        "sql_ms": round(db_client.sql_seconds * 1000, 1),
+        "sql_statements": len(db_client.statements),
+        "rss_before_mb": rss_before_mb,
+        "peak_rss_mb": peak_rss_mb(),
+        "posted": api_client.posted,
+        "errors_logged": logger.exception.call_count + logger.error.call_count,
+    }
+
+
+def measure_task(task_name: str, db_path: str, n_miners: int, latency_seconds: float) -> dict:
+    return asyncio.run(
+        run_task(
+            task_name=task_name,
+            db_path=db_path,
+            n_miners=n_miners,
+            latency_seconds=latency_seconds,
+        )
+    )
+
+
+def summarize(runs: list[dict]) -> dict:
+    return {
+        "wall_ms": round(statistics.median(run["wall_ms"] for run in runs), 1),
+        "sql_ms": round(statistics.median(run["sql_ms"] for run in runs), 1),
+        "sql_statements": runs[-1]["sql_statements"],
+        "rss_before_mb": max(run["rss_before_mb"] for run in runs),
+        "peak_rss_mb": max(run["peak_rss_mb"] for run in runs),
+        "posted": runs[-1]["posted"],
+        "errors_logged": max(run["errors_logged"] for run in runs),
+    }
+
+
+def run_benchmark(
+    tasks: list[str],
+    n_miners: int,
+    n_events: int,
+    n_intervals: int,
+    latency_seconds: float,
+    repeat: int,
+    seed: int,
+) -> dict:
+    # Fresh interpreter for each run, peak RSS is not carried over between tasks
+    mp_context = multiprocessing.get_context("spawn")
+
+    with tempfile.TemporaryDirectory() as temp_dir:
+        seeded_db_path = str(Path(temp_dir, "seeded.db"))
+
+        run_migrations(db_file_name=seeded_db_path)
+
+        start_time = time.perf_counter()
+        seeded = seed_database(
+            db_path=seeded_db_path,
+            n_miners=n_miners,
+            n_events=n_events,
+            n_intervals=n_intervals,
+            seed=seed,
+        )
+        seed_seconds = time.perf_counter() - start_time
+
+        results = {}
+
+        for task_name in tasks:
+            runs = []
+
+            for run_index in range(repeat):
+                # Each run starts from the seeded data
+                db_path = str(Path(temp_dir, f"{task_name}-{run_index}.db"))
+                shutil.copyfile(seeded_db_path, db_path)
+
+                with ProcessPoolExecutor(max_workers=1, mp_context=mp_context) as executor:
+                    runs.append(
+                        executor.submit(
+                            measure_task,
+                            task_name=task_name,
+                            db_path=db_path,
+                            n_miners=n_miners,
+                            latency_seconds=latency_seconds,
+                        ).result()
+                    )
+
+                Path(db_path).unlink()
+
+            results[task_name] = summarize(runs)
+
+    return {
+        "n_miners": n_miners,
+        "n_events": n_events,
+        "n_intervals": n_intervals,
+        "latency_ms": round(latency_seconds * 1000, 1),
+        "repeat": repeat,
+        "seeded": {
+            "events": seeded["events"],
+            "predictions": seeded["predictions"],
+            "scores": seeded["scores"],
+        },
+        "seed_s": round(seed_seconds, 1),
+        "tasks": results,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--miners", type=int, default=256)
+    parser.add_argument("--events", type=int, default=2000)
+    parser.add_argument("--intervals", type=int, default=6)
+    parser.add_argument("--tasks", nargs="+", choices=TASKS, default=TASKS)
+    parser.add_argument("--latency-ms", type=float, default=0.0)
+    parser.add_argument("--repeat", type=int, default=1)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    result = run_benchmark(
+        tasks=args.tasks,
+        n_miners=args.miners,
+        n_events=args.events,
+        n_intervals=args.intervals,
+        latency_seconds=args.latency_ms / 1000,
+        repeat=args.repeat,
+        seed=args.seed,
+    )
+
+    print(json.dumps(result, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,162 @@
+"""
+Benchmark the encoding of the scores payloads posted by ExportScores, from the results of the
+events packed in a payload to the bytes signed and sent.
+
+The round trip is the previous path: each event dumped to a JSON string and loaded back,
+the merged payload then serialized twice, once to sign it and once by aiohttp to send it.
+The other modes dump the results to JSON compatible values and encode the payload once
+with each JSON encoder, orjson only when installed.
+
+Usage:
+    python -m neurons.validator.benchmarks.score_payload --scores 256 1000 --scores-per-event 256
+"""
+
+import argparse
+import json
+import random
+import statistics
+import time
+from datetime import datetime, timedelta, timezone
+
+from neurons.validator.benchmarks.synthetic_data import miner_hotkey
+from neurons.validator.models.backend_models import MinerEventResult, MinerEventResultItems
+from neurons.validator.utils.common.json_encoder import JSON_ENCODERS, get_json_encoder
+
+DESCRIPTION = "Will the event happen by the resolution date? " * 20
+
+
+def make_events_results(
+    n_scores: int, scores_per_event: int, seed: int
+) -> list[MinerEventResultItems]:
+    """Results of the events packed in one payload, alike the ones of prepare_scores_payload"""
+
+    rng = random.Random(seed)
+    now = datetime.now(timezone.utc)
+
+    events_results = []
+
+    for event_idx in range(0, n_scores, scores_per_event):
+        cutoff = now - timedelta(hours=rng.randint(1, 48))
+
+        results = [
+            MinerEventResult(
+                event_id=f"event_{event_idx}",
+                provider_type="acled",
+                title=DESCRIPTION[:500],
+                description=DESCRIPTION,
+                category="event",
+                start_date=cutoff - timedelta(days=2),
+                end_date=cutoff + timedelta(hours=1),
+                resolve_date=cutoff + timedelta(hours=1),
+                settle_date=cutoff,
+                prediction=rng.random(),
+                answer=float(rng.randint(0, 1)),
+                miner_hotkey=miner_hotkey(uid),
+                miner_uid=uid,
+                miner_score=rng.random(),
+                miner_effective_score=rng.random() / 256,
+                validator_hotkey=miner_hotkey(0),
+                validator_uid=0,
+                metadata={"market_type": "acled", "other_data": {"peer_score": rng.random()}},
+                spec_version="1039",
+                registered_date=cutoff - timedelta(days=3),
+                scored_at=now,
+            )
+            for uid in range(min(scores_per_event, n_scores - event_idx))
+        ]
+
+        events_results.append(MinerEventResultItems(results=results))
+
+    return events_results
+
+
+def round_trip(events_results: list[MinerEventResultItems]) -> bytes:
+    payloads = [json.loads(items.model_dump_json()) for items in events_results]
+    payload = {"results": [result for payload in payloads for result in payload["results"]]}
+
+    # Serialized to sign, and again by aiohttp to send
+    json.dumps(payload)
+
+    return json.dumps(payload).encode("utf-8")
+
+
+def make_encode_once(encoder):
+    def encode_once(events_results: list[MinerEventResultItems]) -> bytes:
+        payloads = [items.model_dump(mode="json") for items in events_results]
+        payload = {"results": [result for payload in payloads for result in payload["results"]]}
+
+        return encoder(payload)
+
+    return encode_once
+
+
+def time_runs(fn, events_results: list[MinerEventResultItems], repeat: int) -> dict:
+    timings = []
+    body = b""
+
+    for _ in range(repeat):
+        start_time = time.perf_counter()
+        body = fn(events_results)
+        timings.append((time.perf_counter() - start_time) * 1000)
+
+    return {
+        "median_ms": round(statistics.median(timings), 3),
+        "min_ms": round(min(timings), 3),
+        "body_bytes": len(body),
+    }
+
+
+def run_benchmark(scores: list[int], scores_per_event: int, repeat: int, seed: int) -> dict:
+    modes = {"round_trip": round_trip}
+
+    for name in JSON_ENCODERS:
+        try:
+            encoder = get_json_encoder(name)
+        except ValueError:
+            # Optional encoder not installed
+            continue
+
+        modes[f"encode_once_{name}"] = make_encode_once(encoder)
+
+    results = {}
+
+    for n_scores in scores:
+        events_results = make_events_results(
+            n_scores=n_scores, scores_per_event=scores_per_event, seed=seed
+        )
+
+        timings = {
+            mode: time_runs(fn, events_results=events_results, repeat=repeat)
+            for mode, fn in modes.items()
+        }
+
+        baseline_ms = timings["round_trip"]["median_ms"]
+
+        for mode_timings in timings.values():
+            mode_timings["speedup"] = round(baseline_ms / mode_timings["median_ms"], 2)
+
+        results[n_scores] = timings
+
+    return {"scores_per_event": scores_per_event, "repeat": repeat, "results": results}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--scores", type=int, nargs="+", default=[64, 256, 1000])
+    parser.add_argument("--scores-per-event", type=int, default=256)
+    parser.add_argument("--repeat", type=int, default=20)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    result = run_benchmark(
+        scores=args.scores,
+        scores_per_event=args.scores_per_event,
+        repeat=args.repeat,
+        seed=args.seed,
+    )
+
+    print(json.dumps(result, indent=2))
+
+
+if __name__ == "__main__":
+    main()
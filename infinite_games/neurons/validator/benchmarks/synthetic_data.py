@@ -0,0 +1,241 @@
+"""
+Synthetic subnet data for the benchmarks.
+
+Events are created every 20 minutes up to now and go, from the latest to the oldest, through
+the stages of the validator pipeline: pending, settled and not peer scored, peer scored and
+not metagraph scored, metagraph scored and not exported, exported. Every miner predicts on the
+last intervals of each event.
+"""
+
+import random
+import sqlite3
+from datetime import datetime, timedelta, timezone
+from typing import Any
+
+from neurons.validator.models.event import EventStatus
+from neurons.validator.utils.common.interval import (
+    AGGREGATION_INTERVAL_LENGTH_MINUTES,
+    align_to_interval,
+    minutes_since_epoch,
+)
+
+# Share of the events in each stage, the remaining ones are exported
+PENDING_RATIO = 0.05
+NOT_PEER_SCORED_RATIO = 0.02
+NOT_METAGRAPH_SCORED_RATIO = 0.02
+NOT_EXPORTED_RATIO = 0.02
+
+# Share of the events discarded, outside of the pending ones
+DISCARDED_RATIO = 0.02
+
+EVENTS_FREQUENCY_MINUTES = 20
+EVENTS_DURATION = timedelta(days=2)
+
+SQLITE_DATETIME_FORMAT = "%Y-%m-%d %H:%M:%S"
+
+
+def miner_hotkey(uid: int) -> str:
+    return f"hotkey{uid}"
+
+
+def seed_database(
+    db_path: str, n_miners: int, n_events: int, n_intervals: int, seed: int
+) -> dict[str, Any]:
+    """
+    Seeds a migrated database with the miners, events, predictions and peer scores,
+    returns the rows count of each stage and some event ids to query
+    """
+
+    rng = random.Random(seed)
+    now = datetime.now(timezone.utc).replace(microsecond=0)
+
+    n_pending = max(1, int(n_events * PENDING_RATIO))
+    not_peer_scored_from = n_pending + max(1, int(n_events * NOT_PEER_SCORED_RATIO))
+    not_metagraph_scored_from = not_peer_scored_from + max(
+        1, int(n_events * NOT_METAGRAPH_SCORED_RATIO)
+    )
+    not_exported_from = not_metagraph_scored_from + max(1, int(n_events * NOT_EXPORTED_RATIO))
+    discarded_every = max(1, round(1 / DISCARDED_RATIO))
+
+    stages_count = {
+        "pending": 0,
+        "discarded": 0,
+        "not_peer_scored": 0,
+        "not_metagraph_scored": 0,
+        "not_exported": 0,
+        "exported": 0,
+    }
+    pending_unique_event_id = None
+    scored_event_id = None
+    scores_count = 0
+
+    connection = sqlite3.connect(db_path)
+
+    connection.executemany(
+        """
+            INSERT INTO miners
+                (miner_uid, miner_hotkey, node_ip, registered_date, last_updated, blocktime,
+                blocklisted, is_validating, validator_permit)
+            VALUES (?, ?, '127.0.0.1', ?, ?, ?, false, false, false)
+        """,
+        [
+            (
+                str(uid),
+                miner_hotkey(uid),
+                (now - timedelta(days=60)).isoformat(),
+                now.isoformat(),
+                uid,
+            )
+            for uid in range(n_miners)
+        ],
+    )
+
+    for index in range(n_events):
+        event_id = f"event{index}"
+        unique_event_id = f"ifgames-{event_id}"
+        from_last = n_events - index
+        created_at = now - timedelta(minutes=EVENTS_FREQUENCY_MINUTES * from_last)
+
+        if from_last > n_pending:
+            # Older events are resolved one hour after their cutoff
+            created_at -= EVENTS_DURATION + timedelta(hours=1)
+
+        cutoff = created_at + EVENTS_DURATION
+
+        if from_last <= n_pending:
+            stage = "pending"
+        elif index % discarded_every == 0:
+            stage = "discarded"
+        elif from_last <= not_peer_scored_from:
+            stage = "not_peer_scored"
+        elif from_last <= not_metagraph_scored_from:
+            stage = "not_metagraph_scored"
+        elif from_last <= not_exported_from:
+            stage = "not_exported"
+        else:
+            stage = "exported"
+
+        stages_count[stage] += 1
+
+        settled = stage not in ("pending", "discarded")
+        peer_scored = settled and stage != "not_peer_scored"
+        metagraph_scored = peer_scored and stage != "not_metagraph_scored"
+        exported = stage == "exported"
+
+        if stage == "pending":
+            status = EventStatus.PENDING
+        elif stage == "discarded":
+            status = EventStatus.DISCARDED
+        else:
+            status = EventStatus.SETTLED
+
+        resolved_at = cutoff + timedelta(hours=1) if settled else None
+
+        connection.execute(
+            """
+                INSERT INTO events
+                    (unique_event_id, event_id, market_type, event_type, registered_date,
+                    description, starts, resolve_date, outcome, local_updated_at, status,
+                    metadata, processed, exported, created_at, cutoff, end_date, resolved_at)
+                VALUES (?, ?, 'ifgames', 'binary', ?, 'Synthetic event', ?, ?, ?, ?, ?,
+                    '{"market_type": "binary"}', ?, ?, ?, ?, ?, ?)
+            """,
+            (
+                unique_event_id,
+                event_id,
+                created_at.isoformat(),
+                created_at.isoformat(),
+                cutoff.isoformat(),
+                str(rng.randint(0, 1)) if settled else None,
+                created_at.isoformat(),
+                status,
+                peer_scored or stage == "discarded",
+                exported,
+                created_at.isoformat(),
+                cutoff.isoformat(),
+                cutoff.isoformat(),
+                resolved_at.isoformat() if resolved_at else None,
+            ),
+        )
+
+        # Predictions on the last intervals before the cutoff, or up to the current one
+        last_interval = align_to_interval(minutes_since_epoch(min(cutoff, now)))
+        intervals = [
+            last_interval - AGGREGATION_INTERVAL_LENGTH_MINUTES * offset
+            for offset in range(n_intervals)
+        ]
+
+        connection.executemany(
+            """
+                INSERT INTO predictions
+                    (unique_event_id, minerHotkey, minerUid, predictedOutcome,
+                    interval_start_minutes, interval_agg_prediction, interval_count, submitted,
+                    blocktime, exported)
+                VALUES (?, ?, ?, ?, ?, ?, 1, ?, ?, ?)
+            """,
+            [
+                (
+                    unique_event_id,
+                    miner_hotkey(uid),
+                    str(uid),
+                    str(prediction),
+                    interval,
+                    prediction,
+                    created_at.isoformat(),
+                    uid,
+                    # Predictions of pending events are still to export
+                    stage != "pending",
+                )
+                for uid in range(n_miners)
+                for interval in intervals
+                for prediction in [round(rng.random(), 3)]
+            ],
+        )
+
+        if peer_scored:
+            score_created_at = resolved_at.strftime(SQLITE_DATETIME_FORMAT)
+
+            connection.executemany(
+                """
+                    INSERT INTO scores
+                        (event_id, miner_uid, miner_hotkey, prediction, event_score,
+                        metagraph_score, other_data, created_at, spec_version, processed,
+                        exported)
+                    VALUES (?, ?, ?, ?, ?, ?, '{}', ?, 1039, ?, ?)
+                """,
+                [
+                    (
+                        event_id,
+                        uid,
+                        miner_hotkey(uid),
+                        rng.random(),
+                        rng.uniform(-1, 1),
+                        rng.random() if metagraph_scored else None,
+                        score_created_at,
+                        metagraph_scored,
+                        exported,
+                    )
+                    for uid in range(n_miners)
+                ],
+            )
+
+            scores_count += n_miners
+
+        if stage == "pending" and pending_unique_event_id is None:
+            pending_unique_event_id = unique_event_id
+
+        if metagraph_scored:
+            scored_event_id = event_id
+
+        connection.commit()
+
+    connection.close()
+
+    return {
+        "events": stages_count,
+        "predictions": n_events * n_miners * n_intervals,
+        "scores": scores_count,
+        "pending_unique_event_id": pending_unique_event_id,
+        "scored_event_id": scored_event_id,
+        "scored_unique_event_id": f"ifgames-{scored_event_id}",
+    }
@@ -1,18 +1,112 @@
+import asyncio
+import sqlite3
 import sys
 import time
-from typing import Any, Awaitable, Callable, Iterable, Optional
+from collections import deque
+from contextlib import asynccontextmanager
+from contextvars import Context, ContextVar
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, AsyncIterator, Awaitable, Callable, Iterable, Optional
 
 import aiosqlite
 
 from neurons.validator.alembic.migrate import run_migrations
+from neurons.validator.utils.common.histogram import LatencyHistogram
 from neurons.validator.utils.logger.logger import InfiniteGamesLogger
 
+# Prepared statements kept by each connection, the registered ones and the dynamic ones
+# (IN lists, multi-row values) of the most frequent sizes
+STATEMENT_CACHE_SIZE = 256
+
+# Most writes committed together by the writer
+WRITE_BATCH_MAX_JOBS = 64
+
+# Upper bounds of the write queue wait and write batch duration buckets, in seconds
+WRITE_LATENCY_BUCKETS = (0.001, 0.005, 0.01, 0.05, 0.1, 0.5, 1.0, 5.0, 30.0, 120.0)
+
+# Waits and batches kept for the percentiles
+WRITE_HISTORY_SIZE = 1000
+
+
+@dataclass
+class SqlStats:
+    """
+    Count and total duration of the queries executed, waits for a connection included
+    """
+
+    count: int = 0
+    seconds: float = 0.0
+
+    def observe(self, seconds: float) -> None:
+        self.count += 1
+        self.seconds += seconds
+
+
+@dataclass
+class WriteJob:
+    """
+    Write queued for the writer, its result or error is set on the future
+    """
+
+    operation: Callable[[aiosqlite.Connection], Awaitable[Any]]
+    future: asyncio.Future
+    # Batchable jobs are committed together, the other ones run alone and commit on their own
+    batchable: bool
+    queued_at: float = field(default_factory=time.perf_counter)
+
+
+@dataclass
+class WriterStats:
+    """
+    Writes run by the writer since the client was created
+    """
+
+    wait_seconds: LatencyHistogram
+    batch_seconds: LatencyHistogram
+    jobs: int = 0
+    errors: int = 0
+    batches: int = 0
+    max_batch_size: int = 0
+    busy_seconds: float = 0.0
+
+
+# Stats the queries of the current asyncio task, and of the tasks it creates, are added to.
+# Set by the scheduler for each task run
+current_sql_stats: ContextVar[Optional[SqlStats]] = ContextVar("current_sql_stats", default=None)
+
 
 class DatabaseClient:
+    """
+    Keeps long-lived connections to the database: one writer connection, used for all
+    the writes, and a pool of read-only reader connections. The database is switched to
+    WAL mode so that readers do not block the writer and vice versa.
+
+    Connections are opened lazily on first use and re-opened if found dead,
+    close() has to be called on shutdown.
+
+    Writes are queued and run one at a time by a writer task, the only one using the
+    writer connection. Writes queued while the writer is busy are committed together
+    in one transaction, each in its own savepoint so that a failing write does not
+    fail the others, and their callers resume once the transaction is committed.
+    Writes inside a transaction() block run on its connection and commit with the block.
+    """
+
     __db_path: str
     __logger: InfiniteGamesLogger
-
-    def __init__(self, db_path: str, logger: InfiniteGamesLogger) -> None:
+    __pool_size: int
+    __writer: Optional[aiosqlite.Connection]
+    # Writes waiting for the writer task, which runs while there are any
+    __write_queue: deque[WriteJob]
+    __writer_task: Optional[asyncio.Task]
+    __writer_stats: WriterStats
+    # Idle reader connections, None for a slot without an open connection.
+    # LIFO so that open connections are reused before opening new ones
+    __readers: asyncio.LifoQueue
+    # Writer connection and owner task of the transaction the current task is running in
+    __transaction: ContextVar[Optional[tuple[aiosqlite.Connection, asyncio.Task]]]
+
+    def __init__(self, db_path: str, logger: InfiniteGamesLogger, pool_size: int = 4) -> None:
         # Validate db_path
         if not isinstance(db_path, str):
             raise TypeError("db_path must be an instance of str.")
@@ -21,32 +115,362 @@ class DatabaseClient:
         if not isinstance(logger, InfiniteGamesLogger):
             raise TypeError("logger must be an instance of InfiniteGamesLogger.")
 
+        # Validate pool_size
+        if not isinstance(pool_size, int) or pool_size < 1:
+            raise ValueError("pool_size must be a positive integer.")
+
         self.__db_path = db_path
         self.__logger = logger
+        self.__pool_size = pool_size
+        self.__writer = None
+        self.__write_queue = deque()
+        self.__writer_task = None
+        self.__writer_stats = WriterStats(
+            wait_seconds=LatencyHistogram(
+                buckets=WRITE_LATENCY_BUCKETS, max_values=WRITE_HISTORY_SIZE
+            ),
+            batch_seconds=LatencyHistogram(
+                buckets=WRITE_LATENCY_BUCKETS, max_values=WRITE_HISTORY_SIZE
+            ),
+        )
+        self.__readers = asyncio.LifoQueue(maxsize=pool_size)
+        self.__transaction = ContextVar(f"db_transaction_{id(self)}", default=None)
+
+        for _ in range(pool_size):
+            self.__readers.put_nowait(None)
+
+    async def __connect(self, read_only: bool) -> aiosqlite.Connection:
+        if read_only:
+            database = f"{Path(self.__db_path).resolve().as_uri()}?mode=ro"
+        else:
+            database = self.__db_path
+
+        connection = aiosqlite.connect(
+            database, timeout=90, uri=read_only, cached_statements=STATEMENT_CACHE_SIZE
+        )
+
+        # Connections not closed should not keep the process alive
+        connection.daemon = True
+
+        await connection
+
+        if not read_only:
+            cursor = await connection.execute("PRAGMA journal_mode=WAL")
+            await cursor.close()
+
+        return connection
+
+    async def __get_writer(self) -> aiosqlite.Connection:
+        # Must be called by the writer task only
+        if self.__writer is None or not self.__writer.is_alive():
+            self.__writer = await self.__connect(read_only=False)
+
+        return self.__writer
+
+    async def __acquire_reader(self) -> aiosqlite.Connection:
+        # The writer sets the journal mode, make sure it is opened first
+        if self.__writer is None:
+            await self.__write(self.__noop, batchable=False)
+
+        connection = await self.__readers.get()
+
+        try:
+            if connection is None or not connection.is_alive():
+                connection = await self.__connect(read_only=True)
+        except BaseException:
+            self.__readers.put_nowait(None)
+
+            raise
+
+        return connection
+
+    async def __noop(self, connection: aiosqlite.Connection) -> None:
+        return None
+
+    def __enqueue(
+        self, operation: Callable[[aiosqlite.Connection], Awaitable[Any]], batchable: bool
+    ) -> WriteJob:
+        loop = asyncio.get_running_loop()
+
+        job = WriteJob(operation=operation, future=loop.create_future(), batchable=batchable)
+
+        self.__write_queue.append(job)
+
+        if self.__writer_task is None:
+            # Created in an empty context: the writer works for all the tasks,
+            # its time is not added to the stats of the task that happened to start it
+            self.__writer_task = Context().run(loop.create_task, self.__run_writer())
+
+        return job
+
+    async def __write(
+        self, operation: Callable[[aiosqlite.Connection], Awaitable[Any]], batchable: bool
+    ) -> Any:
+        job = self.__enqueue(operation=operation, batchable=batchable)
+
+        # Cancelled, the job is skipped if the writer did not start it yet
+        return await job.future
+
+    def __next_batch(self) -> list[WriteJob]:
+        jobs = []
+
+        while self.__write_queue and len(jobs) < WRITE_BATCH_MAX_JOBS:
+            job = self.__write_queue[0]
+
+            # Caller cancelled
+            if job.future.done():
+                self.__write_queue.popleft()
+                continue
+
+            if jobs and not (job.batchable and jobs[0].batchable):
+                break
+
+            jobs.append(self.__write_queue.popleft())
+
+        return jobs
+
+    async def __run_writer(self) -> None:
+        try:
+            # Stops when the queue is drained, next write starts a new writer task
+            while self.__write_queue:
+                await self.__run_batch(self.__next_batch())
+        finally:
+            self.__writer_task = None
+
+    async def __run_batch(self, jobs: list[WriteJob]) -> None:
+        if len(jobs) == 0:
+            return
+
+        start_time = time.perf_counter()
+
+        for job in jobs:
+            self.__writer_stats.wait_seconds.observe(start_time - job.queued_at)
+
+        outcomes: dict[int, tuple[Any, Optional[BaseException]]] = {}
+        connection = None
+
+        try:
+            connection = await self.__get_writer()
+
+            # Connection is shared, reset what a previous query may have set
+            connection.row_factory = None
+
+            if len(jobs) == 1:
+                try:
+                    outcomes[id(jobs[0])] = (await jobs[0].operation(connection), None)
+                except Exception as e:
+                    outcomes[id(jobs[0])] = (None, e)
+            else:
+                await self.__run_grouped(jobs=jobs, connection=connection, outcomes=outcomes)
+        except Exception as e:
+            # Connection or transaction failed, all the jobs did
+            for job in jobs:
+                outcomes[id(job)] = (None, e)
+        finally:
+            # Never leave a failed transaction open on the shared writer connection
+            if connection is not None and connection.is_alive() and connection.in_transaction:
+                try:
+                    await connection.rollback()
+                except Exception:
+                    self.__logger.exception("Failed to roll back the writer connection")
+
+            batch_seconds = time.perf_counter() - start_time
+
+            stats = self.__writer_stats
+            stats.jobs += len(jobs)
+            stats.batches += 1
+            stats.max_batch_size = max(stats.max_batch_size, len(jobs))
+            stats.busy_seconds += batch_seconds
+            stats.batch_seconds.observe(batch_seconds)
+
+            # Resolved after the rollback, callers resume on a clean connection
+            for job in jobs:
+                result, error = outcomes.get(id(job), (None, None))
+
+                if error is not None:
+                    stats.errors += 1
+
+                if job.future.done():
+                    continue
+
+                if error is not None:
+                    job.future.set_exception(error)
+                else:
+                    job.future.set_result(result)
+
+    async def __run_grouped(
+        self,
+        jobs: list[WriteJob],
+        connection: aiosqlite.Connection,
+        outcomes: dict[int, tuple[Any, Optional[BaseException]]],
+    ) -> None:
+        start_time = time.time()
+
+        cursor = await connection.execute("BEGIN")
+        await cursor.close()
+
+        # Jobs run as part of the writer transaction, they do not commit on their own
+        token = self.__transaction.set((connection, asyncio.current_task()))
+
+        try:
+            for job in jobs:
+                cursor = await connection.execute("SAVEPOINT write_job")
+                await cursor.close()
+
+                try:
+                    outcomes[id(job)] = (await job.operation(connection), None)
+                except Exception as e:
+                    outcomes[id(job)] = (None, e)
+
+                    cursor = await connection.execute("ROLLBACK TO write_job")
+                    await cursor.close()
+
+                # Operations may reset the row factory, the next one expects none
+                connection.row_factory = None
+
+                cursor = await connection.execute("RELEASE write_job")
+                await cursor.close()
+
+            await connection.commit()
+        finally:
+            self.__transaction.reset(token)
+
+        elapsed_time_ms = round((time.time() - start_time) * 1000)
+
+        self.__logger.debug(
+            "SQL writes committed",
+            extra={"batch_size": len(jobs), "elapsed_time_ms": elapsed_time_ms},
+        )
+
+    @asynccontextmanager
+    async def __lease_writer(self) -> AsyncIterator[aiosqlite.Connection]:
+        """
+        Holds the writer connection, the queued writes wait for the block to exit
+        """
+
+        granted = asyncio.get_running_loop().create_future()
+        released = asyncio.Event()
+
+        async def hold(connection: aiosqlite.Connection) -> None:
+            if not granted.done():
+                granted.set_result(connection)
+
+            await released.wait()
+
+        job = self.__enqueue(operation=hold, batchable=False)
+
+        try:
+            await asyncio.wait((granted, job.future), return_when=asyncio.FIRST_COMPLETED)
+
+            if not granted.done():
+                # Raises the error the writer failed with
+                job.future.result()
+
+            yield granted.result()
+        finally:
+            released.set()
+
+            # Not started yet, skipped by the writer
+            if not job.future.done():
+                job.future.cancel()
+
+    def __current_transaction(self) -> Optional[aiosqlite.Connection]:
+        transaction = self.__transaction.get()
+
+        # Tasks created inside a block inherit the context, only the owner task joins
+        if transaction is None or transaction[1] is not asyncio.current_task():
+            return None
+
+        return transaction[0]
+
+    async def __commit(self, connection: aiosqlite.Connection) -> None:
+        # Inside a transaction the commit happens once, when the block exits
+        if self.__current_transaction() is None:
+            await connection.commit()
+
+    @asynccontextmanager
+    async def transaction(self) -> AsyncIterator[None]:
+        """
+        Unit of work: all the queries run inside the block share the writer connection
+        and are committed once on exit, or rolled back if the block raises.
+
+        Nested blocks join the outer transaction. Other tasks, including the ones created
+        inside the block, do not join it and their writes wait for the block to complete:
+        keep it short and do not await network calls or other writing tasks inside it.
+        """
+
+        if self.__current_transaction() is not None:
+            yield
+
+            return
+
+        start_time = time.time()
+
+        # Rolled back by the writer if the block raises
+        async with self.__lease_writer() as connection:
+            cursor = await connection.execute("BEGIN")
+            await cursor.close()
+
+            token = self.__transaction.set((connection, asyncio.current_task()))
+
+            try:
+                yield
 
-    def __get_caller_name(self) -> str:
+                await connection.commit()
+            finally:
+                self.__transaction.reset(token)
+
+        elapsed_time_ms = round((time.time() - start_time) * 1000)
+
+        self.__logger.debug("SQL transaction committed", extra={"elapsed_time_ms": elapsed_time_ms})
+
+    def __get_caller_name(self, depth: int = 3) -> str:
         try:
-            return sys._getframe(3).f_code.co_name
+            return sys._getframe(depth).f_code.co_name
         except Exception:
             return "unknown"
 
     async def __wrap_execution(
-        self, operation: Callable[[aiosqlite.Connection], Awaitable[any]]
+        self,
+        operation: Callable[[aiosqlite.Connection], Awaitable[any]],
+        read_only: bool = False,
+        batchable: bool = True,
     ) -> Awaitable[Any]:
         start_time = time.time()
 
         caller = self.__get_caller_name()
 
-        connection = None
+        connection = self.__current_transaction()
 
-        try:
-            connection = await aiosqlite.connect(self.__db_path, timeout=90)
+        # Queries inside a transaction, reads included, run on its connection
+        in_transaction = connection is not None
+
+        # Duration of the query itself, set by timed_operation
+        query_seconds = 0.0
+
+        async def timed_operation(connection: aiosqlite.Connection):
+            nonlocal query_seconds
 
             query_start_time = time.time()
 
-            response = await operation(connection)
+            try:
+                return await operation(connection)
+            finally:
+                query_seconds = time.time() - query_start_time
+
+        try:
+            if in_transaction or read_only:
+                if not in_transaction:
+                    connection = await self.__acquire_reader()
+
+                # Connections are shared, reset what a previous query may have set
+                connection.row_factory = None
+
+                response = await timed_operation(connection)
+            else:
+                response = await self.__write(timed_operation, batchable=batchable)
 
-            query_ms = round((time.time() - query_start_time) * 1000)
+            query_ms = round(query_seconds * 1000)
             elapsed_time_ms = round((time.time() - start_time) * 1000)
 
             extra = {
@@ -72,8 +496,13 @@ class DatabaseClient:
 
             raise e
         finally:
-            if connection is not None:
-                await connection.close()
+            sql_stats = current_sql_stats.get()
+
+            if sql_stats is not None:
+                sql_stats.observe(time.time() - start_time)
+
+            if read_only and not in_transaction and connection is not None:
+                self.__readers.put_nowait(connection)
 
     async def insert(
         self, sql: str, parameters: Optional[Iterable[Any]] = None
@@ -83,7 +512,7 @@ class DatabaseClient:
             inserted = await cursor.fetchall()
 
             await cursor.close()
-            await connection.commit()
+            await self.__commit(connection)
 
             return inserted
 
@@ -93,6 +522,10 @@ class DatabaseClient:
         self,
         sql_script: str,
     ) -> None:
+        # executescript() commits any pending transaction before running
+        if self.__current_transaction() is not None:
+            raise RuntimeError("script() cannot run inside a transaction.")
+
         async def execute(connection: aiosqlite.Connection):
             cursor = await connection.executescript(sql_script=sql_script)
 
@@ -101,14 +534,14 @@ class DatabaseClient:
 
             return None
 
-        return await self.__wrap_execution(execute)
+        return await self.__wrap_execution(execute, batchable=False)
 
     async def insert_many(self, sql: str, parameters: Iterable[Iterable[Any]]) -> None:
         async def execute(connection: aiosqlite.Connection):
             cursor = await connection.executemany(sql=sql, parameters=parameters)
 
             await cursor.close()
-            await connection.commit()
+            await self.__commit(connection)
 
             # Execute many does not support returning
             # https://github.com/python/cpython/issues/100021
@@ -124,7 +557,7 @@ class DatabaseClient:
             deleted = await cursor.fetchall()
 
             await cursor.close()
-            await connection.commit()
+            await self.__commit(connection)
 
             return deleted
 
@@ -138,12 +571,24 @@ class DatabaseClient:
             updated = await cursor.fetchall()
 
             await cursor.close()
-            await connection.commit()
+            await self.__commit(connection)
 
             return updated
 
         return await self.__wrap_execution(execute)
 
+    async def update_many(self, sql: str, parameters: Iterable[Iterable[Any]]) -> None:
+        async def execute(connection: aiosqlite.Connection):
+            cursor = await connection.executemany(sql=sql, parameters=parameters)
+
+            await cursor.close()
+            await self.__commit(connection)
+
+            # Execute many does not support returning
+            return None
+
+        return await self.__wrap_execution(execute)
+
     async def one(
         self,
         sql: str,
@@ -161,7 +606,7 @@ class DatabaseClient:
 
             return row
 
-        return await self.__wrap_execution(execute)
+        return await self.__wrap_execution(execute, read_only=True)
 
     async def many(
         self,
@@ -184,7 +629,221 @@ class DatabaseClient:
 
             return rows
 
-        return await self.__wrap_execution(execute)
+        return await self.__wrap_execution(execute, read_only=True)
+
+    async def stream(
+        self,
+        sql: str,
+        parameters: Optional[Iterable[Any]] = None,
+        chunk_size: int = 1000,
+        use_row_factory: bool = False,
+    ) -> AsyncIterator[list[aiosqlite.Row]]:
+        """
+        Yields the rows of a query in chunks of up to chunk_size rows, fetched from a cursor
+        kept open on a reader connection: memory is bounded by the chunk size and the first
+        chunk comes as soon as it is read.
+
+        The reader and its snapshot of the database are held until the iteration completes,
+        consume the chunks promptly and close the iterator when leaving early,
+        e.g. with contextlib.aclosing.
+        """
+
+        if not isinstance(chunk_size, int) or chunk_size < 1:
+            raise ValueError("chunk_size must be a positive integer.")
+
+        start_time = time.time()
+
+        caller = self.__get_caller_name(depth=2)
+
+        connection = self.__current_transaction()
+
+        in_transaction = connection is not None
+
+        rows_count = 0
+
+        # Time spent waiting for the database, the time the chunks are consumed excluded
+        query_seconds = 0.0
+
+        try:
+            if not in_transaction:
+                connection = await self.__acquire_reader()
+
+            # Cursors keep the row factory of their connection when created
+            connection.row_factory = aiosqlite.Row if use_row_factory else None
+
+            query_start_time = time.time()
+
+            cursor = await connection.execute(sql=sql, parameters=parameters)
+
+            try:
+                while True:
+                    rows = await cursor.fetchmany(chunk_size)
+
+                    query_seconds += time.time() - query_start_time
+
+                    if not rows:
+                        break
+
+                    rows_count += len(rows)
+
+                    yield rows
+
+                    query_start_time = time.time()
+            finally:
+                await cursor.close()
+
+            elapsed_time_ms = round((time.time() - start_time) * 1000)
+
+            self.__logger.debug(
+                "SQL streamed",
+                extra={
+                    "caller": caller,
+                    "rows": rows_count,
+                    "query_ms": round(query_seconds * 1000),
+                    "elapsed_time_ms": elapsed_time_ms,
+                },
+            )
+        except Exception:
+            elapsed_time_ms = round((time.time() - start_time) * 1000)
+
+            self.__logger.exception(
+                "SQL errored", extra={"elapsed_time_ms": elapsed_time_ms, "caller": caller}
+            )
+
+            raise
+        finally:
+            sql_stats = current_sql_stats.get()
+
+            if sql_stats is not None:
+                sql_stats.observe(query_seconds)
+
+            if not in_transaction and connection is not None:
+                connection.row_factory = None
+
+                self.__readers.put_nowait(connection)
+
+    async def check_statements(self, statements: Iterable[tuple[str, str]]) -> None:
+        """
+        Compiles each named statement against the current schema, without running it.
+        Raises ValueError listing the statements failing, e.g. referencing a dropped column.
+        """
+
+        errors = []
+
+        async def execute(connection: aiosqlite.Connection):
+            for name, sql in statements:
+                try:
+                    cursor = await connection.execute(f"EXPLAIN {sql}")
+                    await cursor.close()
+                except sqlite3.ProgrammingError as e:
+                    # Raised binding the parameters not supplied, once the statement compiled
+                    if not str(e).startswith("Incorrect number of bindings"):
+                        errors.append(f"{name}: {e}")
+                except sqlite3.Error as e:
+                    errors.append(f"{name}: {e}")
+
+        await self.__wrap_execution(execute, read_only=True)
+
+        if errors:
+            raise ValueError(f"Invalid SQL statements: {'; '.join(errors)}")
+
+    async def health_check(self) -> bool:
+        """
+        Ping the writer and the idle reader connections.
+        Connections failing are closed and re-opened on next use.
+        """
+
+        healthy = True
+
+        async def ping_writer(connection: aiosqlite.Connection) -> bool:
+            if await self.__ping(connection):
+                return True
+
+            self.__writer = None
+
+            return False
+
+        # Not opened yet, nothing to ping
+        if self.__writer is not None and not await self.__write(ping_writer, batchable=False):
+            healthy = False
+
+        for _ in range(self.__readers.qsize()):
+            connection = self.__readers.get_nowait()
+
+            if connection is not None and not await self.__ping(connection):
+                connection = None
+                healthy = False
+
+            self.__readers.put_nowait(connection)
+
+        return healthy
+
+    async def __ping(self, connection: aiosqlite.Connection) -> bool:
+        try:
+            # A connection whose thread is gone would never answer
+            if not connection.is_alive():
+                raise ConnectionError("Connection thread is not running")
+
+            cursor = await connection.execute("SELECT 1")
+            await cursor.close()
+
+            return True
+        except Exception:
+            self.__logger.exception("Database connection health check failed")
+
+            await self.__close_connection(connection)
+
+            return False
+
+    async def __close_connection(self, connection: aiosqlite.Connection) -> None:
+        try:
+            await connection.close()
+        except Exception:
+            self.__logger.exception("Failed to close database connection")
+
+    async def close(self) -> None:
+        """
+        Close all the connections, waiting for the running queries to complete.
+        """
+
+        readers = [await self.__readers.get() for _ in range(self.__pool_size)]
+
+        for connection in readers:
+            if connection is not None:
+                await self.__close_connection(connection)
+
+            self.__readers.put_nowait(None)
+
+        # Writes queued complete first
+        while self.__writer_task is not None:
+            await asyncio.shield(self.__writer_task)
+
+        if self.__writer is not None:
+            writer, self.__writer = self.__writer, None
+
+            await self.__close_connection(writer)
+
+    def writer_stats(self) -> dict:
+        """
+        Writes throughput and queue: jobs run, batches committed, time waited in the queue
+        and time the writer spent per batch, in seconds
+        """
+
+        stats = self.__writer_stats
+
+        return {
+            "queued": len(self.__write_queue),
+            "jobs": stats.jobs,
+            "errors": stats.errors,
+            "batches": stats.batches,
+            "mean_batch_size": (
+                None if stats.batches == 0 else round(stats.jobs / stats.batches, 2)
+            ),
+            "max_batch_size": stats.max_batch_size,
+            "busy_seconds": round(stats.busy_seconds, 3),
+            "wait_seconds": stats.wait_seconds.snapshot(),
+            "batch_seconds": stats.batch_seconds.snapshot(),
+        }
 
     async def migrate(self):
         start_time = time.time()
@@ -1,18 +1,913 @@
-from pathlib import Path
-from typing import Iterable
+import sqlite3
+from itertools import islice
+from typing import AsyncContextManager, Iterable, Optional, Sequence
+
+import pandas as pd
 
 from neurons.validator.db.client import DatabaseClient
+from neurons.validator.db.statements import IN_LIST, STATEMENTS, expand_in_list, expand_values
 from neurons.validator.models.event import EVENTS_FIELDS, EventsModel, EventStatus
 from neurons.validator.models.miner import MINERS_FIELDS, MinersModel
+from neurons.validator.models.outbox import OUTBOX_FIELDS, OutboxKind, OutboxModel
 from neurons.validator.models.prediction import (
     PREDICTION_FIELDS,
     PredictionExportedStatus,
     PredictionsModel,
 )
 from neurons.validator.models.score import SCORE_FIELDS, ScoresModel
+from neurons.validator.utils.common.converters import rows_to_dataframe
 from neurons.validator.utils.logger.logger import InfiniteGamesLogger
 
-SQL_FOLDER = Path(Path(__file__).parent, "sql")
+# Default maximum number of parameters of a statement before SQLite 3.32.0
+SQLITE_LEGACY_MAX_VARIABLE_NUMBER = 999
+
+
+def get_sqlite_max_variable_number() -> int:
+    """
+    Maximum number of parameters of a statement of the SQLite library linked, which the
+    connections opened by the client keep: 32766 by default since SQLite 3.32.0, 999 before.
+    Connection.getlimit is only available since Python 3.11, the legacy limit is used before.
+    """
+
+    connection = sqlite3.connect(":memory:")
+
+    try:
+        if hasattr(connection, "getlimit"):
+            return connection.getlimit(sqlite3.SQLITE_LIMIT_VARIABLE_NUMBER)
+    finally:
+        connection.close()
+
+    return SQLITE_LEGACY_MAX_VARIABLE_NUMBER
+
+
+SQLITE_MAX_VARIABLE_NUMBER = get_sqlite_max_variable_number()
+
+EVENTS_COLUMNS = ", ".join(EVENTS_FIELDS)
+MINERS_COLUMNS = ", ".join(MINERS_FIELDS)
+PREDICTION_COLUMNS = ", ".join(PREDICTION_FIELDS)
+SCORE_COLUMNS = ", ".join(SCORE_FIELDS)
+OUTBOX_COLUMNS = ", ".join(OUTBOX_FIELDS)
+
+# Events fields set by the database on insert
+EVENTS_INSERT_FIELDS = [
+    field_name
+    for field_name in EVENTS_FIELDS
+    if field_name not in ("registered_date", "local_updated_at")
+]
+
+# Rows decoded at once by the columnar fetches
+FRAME_CHUNK_SIZE = 10_000
+
+# Columns and dtypes of the frames of the columnar fetches, the dtypes the models
+# fields get from pydantic_models_to_dataframe
+PREDICTIONS_FOR_SCORING_DTYPES = {
+    "unique_event_id": "string",
+    "minerUid": "string",
+    "minerHotkey": "string",
+    "interval_start_minutes": "Int64",
+    "interval_agg_prediction": "float64",
+}
+
+# In the order of SCORE_FIELDS, created_at kept as text
+SCORE_DTYPES = {
+    "event_id": "string",
+    "miner_uid": "Int64",
+    "miner_hotkey": "string",
+    "prediction": "float64",
+    "event_score": "float64",
+    "metagraph_score": "float64",
+    "other_data": "string",
+    "created_at": "string",
+    "spec_version": "Int64",
+    "processed": "boolean",
+    "exported": "boolean",
+}
+
+SCORES_INSERT_FIELDS = [
+    "event_id",
+    "miner_uid",
+    "miner_hotkey",
+    "prediction",
+    "event_score",
+    "spec_version",
+]
+
+GET_EVENT_SQL = STATEMENTS.register(
+    "get_event",
+    f"""
+        SELECT
+            {EVENTS_COLUMNS}
+        FROM events
+        WHERE
+            unique_event_id = ?
+    """,
+)
+
+UPSERT_PYDANTIC_EVENTS_SQL = STATEMENTS.register(
+    "upsert_pydantic_events",
+    f"""
+        INSERT INTO events
+            ({", ".join(EVENTS_INSERT_FIELDS)}, registered_date, local_updated_at)
+        VALUES
+            ({", ".join(["?"] * len(EVENTS_INSERT_FIELDS))}, CURRENT_TIMESTAMP, CURRENT_TIMESTAMP)
+        ON CONFLICT
+            (unique_event_id)
+        DO NOTHING
+    """,
+)
+
+GET_EVENTS_FOR_SCORING_SQL = STATEMENTS.register(
+    "get_events_for_scoring",
+    f"""
+        SELECT
+            {EVENTS_COLUMNS}
+        FROM events
+        WHERE status = ?
+            AND outcome IS NOT NULL
+            AND processed = false
+        ORDER BY resolved_at ASC
+        LIMIT ?
+    """,
+)
+
+
+def events_for_scoring_page_sql(keyset: str) -> str:
+    # Same order as get_events_for_scoring, ROWID breaks the ties for the keyset
+    return f"""
+        SELECT
+            ROWID,
+            {EVENTS_COLUMNS}
+        FROM events
+        WHERE status = ?
+            AND outcome IS NOT NULL
+            AND processed = false
+            {keyset}
+        ORDER BY resolved_at ASC, ROWID ASC
+        LIMIT ?
+    """
+
+
+GET_EVENTS_FOR_SCORING_FIRST_PAGE_SQL = STATEMENTS.register(
+    "get_events_for_scoring_first_page", events_for_scoring_page_sql(keyset="")
+)
+
+# NULLs sort first: after a NULL resolved_at come the other NULLs, then all the non NULLs
+GET_EVENTS_FOR_SCORING_AFTER_NULL_SQL = STATEMENTS.register(
+    "get_events_for_scoring_after_null",
+    events_for_scoring_page_sql(keyset="AND (resolved_at IS NOT NULL OR ROWID > ?)"),
+)
+
+GET_EVENTS_FOR_SCORING_AFTER_SQL = STATEMENTS.register(
+    "get_events_for_scoring_after",
+    events_for_scoring_page_sql(keyset="AND (resolved_at, ROWID) > (?, ?)"),
+)
+
+GET_PREDICTIONS_FOR_EVENT_SQL = STATEMENTS.register(
+    "get_predictions_for_event",
+    f"""
+        SELECT
+            {PREDICTION_COLUMNS}
+        FROM
+            predictions
+        WHERE
+            unique_event_id = ?
+            AND interval_start_minutes = ?
+        ORDER BY
+            CAST(minerUid AS INTEGER) ASC,
+            minerHotkey ASC
+    """,
+)
+
+GET_PREDICTIONS_FOR_SCORING_SQL = STATEMENTS.register(
+    "get_predictions_for_scoring",
+    f"""
+        SELECT
+            {PREDICTION_COLUMNS}
+        FROM predictions
+        WHERE unique_event_id = ?
+    """,
+)
+
+GET_MINERS_LAST_REGISTRATION_SQL = STATEMENTS.register(
+    "get_miners_last_registration",
+    f"""
+        WITH ranked AS (
+            SELECT
+                {MINERS_COLUMNS},
+                ROW_NUMBER() OVER (
+                    PARTITION BY miner_uid
+                    ORDER BY registered_date DESC
+                ) AS rn
+            FROM miners t
+        )
+        SELECT
+            {MINERS_COLUMNS}
+        FROM ranked
+        WHERE rn = 1
+        ORDER BY miner_uid
+    """,
+)
+
+INSERT_PEER_SCORES_SQL = STATEMENTS.register(
+    "insert_peer_scores",
+    f"""
+        INSERT INTO scores ({", ".join(SCORES_INSERT_FIELDS)})
+        VALUES ({", ".join(["?"] * len(SCORES_INSERT_FIELDS))})
+        ON CONFLICT
+            (event_id, miner_uid, miner_hotkey)
+        DO UPDATE SET
+            prediction = excluded.prediction,
+            event_score = excluded.event_score,
+            spec_version = excluded.spec_version
+    """,
+)
+
+GET_PEER_SCORED_EVENTS_FOR_EXPORT_SQL = STATEMENTS.register(
+    "get_peer_scored_events_for_export",
+    f"""
+        WITH events_to_export AS (
+            SELECT
+                event_id,
+                MIN(ROWID) AS min_row_id
+            FROM scores
+            WHERE processed = 1
+                AND exported = 0
+            GROUP BY event_id
+            ORDER BY min_row_id ASC
+            LIMIT ?
+        )
+        SELECT
+            {", ".join("ev." + field for field in EVENTS_FIELDS)}
+        FROM events ev
+        JOIN events_to_export ete ON ev.event_id = ete.event_id
+        ORDER BY ete.min_row_id ASC
+    """,
+)
+
+GET_PEER_SCORES_FOR_EXPORT_SQL = STATEMENTS.register(
+    "get_peer_scores_for_export",
+    f"""
+        SELECT
+            {SCORE_COLUMNS}
+        FROM scores
+        WHERE event_id = ?
+            AND processed = 1
+    """,
+)
+
+GET_LAST_METAGRAPH_SCORES_SQL = STATEMENTS.register(
+    "get_last_metagraph_scores",
+    f"""
+        WITH grouped AS (
+            SELECT miner_uid AS g_miner_uid,
+                miner_hotkey AS g_miner_hotkey,
+                MAX(ROWID) AS max_rowid
+            FROM scores
+            WHERE processed = 1
+                AND created_at > datetime(CURRENT_TIMESTAMP, '-10 day')
+            GROUP BY miner_uid, miner_hotkey
+        )
+        SELECT
+            {SCORE_COLUMNS}
+        FROM scores s
+        JOIN grouped
+            ON s.miner_uid = grouped.g_miner_uid
+            AND s.miner_hotkey = grouped.g_miner_hotkey
+            AND s.ROWID = grouped.max_rowid
+    """,
+)
+
+GET_PREDICTIONS_TO_EXPORT_SQL = STATEMENTS.register(
+    "get_predictions_to_export",
+    """
+        SELECT
+            p.ROWID,
+            p.unique_event_id,
+            p.minerHotkey,
+            p.minerUid,
+            e.event_type,
+            p.predictedOutcome,
+            p.interval_start_minutes,
+            p.interval_agg_prediction,
+            p.interval_count,
+            p.submitted
+        FROM
+            predictions p
+        JOIN
+            events e ON e.unique_event_id = p.unique_event_id
+        WHERE
+            p.exported = ?
+            AND p.interval_start_minutes < ?
+            AND p.ROWID > ?
+        ORDER BY
+            p.ROWID ASC
+        LIMIT
+            ?
+    """,
+)
+
+# Same predicate as get_predictions_to_export, bounded by the ROWIDs of a page read
+MARK_PREDICTIONS_AS_EXPORTED_RANGE_SQL = STATEMENTS.register(
+    "mark_predictions_as_exported_range",
+    """
+        UPDATE
+            predictions
+        SET
+            exported = ?
+        WHERE
+            ROWID BETWEEN ? AND ?
+            AND exported = ?
+            AND interval_start_minutes < ?
+            AND EXISTS (
+                SELECT 1 FROM events e WHERE e.unique_event_id = predictions.unique_event_id
+            )
+    """,
+)
+
+GET_OUTBOX_DUE_SQL = STATEMENTS.register(
+    "get_outbox_due",
+    f"""
+        SELECT
+            {OUTBOX_COLUMNS}
+        FROM outbox
+        WHERE next_attempt_at <= CURRENT_TIMESTAMP
+        ORDER BY next_attempt_at ASC, id ASC
+        LIMIT ?
+    """,
+)
+
+
+DELETE_EVENT_SQL = STATEMENTS.register(
+    "delete_event",
+    """
+        DELETE FROM events WHERE event_id = ? RETURNING event_id
+    """,
+)
+
+DELETE_PREDICTIONS_SQL = STATEMENTS.register(
+    "delete_predictions",
+    """
+        WITH predictions_to_delete AS (
+            SELECT
+                p.ROWID
+            FROM
+                predictions p
+            LEFT JOIN
+                events e ON p.unique_event_id = e.unique_event_id
+            WHERE
+                (
+                    e.unique_event_id IS NULL
+                    OR (
+                            e.processed = TRUE
+                            AND datetime(e.resolved_at) < datetime(CURRENT_TIMESTAMP, '-4 day')
+                        )
+                    OR e.status = ?
+                )
+                AND p.exported = ?
+            ORDER BY
+                p.ROWID ASC
+            LIMIT ?
+        )
+        DELETE FROM
+            predictions
+        WHERE
+            ROWID IN (
+                SELECT
+                    ROWID
+                FROM
+                    predictions_to_delete
+            )
+        RETURNING
+            ROWID
+    """,
+)
+
+GET_EVENTS_LAST_RESOLVED_AT_SQL = STATEMENTS.register(
+    "get_events_last_resolved_at",
+    """
+        SELECT MAX(resolved_at) FROM events
+    """,
+)
+
+GET_EVENTS_PENDING_FIRST_CREATED_AT_SQL = STATEMENTS.register(
+    "get_events_pending_first_created_at",
+    """
+        SELECT MIN(created_at) FROM events WHERE status = ?
+    """,
+)
+
+GET_EVENTS_TO_PREDICT_SQL = STATEMENTS.register(
+    "get_events_to_predict",
+    """
+        SELECT
+            event_id,
+            market_type,
+            description,
+            cutoff,
+            resolve_date,
+            end_date,
+            metadata,
+            local_updated_at
+        FROM
+            events
+        WHERE
+            status = ?
+            AND datetime(CURRENT_TIMESTAMP) < datetime(cutoff)
+    """,
+)
+
+GET_LAST_EVENT_FROM_SQL = STATEMENTS.register(
+    "get_last_event_from",
+    """
+        SELECT MAX(created_at) FROM events
+    """,
+)
+
+GET_MINERS_COUNT_SQL = STATEMENTS.register(
+    "get_miners_count",
+    """
+        SELECT COUNT(*) FROM miners
+    """,
+)
+
+RESOLVE_EVENT_SQL = STATEMENTS.register(
+    "resolve_event",
+    """
+        UPDATE
+            events
+        SET
+            status = ?,
+            outcome = ?,
+            resolved_at = ?,
+            local_updated_at = CURRENT_TIMESTAMP
+        WHERE
+            event_id = ?
+            AND status = ?
+        RETURNING
+            event_id
+    """,
+)
+
+UPSERT_EVENTS_SQL = STATEMENTS.register(
+    "upsert_events",
+    """
+        INSERT INTO events
+            (
+                unique_event_id,
+                event_id,
+                market_type,
+                event_type,
+                description,
+                starts,
+                resolve_date,
+                outcome,
+                status,
+                metadata,
+                created_at,
+                cutoff,
+                end_date,
+                registered_date,
+                local_updated_at
+            )
+        VALUES
+            (
+                ?,
+                ?,
+                ?,
+                ?,
+                ?,
+                ?,
+                ?,
+                ?,
+                ?,
+                ?,
+                ?,
+                ?,
+                ?,
+                CURRENT_TIMESTAMP,
+                CURRENT_TIMESTAMP
+            )
+        ON CONFLICT
+            (unique_event_id)
+        DO NOTHING
+    """,
+)
+
+UPSERT_MINERS_SQL = STATEMENTS.register(
+    "upsert_miners",
+    """
+        INSERT INTO miners
+            (
+                miner_uid,
+                miner_hotkey,
+                node_ip,
+                registered_date,
+                last_updated,
+                blocktime,
+                blocklisted,
+                is_validating,
+                validator_permit
+            )
+        VALUES
+            (
+                ?,
+                ?,
+                ?,
+                ?,
+                CURRENT_TIMESTAMP,
+                ?,
+                FALSE,
+                ?,
+                ?
+            )
+        ON CONFLICT
+            (miner_hotkey, miner_uid)
+        DO UPDATE
+            set node_ip = ?,
+            last_updated = CURRENT_TIMESTAMP,
+            blocktime = ?,
+            is_validating = excluded.is_validating,
+            validator_permit = excluded.validator_permit
+    """,
+)
+
+UPSERT_PREDICTIONS_SQL = STATEMENTS.register(
+    "upsert_predictions",
+    """
+        INSERT INTO predictions (
+            unique_event_id,
+            minerHotkey,
+            minerUid,
+            predictedOutcome,
+            interval_start_minutes,
+            interval_agg_prediction,
+            blocktime,
+            interval_count,
+            submitted
+        )
+        VALUES (
+            ?,
+            ?,
+            ?,
+            ?,
+            ?,
+            ?,
+            ?,
+            1,
+            CURRENT_TIMESTAMP
+        )
+        ON CONFLICT(unique_event_id,  interval_start_minutes, minerUid)
+        DO UPDATE SET
+            interval_agg_prediction = (interval_agg_prediction * interval_count + ?) / (interval_count + 1),
+            interval_count = interval_count + 1
+    """,
+)
+
+# VALUES row of the multi-row upsert, repeated for each prediction of a chunk
+UPSERT_PREDICTIONS_BULK_ROW = "(?, ?, ?, ?, ?, ?, ?, 1, CURRENT_TIMESTAMP)"
+
+UPSERT_PREDICTIONS_BULK_SQL = STATEMENTS.register(
+    "upsert_predictions_bulk",
+    f"""
+        INSERT INTO predictions (
+            unique_event_id,
+            minerHotkey,
+            minerUid,
+            predictedOutcome,
+            interval_start_minutes,
+            interval_agg_prediction,
+            blocktime,
+            interval_count,
+            submitted
+        )
+        VALUES {UPSERT_PREDICTIONS_BULK_ROW}
+        ON CONFLICT(unique_event_id, interval_start_minutes, minerUid)
+        DO UPDATE SET
+            interval_agg_prediction = (
+                interval_agg_prediction * interval_count
+                + excluded.interval_agg_prediction
+            ) / (interval_count + 1),
+            interval_count = interval_count + 1
+    """,
+)
+
+MARK_PREDICTIONS_AS_EXPORTED_SQL = STATEMENTS.register(
+    "mark_predictions_as_exported",
+    f"""
+        UPDATE
+            predictions
+        SET
+            exported = ?
+        WHERE
+            ROWID IN {IN_LIST}
+        RETURNING
+            ROWID
+    """,
+)
+
+GET_PREDICTIONS_FOR_SCORING_BATCH_SQL = STATEMENTS.register(
+    "get_predictions_for_scoring_batch",
+    f"""
+        SELECT
+            {PREDICTION_COLUMNS}
+        FROM predictions
+        WHERE unique_event_id IN {IN_LIST}
+    """,
+)
+
+GET_PREDICTIONS_FOR_SCORING_FRAMES_SQL = STATEMENTS.register(
+    "get_predictions_for_scoring_frames",
+    f"""
+        SELECT
+            {", ".join(PREDICTIONS_FOR_SCORING_DTYPES)}
+        FROM predictions
+        WHERE unique_event_id IN {IN_LIST}
+    """,
+)
+
+MARK_EVENT_AS_PROCESSED_SQL = STATEMENTS.register(
+    "mark_event_as_processed",
+    """
+        UPDATE events
+        SET processed = true
+        WHERE unique_event_id = ?
+    """,
+)
+
+MARK_EVENT_AS_EXPORTED_SQL = STATEMENTS.register(
+    "mark_event_as_exported",
+    """
+        UPDATE events
+        SET exported = true
+        WHERE unique_event_id = ?
+    """,
+)
+
+MARK_EVENTS_AS_EXPORTED_SQL = STATEMENTS.register(
+    "mark_events_as_exported",
+    f"""
+        UPDATE events
+        SET exported = true
+        WHERE unique_event_id IN {IN_LIST}
+    """,
+)
+
+MARK_EVENT_AS_DISCARDED_SQL = STATEMENTS.register(
+    "mark_event_as_discarded",
+    """
+        UPDATE events
+        SET status = ?
+        WHERE unique_event_id = ?
+    """,
+)
+
+GET_EVENTS_FOR_METAGRAPH_SCORING_SQL = STATEMENTS.register(
+    "get_events_for_metagraph_scoring",
+    """
+        SELECT
+            event_id,
+            MIN(ROWID) AS min_row_id
+        FROM scores
+        WHERE processed = false
+        GROUP BY event_id
+        ORDER BY min_row_id ASC
+        LIMIT ?
+    """,
+)
+
+GET_EVENT_MIN_SCORE_ROW_SQL = STATEMENTS.register(
+    "get_event_min_score_row", "SELECT MIN(ROWID) FROM scores WHERE event_id = ?"
+)
+
+GET_METAGRAPH_WINDOW_RANGE_SQL = STATEMENTS.register(
+    "get_metagraph_window_range",
+    """
+        SELECT
+            COUNT(*),
+            MIN(event_min_row),
+            MAX(event_min_row)
+        FROM metagraph_window_events
+    """,
+)
+
+COUNT_METAGRAPH_WINDOW_MISSING_EVENTS_SQL = STATEMENTS.register(
+    "count_metagraph_window_missing_events",
+    """
+        SELECT COUNT(*)
+        FROM metagraph_window_events mwe
+        WHERE NOT EXISTS (SELECT 1 FROM scores WHERE event_id = mwe.event_id)
+    """,
+)
+
+GET_SCORES_BEFORE_ROW_SQL = STATEMENTS.register(
+    "get_scores_before_row", "SELECT 1 FROM scores WHERE ROWID < ? LIMIT 1"
+)
+
+GET_METAGRAPH_WINDOW_ENTERING_EVENTS_SQL = STATEMENTS.register(
+    "get_metagraph_window_entering_events",
+    """
+        SELECT
+            event_id,
+            MIN(ROWID) AS event_min_row
+        FROM scores
+        WHERE ROWID > :window_last_row
+            AND ROWID < :reference_row
+        GROUP BY event_id
+        HAVING (
+            SELECT MIN(ROWID) FROM scores s WHERE s.event_id = scores.event_id
+        ) > :window_last_row
+        ORDER BY event_min_row ASC
+    """,
+)
+
+INSERT_METAGRAPH_WINDOW_EVENT_SQL = STATEMENTS.register(
+    "insert_metagraph_window_event",
+    "INSERT INTO metagraph_window_events (event_id, event_min_row) VALUES (?, ?)",
+)
+
+ADD_METAGRAPH_WINDOW_SCORES_SQL = STATEMENTS.register(
+    "add_metagraph_window_scores",
+    """
+        INSERT INTO metagraph_window_scores
+            (miner_uid, miner_hotkey, sum_peer_score, count_peer_score)
+        SELECT
+            miner_uid,
+            miner_hotkey,
+            SUM(event_score),
+            COUNT(event_score)
+        FROM scores
+        WHERE event_id = ?
+        GROUP BY miner_uid, miner_hotkey
+        ON CONFLICT (miner_uid, miner_hotkey) DO UPDATE SET
+            sum_peer_score = sum_peer_score + excluded.sum_peer_score,
+            count_peer_score = count_peer_score + excluded.count_peer_score
+    """,
+)
+
+GET_METAGRAPH_WINDOW_LEAVING_EVENTS_SQL = STATEMENTS.register(
+    "get_metagraph_window_leaving_events",
+    """
+        SELECT event_id
+        FROM metagraph_window_events
+        ORDER BY event_min_row ASC
+        LIMIT max((SELECT COUNT(*) FROM metagraph_window_events) - ?, 0)
+    """,
+)
+
+SUBTRACT_METAGRAPH_WINDOW_SCORES_SQL = STATEMENTS.register(
+    "subtract_metagraph_window_scores",
+    """
+        UPDATE metagraph_window_scores
+        SET
+            sum_peer_score = (
+                metagraph_window_scores.sum_peer_score - leaving.sum_peer_score
+            ),
+            count_peer_score = (
+                metagraph_window_scores.count_peer_score - leaving.count_peer_score
+            )
+        FROM (
+            SELECT
+                miner_uid,
+                miner_hotkey,
+                SUM(event_score) AS sum_peer_score,
+                COUNT(event_score) AS count_peer_score
+            FROM scores
+            WHERE event_id = ?
+            GROUP BY miner_uid, miner_hotkey
+        ) AS leaving
+        WHERE metagraph_window_scores.miner_uid = leaving.miner_uid
+            AND metagraph_window_scores.miner_hotkey = leaving.miner_hotkey
+    """,
+)
+
+DELETE_METAGRAPH_WINDOW_EVENT_SQL = STATEMENTS.register(
+    "delete_metagraph_window_event", "DELETE FROM metagraph_window_events WHERE event_id = ?"
+)
+
+DELETE_EMPTY_METAGRAPH_WINDOW_SCORES_SQL = STATEMENTS.register(
+    "delete_empty_metagraph_window_scores",
+    "DELETE FROM metagraph_window_scores WHERE count_peer_score <= 0",
+)
+
+CLEAR_METAGRAPH_WINDOW_EVENTS_SQL = STATEMENTS.register(
+    "clear_metagraph_window_events", "DELETE FROM metagraph_window_events"
+)
+
+CLEAR_METAGRAPH_WINDOW_SCORES_SQL = STATEMENTS.register(
+    "clear_metagraph_window_scores", "DELETE FROM metagraph_window_scores"
+)
+
+REBUILD_METAGRAPH_WINDOW_EVENTS_SQL = STATEMENTS.register(
+    "rebuild_metagraph_window_events",
+    """
+        INSERT INTO metagraph_window_events (event_id, event_min_row)
+        SELECT
+            event_id,
+            MIN(ROWID) AS event_min_row
+        FROM scores
+        GROUP BY event_id
+        HAVING event_min_row < ?
+        ORDER BY event_min_row DESC
+        LIMIT ?
+    """,
+)
+
+REBUILD_METAGRAPH_WINDOW_SCORES_SQL = STATEMENTS.register(
+    "rebuild_metagraph_window_scores",
+    """
+        INSERT INTO metagraph_window_scores
+            (miner_uid, miner_hotkey, sum_peer_score, count_peer_score)
+        SELECT
+            miner_uid,
+            miner_hotkey,
+            SUM(event_score),
+            COUNT(event_score)
+        FROM scores
+        WHERE event_id IN (SELECT event_id FROM metagraph_window_events)
+        GROUP BY miner_uid, miner_hotkey
+    """,
+)
+
+GET_PEER_SCORES_FOR_EXPORT_BATCH_SQL = STATEMENTS.register(
+    "get_peer_scores_for_export_batch",
+    f"""
+        SELECT
+            {SCORE_COLUMNS}
+        FROM scores
+        WHERE event_id IN {IN_LIST}
+            AND processed = 1
+    """,
+)
+
+MARK_PEER_SCORES_AS_EXPORTED_SQL = STATEMENTS.register(
+    "mark_peer_scores_as_exported",
+    """
+        UPDATE scores
+        SET exported = 1
+        WHERE event_id = ?
+    """,
+)
+
+MARK_PEER_SCORES_AS_EXPORTED_BATCH_SQL = STATEMENTS.register(
+    "mark_peer_scores_as_exported_batch",
+    f"""
+        UPDATE scores
+        SET exported = 1
+        WHERE event_id IN {IN_LIST}
+    """,
+)
+
+INSERT_OUTBOX_SQL = STATEMENTS.register(
+    "insert_outbox",
+    """
+        INSERT INTO outbox (kind, payload)
+        VALUES (?, ?)
+    """,
+)
+
+DELETE_OUTBOX_SQL = STATEMENTS.register(
+    "delete_outbox",
+    f"""
+        DELETE FROM outbox
+        WHERE id IN {IN_LIST}
+    """,
+)
+
+RESCHEDULE_OUTBOX_SQL = STATEMENTS.register(
+    "reschedule_outbox",
+    """
+        UPDATE outbox
+        SET attempts = attempts + 1,
+            next_attempt_at = datetime(CURRENT_TIMESTAMP, ?),
+            last_error = ?
+        WHERE id = ?
+    """,
+)
+
+MOVE_OUTBOX_TO_DEAD_LETTERS_SQL = STATEMENTS.register(
+    "move_outbox_to_dead_letters",
+    """
+        INSERT INTO outbox_dead_letters
+            (id, kind, payload, attempts, last_error, created_at)
+        SELECT
+            id, kind, payload, attempts + 1, ?, created_at
+        FROM outbox
+        WHERE id = ?
+    """,
+)
+
+DELETE_OUTBOX_MESSAGE_SQL = STATEMENTS.register(
+    "delete_outbox_message", "DELETE FROM outbox WHERE id = ?"
+)
+
+GET_OUTBOX_COUNTS_SQL = STATEMENTS.register(
+    "get_outbox_counts",
+    """
+        SELECT
+            (SELECT COUNT(*) FROM outbox),
+            (SELECT COUNT(*) FROM outbox_dead_letters)
+    """,
+)
 
 
 class DatabaseOperations:
@@ -29,62 +924,59 @@ class DatabaseOperations:
         self.__db_client = db_client
         self.logger = logger
 
+        # Events subtracted from the metagraph window sums since it was last rebuilt
+        self.__metagraph_window_rotated_events = 0
+
+    def transaction(self) -> AsyncContextManager[None]:
+        """
+        Unit of work: operations awaited inside the block are committed together
+        or not at all, see DatabaseClient.transaction
+        """
+
+        return self.__db_client.transaction()
+
+    def get_writer_stats(self) -> dict:
+        return self.__db_client.writer_stats()
+
+    async def check_statements(self) -> None:
+        """
+        Compiles the registered statements against the migrated schema,
+        raises if any of them fails
+        """
+
+        await self.__db_client.check_statements(STATEMENTS.items())
+
+    async def __stream_to_dataframe(
+        self, sql: str, parameters: Optional[Iterable], dtypes: dict[str, str]
+    ) -> pd.DataFrame:
+        # Chunks decoded as they are read, the rows tuples of one chunk at a time are in memory
+        frames = []
+
+        async for rows in self.__db_client.stream(
+            sql, parameters=parameters, chunk_size=FRAME_CHUNK_SIZE
+        ):
+            frames.append(rows_to_dataframe(rows=rows, dtypes=dtypes))
+
+        if not frames:
+            return rows_to_dataframe(rows=[], dtypes=dtypes)
+
+        return pd.concat(frames, ignore_index=True)
+
     async def delete_event(self, event_id: str) -> Iterable[tuple[str]]:
         return await self.__db_client.delete(
-            """
-                DELETE FROM events WHERE event_id = ? RETURNING event_id
-            """,
+            DELETE_EVENT_SQL,
             [event_id],
         )
 
     async def delete_predictions(self, batch_size: int) -> Iterable[tuple[int]]:
         return await self.__db_client.delete(
-            """
-                WITH predictions_to_delete AS (
-                    SELECT
-                        p.ROWID
-                    FROM
-                        predictions p
-                    LEFT JOIN
-                        events e ON p.unique_event_id = e.unique_event_id
-                    WHERE
-                        (
-                            e.unique_event_id IS NULL
-                            OR (
-                                    e.processed = TRUE
-                                    AND datetime(e.resolved_at) < datetime(CURRENT_TIMESTAMP, '-4 day')
-                                )
-                            OR e.status = ?
-                        )
-                        AND p.exported = ?
-                    ORDER BY
-                        p.ROWID ASC
-                    LIMIT ?
-                )
-                DELETE FROM
-                    predictions
-                WHERE
-                    ROWID IN (
-                        SELECT
-                            ROWID
-                        FROM
-                            predictions_to_delete
-                    )
-                RETURNING
-                    ROWID
-            """,
+            DELETE_PREDICTIONS_SQL,
             [EventStatus.DISCARDED, PredictionExportedStatus.EXPORTED, batch_size],
         )
 
     async def get_event(self, unique_event_id: str) -> None | EventsModel:
         result = await self.__db_client.one(
-            f"""
-                SELECT
-                    {', '.join(EVENTS_FIELDS)}
-                FROM events
-                WHERE
-                    unique_event_id = ?
-            """,
+            GET_EVENT_SQL,
             parameters=[unique_event_id],
             use_row_factory=True,
         )
@@ -95,20 +987,14 @@ class DatabaseOperations:
         return EventsModel(**dict(result))
 
     async def get_events_last_resolved_at(self) -> str | None:
-        row = await self.__db_client.one(
-            """
-                SELECT MAX(resolved_at) FROM events
-            """
-        )
+        row = await self.__db_client.one(GET_EVENTS_LAST_RESOLVED_AT_SQL)
 
         if row is not None:
             return row[0]
 
     async def get_events_pending_first_created_at(self) -> str | None:
         row = await self.__db_client.one(
-            """
-                SELECT MIN(created_at) FROM events WHERE status = ?
-            """,
+            GET_EVENTS_PENDING_FIRST_CREATED_AT_SQL,
             [EventStatus.PENDING],
         )
 
@@ -117,255 +1003,138 @@ class DatabaseOperations:
 
     async def get_events_to_predict(self) -> Iterable[tuple[str]]:
         return await self.__db_client.many(
-            """
-                SELECT
-                    event_id,
-                    market_type,
-                    description,
-                    cutoff,
-                    resolve_date,
-                    end_date,
-                    metadata
-                FROM
-                    events
-                WHERE
-                    status = ?
-                    AND datetime(CURRENT_TIMESTAMP) < datetime(cutoff)
-            """,
+            GET_EVENTS_TO_PREDICT_SQL,
             parameters=[EventStatus.PENDING],
         )
 
     async def get_last_event_from(self) -> str | None:
-        row = await self.__db_client.one(
-            """
-                SELECT MAX(created_at) FROM events
-            """
-        )
+        row = await self.__db_client.one(GET_LAST_EVENT_FROM_SQL)
 
         if row is not None:
             return row[0]
 
     async def get_miners_count(self) -> int:
-        row = await self.__db_client.one(
-            """
-                SELECT COUNT(*) FROM miners
-            """
-        )
+        row = await self.__db_client.one(GET_MINERS_COUNT_SQL)
 
         return row[0]
 
-    async def get_predictions_to_export(self, current_interval_minutes: int, batch_size: int):
+    async def get_predictions_to_export(
+        self, current_interval_minutes: int, batch_size: int, after_rowid: int = 0
+    ):
+        """
+        Keyset paginated: pass the ROWID of the last prediction of the previous page
+        to seek past it instead of scanning again the predictions already read
+        """
+
         return await self.__db_client.many(
-            """
-                SELECT
-                    p.ROWID,
-                    p.unique_event_id,
-                    p.minerHotkey,
-                    p.minerUid,
-                    e.event_type,
-                    p.predictedOutcome,
-                    p.interval_start_minutes,
-                    p.interval_agg_prediction,
-                    p.interval_count,
-                    p.submitted
-                FROM
-                    predictions p
-                JOIN
-                    events e ON e.unique_event_id = p.unique_event_id
-                WHERE
-                    p.exported = ?
-                    AND p.interval_start_minutes < ?
-                ORDER BY
-                    p.ROWID ASC
-                LIMIT
-                    ?
-            """,
-            [PredictionExportedStatus.NOT_EXPORTED, current_interval_minutes, batch_size],
+            GET_PREDICTIONS_TO_EXPORT_SQL,
+            [
+                PredictionExportedStatus.NOT_EXPORTED,
+                current_interval_minutes,
+                after_rowid,
+                batch_size,
+            ],
         )
 
     async def mark_predictions_as_exported(self, ids: list[str]):
-        placeholders = ", ".join(["?"] * len(ids))
-
         return await self.__db_client.update(
-            f"""
-                UPDATE
-                    predictions
-                SET
-                    exported = ?
-                WHERE
-                    ROWID IN ({placeholders})
-                RETURNING
-                    ROWID
-            """,
+            expand_in_list(MARK_PREDICTIONS_AS_EXPORTED_SQL, n_values=len(ids)),
             [PredictionExportedStatus.EXPORTED] + ids,
         )
 
+    async def mark_predictions_as_exported_range(
+        self, first_rowid: int, last_rowid: int, current_interval_minutes: int
+    ) -> None:
+        """
+        Marks exported the predictions of a page of get_predictions_to_export, first to last
+        ROWID included: a range update instead of an IN list of each ROWID
+        """
+
+        await self.__db_client.update(
+            MARK_PREDICTIONS_AS_EXPORTED_RANGE_SQL,
+            [
+                PredictionExportedStatus.EXPORTED,
+                first_rowid,
+                last_rowid,
+                PredictionExportedStatus.NOT_EXPORTED,
+                current_interval_minutes,
+            ],
+        )
+
     async def resolve_event(
         self, event_id: str, outcome: str, resolved_at: str
     ) -> Iterable[tuple[str]]:
         return await self.__db_client.update(
-            """
-                UPDATE
-                    events
-                SET
-                    status = ?,
-                    outcome = ?,
-                    resolved_at = ?,
-                    local_updated_at = CURRENT_TIMESTAMP
-                WHERE
-                    event_id = ?
-                    AND status = ?
-                RETURNING
-                    event_id
-            """,
+            RESOLVE_EVENT_SQL,
             [EventStatus.SETTLED, outcome, resolved_at, event_id, EventStatus.PENDING],
         )
 
     async def upsert_events(self, events: list[list[any]]) -> None:
         return await self.__db_client.insert_many(
-            """
-                INSERT INTO events
-                    (
-                        unique_event_id,
-                        event_id,
-                        market_type,
-                        event_type,
-                        description,
-                        starts,
-                        resolve_date,
-                        outcome,
-                        status,
-                        metadata,
-                        created_at,
-                        cutoff,
-                        end_date,
-                        registered_date,
-                        local_updated_at
-                    )
-                VALUES
-                    (
-                        ?,
-                        ?,
-                        ?,
-                        ?,
-                        ?,
-                        ?,
-                        ?,
-                        ?,
-                        ?,
-                        ?,
-                        ?,
-                        ?,
-                        ?,
-                        CURRENT_TIMESTAMP,
-                        CURRENT_TIMESTAMP
-                    )
-                ON CONFLICT
-                    (unique_event_id)
-                DO NOTHING
-            """,
+            UPSERT_EVENTS_SQL,
             events,
         )
 
     async def upsert_miners(self, miners: list[list[any]]) -> None:
         return await self.__db_client.insert_many(
-            """
-                INSERT INTO miners
-                    (
-                        miner_uid,
-                        miner_hotkey,
-                        node_ip,
-                        registered_date,
-                        last_updated,
-                        blocktime,
-                        blocklisted,
-                        is_validating,
-                        validator_permit
-                    )
-                VALUES
-                    (
-                        ?,
-                        ?,
-                        ?,
-                        ?,
-                        CURRENT_TIMESTAMP,
-                        ?,
-                        FALSE,
-                        ?,
-                        ?
-                    )
-                ON CONFLICT
-                    (miner_hotkey, miner_uid)
-                DO UPDATE
-                    set node_ip = ?,
-                    last_updated = CURRENT_TIMESTAMP,
-                    blocktime = ?,
-                    is_validating = excluded.is_validating,
-                    validator_permit = excluded.validator_permit
-            """,
+            UPSERT_MINERS_SQL,
             miners,
         )
 
     async def upsert_predictions(self, predictions: list[list[any]]):
         return await self.__db_client.insert_many(
-            """
-                INSERT INTO predictions (
-                    unique_event_id,
-                    minerHotkey,
-                    minerUid,
-                    predictedOutcome,
-                    interval_start_minutes,
-                    interval_agg_prediction,
-                    blocktime,
-                    interval_count,
-                    submitted
-                )
-                VALUES (
-                    ?,
-                    ?,
-                    ?,
-                    ?,
-                    ?,
-                    ?,
-                    ?,
-                    1,
-                    CURRENT_TIMESTAMP
-                )
-                ON CONFLICT(unique_event_id,  interval_start_minutes, minerUid)
-                DO UPDATE SET
-                    interval_agg_prediction = (interval_agg_prediction * interval_count + ?) / (interval_count + 1),
-                    interval_count = interval_count + 1
-            """,
+            UPSERT_PREDICTIONS_SQL,
             predictions,
         )
 
+    async def upsert_predictions_bulk(
+        self,
+        predictions: Iterable[Sequence[any]],
+        max_variables: int = SQLITE_MAX_VARIABLE_NUMBER,
+    ) -> int:
+        """
+        Same as upsert_predictions for many rows in one transaction, inserted with multi-row
+        statements each using up to max_variables parameters.
+
+        Rows are (unique_event_id, minerHotkey, minerUid, predictedOutcome,
+        interval_start_minutes, interval_agg_prediction, blocktime), returns the rows count
+        """
+
+        n_columns = 7
+        chunk_size = max_variables // n_columns
+
+        if chunk_size < 1:
+            raise ValueError("max_variables must allow at least one row per statement.")
+
+        rows = iter(predictions)
+        n_rows = 0
+
+        async with self.transaction():
+            while chunk := list(islice(rows, chunk_size)):
+                await self.__db_client.insert(
+                    expand_values(
+                        UPSERT_PREDICTIONS_BULK_SQL,
+                        row=UPSERT_PREDICTIONS_BULK_ROW,
+                        n_rows=len(chunk),
+                    ),
+                    [value for row in chunk for value in row],
+                )
+
+                n_rows += len(chunk)
+
+        return n_rows
+
     async def upsert_pydantic_events(self, events: list[EventsModel]) -> None:
         """Same as upsert_events but with pydantic models"""
 
-        fields_to_insert = [
-            field_name
-            for field_name in EVENTS_FIELDS
-            if field_name not in ("registered_date", "local_updated_at")
-        ]
-        placeholders = ", ".join(["?"] * len(fields_to_insert))
-        columns = ", ".join(fields_to_insert)
-
-        # Convert each event into a tuple of values in the same order as fields_to_insert
+        # Convert each event into a tuple of values in the same order as the insert fields
         event_tuples = [
-            tuple(getattr(event, field_name) for field_name in fields_to_insert) for event in events
+            tuple(getattr(event, field_name) for field_name in EVENTS_INSERT_FIELDS)
+            for event in events
         ]
 
-        sql = f"""
-                INSERT INTO events
-                    ({columns}, registered_date, local_updated_at)
-                VALUES
-                    ({placeholders}, CURRENT_TIMESTAMP, CURRENT_TIMESTAMP)
-                ON CONFLICT
-                    (unique_event_id)
-                DO NOTHING
-        """
         return await self.__db_client.insert_many(
-            sql=sql,
+            sql=UPSERT_PYDANTIC_EVENTS_SQL,
             parameters=event_tuples,
         )
 
@@ -375,16 +1144,7 @@ class DatabaseOperations:
         """
 
         rows = await self.__db_client.many(
-            f"""
-                SELECT
-                    {', '.join(EVENTS_FIELDS)}
-                FROM events
-                WHERE status = ?
-                    AND outcome IS NOT NULL
-                    AND processed = false
-                ORDER BY resolved_at ASC
-                LIMIT ?
-            """,
+            GET_EVENTS_FOR_SCORING_SQL,
             parameters=[EventStatus.SETTLED, max_events],
             use_row_factory=True,
         )
@@ -399,22 +1159,50 @@ class DatabaseOperations:
 
         return events
 
+    async def get_events_for_scoring_page(
+        self, max_events: int = 1000, after: Optional[tuple[Optional[str], int]] = None
+    ) -> tuple[list[EventsModel], Optional[tuple[Optional[str], int]], bool]:
+        """
+        Keyset paginated variant of get_events_for_scoring: returns the events of the page,
+        the key of its last event, to pass as after for the next page, and whether the page
+        was full. Rows failing to parse are dropped from the events but still count towards
+        a full page, so more events may follow a page with fewer than max_events.
+        Events left unprocessed by a page are not returned again by the next ones.
+        """
+
+        if after is None:
+            sql = GET_EVENTS_FOR_SCORING_FIRST_PAGE_SQL
+            parameters = [EventStatus.SETTLED, max_events]
+        elif after[0] is None:
+            sql = GET_EVENTS_FOR_SCORING_AFTER_NULL_SQL
+            parameters = [EventStatus.SETTLED, after[1], max_events]
+        else:
+            sql = GET_EVENTS_FOR_SCORING_AFTER_SQL
+            parameters = [EventStatus.SETTLED, after[0], after[1], max_events]
+
+        rows = await self.__db_client.many(sql, parameters=parameters, use_row_factory=True)
+
+        if not rows:
+            return [], after, False
+
+        events = []
+        for row in rows:
+            try:
+                event = EventsModel(**dict(row))
+                events.append(event)
+            except Exception:
+                self.logger.exception("Error parsing event", extra={"row": row})
+
+        # Raw resolved_at, as stored
+        last_key = (rows[-1]["resolved_at"], rows[-1]["rowid"])
+
+        return events, last_key, len(rows) == max_events
+
     async def get_predictions_for_event(
         self, unique_event_id: str, interval_start_minutes: int
     ) -> list[PredictionsModel]:
         rows = await self.__db_client.many(
-            f"""
-                SELECT
-                    {', '.join(PREDICTION_FIELDS)}
-                FROM
-                    predictions
-                WHERE
-                    unique_event_id = ?
-                    AND interval_start_minutes = ?
-                ORDER BY
-                    CAST(minerUid AS INTEGER) ASC,
-                    minerHotkey ASC
-            """,
+            GET_PREDICTIONS_FOR_EVENT_SQL,
             parameters=[unique_event_id, interval_start_minutes],
             use_row_factory=True,
         )
@@ -432,12 +1220,7 @@ class DatabaseOperations:
 
     async def get_predictions_for_scoring(self, unique_event_id: str) -> list[PredictionsModel]:
         rows = await self.__db_client.many(
-            f"""
-                SELECT
-                    {', '.join(PREDICTION_FIELDS)}
-                FROM predictions
-                WHERE unique_event_id = ?
-            """,
+            GET_PREDICTIONS_FOR_SCORING_SQL,
             parameters=(unique_event_id,),
             use_row_factory=True,
         )
@@ -452,24 +1235,65 @@ class DatabaseOperations:
 
         return predictions
 
+    async def get_predictions_for_scoring_batch(
+        self, unique_event_ids: list[str]
+    ) -> dict[str, list[PredictionsModel]]:
+        """
+        Same as get_predictions_for_scoring for many events in one query,
+        grouped by unique_event_id
+        """
+
+        predictions_by_event = {unique_event_id: [] for unique_event_id in unique_event_ids}
+
+        if not unique_event_ids:
+            return predictions_by_event
+
+        rows = await self.__db_client.many(
+            expand_in_list(GET_PREDICTIONS_FOR_SCORING_BATCH_SQL, n_values=len(unique_event_ids)),
+            parameters=unique_event_ids,
+            use_row_factory=True,
+        )
+
+        for row in rows:
+            try:
+                prediction = PredictionsModel(**dict(row))
+                predictions_by_event[prediction.unique_event_id].append(prediction)
+            except Exception:
+                self.logger.exception("Error parsing prediction", extra={"row": row})
+
+        return predictions_by_event
+
+    async def get_predictions_for_scoring_frames(
+        self, unique_event_ids: list[str]
+    ) -> dict[str, pd.DataFrame]:
+        """
+        Columnar variant of get_predictions_for_scoring_batch: one frame per event with
+        the columns scoring reads, see PREDICTIONS_FOR_SCORING_DTYPES, decoded from the rows
+        without a model per prediction. Empty frame for the events without predictions.
+        """
+
+        if not unique_event_ids:
+            return {}
+
+        predictions_df = await self.__stream_to_dataframe(
+            expand_in_list(GET_PREDICTIONS_FOR_SCORING_FRAMES_SQL, n_values=len(unique_event_ids)),
+            parameters=unique_event_ids,
+            dtypes=PREDICTIONS_FOR_SCORING_DTYPES,
+        )
+
+        frames_by_event = {
+            unique_event_id: frame.reset_index(drop=True)
+            for unique_event_id, frame in predictions_df.groupby("unique_event_id", sort=False)
+        }
+
+        return {
+            unique_event_id: frames_by_event.get(unique_event_id, predictions_df.iloc[:0])
+            for unique_event_id in unique_event_ids
+        }
+
     async def get_miners_last_registration(self) -> list:
         rows = await self.__db_client.many(
-            f"""
-                WITH ranked AS (
-                    SELECT
-                        {', '.join(MINERS_FIELDS)},
-                        ROW_NUMBER() OVER (
-                            PARTITION BY miner_uid
-                            ORDER BY registered_date DESC
-                        ) AS rn
-                    FROM miners t
-                )
-                SELECT
-                    {', '.join(MINERS_FIELDS)}
-                FROM ranked
-                WHERE rn = 1
-                ORDER BY miner_uid
-            """,
+            GET_MINERS_LAST_REGISTRATION_SQL,
             use_row_factory=True,
         )
         miners = []
@@ -484,69 +1308,70 @@ class DatabaseOperations:
 
     async def mark_event_as_processed(self, unique_event_id: str) -> None:
         return await self.__db_client.update(
-            """
-                UPDATE events
-                SET processed = true
-                WHERE unique_event_id = ?
-            """,
+            MARK_EVENT_AS_PROCESSED_SQL,
             parameters=(unique_event_id,),
         )
 
     async def mark_event_as_exported(self, unique_event_id: str) -> None:
         return await self.__db_client.update(
-            """
-                UPDATE events
-                SET exported = true
-                WHERE unique_event_id = ?
-            """,
+            MARK_EVENT_AS_EXPORTED_SQL,
             parameters=(unique_event_id,),
         )
 
+    async def mark_events_as_exported(self, unique_event_ids: list[str]) -> None:
+        return await self.__db_client.update(
+            expand_in_list(MARK_EVENTS_AS_EXPORTED_SQL, n_values=len(unique_event_ids)),
+            parameters=unique_event_ids,
+        )
+
     async def mark_event_as_discarded(self, unique_event_id: str) -> None:
         """For resolved events which cannot be scored"""
         return await self.__db_client.update(
-            """
-                UPDATE events
-                SET status = ?
-                WHERE unique_event_id = ?
-            """,
+            MARK_EVENT_AS_DISCARDED_SQL,
             parameters=[EventStatus.DISCARDED, unique_event_id],
         )
 
     async def insert_peer_scores(self, scores: list[ScoresModel]) -> None:
         """Insert raw peer scores into the scores table"""
 
-        fields_to_insert = [
-            "event_id",
-            "miner_uid",
-            "miner_hotkey",
-            "prediction",
-            "event_score",
-            "spec_version",
-        ]
-        placeholders = ", ".join("?" for _ in fields_to_insert)
-        columns = ", ".join(fields_to_insert)
-
-        # Convert each event into a tuple of values in the same order as fields_to_insert
+        # Convert each score into a tuple of values in the same order as the insert fields
         score_tuples = [
-            tuple(getattr(score, field_name) for field_name in fields_to_insert) for score in scores
+            tuple(getattr(score, field_name) for field_name in SCORES_INSERT_FIELDS)
+            for score in scores
         ]
 
-        sql = f"""
-                INSERT INTO scores ({columns})
-                VALUES ({placeholders})
-                ON CONFLICT
-                    (event_id, miner_uid, miner_hotkey)
-                DO UPDATE SET
-                    prediction = excluded.prediction,
-                    event_score = excluded.event_score,
-                    spec_version = excluded.spec_version
-        """
         return await self.__db_client.insert_many(
-            sql=sql,
+            sql=INSERT_PEER_SCORES_SQL,
             parameters=score_tuples,
         )
 
+    async def insert_peer_scores_batch(
+        self,
+        scores: list[ScoresModel],
+        processed_unique_event_ids: list[str],
+        discarded_unique_event_ids: list[str],
+    ) -> None:
+        """
+        Insert the peer scores of many events and mark the events as processed / discarded
+        in a single transaction
+        """
+
+        async with self.transaction():
+            await self.insert_peer_scores(scores)
+
+            await self.__db_client.update_many(
+                MARK_EVENT_AS_PROCESSED_SQL,
+                [(unique_event_id,) for unique_event_id in processed_unique_event_ids],
+            )
+
+            await self.__db_client.update_many(
+                MARK_EVENT_AS_DISCARDED_SQL,
+                [
+                    (EventStatus.DISCARDED, unique_event_id)
+                    for unique_event_id in discarded_unique_event_ids
+                ],
+            )
+
     async def get_events_for_metagraph_scoring(self, max_events: int = 1000) -> list[dict]:
         """
         Returns all events that were recently peer scored and not processed.
@@ -554,16 +1379,7 @@ class DatabaseOperations:
         """
 
         rows = await self.__db_client.many(
-            """
-                SELECT
-                    event_id,
-                    MIN(ROWID) AS min_row_id
-                FROM scores
-                WHERE processed = false
-                GROUP BY event_id
-                ORDER BY min_row_id ASC
-                LIMIT ?
-            """,
+            GET_EVENTS_FOR_METAGRAPH_SCORING_SQL,
             use_row_factory=True,
             parameters=[
                 max_events,
@@ -583,38 +1399,137 @@ class DatabaseOperations:
         """
         Calculate the moving average of peer scores for a given event
         """
-        raw_sql = Path(SQL_FOLDER, "metagraph_peer_score.sql").read_text()
         updated = await self.__db_client.update(
-            raw_sql,
+            STATEMENTS["metagraph_peer_score"],
             parameters={"event_id": event_id, "n_events": n_events},
         )
 
         return updated
 
+    async def set_metagraph_peer_scores_incremental(self, event_id: str, n_events: int) -> list:
+        """
+        Same as set_metagraph_peer_scores, with the peer scores of the previous n_events
+        kept in the metagraph window tables: the window slides by the events scored since
+        the last call instead of re-aggregating the whole scores table for each event
+        """
+        async with self.transaction():
+            reference = await self.__db_client.one(
+                GET_EVENT_MIN_SCORE_ROW_SQL, parameters=[event_id]
+            )
+            reference_row = reference[0]
+
+            # No scores to update
+            if reference_row is None:
+                return []
+
+            slid = await self.__slide_metagraph_window(
+                reference_row=reference_row, n_events=n_events
+            )
+
+            if not slid:
+                await self.rebuild_metagraph_window(reference_row=reference_row, n_events=n_events)
+
+            return await self.__db_client.update(
+                STATEMENTS["metagraph_window_peer_score"],
+                parameters={"event_id": event_id, "n_events": n_events},
+            )
+
+    async def __slide_metagraph_window(self, reference_row: int, n_events: int) -> bool:
+        """
+        Move the window to the n_events preceding reference_row.
+        Returns False if the window state cannot be slid and has to be rebuilt.
+        """
+        # Running sums accumulate float rounding errors, rebuild once the window rotated
+        if self.__metagraph_window_rotated_events >= n_events:
+            return False
+
+        window_count, window_first_row, window_last_row = await self.__db_client.one(
+            GET_METAGRAPH_WINDOW_RANGE_SQL
+        )
+
+        # Empty state or events not scored in row order
+        if window_count == 0 or reference_row <= window_last_row:
+            return False
+
+        # Scores of events in the window were deleted, they cannot be subtracted
+        missing = await self.__db_client.one(COUNT_METAGRAPH_WINDOW_MISSING_EVENTS_SQL)
+
+        if missing[0] > 0:
+            return False
+
+        # Window not full while there are older events, e.g. n_events increased
+        if window_count < n_events:
+            older_scores = await self.__db_client.one(
+                GET_SCORES_BEFORE_ROW_SQL, parameters=[window_first_row]
+            )
+
+            if older_scores is not None:
+                return False
+
+        # Events scored since the window was last slid
+        entering_events = await self.__db_client.many(
+            GET_METAGRAPH_WINDOW_ENTERING_EVENTS_SQL,
+            parameters={"window_last_row": window_last_row, "reference_row": reference_row},
+        )
+
+        for entering_event_id, event_min_row in entering_events:
+            await self.__db_client.insert(
+                INSERT_METAGRAPH_WINDOW_EVENT_SQL,
+                parameters=[entering_event_id, event_min_row],
+            )
+
+            await self.__db_client.insert(
+                ADD_METAGRAPH_WINDOW_SCORES_SQL,
+                parameters=[entering_event_id],
+            )
+
+        leaving_events = await self.__db_client.many(
+            GET_METAGRAPH_WINDOW_LEAVING_EVENTS_SQL,
+            parameters=[n_events],
+        )
+
+        for (leaving_event_id,) in leaving_events:
+            await self.__db_client.update(
+                SUBTRACT_METAGRAPH_WINDOW_SCORES_SQL,
+                parameters=[leaving_event_id],
+            )
+
+            await self.__db_client.delete(
+                DELETE_METAGRAPH_WINDOW_EVENT_SQL,
+                parameters=[leaving_event_id],
+            )
+
+        self.__metagraph_window_rotated_events += len(leaving_events)
+
+        # Miners without scores left in the window, also drops the float residue
+        await self.__db_client.delete(DELETE_EMPTY_METAGRAPH_WINDOW_SCORES_SQL)
+
+        return True
+
+    async def rebuild_metagraph_window(self, reference_row: int, n_events: int) -> None:
+        """
+        Rebuild the metagraph window tables from the scores of the n_events preceding
+        reference_row, as selected by metagraph_peer_score.sql
+        """
+        async with self.transaction():
+            await self.__db_client.delete(CLEAR_METAGRAPH_WINDOW_EVENTS_SQL)
+            await self.__db_client.delete(CLEAR_METAGRAPH_WINDOW_SCORES_SQL)
+
+            await self.__db_client.insert(
+                REBUILD_METAGRAPH_WINDOW_EVENTS_SQL,
+                parameters=[reference_row, n_events],
+            )
+
+            await self.__db_client.insert(REBUILD_METAGRAPH_WINDOW_SCORES_SQL)
+
+        self.__metagraph_window_rotated_events = 0
+
     async def get_peer_scored_events_for_export(self, max_events: int = 1000) -> list[EventsModel]:
         """
         Get peer scored events that have not been exported
         """
-        ev_event_fields = ["ev." + field for field in EVENTS_FIELDS]
         rows = await self.__db_client.many(
-            f"""
-                WITH events_to_export AS (
-                    SELECT
-                        event_id,
-                        MIN(ROWID) AS min_row_id
-                    FROM scores
-                    WHERE processed = 1
-                        AND exported = 0
-                    GROUP BY event_id
-                    ORDER BY min_row_id ASC
-                    LIMIT ?
-                )
-                SELECT
-                    {', '.join(ev_event_fields)}
-                FROM events ev
-                JOIN events_to_export ete ON ev.event_id = ete.event_id
-                ORDER BY ete.min_row_id ASC
-            """,
+            GET_PEER_SCORED_EVENTS_FOR_EXPORT_SQL,
             use_row_factory=True,
             parameters=[
                 max_events,
@@ -637,13 +1552,7 @@ class DatabaseOperations:
         Processed has to be true, to guarantee that metagraph score is set
         """
         rows = await self.__db_client.many(
-            f"""
-                SELECT
-                    {', '.join(SCORE_FIELDS)}
-                FROM scores
-                WHERE event_id = ?
-                    AND processed = 1
-            """,
+            GET_PEER_SCORES_FOR_EXPORT_SQL,
             parameters=[event_id],
             use_row_factory=True,
         )
@@ -658,19 +1567,51 @@ class DatabaseOperations:
 
         return scores
 
+    async def get_peer_scores_for_export_batch(
+        self, event_ids: list[str]
+    ) -> dict[str, list[ScoresModel]]:
+        """
+        Same as get_peer_scores_for_export for many events in one query, grouped by event_id
+        """
+
+        scores_by_event = {event_id: [] for event_id in event_ids}
+
+        if not event_ids:
+            return scores_by_event
+
+        rows = await self.__db_client.many(
+            expand_in_list(GET_PEER_SCORES_FOR_EXPORT_BATCH_SQL, n_values=len(event_ids)),
+            parameters=event_ids,
+            use_row_factory=True,
+        )
+
+        for row in rows:
+            try:
+                score = ScoresModel(**dict(row))
+                scores_by_event[score.event_id].append(score)
+            except Exception:
+                self.logger.exception("Error parsing score", extra={"row": row})
+
+        return scores_by_event
+
     async def mark_peer_scores_as_exported(self, event_id: str) -> list:
         """
         Mark peer scores from event_id as exported
         """
         return await self.__db_client.update(
-            """
-                UPDATE scores
-                SET exported = 1
-                WHERE event_id = ?
-            """,
+            MARK_PEER_SCORES_AS_EXPORTED_SQL,
             parameters=(event_id,),
         )
 
+    async def mark_peer_scores_as_exported_batch(self, event_ids: list[str]) -> list:
+        """
+        Mark peer scores from many event_ids as exported
+        """
+        return await self.__db_client.update(
+            expand_in_list(MARK_PEER_SCORES_AS_EXPORTED_BATCH_SQL, n_values=len(event_ids)),
+            parameters=event_ids,
+        )
+
     async def get_last_metagraph_scores(self) -> list:
         """
         Returns the last known metagraph_score for each miner_uid, miner_hotkey;
@@ -678,24 +1619,7 @@ class DatabaseOperations:
         if the miner registered after the event cutoff, we will have no metagraph_score
         """
         rows = await self.__db_client.many(
-            f"""
-                WITH grouped AS (
-                    SELECT miner_uid AS g_miner_uid,
-                        miner_hotkey AS g_miner_hotkey,
-                        MAX(ROWID) AS max_rowid
-                    FROM scores
-                    WHERE processed = 1
-                        AND created_at > datetime(CURRENT_TIMESTAMP, '-10 day')
-                    GROUP BY miner_uid, miner_hotkey
-                )
-                SELECT
-                    {', '.join(SCORE_FIELDS)}
-                FROM scores s
-                JOIN grouped
-                    ON s.miner_uid = grouped.g_miner_uid
-                    AND s.miner_hotkey = grouped.g_miner_hotkey
-                    AND s.ROWID = grouped.max_rowid
-            """,
+            GET_LAST_METAGRAPH_SCORES_SQL,
             use_row_factory=True,
         )
 
@@ -709,6 +1633,15 @@ class DatabaseOperations:
 
         return scores
 
+    async def get_last_metagraph_scores_frame(self) -> pd.DataFrame:
+        """
+        Columnar variant of get_last_metagraph_scores, a frame with the SCORE_DTYPES columns
+        """
+
+        return await self.__stream_to_dataframe(
+            GET_LAST_METAGRAPH_SCORES_SQL, parameters=None, dtypes=SCORE_DTYPES
+        )
+
     async def vacuum_database(self, pages: int):
         await self.__db_client.script(f"PRAGMA incremental_vacuum({pages})")
 
@@ -718,9 +1651,8 @@ class DatabaseOperations:
         """
         Retrieve the weighted average of the latest predictions for a given event
         """
-        raw_sql = Path(SQL_FOLDER, "latest_predictions_event.sql").read_text()
         row = await self.__db_client.one(
-            raw_sql,
+            STATEMENTS["latest_predictions_event"],
             parameters={
                 "unique_event_id": unique_event_id,
                 "interval_start_minutes": interval_start_minutes,
@@ -741,3 +1673,63 @@ class DatabaseOperations:
         weighted_average_prediction = float(row[0])
 
         return weighted_average_prediction
+
+    async def insert_outbox(self, kind: OutboxKind, payloads: list[bytes]) -> None:
+        """
+        Stores encoded payloads for the outbox dispatcher to deliver as they are,
+        due for delivery right away
+        """
+
+        return await self.__db_client.insert_many(
+            INSERT_OUTBOX_SQL,
+            [(kind, payload) for payload in payloads],
+        )
+
+    async def get_outbox_due(self, limit: int) -> list[OutboxModel]:
+        rows = await self.__db_client.many(
+            GET_OUTBOX_DUE_SQL, parameters=[limit], use_row_factory=True
+        )
+
+        messages = []
+        for row in rows:
+            try:
+                message = OutboxModel(**dict(row))
+                messages.append(message)
+            except Exception:
+                self.logger.exception("Error parsing outbox message", extra={"id": row["id"]})
+
+        return messages
+
+    async def delete_outbox(self, ids: list[int]) -> None:
+        return await self.__db_client.delete(
+            expand_in_list(DELETE_OUTBOX_SQL, n_values=len(ids)),
+            parameters=ids,
+        )
+
+    async def reschedule_outbox(self, message_id: int, delay_seconds: float, error: str) -> None:
+        """
+        Records a failed delivery attempt, next attempt after delay_seconds
+        """
+
+        return await self.__db_client.update(
+            RESCHEDULE_OUTBOX_SQL,
+            parameters=[f"+{round(delay_seconds)} seconds", error, message_id],
+        )
+
+    async def move_outbox_to_dead_letters(self, message_id: int, error: str) -> None:
+        """
+        Records a last failed delivery attempt and moves the message to the dead letters
+        """
+
+        async with self.__db_client.transaction():
+            await self.__db_client.insert(
+                MOVE_OUTBOX_TO_DEAD_LETTERS_SQL,
+                parameters=[error, message_id],
+            )
+
+            await self.__db_client.delete(DELETE_OUTBOX_MESSAGE_SQL, parameters=[message_id])
+
+    async def get_outbox_counts(self) -> dict[str, int]:
+        row = await self.__db_client.one(GET_OUTBOX_COUNTS_SQL)
+
+        return {"pending": row[0], "dead_letters": row[1]}
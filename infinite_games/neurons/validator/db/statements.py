@@ -0,0 +1,74 @@
+from pathlib import Path
+
+SQL_FOLDER = Path(Path(__file__).parent, "sql")
+
+# IN list of a registered template, compiled at startup with a single placeholder and
+# expanded to one placeholder per value when queried
+IN_LIST = "(/* in_list */ ?)"
+
+
+class SqlStatements:
+    """
+    Named SQL statements, read from the sql folder or built from the models fields once
+    at import, so that the same string is passed for each query and found in the
+    statement cache of the connections.
+
+    DatabaseClient.check_statements compiles them all at startup.
+    """
+
+    __statements: dict[str, str]
+
+    def __init__(self) -> None:
+        self.__statements = {}
+
+    def register(self, name: str, sql: str) -> str:
+        if name in self.__statements:
+            raise ValueError(f"Statement '{name}' is already registered.")
+
+        self.__statements[name] = sql
+
+        return sql
+
+    def load(self, folder: Path) -> None:
+        """
+        Registers each .sql file of the folder, named after the file
+        """
+
+        for path in sorted(folder.glob("*.sql")):
+            self.register(name=path.stem, sql=path.read_text())
+
+    def __getitem__(self, name: str) -> str:
+        return self.__statements[name]
+
+    def __len__(self) -> int:
+        return len(self.__statements)
+
+    def items(self) -> list[tuple[str, str]]:
+        return list(self.__statements.items())
+
+
+def expand_in_list(sql: str, n_values: int) -> str:
+    """
+    Statement of a template with an IN_LIST, with one placeholder per value in the list
+    """
+
+    if IN_LIST not in sql:
+        raise ValueError("Statement has no IN list to expand.")
+
+    return sql.replace(IN_LIST, f"({', '.join(['?'] * n_values)})")
+
+
+def expand_values(sql: str, row: str, n_rows: int) -> str:
+    """
+    Statement of a multi-row insert template, with its VALUES row repeated n_rows times
+    """
+
+    if sql.count(row) != 1:
+        raise ValueError("Statement must have the VALUES row once.")
+
+    return sql.replace(row, ", ".join([row] * n_rows))
+
+
+STATEMENTS = SqlStatements()
+
+STATEMENTS.load(SQL_FOLDER)
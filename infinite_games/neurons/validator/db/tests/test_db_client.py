@@ -1,9 +1,14 @@
+import asyncio
+import contextlib
+import sqlite3
 import tempfile
-from unittest.mock import MagicMock
+import threading
+from unittest.mock import ANY, MagicMock
 
+import aiosqlite
 import pytest
 
-from neurons.validator.db.client import DatabaseClient
+from neurons.validator.db.client import DatabaseClient, SqlStats, current_sql_stats
 from neurons.validator.utils.logger.logger import InfiniteGamesLogger
 
 
@@ -65,6 +70,75 @@ class TestDbClient:
         assert result == []
         assert mocked_logger.debug.call_count == 3  # Ensure logger was called
 
+    async def test_transaction(self, db_client: DatabaseClient, mocked_logger: MagicMock):
+        async with db_client.transaction():
+            await db_client.insert_many(
+                "INSERT INTO test_table (name) VALUES (?)",
+                [("test_transaction_1",), ("test_transaction_2",)],
+            )
+            await db_client.update(
+                "UPDATE test_table SET name = ? WHERE id = ?", ("test_transaction_updated", 1)
+            )
+
+            # Reads inside the transaction see its writes
+            assert await db_client.one("SELECT count(*) FROM test_table") == (2,)
+
+            # Not committed yet
+            assert await asyncio.create_task(db_client.many("SELECT * FROM test_table")) == []
+
+            # Nested block joins the outer transaction
+            async with db_client.transaction():
+                await db_client.delete("DELETE FROM test_table WHERE id = ?", (2,))
+
+            assert await asyncio.create_task(db_client.many("SELECT * FROM test_table")) == []
+
+        result = await db_client.many("SELECT * FROM test_table")
+
+        assert result == [(1, "test_transaction_updated")]
+        mocked_logger.debug.assert_any_call("SQL transaction committed", extra=ANY)
+
+    async def test_transaction_rollback(self, db_client: DatabaseClient):
+        with pytest.raises(Exception, match="no such table: fake_table"):
+            async with db_client.transaction():
+                await db_client.insert("INSERT INTO test_table (name) VALUES ('test_rollback')")
+                await db_client.insert("INSERT INTO fake_table (name) VALUES ('test_rollback')")
+
+        with pytest.raises(ValueError, match="Not a database error"):
+            async with db_client.transaction():
+                await db_client.insert("INSERT INTO test_table (name) VALUES ('test_rollback')")
+
+                raise ValueError("Not a database error")
+
+        # Writer is usable after rollbacks
+        await db_client.insert("INSERT INTO test_table (name) VALUES ('test_after_rollback')")
+
+        result = await db_client.many("SELECT name FROM test_table")
+
+        assert result == [("test_after_rollback",)]
+
+    async def test_transaction_blocks_other_writers(self, db_client: DatabaseClient):
+        async with db_client.transaction():
+            await db_client.insert("INSERT INTO test_table (name) VALUES ('test_first')")
+
+            other_write = asyncio.create_task(
+                db_client.insert("INSERT INTO test_table (name) VALUES ('test_second')")
+            )
+            await asyncio.sleep(0.05)
+
+            # Other tasks do not join the transaction, they wait for it to complete
+            assert not other_write.done()
+
+        await other_write
+
+        result = await db_client.many("SELECT name FROM test_table ORDER BY id")
+
+        assert result == [("test_first",), ("test_second",)]
+
+    async def test_script_in_transaction(self, db_client: DatabaseClient):
+        with pytest.raises(RuntimeError, match="script\\(\\) cannot run inside a transaction."):
+            async with db_client.transaction():
+                await db_client.script("DELETE FROM test_table;")
+
     async def test_delete(self, db_client: DatabaseClient, mocked_logger: MagicMock):
         # Insert a row to delete
         await db_client.insert("INSERT INTO test_table (name) VALUES ('test_delete')")
@@ -88,6 +162,32 @@ class TestDbClient:
         assert result == [("test_update_2",)]
         assert mocked_logger.debug.call_count == 3  # Ensure logger was called
 
+    async def test_update_many(self, db_client: DatabaseClient, mocked_logger: MagicMock):
+        # Insert rows to update
+        await db_client.insert_many(
+            "INSERT INTO test_table (name) VALUES (?)",
+            [("test_update_many_1",), ("test_update_many_2",), ("test_update_many_3",)],
+        )
+
+        sql = "UPDATE test_table SET name = ? WHERE id = ?"
+        params = [("test_update_many_4", 1), ("test_update_many_5", 3), ("test_update_many_6", 4)]
+
+        result = await db_client.update_many(sql, params)
+        assert result is None
+
+        result = await db_client.many("SELECT * FROM test_table")
+
+        assert result == [
+            (1, "test_update_many_4"),
+            (2, "test_update_many_2"),
+            (3, "test_update_many_5"),
+        ]
+        assert mocked_logger.debug.call_count == 4  # Ensure logger was called
+
+    async def test_update_many_no_params(self, db_client: DatabaseClient):
+        result = await db_client.update_many("UPDATE test_table SET name = ? WHERE id = ?", [])
+        assert result is None
+
     async def test_one(self, db_client: DatabaseClient, mocked_logger: MagicMock):
         # Insert a row for querying
         await db_client.insert("INSERT INTO test_table (name) VALUES ('test_one')")
@@ -130,6 +230,58 @@ class TestDbClient:
             "Query returning many rows", extra={"rows": rows_to_insert}
         )  # Ensure warning logged
 
+    async def test_stream(self, db_client: DatabaseClient, mocked_logger: MagicMock):
+        await db_client.insert_many(
+            "INSERT INTO test_table (name) VALUES (?)", [(f"test_stream_{i}",) for i in range(5)]
+        )
+
+        chunks = [
+            chunk
+            async for chunk in db_client.stream(
+                "SELECT * FROM test_table WHERE id > ? ORDER BY id", (1,), chunk_size=3
+            )
+        ]
+
+        assert chunks == [
+            [(2, "test_stream_1"), (3, "test_stream_2"), (4, "test_stream_3")],
+            [(5, "test_stream_4")],
+        ]
+        mocked_logger.debug.assert_any_call(
+            "SQL streamed",
+            extra={"caller": ANY, "rows": 4, "query_ms": ANY, "elapsed_time_ms": ANY},
+        )
+
+        # Row factory
+        async for chunk in db_client.stream("SELECT * FROM test_table", use_row_factory=True):
+            assert chunk[0]["name"] == "test_stream_0"
+
+        # Leaving early returns the reader, reset, to the pool
+        async with contextlib.aclosing(
+            db_client.stream("SELECT * FROM test_table", chunk_size=1)
+        ) as stream:
+            async for chunk in stream:
+                break
+
+        assert await db_client.one("SELECT * FROM test_table") == (1, "test_stream_0")
+
+        # Inside a transaction the uncommitted writes are streamed
+        async with db_client.transaction():
+            await db_client.delete("DELETE FROM test_table WHERE id > ?", (1,))
+
+            chunks = [chunk async for chunk in db_client.stream("SELECT id FROM test_table")]
+
+            assert chunks == [[(1,)]]
+
+        with pytest.raises(ValueError, match="chunk_size must be a positive integer."):
+            async for chunk in db_client.stream("SELECT * FROM test_table", chunk_size=0):
+                pass
+
+        with pytest.raises(Exception, match="no such table: fake_table"):
+            async for chunk in db_client.stream("SELECT * FROM fake_table"):
+                pass
+
+        mocked_logger.exception.assert_called()
+
     async def test_error(self, db_client: DatabaseClient, mocked_logger: InfiniteGamesLogger):
         with pytest.raises(Exception, match="no such table: fake_table"):
             await db_client.insert(
@@ -139,6 +291,227 @@ class TestDbClient:
         assert mocked_logger.debug.call_count == 1  # Only called for creating the table
         mocked_logger.exception.assert_called()
 
+    async def test_sql_stats(self, db_client: DatabaseClient):
+        sql_stats = SqlStats()
+
+        async def run():
+            current_sql_stats.set(sql_stats)
+
+            await db_client.insert("INSERT INTO test_table (name) VALUES ('test')")
+
+            # Queries of the tasks created are added too
+            await asyncio.create_task(db_client.one("SELECT * FROM test_table"))
+
+            with pytest.raises(Exception):
+                await db_client.many("SELECT * FROM fake_table")
+
+        await asyncio.create_task(run())
+
+        # Queries outside of the task are not
+        await db_client.one("SELECT 1")
+
+        assert sql_stats.count == 3
+        assert sql_stats.seconds > 0
+
+    async def test_check_statements(self, db_client: DatabaseClient):
+        await db_client.check_statements(
+            [
+                ("select", "SELECT name FROM test_table"),
+                ("select_qmark", "SELECT name FROM test_table WHERE id = ?"),
+                ("insert_named", "INSERT INTO test_table (name) VALUES (:name)"),
+            ]
+        )
+
+        with pytest.raises(ValueError) as e:
+            await db_client.check_statements(
+                [
+                    ("missing_column", "SELECT fake_column FROM test_table WHERE id = ?"),
+                    ("valid", "DELETE FROM test_table WHERE id = ?"),
+                    ("missing_table", "INSERT INTO fake_table (name) VALUES (?)"),
+                ]
+            )
+
+        assert str(e.value) == (
+            "Invalid SQL statements: missing_column: no such column: fake_column; "
+            "missing_table: no such table: fake_table"
+        )
+
+        # Nothing ran
+        assert await db_client.many("SELECT * FROM test_table") == []
+
+    def test_invalid_pool_size(self, mocked_logger: MagicMock):
+        for pool_size in [0, -1, 1.5, "2"]:
+            with pytest.raises(ValueError, match="pool_size must be a positive integer."):
+                DatabaseClient("test.db", mocked_logger, pool_size=pool_size)
+
+    async def test_wal_mode(self, db_client: DatabaseClient):
+        result = await db_client.one("PRAGMA journal_mode")
+
+        assert result == ("wal",)
+
+    async def test_connections_reused(self, db_client: DatabaseClient):
+        def count_connections():
+            return sum(isinstance(t, aiosqlite.Connection) for t in threading.enumerate())
+
+        await db_client.insert("INSERT INTO test_table (name) VALUES ('test_reused')")
+        await db_client.one("SELECT * FROM test_table")
+
+        connections_count = count_connections()
+
+        for _ in range(5):
+            await db_client.insert("INSERT INTO test_table (name) VALUES ('test_reused')")
+            await db_client.one("SELECT count(*) FROM test_table")
+
+        # No connection opened for the new queries
+        assert count_connections() == connections_count
+
+    async def test_readers_are_read_only(self, db_client: DatabaseClient):
+        with pytest.raises(Exception, match="attempt to write a readonly database"):
+            await db_client.one("INSERT INTO test_table (name) VALUES ('test_read_only')")
+
+        result = await db_client.many("SELECT * FROM test_table")
+
+        assert result == []
+
+    async def test_readers_row_factory_reset(self, db_client: DatabaseClient):
+        await db_client.insert("INSERT INTO test_table (name) VALUES ('test_row_factory')")
+
+        row = await db_client.one("SELECT * FROM test_table", use_row_factory=True)
+        assert row["name"] == "test_row_factory"
+
+        # Same pooled connection, no row factory
+        row = await db_client.one("SELECT * FROM test_table")
+        assert row == (1, "test_row_factory")
+
+    async def test_failed_write_rolled_back(self, db_client: DatabaseClient):
+        await db_client.script(
+            "CREATE TABLE test_unique (id INTEGER PRIMARY KEY, name TEXT UNIQUE);"
+        )
+
+        # Second row fails after the first one is inserted in the implicit transaction
+        with pytest.raises(Exception, match="UNIQUE constraint failed"):
+            await db_client.insert_many(
+                "INSERT INTO test_unique (name) VALUES (?)",
+                [("test_unique_1",), ("test_unique_1",)],
+            )
+
+        # Next write on the writer connection must not commit the failed one
+        await db_client.insert("INSERT INTO test_table (name) VALUES ('test_after_failure')")
+
+        assert await db_client.many("SELECT name FROM test_unique") == []
+        assert await db_client.many("SELECT name FROM test_table") == [("test_after_failure",)]
+
+    async def test_writes_batched(self, db_client: DatabaseClient, mocked_logger: MagicMock):
+        await db_client.script(
+            "CREATE TABLE test_unique (id INTEGER PRIMARY KEY, name TEXT UNIQUE);"
+        )
+
+        results = await asyncio.gather(
+            *[
+                db_client.insert("INSERT INTO test_unique (name) VALUES (?) RETURNING id", (name,))
+                for name in ["test_1", "test_2", "test_1", "test_3"]
+            ],
+            return_exceptions=True,
+        )
+
+        # Queued while the writer was busy, committed together
+        mocked_logger.debug.assert_any_call(
+            "SQL writes committed", extra={"batch_size": 4, "elapsed_time_ms": ANY}
+        )
+
+        # Failed write rolled back alone
+        assert results[:2] == [[(1,)], [(2,)]]
+        assert isinstance(results[2], sqlite3.IntegrityError)
+        assert results[3] == [(3,)]
+
+        assert await db_client.many("SELECT name FROM test_unique ORDER BY id") == [
+            ("test_1",),
+            ("test_2",),
+            ("test_3",),
+        ]
+
+        stats = db_client.writer_stats()
+
+        assert stats["queued"] == 0
+        assert stats["jobs"] == 6
+        assert stats["errors"] == 1
+        assert stats["max_batch_size"] == 4
+        assert stats["wait_seconds"]["count"] == 6
+        assert stats["batch_seconds"]["count"] == stats["batches"]
+
+    async def test_writes_wait_for_transaction(self, db_client: DatabaseClient):
+        async with db_client.transaction():
+            other_writes = [
+                asyncio.create_task(
+                    db_client.insert("INSERT INTO test_table (name) VALUES (?)", (f"test_{i}",))
+                )
+                for i in range(3)
+            ]
+            await asyncio.sleep(0.05)
+
+            # Cancelled before the writer started it, skipped
+            other_writes[1].cancel()
+
+        await asyncio.gather(other_writes[0], other_writes[2])
+
+        result = await db_client.many("SELECT name FROM test_table ORDER BY id")
+
+        assert result == [("test_0",), ("test_2",)]
+        assert db_client.writer_stats()["max_batch_size"] == 2
+
+    async def test_writer_outside_task_stats(self, db_client: DatabaseClient):
+        sql_stats = SqlStats()
+
+        async def run():
+            current_sql_stats.set(sql_stats)
+
+            # Starts the writer task
+            await db_client.insert("INSERT INTO test_table (name) VALUES ('test')")
+
+        await asyncio.create_task(run())
+
+        # Later writes of other tasks are not added to the stats of the task
+        await db_client.insert("INSERT INTO test_table (name) VALUES ('test')")
+
+        assert sql_stats.count == 1
+
+    async def test_concurrent_reads(self, mocked_logger: MagicMock):
+        temp_db = tempfile.NamedTemporaryFile(delete=False)
+        temp_db.close()
+
+        client = DatabaseClient(temp_db.name, mocked_logger, pool_size=2)
+
+        await client.script("CREATE TABLE test_table (id INTEGER PRIMARY KEY, name TEXT);")
+        await client.insert("INSERT INTO test_table (name) VALUES ('test_concurrent')")
+
+        results = await asyncio.gather(
+            *[client.one("SELECT name FROM test_table") for _ in range(10)],
+            client.insert("INSERT INTO test_table (name) VALUES ('test_concurrent_2')"),
+        )
+
+        assert results[:10] == [("test_concurrent",)] * 10
+
+        await client.close()
+
+    async def test_health_check(self, db_client: DatabaseClient, mocked_logger: MagicMock):
+        await db_client.one("SELECT 1")
+
+        assert await db_client.health_check() is True
+        mocked_logger.exception.assert_not_called()
+
+    async def test_reconnect_after_close(self, db_client: DatabaseClient):
+        await db_client.insert("INSERT INTO test_table (name) VALUES ('test_close')")
+
+        await db_client.close()
+
+        # Connections are re-opened on next use
+        result = await db_client.many("SELECT name FROM test_table")
+
+        assert result == [("test_close",)]
+        assert await db_client.health_check() is True
+
+        await db_client.close()
+
     async def test_migrate(self, db_client: DatabaseClient):
         await db_client.migrate()
 
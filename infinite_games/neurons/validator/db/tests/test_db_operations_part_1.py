@@ -1,4 +1,5 @@
 import json
+import sqlite3
 import tempfile
 from datetime import datetime, timedelta, timezone
 from unittest.mock import ANY, MagicMock
@@ -6,7 +7,12 @@ from unittest.mock import ANY, MagicMock
 import pytest
 
 from neurons.validator.db.client import DatabaseClient
-from neurons.validator.db.operations import DatabaseOperations
+from neurons.validator.db.operations import (
+    SQLITE_LEGACY_MAX_VARIABLE_NUMBER,
+    SQLITE_MAX_VARIABLE_NUMBER,
+    DatabaseOperations,
+    get_sqlite_max_variable_number,
+)
 from neurons.validator.db.tests.test_utils import TestDbOperationsBase
 from neurons.validator.models.event import EventsModel, EventStatus
 from neurons.validator.models.miner import MinersModel
@@ -875,6 +881,8 @@ class TestDbOperationsPart1(TestDbOperationsBase):
 
         assert len(result) == 1
         assert result[0][0] == event_to_predict_id
+        # local_updated_at
+        assert result[0][7] is not None
 
     async def test_get_predictions_for_event(self, db_operations: DatabaseOperations):
         unique_event_id = "unique_event_id_1"
@@ -1097,6 +1105,16 @@ class TestDbOperationsPart1(TestDbOperationsBase):
         assert len(result) == 1
         assert result[0][1] == "unique_event_id_1"
 
+        # Next page seeks past the ROWID of the last prediction read
+        result = await db_operations.get_predictions_to_export(
+            current_interval_minutes=current_interval_minutes,
+            batch_size=20,
+            after_rowid=result[0][0],
+        )
+
+        assert len(result) == 1
+        assert result[0][1] != "unique_event_id_1"
+
         result = await db_operations.get_predictions_to_export(
             current_interval_minutes=current_interval_minutes, batch_size=20
         )
@@ -1162,6 +1180,69 @@ class TestDbOperationsPart1(TestDbOperationsBase):
         assert result[1][2] == PredictionExportedStatus.EXPORTED
         assert result[2][2] == PredictionExportedStatus.NOT_EXPORTED
 
+    async def test_mark_predictions_as_exported_range(
+        self, db_client: DatabaseClient, db_operations: DatabaseOperations
+    ):
+        events = [
+            (
+                f"unique_event_id_{index}",
+                f"event_{index}",
+                "truncated_market",
+                "market",
+                "desc",
+                "2024-12-02",
+                "2024-12-03",
+                "outcome",
+                "status",
+                '{"key": "value"}',
+                "2000-12-02T14:30:00+00:00",
+                "2000-12-02T14:30:00+00:00",
+                "2000-12-03T14:30:00+00:00",
+            )
+            # No event for the 4th prediction
+            for index in [1, 2, 3, 5, 6]
+        ]
+
+        predictions = [
+            (
+                f"unique_event_id_{index}",
+                f"neuronHotkey_{index}",
+                f"neuronUid_{index}",
+                "1",
+                # The 3rd prediction wont be ready to be exported
+                11 if index == 3 else 10,
+                "1",
+                1,
+                "1",
+            )
+            for index in range(1, 7)
+        ]
+
+        await db_operations.upsert_events(events=events)
+        await db_operations.upsert_predictions(predictions=predictions)
+
+        page = await db_operations.get_predictions_to_export(
+            current_interval_minutes=11, batch_size=2, after_rowid=1
+        )
+
+        assert [prediction[0] for prediction in page] == [2, 5]
+
+        await db_operations.mark_predictions_as_exported_range(
+            first_rowid=page[0][0], last_rowid=page[-1][0], current_interval_minutes=11
+        )
+
+        result = await db_client.many("SELECT ROWID, exported FROM predictions ORDER BY ROWID")
+
+        # Only the predictions of the page marked in its range
+        assert result == [
+            (1, PredictionExportedStatus.NOT_EXPORTED),
+            (2, PredictionExportedStatus.EXPORTED),
+            (3, PredictionExportedStatus.NOT_EXPORTED),
+            (4, PredictionExportedStatus.NOT_EXPORTED),
+            (5, PredictionExportedStatus.EXPORTED),
+            (6, PredictionExportedStatus.NOT_EXPORTED),
+        ]
+
     async def test_resolve_event(
         self, db_client: DatabaseClient, db_operations: DatabaseOperations
     ):
@@ -1511,6 +1592,96 @@ class TestDbOperationsPart1(TestDbOperationsBase):
         assert result[0][0] == 2
         assert result[1][0] == 2
 
+    async def test_upsert_predictions_bulk(
+        self, db_operations: DatabaseOperations, db_client: DatabaseClient
+    ):
+        interval_start_minutes = 5
+        block = 1
+
+        predictions = [
+            (
+                f"unique_event_id_{i}",
+                f"neuronHotkey_{i}",
+                f"neuronUid_{i}",
+                "0.5",
+                interval_start_minutes,
+                0.5,
+                block,
+            )
+            for i in range(10)
+        ]
+
+        # 3 rows per statement
+        inserted = await db_operations.upsert_predictions_bulk(
+            (prediction for prediction in predictions), max_variables=21
+        )
+
+        assert inserted == 10
+
+        result = await db_client.many(
+            """
+                SELECT
+                    unique_event_id, minerHotkey, minerUid, predictedOutcome,
+                    interval_start_minutes, interval_agg_prediction, blocktime, interval_count
+                FROM predictions
+                ORDER BY ROWID
+            """
+        )
+
+        assert result == [(*prediction, 1) for prediction in predictions]
+
+        # Upsert averages the predictions as upsert_predictions
+        updated_prediction = (*predictions[0][:5], 1.0, block)
+
+        inserted = await db_operations.upsert_predictions_bulk([updated_prediction])
+
+        assert inserted == 1
+
+        result = await db_client.one(
+            """
+                SELECT interval_agg_prediction, interval_count
+                FROM predictions
+                WHERE unique_event_id = ?
+            """,
+            [predictions[0][0]],
+        )
+
+        assert result == (0.75, 2)
+
+    def test_get_sqlite_max_variable_number(self, monkeypatch):
+        connection = sqlite3.connect(":memory:")
+        expected = connection.getlimit(sqlite3.SQLITE_LIMIT_VARIABLE_NUMBER)
+        connection.close()
+
+        assert get_sqlite_max_variable_number() == expected
+        assert SQLITE_MAX_VARIABLE_NUMBER == expected
+
+        # Before Python 3.11, no getlimit
+        monkeypatch.setattr(sqlite3, "connect", lambda _: MagicMock(spec=["close"]))
+
+        assert get_sqlite_max_variable_number() == SQLITE_LEGACY_MAX_VARIABLE_NUMBER
+
+    async def test_upsert_predictions_bulk_rollback(
+        self, db_operations: DatabaseOperations, db_client: DatabaseClient
+    ):
+        predictions = [
+            ("unique_event_id_1", "neuronHotkey_1", "neuronUid_1", "1", 5, 1.0, 1),
+            ("unique_event_id_2", "neuronHotkey_2", "neuronUid_2", "1", 5, 1.0, 1),
+            # Not enough values
+            ("unique_event_id_3", "neuronHotkey_3"),
+        ]
+
+        with pytest.raises(Exception):
+            await db_operations.upsert_predictions_bulk(predictions, max_variables=7)
+
+        # All the chunks are rolled back
+        result = await db_client.many("SELECT * FROM predictions")
+
+        assert result == []
+
+        with pytest.raises(ValueError, match="max_variables must allow at least one row"):
+            await db_operations.upsert_predictions_bulk(predictions, max_variables=6)
+
     async def test_get_events_for_scoring(self, db_operations: DatabaseOperations):
         expected_event_id = "event1"
 
@@ -1555,6 +1726,89 @@ class TestDbOperationsPart1(TestDbOperationsBase):
         assert result[0].event_id == expected_event_id
         assert result[0].status == EventStatus.SETTLED
 
+    async def test_get_events_for_scoring_page(
+        self, db_operations: DatabaseOperations, db_client: DatabaseClient
+    ):
+        events = [
+            EventsModel(
+                unique_event_id=f"unique{i}",
+                event_id=f"event{i}",
+                market_type="truncated_market",
+                event_type="market",
+                description="desc",
+                starts="2024-12-02",
+                resolve_date="2024-12-03",
+                outcome="1",
+                status=EventStatus.SETTLED,
+                metadata='{"key": "value"}',
+                created_at="2000-12-02T14:30:00+00:00",
+                cutoff="2000-12-30T14:30:00+00:00",
+                end_date="2000-12-31T14:30:00+00:00",
+            )
+            for i in range(5)
+        ]
+
+        await db_operations.upsert_pydantic_events(events)
+
+        # Two events not resolved_at, two resolved at the same time
+        await db_client.update(
+            "UPDATE events SET resolved_at = ? WHERE unique_event_id IN (?, ?)",
+            ["2024-12-03T00:00:00+00:00", "unique0", "unique3"],
+        )
+        await db_client.update(
+            "UPDATE events SET resolved_at = ? WHERE unique_event_id = ?",
+            ["2024-12-02T00:00:00+00:00", "unique4"],
+        )
+
+        pages = []
+        after = None
+
+        while True:
+            page, after, has_more = await db_operations.get_events_for_scoring_page(
+                max_events=2, after=after
+            )
+
+            if not page:
+                break
+
+            pages.append(([event.unique_event_id for event in page], has_more))
+
+        assert pages == [
+            (["unique1", "unique2"], True),
+            (["unique4", "unique0"], True),
+            (["unique3"], False),
+        ]
+
+        # Last key kept when no events left
+        assert after == ("2024-12-03T00:00:00+00:00", 4)
+
+        # Events left unprocessed by a page are not returned again
+        page, after, has_more = await db_operations.get_events_for_scoring_page(
+            max_events=2, after=(None, 3)
+        )
+
+        assert [event.unique_event_id for event in page] == ["unique4", "unique0"]
+        assert after == ("2024-12-03T00:00:00+00:00", 1)
+        assert has_more
+
+        # A row failing to parse is dropped, the page still full
+        await db_client.update(
+            "UPDATE events SET cutoff = ? WHERE unique_event_id = ?", ["not a date", "unique2"]
+        )
+
+        page, after, has_more = await db_operations.get_events_for_scoring_page(max_events=2)
+
+        assert [event.unique_event_id for event in page] == ["unique1"]
+        assert after == (None, 3)
+        assert has_more
+
+        page, after, has_more = await db_operations.get_events_for_scoring_page(
+            max_events=2, after=after
+        )
+
+        assert [event.unique_event_id for event in page] == ["unique4", "unique0"]
+        assert has_more
+
     async def test_get_predictions_for_scoring(
         self, db_operations: DatabaseOperations, db_client: DatabaseClient
     ):
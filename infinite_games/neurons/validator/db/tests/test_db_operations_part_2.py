@@ -1,8 +1,15 @@
+import json
+import random
 from datetime import datetime, timedelta, timezone
 
+import pandas as pd
+import pytest
+
 from neurons.validator.db.tests.test_utils import TestDbOperationsBase
 from neurons.validator.models.event import EventsModel, EventStatus
+from neurons.validator.models.outbox import OutboxKind
 from neurons.validator.models.score import SCORE_FIELDS, ScoresModel
+from neurons.validator.utils.common.converters import pydantic_models_to_dataframe
 
 
 class TestDbOperationsPart2(TestDbOperationsBase):
@@ -223,6 +230,71 @@ class TestDbOperationsPart2(TestDbOperationsBase):
             else:
                 assert row["exported"] == 0
 
+    async def test_get_peer_scores_for_export_batch(self, db_operations, db_client):
+        scores = [
+            ScoresModel(
+                event_id=event_id,
+                miner_uid=miner_uid,
+                miner_hotkey=f"hk{miner_uid}",
+                prediction=0.8,
+                event_score=0.85,
+                spec_version=1,
+            )
+            for event_id, miner_uid in [("event1", 1), ("event1", 2), ("event2", 1), ("event3", 1)]
+        ]
+        await db_operations.insert_peer_scores(scores)
+        await db_client.update(
+            "UPDATE scores SET processed = ? WHERE event_id != ?",
+            [1, "event3"],
+        )
+
+        result = await db_operations.get_peer_scores_for_export_batch(
+            ["event1", "event2", "event3", "event4"]
+        )
+
+        assert list(result) == ["event1", "event2", "event3", "event4"]
+        assert [score.miner_uid for score in result["event1"]] == [1, 2]
+        assert [score.miner_uid for score in result["event2"]] == [1]
+        # Not processed
+        assert result["event3"] == []
+        assert result["event4"] == []
+
+        assert await db_operations.get_peer_scores_for_export_batch([]) == {}
+
+    async def test_mark_peer_scores_and_events_as_exported_batch(self, db_operations, db_client):
+        scores = [
+            ScoresModel(
+                event_id=event_id,
+                miner_uid=1,
+                miner_hotkey="hk1",
+                prediction=0.80,
+                event_score=0.85,
+                spec_version=1,
+            )
+            for event_id in ["event1", "event2", "event3"]
+        ]
+        await db_operations.insert_peer_scores(scores)
+
+        await db_operations.mark_peer_scores_as_exported_batch(["event1", "event3"])
+
+        updated = await db_client.many("SELECT event_id, exported FROM scores ORDER BY ROWID ASC")
+
+        assert updated == [("event1", 1), ("event2", 0), ("event3", 1)]
+
+        await db_client.insert_many(
+            "INSERT INTO events (unique_event_id, event_id, market_type, event_type, description,"
+            " outcome, status, metadata) VALUES (?, ?, 'market', 'type', 'desc', '1', 3, '{}')",
+            [(f"unique_{event_id}", event_id) for event_id in ["event1", "event2", "event3"]],
+        )
+
+        await db_operations.mark_events_as_exported(["unique_event1", "unique_event2"])
+
+        updated = await db_client.many(
+            "SELECT unique_event_id, exported FROM events ORDER BY ROWID ASC"
+        )
+
+        assert updated == [("unique_event1", 1), ("unique_event2", 1), ("unique_event3", 0)]
+
     async def test_get_last_metagraph_scores(self, db_operations, db_client):
         created_at = datetime.now(timezone.utc) - timedelta(days=1)
         scores_list = [
@@ -325,6 +397,16 @@ class TestDbOperationsPart2(TestDbOperationsBase):
         assert last_metagraph_scores[2].miner_hotkey == "hk5"
         assert last_metagraph_scores[2].metagraph_score == 0.0
 
+        # Columnar variant, same rows and dtypes as the models frame
+        last_metagraph_scores_df = await db_operations.get_last_metagraph_scores_frame()
+        models_df = pydantic_models_to_dataframe(last_metagraph_scores)
+
+        assert list(last_metagraph_scores_df.columns) == list(SCORE_FIELDS)
+
+        columns = ["event_id", "miner_uid", "miner_hotkey", "metagraph_score", "spec_version"]
+        pd.testing.assert_frame_equal(last_metagraph_scores_df[columns], models_df[columns])
+        assert last_metagraph_scores_df["processed"].tolist() == [True, True, True]
+
     async def test_mark_event_as_discarded(self, db_operations, db_client):
         now = datetime.now(timezone.utc)
         discarded_unique_event_id = "discarded_event"
@@ -383,6 +465,35 @@ class TestDbOperationsPart2(TestDbOperationsBase):
 
         assert result is None
 
+    async def test_check_statements(self, db_operations):
+        # Registered statements compile against the migrated schema
+        await db_operations.check_statements()
+
+    async def test_check_statements_error(self, db_operations, db_client):
+        await db_client.script("ALTER TABLE scores DROP COLUMN spec_version;")
+
+        with pytest.raises(ValueError, match="insert_peer_scores: table scores has no column"):
+            await db_operations.check_statements()
+
+    async def test_check_statements_templates(self, db_operations, db_client):
+        await db_client.script("ALTER TABLE outbox RENAME COLUMN id TO message_id;")
+
+        # IN list templates and the statements of the outbox compiled too
+        with pytest.raises(ValueError) as exc_info:
+            await db_operations.check_statements()
+
+        assert "delete_outbox: no such column: id" in str(exc_info.value)
+        assert "delete_outbox_message: no such column: id" in str(exc_info.value)
+
+    async def test_get_writer_stats(self, db_operations):
+        await db_operations.vacuum_database(500)
+
+        stats = db_operations.get_writer_stats()
+
+        assert stats["queued"] == 0
+        assert stats["jobs"] >= 1
+        assert stats["errors"] == 0
+
     async def test_get_wa_prediction_event(self, db_operations, db_client):
         unique_event_id = "unique_event_id"
 
@@ -446,3 +557,275 @@ class TestDbOperationsPart2(TestDbOperationsBase):
         assert wa_prediction == sum([(i * 0.01) ** 2 for i in range(40, 50)]) / sum(
             [i * 0.01 for i in range(40, 50)]
         )
+
+    async def test_get_predictions_for_scoring_batch(self, db_operations, db_client):
+        predictions = [
+            ("event_1", "hk1", "1", "1", 10, 0.1, 1, 0.1),
+            ("event_1", "hk2", "2", "1", 10, 0.2, 1, 0.2),
+            ("event_2", "hk1", "1", "1", 10, 0.3, 1, 0.3),
+            ("event_other", "hk1", "1", "1", 10, 0.4, 1, 0.4),
+        ]
+        await db_operations.upsert_predictions(predictions)
+
+        result = await db_operations.get_predictions_for_scoring_batch(
+            unique_event_ids=["event_1", "event_2", "event_no_predictions"]
+        )
+
+        assert list(result.keys()) == ["event_1", "event_2", "event_no_predictions"]
+        assert sorted(p.minerHotkey for p in result["event_1"]) == ["hk1", "hk2"]
+        assert [p.interval_agg_prediction for p in result["event_2"]] == [0.3]
+        assert result["event_no_predictions"] == []
+
+        result = await db_operations.get_predictions_for_scoring_batch(unique_event_ids=[])
+
+        assert result == {}
+
+    async def test_get_predictions_for_scoring_frames(self, db_operations, db_client):
+        predictions = [
+            ("event_1", "hk1", "1", "1", 10, 0.1, 1, 0.1),
+            ("event_1", "hk2", "2", "1", 10, 0.2, 1, 0.2),
+            ("event_2", "hk1", "1", "1", 10, 0.3, 1, 0.3),
+            ("event_other", "hk1", "1", "1", 10, 0.4, 1, 0.4),
+        ]
+        await db_operations.upsert_predictions(predictions)
+
+        result = await db_operations.get_predictions_for_scoring_frames(
+            unique_event_ids=["event_1", "event_2", "event_no_predictions"]
+        )
+        models = await db_operations.get_predictions_for_scoring_batch(
+            unique_event_ids=["event_1", "event_2"]
+        )
+
+        assert list(result.keys()) == ["event_1", "event_2", "event_no_predictions"]
+
+        # Same columns and dtypes as the models frame
+        for unique_event_id in ["event_1", "event_2"]:
+            columns = list(result[unique_event_id].columns)
+            models_df = pydantic_models_to_dataframe(models[unique_event_id])[columns]
+
+            pd.testing.assert_frame_equal(result[unique_event_id], models_df)
+
+        assert result["event_no_predictions"].empty
+        assert list(result["event_no_predictions"].columns) == columns
+
+        result = await db_operations.get_predictions_for_scoring_frames(unique_event_ids=[])
+
+        assert result == {}
+
+    async def test_insert_peer_scores_batch(self, db_operations, db_client):
+        now = datetime.now(timezone.utc)
+
+        events = [
+            EventsModel(
+                unique_event_id=unique_event_id,
+                event_id=unique_event_id,
+                market_type="market_type",
+                event_type="type",
+                description="desc",
+                outcome="1",
+                status=EventStatus.SETTLED,
+                metadata='{"key": "value"}',
+                resolved_at=now.isoformat(),
+            )
+            for unique_event_id in ["scored_event", "discarded_event", "untouched_event"]
+        ]
+        await db_operations.upsert_pydantic_events(events)
+
+        scores = [
+            ScoresModel(
+                event_id="scored_event",
+                miner_uid=miner_uid,
+                miner_hotkey=f"hk{miner_uid}",
+                prediction=0.5,
+                event_score=0.1 * miner_uid,
+                spec_version=1,
+            )
+            for miner_uid in range(3)
+        ]
+
+        await db_operations.insert_peer_scores_batch(
+            scores=scores,
+            processed_unique_event_ids=["scored_event"],
+            discarded_unique_event_ids=["discarded_event"],
+        )
+
+        inserted_scores = await db_client.many(
+            "SELECT event_id, miner_uid, event_score FROM scores ORDER BY miner_uid"
+        )
+        assert inserted_scores == [("scored_event", i, 0.1 * i) for i in range(3)]
+
+        result = await db_client.many(
+            "SELECT unique_event_id, status, processed FROM events ORDER BY ROWID ASC"
+        )
+        assert result == [
+            ("scored_event", str(EventStatus.SETTLED.value), 1),
+            ("discarded_event", str(EventStatus.DISCARDED.value), 0),
+            ("untouched_event", str(EventStatus.SETTLED.value), 0),
+        ]
+
+    async def insert_random_peer_scores(self, db_operations, n_events: int, seed: int) -> list[str]:
+        rng = random.Random(seed)
+        event_ids = [f"event_{i}" for i in range(n_events)]
+
+        for event_id in event_ids:
+            miner_uids = rng.sample(range(12), k=rng.randint(1, 12))
+            scores = [
+                ScoresModel(
+                    event_id=event_id,
+                    miner_uid=miner_uid,
+                    miner_hotkey=f"hk{miner_uid}",
+                    prediction=0.5,
+                    event_score=rng.uniform(-3, 1),
+                    spec_version=1,
+                )
+                for miner_uid in miner_uids
+            ]
+            await db_operations.insert_peer_scores(scores)
+
+        return event_ids
+
+    async def assert_metagraph_parity(
+        self, db_operations, db_client, event_id: str, n_events: int
+    ) -> None:
+        sql = """
+            SELECT miner_uid, miner_hotkey, metagraph_score, other_data, processed
+            FROM scores
+            WHERE event_id = ?
+            ORDER BY miner_uid
+        """
+
+        assert await db_operations.set_metagraph_peer_scores(event_id, n_events=n_events) == []
+        expected = await db_client.many(sql, parameters=[event_id])
+
+        await db_client.update(
+            "UPDATE scores SET metagraph_score = NULL, other_data = NULL, processed = 0"
+        )
+
+        updated = await db_operations.set_metagraph_peer_scores_incremental(
+            event_id, n_events=n_events
+        )
+        assert updated == []
+        actual = await db_client.many(sql, parameters=[event_id])
+
+        assert len(actual) == len(expected)
+
+        for actual_row, expected_row in zip(actual, expected):
+            assert actual_row[:2] == expected_row[:2]
+            assert actual_row[2] == pytest.approx(expected_row[2], rel=0, abs=1e-9)
+            assert actual_row[4] == 1
+
+            actual_data = json.loads(actual_row[3])
+            expected_data = json.loads(expected_row[3])
+
+            assert actual_data.keys() == expected_data.keys()
+            assert actual_data["count_peer_score"] == expected_data["count_peer_score"]
+            assert actual_data["true_count_peer_score"] == expected_data["true_count_peer_score"]
+
+            for key in ["sum_peer_score", "avg_peer_score", "sqmax_avg_peer_score"]:
+                assert actual_data[key] == pytest.approx(expected_data[key], rel=0, abs=1e-9)
+
+    @pytest.mark.parametrize("n_events", [1, 3, 149])
+    async def test_set_metagraph_peer_scores_incremental(
+        self, db_operations, db_client, n_events: int
+    ):
+        event_ids = await self.insert_random_peer_scores(db_operations, n_events=15, seed=n_events)
+
+        for idx, event_id in enumerate(event_ids):
+            await self.assert_metagraph_parity(db_operations, db_client, event_id, n_events)
+
+            window_events = await db_client.many(
+                "SELECT event_id FROM metagraph_window_events ORDER BY event_min_row"
+            )
+            assert [row[0] for row in window_events] == event_ids[max(idx - n_events, 0) : idx]
+
+    async def test_set_metagraph_peer_scores_incremental_long_run(self, db_operations, db_client):
+        n_events = 50
+        event_ids = await self.insert_random_peer_scores(db_operations, n_events=2000, seed=11)
+
+        for idx, event_id in enumerate(event_ids):
+            # Window slid and periodically rebuilt over many rotations stays on the full run
+            if idx % 200 == 0 or idx == len(event_ids) - 1:
+                await self.assert_metagraph_parity(db_operations, db_client, event_id, n_events)
+            else:
+                await db_operations.set_metagraph_peer_scores_incremental(
+                    event_id, n_events=n_events
+                )
+
+        window_events = await db_client.many(
+            "SELECT event_id FROM metagraph_window_events ORDER BY event_min_row"
+        )
+        assert [row[0] for row in window_events] == event_ids[-n_events - 1 : -1]
+
+    async def test_set_metagraph_peer_scores_incremental_rebuild(self, db_operations, db_client):
+        event_ids = await self.insert_random_peer_scores(db_operations, n_events=12, seed=7)
+
+        for event_id in event_ids[:8]:
+            await self.assert_metagraph_parity(db_operations, db_client, event_id, n_events=3)
+
+        # Events scored out of row order
+        await self.assert_metagraph_parity(db_operations, db_client, event_ids[2], n_events=3)
+        await self.assert_metagraph_parity(db_operations, db_client, event_ids[8], n_events=3)
+
+        # Window size increased and decreased
+        await self.assert_metagraph_parity(db_operations, db_client, event_ids[9], n_events=5)
+        await self.assert_metagraph_parity(db_operations, db_client, event_ids[10], n_events=2)
+
+        # Scores of an event in the window deleted
+        await db_client.delete("DELETE FROM scores WHERE event_id = ?", [event_ids[10]])
+        await self.assert_metagraph_parity(db_operations, db_client, event_ids[11], n_events=2)
+
+        # Unknown event
+        updated = await db_operations.set_metagraph_peer_scores_incremental(
+            "unknown_event", n_events=2
+        )
+        assert updated == []
+
+    async def test_outbox(self, db_operations, db_client):
+        await db_operations.insert_outbox(
+            kind=OutboxKind.PREDICTIONS, payloads=[b'{"submissions": []}', b'{"events": null}']
+        )
+        await db_operations.insert_outbox(kind=OutboxKind.SCORES, payloads=[b'{"results": []}'])
+
+        messages = await db_operations.get_outbox_due(limit=10)
+
+        assert [(message.id, message.kind, message.payload) for message in messages] == [
+            (1, OutboxKind.PREDICTIONS, b'{"submissions": []}'),
+            (2, OutboxKind.PREDICTIONS, b'{"events": null}'),
+            (3, OutboxKind.SCORES, b'{"results": []}'),
+        ]
+        assert messages[0].attempts == 0
+        assert messages[0].last_error is None
+
+        assert len(await db_operations.get_outbox_due(limit=2)) == 2
+
+        # Rescheduled message not due
+        await db_operations.reschedule_outbox(message_id=1, delay_seconds=60.0, error="error")
+
+        messages = await db_operations.get_outbox_due(limit=10)
+
+        assert [message.id for message in messages] == [2, 3]
+
+        row = await db_client.one(
+            "SELECT attempts, last_error, next_attempt_at > CURRENT_TIMESTAMP FROM outbox"
+            " WHERE id = 1"
+        )
+
+        assert row == (1, "error", 1)
+
+        # Delivered
+        await db_operations.delete_outbox(ids=[2])
+
+        # Dead letter
+        await db_operations.move_outbox_to_dead_letters(message_id=1, error="last error")
+
+        assert await db_client.many("SELECT id FROM outbox") == [(3,)]
+
+        dead_letters = await db_client.many(
+            "SELECT id, kind, payload, attempts, last_error FROM outbox_dead_letters"
+        )
+
+        assert dead_letters == [
+            (1, OutboxKind.PREDICTIONS, b'{"submissions": []}', 2, "last error")
+        ]
+
+        assert await db_operations.get_outbox_counts() == {"pending": 1, "dead_letters": 1}
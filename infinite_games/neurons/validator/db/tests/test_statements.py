@@ -0,0 +1,60 @@
+import pytest
+
+from neurons.validator.db.statements import (
+    IN_LIST,
+    SQL_FOLDER,
+    STATEMENTS,
+    SqlStatements,
+    expand_in_list,
+    expand_values,
+)
+
+
+class TestSqlStatements:
+    def test_register(self):
+        statements = SqlStatements()
+
+        sql = statements.register(name="select", sql="SELECT 1")
+
+        assert sql == "SELECT 1"
+        assert statements["select"] == "SELECT 1"
+        assert statements.items() == [("select", "SELECT 1")]
+
+        with pytest.raises(ValueError, match="Statement 'select' is already registered."):
+            statements.register(name="select", sql="SELECT 2")
+
+        with pytest.raises(KeyError):
+            statements["unknown"]
+
+    def test_load(self, tmp_path):
+        tmp_path.joinpath("b_statement.sql").write_text("SELECT 2")
+        tmp_path.joinpath("a_statement.sql").write_text("SELECT 1")
+        tmp_path.joinpath("notes.txt").write_text("Not a statement")
+
+        statements = SqlStatements()
+        statements.load(tmp_path)
+
+        assert statements.items() == [("a_statement", "SELECT 1"), ("b_statement", "SELECT 2")]
+
+    def test_sql_folder_loaded(self):
+        for path in SQL_FOLDER.glob("*.sql"):
+            assert STATEMENTS[path.stem] == path.read_text()
+
+    def test_expand_in_list(self):
+        sql = f"SELECT 1 FROM events WHERE event_id IN {IN_LIST}"
+
+        assert expand_in_list(sql, n_values=3) == "SELECT 1 FROM events WHERE event_id IN (?, ?, ?)"
+        assert expand_in_list(sql, n_values=0) == "SELECT 1 FROM events WHERE event_id IN ()"
+
+        with pytest.raises(ValueError, match="Statement has no IN list to expand."):
+            expand_in_list("SELECT 1", n_values=3)
+
+    def test_expand_values(self):
+        sql = "INSERT INTO t (a, b) VALUES (?, 1) ON CONFLICT DO NOTHING"
+
+        assert expand_values(sql, row="(?, 1)", n_rows=3) == (
+            "INSERT INTO t (a, b) VALUES (?, 1), (?, 1), (?, 1) ON CONFLICT DO NOTHING"
+        )
+
+        with pytest.raises(ValueError, match="Statement must have the VALUES row once."):
+            expand_values(sql, row="(?, 2)", n_rows=3)
@@ -1,17 +1,26 @@
 import asyncio
 import base64
-import json
 import time
+from typing import Optional, Union
 
 import aiohttp
 import aiohttp.typedefs
 from bittensor_wallet import Wallet
 
+from neurons.validator.utils.common.json_encoder import JsonEncoder, encode_json
 from neurons.validator.utils.config import IfgamesEnvType
 from neurons.validator.utils.git import commit_short_hash
 from neurons.validator.utils.logger.logger import InfiniteGamesLogger
 from neurons.validator.version import __version__
 
+# Connections to the API host, requests past the limit wait for a free one
+CONNECTIONS_LIMIT_PER_HOST = 16
+
+# Idle connections kept open for the next requests, in seconds
+KEEPALIVE_TIMEOUT_SECONDS = 60
+
+DNS_CACHE_TTL_SECONDS = 300
+
 
 class IfGamesClient:
     __base_url: str
@@ -19,8 +28,17 @@ class IfGamesClient:
     __headers: aiohttp.typedefs.LooseHeaders
     __logger: InfiniteGamesLogger
     __bt_wallet: Wallet
-
-    def __init__(self, env: IfgamesEnvType, logger: InfiniteGamesLogger, bt_wallet: Wallet) -> None:
+    __session: Optional[aiohttp.ClientSession]
+    __json_encoder: JsonEncoder
+
+    def __init__(
+        self,
+        env: IfgamesEnvType,
+        logger: InfiniteGamesLogger,
+        bt_wallet: Wallet,
+        base_url: Optional[str] = None,
+        json_encoder: JsonEncoder = encode_json,
+    ) -> None:
         # Validate env
         if not isinstance(env, str):
             raise TypeError("env must be an instance of str.")
@@ -33,8 +51,21 @@ class IfGamesClient:
         if not isinstance(bt_wallet, Wallet):
             raise TypeError("bt_wallet must be an instance of Wallet.")
 
+        # Validate base_url
+        if base_url is not None and not isinstance(base_url, str):
+            raise TypeError("base_url must be an instance of str.")
+
+        # Validate json_encoder
+        if not callable(json_encoder):
+            raise TypeError("json_encoder must be callable.")
+
         self.__logger = logger
         self.__base_url = "https://ifgames.win" if env == "prod" else "https://stg.ifgames.win"
+
+        # Overrides the env url, e.g. for a local server
+        if base_url is not None:
+            self.__base_url = base_url
+
         self.__timeout = aiohttp.ClientTimeout(total=90)  # In seconds
 
         self.__bt_wallet = bt_wallet
@@ -45,6 +76,17 @@ class IfGamesClient:
             "Validator-Public-Key": bt_wallet.hotkey.public_key.hex(),
         }
 
+        self.__session = None
+
+        self.__json_encoder = json_encoder
+
+    def create_connector(self) -> aiohttp.TCPConnector:
+        return aiohttp.TCPConnector(
+            limit_per_host=CONNECTIONS_LIMIT_PER_HOST,
+            keepalive_timeout=KEEPALIVE_TIMEOUT_SECONDS,
+            ttl_dns_cache=DNS_CACHE_TTL_SECONDS,
+        )
+
     def create_session(self, other_headers: dict = None) -> aiohttp.ClientSession:
         headers = self.__headers.copy()
         if other_headers:
@@ -60,8 +102,27 @@ class IfGamesClient:
             timeout=self.__timeout,
             headers=headers,
             trace_configs=[trace_config],
+            connector=self.create_connector(),
         )
 
+    @property
+    def session(self) -> aiohttp.ClientSession:
+        """
+        Session shared by the requests, created on first use: its connections are kept alive
+        and reused by the next requests instead of a TCP & TLS handshake each
+        """
+
+        if self.__session is None or self.__session.closed:
+            self.__session = self.create_session()
+
+        return self.__session
+
+    async def close(self) -> None:
+        if self.__session is not None and not self.__session.closed:
+            await self.__session.close()
+
+        self.__session = None
+
     async def on_request_start(self, _, trace_config_ctx, __):
         trace_config_ctx.start_time = time.time()
 
@@ -105,9 +166,13 @@ class IfGamesClient:
 
         self.__logger.exception("Http request exception", extra=extra)
 
-    def make_auth_headers(self, body: any) -> dict[str, str]:
+    def encode_body(self, body: any) -> bytes:
+        return self.__json_encoder(body)
+
+    def make_auth_headers(self, body: bytes) -> dict[str, str]:
+        # Signs the exact bytes sent as the request body
         hot_key = self.__bt_wallet.get_hotkey()
-        signed = base64.b64encode(hot_key.sign(json.dumps(body))).decode("utf-8")
+        signed = base64.b64encode(hot_key.sign(body)).decode("utf-8")
 
         return {
             "Authorization": f"Bearer {signed}",
@@ -119,73 +184,69 @@ class IfGamesClient:
         if from_date is None or offset is None or limit is None:
             raise ValueError("Invalid parameters")
 
-        async with self.create_session() as session:
-            path = f"/api/v2/events?from_date={from_date}&offset={offset}&limit={limit}"
+        path = f"/api/v2/events?from_date={from_date}&offset={offset}&limit={limit}"
 
-            async with session.get(path) as response:
-                response.raise_for_status()
+        async with self.session.get(path) as response:
+            response.raise_for_status()
 
-                return await response.json()
+            return await response.json()
 
     async def get_events_deleted(self, deleted_since: str, offset: int, limit: int):
         # Check that all parameters are provided
         if not isinstance(deleted_since, str) or offset is None or limit is None:
             raise ValueError("Invalid parameters")
 
-        async with self.create_session() as session:
-            path = f"/api/v2/events/deleted?deleted_since={deleted_since}&offset={offset}&limit={limit}"
+        path = f"/api/v2/events/deleted?deleted_since={deleted_since}&offset={offset}&limit={limit}"
 
-            async with session.get(path) as response:
-                response.raise_for_status()
+        async with self.session.get(path) as response:
+            response.raise_for_status()
 
-                return await response.json()
+            return await response.json()
 
     async def get_resolved_events(self, resolved_since: str, offset: int, limit: int):
         # Check that all parameters are provided
         if not isinstance(resolved_since, str) or offset is None or limit is None:
             raise ValueError("Invalid parameters")
 
-        async with self.create_session() as session:
-            path = f"/api/v2/events/resolved?resolved_since={resolved_since}&offset={offset}&limit={limit}"
+        path = (
+            f"/api/v2/events/resolved?resolved_since={resolved_since}&offset={offset}&limit={limit}"
+        )
 
-            async with session.get(path) as response:
-                response.raise_for_status()
+        async with self.session.get(path) as response:
+            response.raise_for_status()
 
-                return await response.json()
+            return await response.json()
 
-    async def post_predictions(self, predictions: dict[any]):
-        if not isinstance(predictions, dict):
-            raise ValueError("Invalid parameter")
+    async def post_json(self, path: str, body: bytes):
+        """
+        Posts a body already encoded: the bytes signed are the bytes sent, serialized once
+        """
 
-        assert len(predictions) > 0
+        headers = {**self.make_auth_headers(body=body), "Content-Type": "application/json"}
 
-        auth_headers = self.make_auth_headers(body=predictions)
+        async with self.session.post(path, data=body, headers=headers) as response:
+            response.raise_for_status()
 
-        try:
-            async with self.create_session(other_headers=auth_headers) as session:
-                path = "/api/v1/validators/data"
+            return await response.json()
 
-                async with session.post(path, json=predictions) as response:
-                    response.raise_for_status()
-                    self.__logger.info(f"Successfully posted predictions: {predictions}")
-                    return await response.json()
-        except Exception as e:
-            self.__logger.error(f"Error posting predictions: {e}")
-            return None
-
-    async def post_scores(self, scores: dict):
-        if not isinstance(scores, dict):
+    async def post_predictions(self, predictions: Union[dict[any], bytes]):
+        if not isinstance(predictions, (dict, bytes)):
             raise ValueError("Invalid parameter")
 
-        assert len(scores) > 0
+        assert len(predictions) > 0
 
-        auth_headers = self.make_auth_headers(body=scores)
+        if isinstance(predictions, dict):
+            predictions = self.encode_body(predictions)
 
-        async with self.create_session(other_headers=auth_headers) as session:
-            path = "/api/v1/validators/results"
+        return await self.post_json(path="/api/v1/validators/data", body=predictions)
 
-            async with session.post(path, json=scores) as response:
-                response.raise_for_status()
+    async def post_scores(self, scores: Union[dict, bytes]):
+        if not isinstance(scores, (dict, bytes)):
+            raise ValueError("Invalid parameter")
+
+        assert len(scores) > 0
 
-                return await response.json()
+        if isinstance(scores, dict):
+            scores = self.encode_body(scores)
 
+        return await self.post_json(path="/api/v1/validators/results", body=scores)
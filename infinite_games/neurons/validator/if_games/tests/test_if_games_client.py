@@ -11,7 +11,14 @@ from aioresponses import aioresponses
 from bittensor_wallet import Wallet
 from yarl import URL
 
-from neurons.validator.if_games.client import IfGamesClient, IfgamesEnvType
+from neurons.validator.if_games.client import (
+    CONNECTIONS_LIMIT_PER_HOST,
+    DNS_CACHE_TTL_SECONDS,
+    KEEPALIVE_TIMEOUT_SECONDS,
+    IfGamesClient,
+    IfgamesEnvType,
+)
+from neurons.validator.utils.common.json_encoder import encode_pydantic_json
 from neurons.validator.utils.git import commit_short_hash
 from neurons.validator.utils.logger.logger import InfiniteGamesLogger
 from neurons.validator.version import __version__
@@ -21,7 +28,7 @@ def make_client_test_env(env: IfgamesEnvType = "test"):
     logger = MagicMock(spec=InfiniteGamesLogger)
 
     hotkey_mock = MagicMock(
-        sign=MagicMock(side_effect=lambda x: x.encode("utf-8")),
+        sign=MagicMock(side_effect=lambda x: x),
         ss58_address="ss58_address",
         public_key=b"public_key",
     )
@@ -62,6 +69,83 @@ class TestIfGamesClient:
         assert session.headers["Validator-Hash"] == commit_short_hash
         assert session.headers["Validator-Public-Key"] == b"public_key".hex()
 
+    async def test_base_url(self):
+        client = make_client_test_env(env="test")
+        client = IfGamesClient(
+            env="test",
+            logger=client._IfGamesClient__logger,
+            bt_wallet=client._IfGamesClient__bt_wallet,
+            base_url="http://127.0.0.1:8080",
+        )
+
+        assert client.create_session()._base_url == URL("http://127.0.0.1:8080")
+
+    async def test_session_connector_config(self, client_test_env: IfGamesClient):
+        connector = client_test_env.session.connector
+
+        assert connector.limit_per_host == CONNECTIONS_LIMIT_PER_HOST
+        assert connector._keepalive_timeout == KEEPALIVE_TIMEOUT_SECONDS
+        assert connector.use_dns_cache is True
+        assert connector._cached_hosts._ttl == DNS_CACHE_TTL_SECONDS
+
+        await client_test_env.close()
+
+    def test_json_encoder(self):
+        client = make_client_test_env(env="test")
+
+        with pytest.raises(TypeError, match="json_encoder must be callable."):
+            IfGamesClient(
+                env="test",
+                logger=client._IfGamesClient__logger,
+                bt_wallet=client._IfGamesClient__bt_wallet,
+                json_encoder="orjson",
+            )
+
+        # Default encoder, same bytes as json.dumps
+        assert client.encode_body({"a": [1, 2]}) == b'{"a": [1, 2]}'
+
+        client = IfGamesClient(
+            env="test",
+            logger=client._IfGamesClient__logger,
+            bt_wallet=client._IfGamesClient__bt_wallet,
+            json_encoder=encode_pydantic_json,
+        )
+
+        assert client.encode_body({"a": [1, 2]}) == b'{"a":[1,2]}'
+
+    async def test_session_reused(self, client_test_env: IfGamesClient):
+        with aioresponses() as mocked:
+            mocked.get(
+                "/api/v2/events?from_date=1&offset=0&limit=1",
+                status=200,
+                body=json.dumps({}).encode("utf-8"),
+                repeat=True,
+            )
+
+            await client_test_env.get_events(from_date=1, offset=0, limit=1)
+
+            session = client_test_env.session
+
+            await client_test_env.get_events(from_date=1, offset=0, limit=1)
+
+            # Same session, and connections, for the next requests
+            assert client_test_env.session is session
+            assert not session.closed
+
+            await client_test_env.close()
+
+            assert session.closed
+
+            # New session after close
+            await client_test_env.get_events(from_date=1, offset=0, limit=1)
+
+            assert client_test_env.session is not session
+
+            await client_test_env.close()
+
+        # Close without session
+        await client_test_env.close()
+
     async def test_logger_interceptors_success(self, client_test_env: IfGamesClient):
         logger = client_test_env._IfGamesClient__logger
 
@@ -406,11 +490,11 @@ class TestIfGamesClient:
             assert e.value.status == status_code
 
     def test_make_auth_headers(self, client_test_env: IfGamesClient):
-        body = {"fake": "body"}
+        body = b'{"fake": "body"}'
 
         auth_headers = client_test_env.make_auth_headers(body=body)
 
-        encoded = base64.b64encode(json.dumps(body).encode("utf-8")).decode("utf-8")
+        encoded = base64.b64encode(body).decode("utf-8")
 
         assert auth_headers == {
             "Authorization": f"Bearer {encoded}",
@@ -434,7 +518,17 @@ class TestIfGamesClient:
 
             result = await client_test_env.post_predictions(predictions=predictions)
 
-            mocked.assert_called_with(url=url_path, method="POST", json=predictions)
+            mocked.assert_called_with(
+                url=url_path,
+                method="POST",
+                data=json.dumps(predictions).encode("utf-8"),
+                headers={
+                    **client_test_env.make_auth_headers(
+                        body=json.dumps(predictions).encode("utf-8")
+                    ),
+                    "Content-Type": "application/json",
+                },
+            )
 
             # Verify the response matches
             assert result == mock_response_data
@@ -459,7 +553,17 @@ class TestIfGamesClient:
             with pytest.raises(ClientResponseError) as e:
                 await client_test_env.post_predictions(predictions=predictions)
 
-            mocked.assert_called_with(url=url_path, method="POST", json=predictions)
+            mocked.assert_called_with(
+                url=url_path,
+                method="POST",
+                data=json.dumps(predictions).encode("utf-8"),
+                headers={
+                    **client_test_env.make_auth_headers(
+                        body=json.dumps(predictions).encode("utf-8")
+                    ),
+                    "Content-Type": "application/json",
+                },
+            )
 
             # Assert the exception
             assert e.value.status == status_code
@@ -481,7 +585,15 @@ class TestIfGamesClient:
 
             result = await client_test_env.post_scores(scores=scores)
 
-            mocked.assert_called_with(url=url_path, method="POST", json=scores)
+            mocked.assert_called_with(
+                url=url_path,
+                method="POST",
+                data=json.dumps(scores).encode("utf-8"),
+                headers={
+                    **client_test_env.make_auth_headers(body=json.dumps(scores).encode("utf-8")),
+                    "Content-Type": "application/json",
+                },
+            )
 
             # Verify the response matches
             assert result == mock_response_data
@@ -509,8 +621,36 @@ class TestIfGamesClient:
             mocked.assert_called_with(
                 url=url_path,
                 method="POST",
-                json=scores,
+                data=json.dumps(scores).encode("utf-8"),
+                headers={
+                    **client_test_env.make_auth_headers(body=json.dumps(scores).encode("utf-8")),
+                    "Content-Type": "application/json",
+                },
             )
 
             # Assert the exception
             assert e.value.status == status_code
+
+    async def test_post_scores_encoded(self, client_test_env: IfGamesClient):
+        body = b'{"results":[{"fake_data":"fake_data"}]}'
+
+        with aioresponses() as mocked:
+            url_path = "/api/v1/validators/results"
+
+            mocked.post(url_path, status=200, body=b"{}")
+
+            await client_test_env.post_scores(scores=body)
+
+            # Bytes sent as they are, signed as they are
+            mocked.assert_called_with(
+                url=url_path,
+                method="POST",
+                data=body,
+                headers={
+                    **client_test_env.make_auth_headers(body=body),
+                    "Content-Type": "application/json",
+                },
+            )
+
+        with pytest.raises(ValueError, match="Invalid parameter"):
+            await client_test_env.post_scores(scores='{"results": []}')
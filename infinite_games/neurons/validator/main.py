@@ -13,6 +13,7 @@ from neurons.validator.scheduler.tasks_scheduler import TasksScheduler
 from neurons.validator.tasks.db_cleaner import DbCleaner
 from neurons.validator.tasks.db_vacuum import DbVacuum
 from neurons.validator.tasks.delete_events import DeleteEvents
+from neurons.validator.tasks.dispatch_outbox import DispatchOutbox
 from neurons.validator.tasks.export_predictions import ExportPredictions
 from neurons.validator.tasks.export_scores import ExportScores
 from neurons.validator.tasks.metagraph_scoring import MetagraphScoring
@@ -21,6 +22,8 @@ from neurons.validator.tasks.pull_events import PullEvents
 from neurons.validator.tasks.query_miners import QueryMiners
 from neurons.validator.tasks.resolve_events import ResolveEvents
 from neurons.validator.tasks.set_weights import SetWeights
+from neurons.validator.tasks.sync_metagraph import SyncMetagraph
+from neurons.validator.utils.common.json_encoder import get_json_encoder
 from neurons.validator.utils.config import get_config
 from neurons.validator.utils.env import ENVIRONMENT_VARIABLES, assert_requirements
 from neurons.validator.utils.logger.logger import logger, set_bittensor_logger
@@ -50,21 +53,48 @@ async def main():
     validator_uid = bt_metagraph.hotkeys.index(validator_hotkey)
 
     # Components
-    db_client = DatabaseClient(db_path=db_path, logger=logger)
+    db_client = DatabaseClient(
+        db_path=db_path, logger=logger, pool_size=ENVIRONMENT_VARIABLES.DB_POOL_SIZE
+    )
     db_operations = DatabaseOperations(db_client=db_client, logger=logger)
-    api_client = IfGamesClient(env=ifgames_env, logger=logger, bt_wallet=bt_wallet)
+    api_client = IfGamesClient(
+        env=ifgames_env,
+        logger=logger,
+        bt_wallet=bt_wallet,
+        json_encoder=get_json_encoder(ENVIRONMENT_VARIABLES.JSON_ENCODER),
+    )
+
+    scheduler = TasksScheduler(
+        logger=logger,
+        compute_workers=ENVIRONMENT_VARIABLES.COMPUTE_WORKERS,
+        trace_memory=ENVIRONMENT_VARIABLES.TRACE_MEMORY,
+        # One heavy task at a time on the database writer
+        max_heavy_tasks=1,
+    )
 
     api = API(
         host="0.0.0.0",
         port=8000,
         db_operations=db_operations,
         api_access_keys=ENVIRONMENT_VARIABLES.API_ACCESS_KEYS,
+        scheduler=scheduler,
     )
 
     # Migrate db
     await db_client.migrate()
+    await db_operations.check_statements()
 
     # Tasks
+    # Metagraph synced every 10 blocks, the snapshot is shared by the tasks below.
+    # Synced in a worker thread: own subtensor & metagraph, not shared with the event loop
+    sync_subtensor = Subtensor(config=config)
+    sync_metagraph_task = SyncMetagraph(
+        interval_seconds=120.0,
+        subtensor=sync_subtensor,
+        metagraph=sync_subtensor.metagraph(netuid=bt_netuid, lite=True),
+        logger=logger,
+    )
+
     pull_events_task = PullEvents(
         interval_seconds=50.0, page_size=50, db_operations=db_operations, api_client=api_client
     )
@@ -91,6 +121,10 @@ async def main():
         dendrite=bt_dendrite,
         metagraph=bt_metagraph,
         logger=logger,
+        streaming=True,
+        max_concurrency=256,
+        store_batch_size=32,
+        metagraph_sync=sync_metagraph_task,
     )
 
     export_predictions_task = ExportPredictions(
@@ -101,6 +135,7 @@ async def main():
         validator_uid=validator_uid,
         validator_hotkey=validator_hotkey,
         logger=logger,
+        max_concurrent_posts=4,
     )
 
     peer_scoring_task = PeerScoring(
@@ -109,6 +144,7 @@ async def main():
         metagraph=bt_metagraph,
         logger=logger,
         page_size=100,
+        metagraph_sync=sync_metagraph_task,
     )
 
     metagraph_scoring_task = MetagraphScoring(
@@ -126,6 +162,21 @@ async def main():
         logger=logger,
         validator_uid=validator_uid,
         validator_hotkey=validator_hotkey,
+        max_scores_per_payload=1000,
+        max_concurrent_posts=4,
+    )
+
+    # Retries the exports payloads whose post failed
+    dispatch_outbox_task = DispatchOutbox(
+        interval_seconds=60.0,
+        db_operations=db_operations,
+        api_client=api_client,
+        logger=logger,
+        batch_size=100,
+        max_concurrency=4,
+        max_attempts=12,
+        base_delay_seconds=30.0,
+        max_delay_seconds=3600.0,
     )
 
     set_weights_task = SetWeights(
@@ -136,6 +187,7 @@ async def main():
         netuid=bt_netuid,
         subtensor=bt_subtensor,
         wallet=bt_wallet,
+        metagraph_sync=sync_metagraph_task,
     )
 
     db_cleaner_task = DbCleaner(
@@ -149,20 +201,38 @@ async def main():
         pages=500,
     )
 
-    # Add tasks to scheduler
-    scheduler = TasksScheduler(logger=logger)
-
-    scheduler.add(task=pull_events_task)
-    scheduler.add(task=resolve_events_task)
-    scheduler.add(task=delete_events_task)
-    scheduler.add(task=query_miners_task)
-    scheduler.add(task=export_predictions_task)
-    scheduler.add(task=peer_scoring_task)
-    scheduler.add(task=metagraph_scoring_task)
-    scheduler.add(task=export_scores_task)
-    scheduler.add(task=set_weights_task)
-    scheduler.add(task=db_cleaner_task)
-    scheduler.add(task=vacuum_task)
+    # Add tasks to scheduler, runs cancelled past their timeout
+    scheduler.add(task=sync_metagraph_task, timeout_seconds=600.0)
+    scheduler.add(task=pull_events_task, timeout_seconds=600.0)
+    scheduler.add(task=resolve_events_task, timeout_seconds=600.0)
+    scheduler.add(task=delete_events_task, timeout_seconds=600.0)
+    scheduler.add(task=query_miners_task, timeout_seconds=900.0)
+    scheduler.add(task=export_predictions_task, timeout_seconds=900.0)
+    # Scoring pipeline, each stage woken when the previous one has output
+    scheduler.add(
+        task=peer_scoring_task,
+        depends_on=[resolve_events_task.name],
+        timeout_seconds=3600.0,
+        heavy=True,
+    )
+    scheduler.add(
+        task=metagraph_scoring_task,
+        depends_on=[peer_scoring_task.name],
+        timeout_seconds=1800.0,
+    )
+    scheduler.add(
+        task=export_scores_task,
+        depends_on=[metagraph_scoring_task.name],
+        timeout_seconds=1800.0,
+    )
+    scheduler.add(
+        task=set_weights_task,
+        depends_on=[metagraph_scoring_task.name],
+        timeout_seconds=900.0,
+    )
+    scheduler.add(task=dispatch_outbox_task, timeout_seconds=900.0)
+    scheduler.add(task=db_cleaner_task, timeout_seconds=600.0, heavy=True)
+    scheduler.add(task=vacuum_task, timeout_seconds=1800.0, heavy=True)
 
     # Start API
     api_task = asyncio.create_task(api.start())
@@ -184,4 +254,8 @@ async def main():
         },
     )
 
-    await asyncio.gather(scheduler_task, api_task)
+    try:
+        await asyncio.gather(scheduler_task, api_task)
+    finally:
+        await api_client.close()
+        await db_client.close()
@@ -0,0 +1,23 @@
+from datetime import datetime
+from enum import Enum
+from typing import Optional
+
+from pydantic import BaseModel
+
+
+class OutboxKind(str, Enum):
+    PREDICTIONS = "predictions"
+    SCORES = "scores"
+
+
+class OutboxModel(BaseModel):
+    id: Optional[int] = None
+    kind: OutboxKind
+    payload: bytes
+    attempts: int = 0
+    next_attempt_at: Optional[datetime] = None
+    last_error: Optional[str] = None
+    created_at: Optional[datetime] = None
+
+
+OUTBOX_FIELDS = OutboxModel.model_fields.keys()
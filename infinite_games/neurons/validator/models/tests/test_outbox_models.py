@@ -0,0 +1,52 @@
+from datetime import datetime
+
+import pytest
+from pydantic import ValidationError
+
+from neurons.validator.models.outbox import OUTBOX_FIELDS, OutboxKind, OutboxModel
+
+
+class TestOutboxModel:
+    def test_create_minimal(self):
+        model = OutboxModel(kind="scores", payload=b'{"results": []}')
+
+        assert model.kind == OutboxKind.SCORES
+        assert model.payload == b'{"results": []}'
+        # Defaults
+        assert model.id is None
+        assert model.attempts == 0
+        assert model.next_attempt_at is None
+        assert model.last_error is None
+        assert model.created_at is None
+
+    def test_create_from_row(self):
+        model = OutboxModel(
+            id=1,
+            kind="predictions",
+            payload="{}",
+            attempts=2,
+            next_attempt_at="2025-01-01 12:00:00",
+            last_error="error",
+            created_at="2025-01-01 11:00:00",
+        )
+
+        assert model.kind == OutboxKind.PREDICTIONS
+        # Payloads stored as text read as bytes
+        assert model.payload == b"{}"
+        assert model.next_attempt_at == datetime(2025, 1, 1, 12, 0, 0)
+        assert model.created_at == datetime(2025, 1, 1, 11, 0, 0)
+
+    def test_invalid_kind(self):
+        with pytest.raises(ValidationError):
+            OutboxModel(kind="unknown", payload="{}")
+
+    def test_fields(self):
+        assert list(OUTBOX_FIELDS) == [
+            "id",
+            "kind",
+            "payload",
+            "attempts",
+            "next_attempt_at",
+            "last_error",
+            "created_at",
+        ]
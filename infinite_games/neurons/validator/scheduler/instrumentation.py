@@ -0,0 +1,299 @@
+import asyncio
+import time
+import tracemalloc
+from collections.abc import Coroutine
+from contextvars import Context, ContextVar
+from dataclasses import dataclass, field
+from datetime import datetime, timezone
+from typing import Any, Callable, Optional
+
+from neurons.validator.db.client import SqlStats
+from neurons.validator.utils.common.histogram import LatencyHistogram
+
+# Upper bounds of the event loop lag buckets, in seconds
+LAG_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0)
+
+LAG_PROBE_INTERVAL_SECONDS = 0.5
+
+# Lag probes kept for the percentiles, ~8 minutes
+LAG_HISTORY_SIZE = 1000
+
+# Runs kept for the percentiles of each task
+TASK_HISTORY_SIZE = 100
+
+
+@dataclass
+class TaskRun:
+    """
+    Resources used by a run of a task, including the asyncio tasks it creates
+    """
+
+    task_name: str
+    started_at: datetime
+    start_time: float
+    sql: SqlStats = field(default_factory=SqlStats)
+    # CPU time on the event loop thread, work offloaded to threads or processes excluded
+    cpu_seconds: float = 0.0
+    memory_start: Optional[int] = None
+    memory_peak: Optional[int] = None
+
+
+@dataclass
+class TaskMetrics:
+    """
+    Rolling history of the runs of a task
+    """
+
+    wall_seconds: LatencyHistogram
+    cpu_seconds: LatencyHistogram
+    sql_seconds: LatencyHistogram
+    runs: int = 0
+    errors: int = 0
+    sql_count: int = 0
+    last_run: Optional[dict] = None
+
+
+# Run the current asyncio task belongs to, set by the scheduler for each run
+current_task_run: ContextVar[Optional[TaskRun]] = ContextVar("current_task_run", default=None)
+
+
+class TimedCoroutine(Coroutine):
+    """
+    Wraps the coroutine of an asyncio task to add the CPU time of each of its steps
+    to a task run
+    """
+
+    __coro: Coroutine
+    __run: TaskRun
+
+    def __init__(self, coro: Coroutine, run: TaskRun):
+        self.__coro = coro
+        self.__run = run
+
+    def __timed(self, step: Callable[[], Any]) -> Any:
+        start_time = time.thread_time()
+
+        try:
+            return step()
+        finally:
+            self.__run.cpu_seconds += time.thread_time() - start_time
+
+    def send(self, value: Any) -> Any:
+        return self.__timed(lambda: self.__coro.send(value))
+
+    def throw(self, typ, val=None, tb=None) -> Any:
+        if val is None and tb is None:
+            return self.__timed(lambda: self.__coro.throw(typ))
+
+        return self.__timed(lambda: self.__coro.throw(typ, val, tb))
+
+    def close(self) -> None:
+        self.__coro.close()
+
+    def __await__(self):
+        # Awaited directly the steps are not timed, the scheduler only wraps tasks coroutines
+        return self.__coro.__await__()
+
+    def __getattr__(self, name: str) -> Any:
+        # cr_frame, cr_code... used by the asyncio tasks repr and stacks
+        return getattr(self.__coro, name)
+
+
+def format_await_stack(coro: Coroutine) -> list[str]:
+    """
+    Frames of a coroutine and of the coroutines it is awaiting, outermost first
+    """
+
+    stack = []
+
+    while coro is not None:
+        frame = getattr(coro, "cr_frame", None) or getattr(coro, "gi_frame", None)
+
+        if frame is not None:
+            stack.append(f"{frame.f_code.co_filename}:{frame.f_lineno} in {frame.f_code.co_name}")
+
+        # None once awaiting a future, e.g. a task or a socket read
+        coro = getattr(coro, "cr_await", None) or getattr(coro, "gi_yieldfrom", None)
+
+    return stack
+
+
+class SchedulerInstrumentation:
+    """
+    Collects the event loop lag and the resources used by each task run:
+    wall time, CPU time on the event loop, SQL queries count & duration and,
+    when trace_memory is set, the peak of memory allocated above the start of the run.
+
+    Memory is traced with tracemalloc, which slows down allocations:
+    the peaks include the allocations of the other tasks running at the same time.
+    """
+
+    __trace_memory: bool
+    __tracing_started: bool
+    __lag: LatencyHistogram
+    __tasks: dict[str, TaskMetrics]
+    __running: dict[str, TaskRun]
+
+    def __init__(self, trace_memory: bool = False):
+        self.__trace_memory = trace_memory
+        self.__tracing_started = False
+        self.__lag = LatencyHistogram(buckets=LAG_BUCKETS, max_values=LAG_HISTORY_SIZE)
+        self.__tasks = {}
+        self.__running = {}
+
+    @property
+    def running_tasks(self) -> list[str]:
+        return list(self.__running)
+
+    def start(self) -> None:
+        if self.__trace_memory and not tracemalloc.is_tracing():
+            tracemalloc.start()
+
+            self.__tracing_started = True
+
+    def stop(self) -> None:
+        if self.__tracing_started:
+            tracemalloc.stop()
+
+            self.__tracing_started = False
+
+    def task_factory(
+        self, loop: asyncio.AbstractEventLoop, coro: Coroutine, context: Optional[Context] = None
+    ) -> asyncio.Task:
+        """
+        Event loop task factory, times the steps of the asyncio tasks created by a task run
+        """
+
+        run = current_task_run.get() if context is None else context.get(current_task_run)
+
+        if run is not None:
+            coro = TimedCoroutine(coro=coro, run=run)
+
+        if context is None:
+            return asyncio.Task(coro, loop=loop)
+
+        return asyncio.Task(coro, loop=loop, context=context)
+
+    def __sample_memory(self) -> None:
+        if not tracemalloc.is_tracing():
+            return
+
+        # Peak since the previous sample, reset here only
+        peak = tracemalloc.get_traced_memory()[1]
+        tracemalloc.reset_peak()
+
+        for run in self.__running.values():
+            run.memory_peak = max(run.memory_peak or 0, peak)
+
+    async def probe_event_loop_lag(
+        self, interval_seconds: float = LAG_PROBE_INTERVAL_SECONDS
+    ) -> float:
+        """
+        Sleeps and returns how late the event loop woke up, in seconds
+        """
+
+        start_time = time.perf_counter()
+
+        await asyncio.sleep(interval_seconds)
+
+        lag_seconds = max(0.0, time.perf_counter() - start_time - interval_seconds)
+
+        self.__lag.observe(lag_seconds)
+        self.__sample_memory()
+
+        return lag_seconds
+
+    def start_run(self, task_name: str) -> TaskRun:
+        self.__sample_memory()
+
+        run = TaskRun(
+            task_name=task_name,
+            started_at=datetime.now(timezone.utc),
+            start_time=time.perf_counter(),
+        )
+
+        if tracemalloc.is_tracing():
+            run.memory_start = tracemalloc.get_traced_memory()[0]
+
+        self.__running[task_name] = run
+
+        return run
+
+    def end_run(self, run: TaskRun, errored: bool) -> dict:
+        """
+        Records the run and returns its stats
+        """
+
+        wall_seconds = time.perf_counter() - run.start_time
+
+        self.__sample_memory()
+        self.__running.pop(run.task_name, None)
+
+        metrics = self.__tasks.get(run.task_name)
+
+        if metrics is None:
+            metrics = TaskMetrics(
+                wall_seconds=LatencyHistogram(max_values=TASK_HISTORY_SIZE),
+                cpu_seconds=LatencyHistogram(max_values=TASK_HISTORY_SIZE),
+                sql_seconds=LatencyHistogram(max_values=TASK_HISTORY_SIZE),
+            )
+            self.__tasks[run.task_name] = metrics
+
+        stats = {
+            "elapsed_time_ms": round(wall_seconds * 1000),
+            "cpu_time_ms": round(run.cpu_seconds * 1000),
+            "sql_count": run.sql.count,
+            "sql_time_ms": round(run.sql.seconds * 1000),
+        }
+
+        if run.memory_start is not None and run.memory_peak is not None:
+            stats["memory_peak_kb"] = round(max(0, run.memory_peak - run.memory_start) / 1024)
+
+        metrics.runs += 1
+        metrics.errors += int(errored)
+        metrics.sql_count += run.sql.count
+        metrics.wall_seconds.observe(wall_seconds)
+        metrics.cpu_seconds.observe(run.cpu_seconds)
+        metrics.sql_seconds.observe(run.sql.seconds)
+        metrics.last_run = {"started_at": run.started_at.isoformat(), "errored": errored, **stats}
+
+        return stats
+
+    def task_snapshot(self, task_name: str) -> dict:
+        metrics = self.__tasks.get(task_name)
+        run = self.__running.get(task_name)
+
+        snapshot = {
+            "running_for_seconds": (
+                None if run is None else round(time.perf_counter() - run.start_time, 3)
+            ),
+            "runs": 0,
+            "errors": 0,
+            "sql_count": 0,
+            "last_run": None,
+            "wall_seconds": None,
+            "cpu_seconds": None,
+            "sql_seconds": None,
+        }
+
+        if metrics is not None:
+            snapshot.update(
+                {
+                    "runs": metrics.runs,
+                    "errors": metrics.errors,
+                    "sql_count": metrics.sql_count,
+                    "last_run": metrics.last_run,
+                    "wall_seconds": metrics.wall_seconds.snapshot(),
+                    "cpu_seconds": metrics.cpu_seconds.snapshot(),
+                    "sql_seconds": metrics.sql_seconds.snapshot(),
+                }
+            )
+
+        return snapshot
+
+    def snapshot(self) -> dict:
+        return {
+            "memory_traced": tracemalloc.is_tracing(),
+            "running_tasks": self.running_tasks,
+            "event_loop_lag_seconds": self.__lag.snapshot(),
+        }
@@ -1,6 +1,9 @@
+import asyncio
 from abc import ABC, abstractmethod
+from concurrent.futures import Executor
 from dataclasses import dataclass, field
-from typing import Literal
+from functools import partial
+from typing import Any, Callable, Literal, Optional
 
 
 class TaskStatus:
@@ -9,6 +12,16 @@ class TaskStatus:
     RUNNING = "running"
 
 
+@dataclass
+class TaskBacklog:
+    """
+    Work of a task run, reported for the scheduler to adapt the delay of the next run.
+    """
+
+    processed: int  # Items processed by the run, 0 for an idle run
+    pending: bool  # Items are left to process, the run stopped on its page / batch size
+
+
 @dataclass
 class AbstractTask(ABC):
     """
@@ -19,6 +32,14 @@ class AbstractTask(ABC):
         init=False, default=TaskStatus.UNSCHEDULED
     )  # Task status
 
+    compute_executor: Optional[Executor] = field(
+        init=False, default=None, repr=False
+    )  # Process pool of the scheduler for the compute stages
+
+    backlog: Optional[TaskBacklog] = field(
+        init=False, default=None, repr=False
+    )  # Set by the run, the task runs at its fixed interval if None
+
     @property
     @abstractmethod
     def name(self) -> str:
@@ -33,6 +54,24 @@ class AbstractTask(ABC):
     async def run(self) -> None:
         pass
 
+    def metrics(self) -> dict:
+        """
+        Task specific metrics, reported in the scheduler snapshot.
+        """
+        return {}
+
+    async def run_compute(self, func: Callable[..., Any], *args, **kwargs) -> Any:
+        """
+        Runs a pure compute stage in the scheduler process pool, inline without one.
+        func must be a module level function, its arguments and result picklable.
+        """
+        if self.compute_executor is None:
+            return func(*args, **kwargs)
+
+        loop = asyncio.get_running_loop()
+
+        return await loop.run_in_executor(self.compute_executor, partial(func, *args, **kwargs))
+
     def __post_init__(self):
         """
         Perform validation after the dataclass initialization.
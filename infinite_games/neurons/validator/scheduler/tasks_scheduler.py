@@ -1,9 +1,59 @@
 import asyncio
+import multiprocessing
 import time
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import asdict, dataclass, field
+from typing import Optional
 
+from neurons.validator.db.client import current_sql_stats
+from neurons.validator.scheduler.instrumentation import (
+    SchedulerInstrumentation,
+    current_task_run,
+    format_await_stack,
+)
 from neurons.validator.scheduler.task import AbstractTask, TaskStatus
 from neurons.validator.utils.logger.logger import InfiniteGamesLogger
 
+# Event loop lag logged as a warning, in seconds
+LAG_WARNING_SECONDS = 1.0
+
+# Consecutive runs of a task re-run immediately while it reports pending work
+BURST_MAX_RUNS = 10
+
+# Tasks re-running immediately at once, the others wait for a slot
+BURST_MAX_TASKS = 2
+
+# Delay of consecutive idle runs, multiplied by the factor up to the max times the interval
+IDLE_BACKOFF_FACTOR = 2.0
+IDLE_MAX_BACKOFF = 4.0
+
+# Runs checked by the watchdog every interval, stuck past their timeout or the default
+WATCHDOG_INTERVAL_SECONDS = 60.0
+STUCK_TASK_SECONDS = 1800.0
+
+
+@dataclass
+class TaskOptions:
+    """
+    Scheduling options of a task, set when added to the scheduler.
+    """
+
+    depends_on: list[str] = field(default_factory=list)  # Tasks whose output wakes it
+    timeout_seconds: Optional[float] = None  # Runs cancelled past it
+    heavy: bool = False  # Runs count against the heavy tasks budget
+
+
+@dataclass
+class TaskSchedule:
+    """
+    Adaptive schedule of a task, from the backlog reported by its runs.
+    """
+
+    idle_runs: int = 0  # Consecutive runs without work
+    burst_runs: int = 0  # Consecutive runs re-run immediately
+    delay_seconds: float = 0.0  # Delay before the next run
+    wakeups: int = 0  # Runs started early, woken by a dependency
+
 
 class TasksScheduler:
     """
@@ -12,66 +62,330 @@ class TasksScheduler:
 
     __tasks: list[AbstractTask]
     __logger: InfiniteGamesLogger
+    __compute_workers: int
+    __instrumentation: SchedulerInstrumentation
+    __schedules: dict[str, TaskSchedule]
+    __burst_slots: asyncio.Semaphore
+    __options: dict[str, TaskOptions]
+    __wakeups: dict[str, asyncio.Event]
+    __heavy_slots: Optional[asyncio.Semaphore]
+    __runs: dict[str, tuple[asyncio.Task, float]]
 
-    def __init__(self, logger: InfiniteGamesLogger):
+    def __init__(
+        self,
+        logger: InfiniteGamesLogger,
+        compute_workers: int = 0,
+        trace_memory: bool = False,
+        max_heavy_tasks: Optional[int] = None,
+    ):
         # Validate logger
         if not isinstance(logger, InfiniteGamesLogger):
             raise TypeError("logger must be an instance of InfiniteGamesLogger.")
 
+        # Validate compute_workers
+        if not isinstance(compute_workers, int) or compute_workers < 0:
+            raise ValueError("compute_workers must be a non-negative integer.")
+
+        # Validate max_heavy_tasks
+        if max_heavy_tasks is not None and (
+            not isinstance(max_heavy_tasks, int) or max_heavy_tasks < 1
+        ):
+            raise ValueError("max_heavy_tasks must be a positive integer or None.")
+
         self.__tasks = []  # List to store tasks
         self.__logger = logger
+        # Workers of the process pool running the tasks compute stages, 0 runs them inline
+        self.__compute_workers = compute_workers
+        self.__instrumentation = SchedulerInstrumentation(trace_memory=trace_memory)
+        self.__schedules = {}
+        self.__burst_slots = asyncio.Semaphore(BURST_MAX_TASKS)
+        self.__options = {}
+        self.__wakeups = {}
+        # Heavy tasks running at once, e.g. competing for the database writer, unbounded if None
+        self.__heavy_slots = None if max_heavy_tasks is None else asyncio.Semaphore(max_heavy_tasks)
+        # asyncio task & start time of the running runs, checked by the watchdog
+        self.__runs = {}
+
+    async def __run_task(self, task: AbstractTask):
+        """
+        Private method to execute a single run of a task.
+        :param task: The task to be executed.
+        """
+        # Start a new trace
+        self.__logger.start_trace()
+
+        task.status = TaskStatus.RUNNING  # Mark the task as running
+        task.backlog = None  # Reported again by the run
+
+        self.__logger.info("Task started", extra={"task_name": task.name})
+
+        run = self.__instrumentation.start_run(task_name=task.name)
+
+        # The run and the asyncio tasks it creates collect their CPU time & SQL queries
+        run_token = current_task_run.set(run)
+        sql_stats_token = current_sql_stats.set(run.sql)
+
+        timeout_seconds = self.__options[task.name].timeout_seconds
+
+        # Execute the task's run async function, in its own asyncio task
+        run_task = asyncio.create_task(task.run())
+        self.__runs[task.name] = (run_task, time.perf_counter())
+
+        try:
+            # Cancelled past the timeout, at its next await
+            await asyncio.wait_for(run_task, timeout=timeout_seconds)
+
+            stats = self.__instrumentation.end_run(run=run, errored=False)
+
+            self.__logger.info("Task finished", extra={"task_name": task.name, **stats})
+
+        except Exception as e:
+            stats = self.__instrumentation.end_run(run=run, errored=True)
+
+            if isinstance(e, asyncio.TimeoutError) and run_task.cancelled():
+                self.__logger.error(
+                    "Task timed out",
+                    extra={"task_name": task.name, "timeout_seconds": timeout_seconds, **stats},
+                )
+            else:
+                # Log any exceptions that occur during task execution
+                self.__logger.exception("Task errored", extra={"task_name": task.name, **stats})
+
+            # Backlog of a failed run is not reliable
+            task.backlog = None
+        finally:
+            self.__runs.pop(task.name, None)
+
+            current_sql_stats.reset(sql_stats_token)
+            current_task_run.reset(run_token)
+
+        task.status = TaskStatus.IDLE  # Mark the task as idle after completion
+
+    def __next_delay(self, task: AbstractTask, schedule: TaskSchedule) -> float:
+        """
+        Private method returning the delay before the next run of a task:
+        none while it reports pending work, for a bounded number of runs,
+        its interval after a run with work, backing off after consecutive idle runs.
+        """
+        backlog = task.backlog
+
+        if backlog is None:
+            # Task not reporting its backlog, fixed interval
+            schedule.idle_runs = 0
+            schedule.burst_runs = 0
+
+            return task.interval_seconds
+
+        if backlog.pending and schedule.burst_runs < BURST_MAX_RUNS:
+            schedule.idle_runs = 0
+            schedule.burst_runs += 1
+
+            return 0.0
+
+        schedule.burst_runs = 0
+
+        if backlog.processed > 0 or backlog.pending:
+            schedule.idle_runs = 0
+
+            return task.interval_seconds
+
+        schedule.idle_runs += 1
+
+        backoff = min(IDLE_BACKOFF_FACTOR ** (schedule.idle_runs - 1), IDLE_MAX_BACKOFF)
+
+        return task.interval_seconds * backoff
+
+    async def __run_within_budget(self, task: AbstractTask):
+        """
+        Private method to execute a run of a task, waiting for a heavy task slot if needed.
+        """
+        if self.__heavy_slots is None or not self.__options[task.name].heavy:
+            await self.__run_task(task)
+
+            return
+
+        async with self.__heavy_slots:
+            await self.__run_task(task)
 
     async def __schedule_task(self, task: AbstractTask):
         """
         Private method to manage the execution of a single task.
         :param task: The task to be scheduled and executed.
         """
-        while True:  # Continuously execute the task at the specified interval
-            start_time = time.time()
+        schedule = TaskSchedule()
+        self.__schedules[task.name] = schedule
+
+        while True:  # Continuously execute the task
+            if schedule.burst_runs > 0:
+                # Bounded number of tasks catching up at once
+                async with self.__burst_slots:
+                    await self.__run_within_budget(task)
+            else:
+                await self.__run_within_budget(task)
+
+            schedule.delay_seconds = self.__next_delay(task=task, schedule=schedule)
+
+            if schedule.delay_seconds != task.interval_seconds:
+                self.__logger.debug(
+                    "Task rescheduled",
+                    extra={
+                        "task_name": task.name,
+                        "delay_seconds": schedule.delay_seconds,
+                        "burst_runs": schedule.burst_runs,
+                        "idle_runs": schedule.idle_runs,
+                    },
+                )
+
+            if task.backlog is not None and task.backlog.processed > 0:
+                self.__wake_dependents(task=task)
+
+            # Wait before the next execution, or until woken by a dependency
+            if await self.__wait(task=task, delay_seconds=schedule.delay_seconds):
+                schedule.wakeups += 1
+
+    def __wake_dependents(self, task: AbstractTask):
+        """
+        Private method waking the tasks depending on a task, after a run with output.
+        """
+        dependents = [
+            name for name, options in self.__options.items() if task.name in options.depends_on
+        ]
 
-            # Start a new trace
-            self.__logger.start_trace()
+        for name in dependents:
+            self.__wakeups[name].set()
 
-            task.status = TaskStatus.RUNNING  # Mark the task as running
+        if dependents:
+            self.__logger.debug(
+                "Task dependents woken", extra={"task_name": task.name, "dependents": dependents}
+            )
 
-            self.__logger.info("Task started", extra={"task_name": task.name})
+    async def __wait(self, task: AbstractTask, delay_seconds: float) -> bool:
+        """
+        Private method waiting for the delay before the next run of a task.
+        Returns True if woken earlier by a dependency, interval polling is the fallback.
+        """
+        wakeup = self.__wakeups[task.name]
 
+        if delay_seconds <= 0:
+            await asyncio.sleep(0)
+        else:
             try:
-                # Execute the task's run async function
-                await task.run()
+                await asyncio.wait_for(wakeup.wait(), timeout=delay_seconds)
+            except asyncio.TimeoutError:
+                pass
 
-                elapsed_time_ms = round((time.time() - start_time) * 1000)
+        # Woken while running or waiting, the next run picks up the output
+        woken = wakeup.is_set()
+        wakeup.clear()
 
-                self.__logger.info(
-                    "Task finished",
-                    extra={"task_name": task.name, "elapsed_time_ms": elapsed_time_ms},
-                )
+        return woken
 
-            except Exception:
-                # Log any exceptions that occur during task execution
-                elapsed_time_ms = round((time.time() - start_time) * 1000)
+    def __check_stuck_runs(self):
+        """
+        Private method logging the runs stuck past their timeout, or the default,
+        with the stack of the coroutines they are awaiting.
+        """
+        for task_name, (run_task, start_time) in list(self.__runs.items()):
+            running_seconds = time.perf_counter() - start_time
+            stuck_seconds = self.__options[task_name].timeout_seconds or STUCK_TASK_SECONDS
 
-                self.__logger.exception(
-                    "Task errored",
-                    extra={"task_name": task.name, "elapsed_time_ms": elapsed_time_ms},
-                )
+            if running_seconds < stuck_seconds:
+                continue
 
-            task.status = TaskStatus.IDLE  # Mark the task as idle after completion
+            self.__logger.warning(
+                "Task stuck",
+                extra={
+                    "task_name": task_name,
+                    "running_seconds": round(running_seconds),
+                    "timeout_seconds": self.__options[task_name].timeout_seconds,
+                    "stack": format_await_stack(run_task.get_coro()),
+                },
+            )
 
-            # Wait for the specified interval before the next execution
-            await asyncio.sleep(task.interval_seconds)
+    async def __watchdog(self):
+        """
+        Private method checking the running tasks once per interval.
+        """
+        while True:
+            await asyncio.sleep(WATCHDOG_INTERVAL_SECONDS)
+
+            self.__check_stuck_runs()
+
+    async def __monitor_event_loop(self):
+        """
+        Private method probing the event loop lag while the tasks run.
+        """
+        while True:
+            lag_seconds = await self.__instrumentation.probe_event_loop_lag()
+
+            if lag_seconds >= LAG_WARNING_SECONDS:
+                self.__logger.warning(
+                    "Event loop lagged",
+                    extra={
+                        "lag_ms": round(lag_seconds * 1000),
+                        "running_tasks": self.__instrumentation.running_tasks,
+                    },
+                )
 
-    def add(self, task: AbstractTask):
+    def add(
+        self,
+        task: AbstractTask,
+        depends_on: Optional[list[str]] = None,
+        timeout_seconds: Optional[float] = None,
+        heavy: bool = False,
+    ):
         """
         Add a new task to the scheduler.
         :param task: The Task object to add.
+        :param depends_on: Names of the tasks, added before, whose runs with output
+        (backlog.processed > 0) wake this task without waiting for its interval.
+        :param timeout_seconds: Deadline of the runs, cancelled past it. None for no deadline.
+        :param heavy: Runs of the task count against the scheduler max_heavy_tasks budget.
         """
         tasks_names = {item.name for item in self.__tasks}
 
         if task.name in tasks_names:
             raise ValueError(f"Task '{task.name}' already added")
 
+        # Dependencies added first, the graph has no cycles
+        for dependency in depends_on or []:
+            if dependency not in tasks_names:
+                raise ValueError(f"Task '{task.name}' depends on unknown task '{dependency}'")
+
+        if timeout_seconds is not None and (
+            not isinstance(timeout_seconds, float) or timeout_seconds <= 0
+        ):
+            raise ValueError("timeout_seconds must be a positive number (float).")
+
         self.__tasks.append(task)  # Append the task to the internal list
+        self.__options[task.name] = TaskOptions(
+            depends_on=list(depends_on or []), timeout_seconds=timeout_seconds, heavy=heavy
+        )
+        self.__wakeups[task.name] = asyncio.Event()
+
+    def snapshot(self) -> dict:
+        """
+        Structured snapshot of the event loop lag and of the runs of each task:
+        dependencies, adaptive schedule, last run, totals, p50 / p95 / p99 of the recent runs
+        wall, CPU & SQL times and the task own metrics.
+        """
+        snapshot = self.__instrumentation.snapshot()
+
+        snapshot["tasks"] = {
+            task.name: {
+                "status": task.status,
+                "interval_seconds": task.interval_seconds,
+                **asdict(self.__options[task.name]),
+                "schedule": (
+                    asdict(self.__schedules[task.name]) if task.name in self.__schedules else None
+                ),
+                **self.__instrumentation.task_snapshot(task_name=task.name),
+                "metrics": task.metrics(),
+            }
+            for task in self.__tasks
+        }
+
+        return snapshot
 
     async def start(self):
         """
@@ -87,5 +401,40 @@ class TasksScheduler:
             # Schedule and start the task
             scheduled_tasks.append(self.__schedule_task(task))
 
-        # Await all tasks
-        await asyncio.gather(*scheduled_tasks)
+        if not scheduled_tasks:
+            return
+
+        scheduled_tasks.append(self.__monitor_event_loop())
+        scheduled_tasks.append(self.__watchdog())
+
+        loop = asyncio.get_running_loop()
+        task_factory = loop.get_task_factory()
+
+        # Times the asyncio tasks created by the runs
+        loop.set_task_factory(self.__instrumentation.task_factory)
+        self.__instrumentation.start()
+
+        executor = None
+
+        if self.__compute_workers > 0:
+            # Spawned workers, forking would copy the threads & connections of the validator
+            executor = ProcessPoolExecutor(
+                max_workers=self.__compute_workers,
+                mp_context=multiprocessing.get_context("spawn"),
+            )
+
+            for task in self.__tasks:
+                task.compute_executor = executor
+
+        try:
+            # Await all tasks
+            await asyncio.gather(*scheduled_tasks)
+        finally:
+            if executor is not None:
+                for task in self.__tasks:
+                    task.compute_executor = None
+
+                executor.shutdown(wait=False, cancel_futures=True)
+
+            self.__instrumentation.stop()
+            loop.set_task_factory(task_factory)
@@ -0,0 +1,211 @@
+import asyncio
+import time
+import tracemalloc
+
+import pytest
+
+from neurons.validator.scheduler.instrumentation import (
+    SchedulerInstrumentation,
+    TimedCoroutine,
+    current_task_run,
+    format_await_stack,
+)
+
+
+def spin(seconds: float):
+    start_time = time.thread_time()
+
+    while time.thread_time() - start_time < seconds:
+        pass
+
+
+class TestSchedulerInstrumentation:
+    @pytest.fixture
+    def instrumentation(self):
+        return SchedulerInstrumentation()
+
+    async def test_timed_coroutine(self, instrumentation: SchedulerInstrumentation):
+        run = instrumentation.start_run(task_name="task")
+
+        async def work():
+            spin(0.05)
+
+            # Time awaiting is not CPU time
+            await asyncio.sleep(0.1)
+
+            spin(0.05)
+
+            return "result"
+
+        result = await asyncio.get_running_loop().create_task(TimedCoroutine(coro=work(), run=run))
+
+        assert result == "result"
+        assert run.cpu_seconds == pytest.approx(0.1, abs=0.04)
+
+    async def test_timed_coroutine_cancelled(self, instrumentation: SchedulerInstrumentation):
+        run = instrumentation.start_run(task_name="task")
+        cancelled = False
+
+        async def work():
+            nonlocal cancelled
+
+            try:
+                await asyncio.sleep(10)
+            except asyncio.CancelledError:
+                cancelled = True
+                raise
+
+        task = asyncio.get_running_loop().create_task(TimedCoroutine(coro=work(), run=run))
+        await asyncio.sleep(0)
+
+        task.cancel()
+
+        with pytest.raises(asyncio.CancelledError):
+            await task
+
+        assert cancelled is True
+
+    async def test_task_factory(self, instrumentation: SchedulerInstrumentation):
+        loop = asyncio.get_running_loop()
+        task_factory = loop.get_task_factory()
+        run = instrumentation.start_run(task_name="task")
+
+        async def child():
+            spin(0.05)
+
+        async def work():
+            # Tasks created by the run are timed too
+            await asyncio.gather(child(), child())
+
+            spin(0.05)
+
+        loop.set_task_factory(instrumentation.task_factory)
+
+        try:
+            token = current_task_run.set(run)
+
+            try:
+                await asyncio.create_task(work())
+            finally:
+                current_task_run.reset(token)
+
+            # Tasks created outside of a run are not
+            await asyncio.create_task(child())
+        finally:
+            loop.set_task_factory(task_factory)
+
+        assert run.cpu_seconds == pytest.approx(0.15, abs=0.05)
+
+    async def test_end_run(self, instrumentation: SchedulerInstrumentation):
+        run = instrumentation.start_run(task_name="task")
+
+        assert instrumentation.running_tasks == ["task"]
+        assert instrumentation.task_snapshot("task")["running_for_seconds"] >= 0
+
+        run.cpu_seconds = 0.2
+        run.sql.observe(0.1)
+        run.sql.observe(0.05)
+
+        stats = instrumentation.end_run(run=run, errored=False)
+
+        assert stats == {
+            "elapsed_time_ms": pytest.approx(0, abs=100),
+            "cpu_time_ms": 200,
+            "sql_count": 2,
+            "sql_time_ms": 150,
+        }
+        assert instrumentation.running_tasks == []
+
+        run = instrumentation.start_run(task_name="task")
+        run.cpu_seconds = 0.4
+
+        instrumentation.end_run(run=run, errored=True)
+
+        snapshot = instrumentation.task_snapshot("task")
+
+        assert snapshot["running_for_seconds"] is None
+        assert snapshot["runs"] == 2
+        assert snapshot["errors"] == 1
+        assert snapshot["sql_count"] == 2
+        assert snapshot["last_run"]["errored"] is True
+        assert snapshot["last_run"]["cpu_time_ms"] == 400
+        assert snapshot["cpu_seconds"]["p50"] == 0.2
+        assert snapshot["cpu_seconds"]["p99"] == 0.4
+        assert snapshot["wall_seconds"]["count"] == 2
+        assert snapshot["sql_seconds"]["max"] == pytest.approx(0.15)
+
+    def test_task_snapshot_no_runs(self, instrumentation: SchedulerInstrumentation):
+        assert instrumentation.task_snapshot("task") == {
+            "running_for_seconds": None,
+            "runs": 0,
+            "errors": 0,
+            "sql_count": 0,
+            "last_run": None,
+            "wall_seconds": None,
+            "cpu_seconds": None,
+            "sql_seconds": None,
+        }
+
+    async def test_probe_event_loop_lag(self, instrumentation: SchedulerInstrumentation):
+        async def block():
+            await asyncio.sleep(0)
+
+            # Blocks the event loop
+            time.sleep(0.2)
+
+        probe = asyncio.create_task(instrumentation.probe_event_loop_lag(interval_seconds=0.01))
+
+        await block()
+
+        lag_seconds = await probe
+
+        assert lag_seconds == pytest.approx(0.2, abs=0.05)
+
+        snapshot = instrumentation.snapshot()
+
+        assert snapshot["memory_traced"] is False
+        assert snapshot["running_tasks"] == []
+        assert snapshot["event_loop_lag_seconds"]["count"] == 1
+        assert snapshot["event_loop_lag_seconds"]["max"] == pytest.approx(0.2, abs=0.05)
+
+    async def test_trace_memory(self):
+        instrumentation = SchedulerInstrumentation(trace_memory=True)
+
+        instrumentation.start()
+
+        try:
+            assert tracemalloc.is_tracing()
+
+            run = instrumentation.start_run(task_name="task")
+
+            # Peak reached then released during the run
+            data = bytearray(4 * 1024 * 1024)
+            del data
+
+            stats = instrumentation.end_run(run=run, errored=False)
+        finally:
+            instrumentation.stop()
+
+        assert not tracemalloc.is_tracing()
+        assert stats["memory_peak_kb"] >= 4 * 1024
+        assert stats["memory_peak_kb"] < 5 * 1024
+
+    async def test_format_await_stack(self, instrumentation: SchedulerInstrumentation):
+        async def inner():
+            await asyncio.sleep(10)
+
+        async def outer():
+            await inner()
+
+        run = instrumentation.start_run(task_name="task")
+        task = asyncio.get_running_loop().create_task(TimedCoroutine(coro=outer(), run=run))
+
+        await asyncio.sleep(0)
+
+        try:
+            stack = format_await_stack(task.get_coro())
+        finally:
+            task.cancel()
+
+        assert [frame.split(" in ")[1] for frame in stack] == ["outer", "inner", "sleep"]
+        assert stack[0].startswith(__file__)
@@ -72,3 +72,23 @@ class TestTask:
 
         with pytest.raises(TypeError):
             UndefinedRun()
+
+    async def test_run_compute_inline(self):
+        class ValidTask(AbstractTask):
+            @property
+            def name(self):
+                return "Test Task"
+
+            @property
+            def interval_seconds(self):
+                return 5.0
+
+            async def run(self):
+                pass
+
+        task = ValidTask()
+
+        # No process pool, compute stages run inline
+        assert task.compute_executor is None
+        assert await task.run_compute(divmod, 7, 2) == (3, 1)
+        assert await task.run_compute(int, "11", base=2) == 3
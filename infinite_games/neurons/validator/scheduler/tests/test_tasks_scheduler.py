@@ -1,9 +1,13 @@
 import asyncio
-from unittest.mock import MagicMock
+import os
+import tempfile
+import time
+from unittest.mock import ANY, MagicMock
 
 import pytest
 
-from neurons.validator.scheduler.task import AbstractTask
+from neurons.validator.db.client import DatabaseClient
+from neurons.validator.scheduler.task import AbstractTask, TaskBacklog
 from neurons.validator.scheduler.tasks_scheduler import TasksScheduler
 from neurons.validator.utils.logger.logger import InfiniteGamesLogger
 
@@ -204,3 +208,532 @@ class TestTasksScheduler:
         # Verify that the task function is NOT executed because it is already started
         assert runs == 0
         assert task.status == "idle"
+
+    def test_invalid_compute_workers(self, logger):
+        with pytest.raises(ValueError, match="compute_workers must be a non-negative integer."):
+            TasksScheduler(logger=logger, compute_workers=-1)
+
+    async def test_compute_stages_in_process_pool(self, logger, await_start_with_timeout):
+        scheduler = TasksScheduler(logger=logger, compute_workers=1)
+        results = []
+
+        class TestTask(AbstractTask):
+            @property
+            def name(self):
+                return "Test Task"
+
+            @property
+            def interval_seconds(self):
+                return 10.0
+
+            async def run(self):
+                # Module level function, runs in the worker process
+                results.append(await self.run_compute(os.getpid))
+                results.append(await self.run_compute(divmod, 7, 2))
+
+        task = TestTask()
+        scheduler.add(task)
+
+        await await_start_with_timeout(start_future=scheduler.start(), timeout=10)
+
+        # Assertions
+        assert results[0] != os.getpid()
+        assert results[1] == (3, 1)
+
+        # Process pool shut down with the scheduler
+        assert task.compute_executor is None
+        assert logger.exception.call_count == 0
+
+    async def test_snapshot(self, logger, scheduler, await_start_with_timeout):
+        temp_db = tempfile.NamedTemporaryFile(delete=False)
+        temp_db.close()
+
+        db_client = DatabaseClient(db_path=temp_db.name, logger=logger)
+
+        async def spin():
+            start_time = time.thread_time()
+
+            while time.thread_time() - start_time < 0.05:
+                pass
+
+            await db_client.one("SELECT 1")
+
+        class TestTask(AbstractTask):
+            @property
+            def name(self):
+                return "Test Task"
+
+            @property
+            def interval_seconds(self):
+                return 10.0
+
+            async def run(self):
+                await db_client.one("SELECT 1")
+
+                # CPU time & queries of the tasks created are collected
+                await asyncio.gather(spin(), spin())
+
+        task = TestTask()
+        scheduler.add(task)
+
+        try:
+            await await_start_with_timeout(start_future=scheduler.start(), timeout=0.6)
+        finally:
+            await db_client.close()
+
+        logger.info.assert_called_with(
+            "Task finished",
+            extra={
+                "task_name": "Test Task",
+                "elapsed_time_ms": ANY,
+                "cpu_time_ms": ANY,
+                "sql_count": 3,
+                "sql_time_ms": ANY,
+            },
+        )
+
+        snapshot = scheduler.snapshot()
+
+        assert snapshot["memory_traced"] is False
+        assert snapshot["running_tasks"] == []
+        assert snapshot["event_loop_lag_seconds"]["count"] == 1
+
+        task_snapshot = snapshot["tasks"]["Test Task"]
+
+        assert task_snapshot["status"] == "idle"
+        assert task_snapshot["interval_seconds"] == 10.0
+        assert task_snapshot["runs"] == 1
+        assert task_snapshot["errors"] == 0
+        assert task_snapshot["sql_count"] == 3
+        assert task_snapshot["last_run"]["cpu_time_ms"] >= 100
+        assert task_snapshot["cpu_seconds"]["p99"] >= 0.1
+        assert task_snapshot["wall_seconds"]["p50"] >= task_snapshot["cpu_seconds"]["p50"]
+
+    async def test_burst_while_pending(
+        self, logger, scheduler, await_start_with_timeout, monkeypatch
+    ):
+        monkeypatch.setattr("neurons.validator.scheduler.tasks_scheduler.BURST_MAX_RUNS", 3)
+
+        runs = 0
+
+        class TestTask(AbstractTask):
+            @property
+            def name(self):
+                return "Test Task"
+
+            @property
+            def interval_seconds(self):
+                return 10.0
+
+            async def run(self):
+                nonlocal runs
+                runs += 1
+
+                self.backlog = TaskBacklog(processed=10, pending=True)
+
+        task = TestTask()
+        scheduler.add(task)
+
+        await await_start_with_timeout(start_future=scheduler.start(), timeout=0.5)
+
+        # First run and 3 immediate re-runs, then the interval
+        assert runs == 4
+
+        schedule = scheduler.snapshot()["tasks"]["Test Task"]["schedule"]
+
+        assert schedule == {
+            "idle_runs": 0,
+            "burst_runs": 0,
+            "delay_seconds": 10.0,
+            "wakeups": 0,
+        }
+
+    async def test_backoff_when_idle(self, logger, scheduler, await_start_with_timeout):
+        run_times = []
+
+        class TestTask(AbstractTask):
+            @property
+            def name(self):
+                return "Test Task"
+
+            @property
+            def interval_seconds(self):
+                return 0.1
+
+            async def run(self):
+                run_times.append(time.perf_counter())
+
+                self.backlog = TaskBacklog(processed=0, pending=False)
+
+        task = TestTask()
+        scheduler.add(task)
+
+        await await_start_with_timeout(start_future=scheduler.start(), timeout=1.2)
+
+        delays = [round(b - a, 1) for a, b in zip(run_times, run_times[1:])]
+
+        # Doubled after each idle run, up to 4 times the interval
+        assert delays == [0.1, 0.2, 0.4, 0.4]
+
+        schedule = scheduler.snapshot()["tasks"]["Test Task"]["schedule"]
+
+        assert schedule["idle_runs"] == 5
+        assert schedule["delay_seconds"] == pytest.approx(0.4)
+
+    async def test_backoff_reset_on_work(self, logger, scheduler, await_start_with_timeout):
+        processed = [0, 0, 0, 5, 0]
+        run_times = []
+
+        class TestTask(AbstractTask):
+            @property
+            def name(self):
+                return "Test Task"
+
+            @property
+            def interval_seconds(self):
+                return 0.1
+
+            async def run(self):
+                run_times.append(time.perf_counter())
+
+                if len(run_times) > len(processed):
+                    # Not reporting, fixed interval
+                    return
+
+                self.backlog = TaskBacklog(processed=processed[len(run_times) - 1], pending=False)
+
+        task = TestTask()
+        scheduler.add(task)
+
+        await await_start_with_timeout(start_future=scheduler.start(), timeout=1.05)
+
+        delays = [round(b - a, 1) for a, b in zip(run_times, run_times[1:])]
+
+        assert delays[:6] == [0.1, 0.2, 0.4, 0.1, 0.1, 0.1]
+
+    async def test_burst_concurrency_bounded(self, logger, await_start_with_timeout, monkeypatch):
+        monkeypatch.setattr("neurons.validator.scheduler.tasks_scheduler.BURST_MAX_RUNS", 5)
+        monkeypatch.setattr("neurons.validator.scheduler.tasks_scheduler.BURST_MAX_TASKS", 2)
+
+        scheduler = TasksScheduler(logger=logger)
+
+        runs = {}
+        running = 0
+        max_running = 0
+
+        def make_task(task_name: str):
+            class TestTask(AbstractTask):
+                @property
+                def name(self):
+                    return task_name
+
+                @property
+                def interval_seconds(self):
+                    return 10.0
+
+                async def run(self):
+                    nonlocal running, max_running
+
+                    runs[task_name] = runs.get(task_name, 0) + 1
+                    running += 1
+
+                    # First runs are not bursts
+                    if runs[task_name] > 1:
+                        max_running = max(max_running, running)
+
+                    await asyncio.sleep(0.02)
+
+                    running -= 1
+
+                    self.backlog = TaskBacklog(processed=1, pending=True)
+
+            return TestTask()
+
+        tasks = [make_task(f"Test Task {index}") for index in range(4)]
+
+        for task in tasks:
+            scheduler.add(task)
+
+        await await_start_with_timeout(start_future=scheduler.start(), timeout=1)
+
+        # All the burst runs done, 2 at a time
+        assert list(runs.values()) == [6, 6, 6, 6]
+        assert max_running == 2
+
+    def test_add_unknown_dependency(self, scheduler):
+        class TestTask(AbstractTask):
+            @property
+            def name(self):
+                return "Test Task"
+
+            @property
+            def interval_seconds(self):
+                return 10.0
+
+            async def run(self):
+                pass
+
+        with pytest.raises(ValueError, match="Task 'Test Task' depends on unknown task 'Other'"):
+            scheduler.add(TestTask(), depends_on=["Other"])
+
+    @pytest.mark.parametrize("processed,expected_dependent_runs", [(3, 2), (0, 1)])
+    async def test_dependency_wakeup(
+        self, scheduler, await_start_with_timeout, processed, expected_dependent_runs
+    ):
+        runs = {"Stage 1": [], "Stage 2": []}
+
+        def make_task(task_name: str, duration_seconds: float, backlog: TaskBacklog | None):
+            class TestTask(AbstractTask):
+                @property
+                def name(self):
+                    return task_name
+
+                @property
+                def interval_seconds(self):
+                    return 10.0
+
+                async def run(self):
+                    runs[task_name].append(time.perf_counter())
+
+                    await asyncio.sleep(duration_seconds)
+
+                    self.backlog = backlog
+
+                def metrics(self):
+                    return {"runs": len(runs[task_name])}
+
+            return TestTask()
+
+        stage_1 = make_task(
+            "Stage 1", duration_seconds=0.1, backlog=TaskBacklog(processed=processed, pending=False)
+        )
+        stage_2 = make_task("Stage 2", duration_seconds=0.0, backlog=None)
+
+        scheduler.add(stage_1)
+        scheduler.add(stage_2, depends_on=["Stage 1"])
+
+        await await_start_with_timeout(start_future=scheduler.start(), timeout=0.5)
+
+        # Stage 2 woken by the output of stage 1, without waiting for its interval
+        assert len(runs["Stage 1"]) == 1
+        assert len(runs["Stage 2"]) == expected_dependent_runs
+
+        if expected_dependent_runs == 2:
+            assert runs["Stage 2"][1] - runs["Stage 1"][0] == pytest.approx(0.1, abs=0.05)
+
+        snapshot = scheduler.snapshot()["tasks"]
+
+        assert snapshot["Stage 1"]["depends_on"] == []
+        assert snapshot["Stage 2"]["depends_on"] == ["Stage 1"]
+        assert snapshot["Stage 2"]["schedule"]["wakeups"] == expected_dependent_runs - 1
+        assert snapshot["Stage 2"]["metrics"] == {"runs": expected_dependent_runs}
+
+    async def test_dependency_wakeup_while_running(self, scheduler, await_start_with_timeout):
+        runs = {"Stage 1": 0, "Stage 2": 0}
+
+        def make_task(task_name: str, duration_seconds: float):
+            class TestTask(AbstractTask):
+                @property
+                def name(self):
+                    return task_name
+
+                @property
+                def interval_seconds(self):
+                    return 10.0
+
+                async def run(self):
+                    runs[task_name] += 1
+
+                    await asyncio.sleep(duration_seconds)
+
+                    self.backlog = TaskBacklog(processed=1, pending=False)
+
+            return TestTask()
+
+        scheduler.add(make_task("Stage 1", duration_seconds=0.05))
+        scheduler.add(make_task("Stage 2", duration_seconds=0.2), depends_on=["Stage 1"])
+
+        await await_start_with_timeout(start_future=scheduler.start(), timeout=0.6)
+
+        # Output of stage 1 during the run of stage 2 is picked by its next run
+        assert runs == {"Stage 1": 1, "Stage 2": 2}
+
+    def test_invalid_options(self, logger, scheduler):
+        with pytest.raises(ValueError, match="max_heavy_tasks must be a positive integer or None."):
+            TasksScheduler(logger=logger, max_heavy_tasks=0)
+
+        class TestTask(AbstractTask):
+            @property
+            def name(self):
+                return "Test Task"
+
+            @property
+            def interval_seconds(self):
+                return 10.0
+
+            async def run(self):
+                pass
+
+        for timeout_seconds in [0.0, -1.0, 10]:
+            with pytest.raises(
+                ValueError, match="timeout_seconds must be a positive number \\(float\\)."
+            ):
+                scheduler.add(TestTask(), timeout_seconds=timeout_seconds)
+
+    async def test_task_timeout(self, logger, scheduler, await_start_with_timeout):
+        runs = 0
+        cancelled = 0
+
+        class TestTask(AbstractTask):
+            @property
+            def name(self):
+                return "Test Task"
+
+            @property
+            def interval_seconds(self):
+                return 0.1
+
+            async def run(self):
+                nonlocal runs, cancelled
+                runs += 1
+
+                try:
+                    # Hung call
+                    await asyncio.sleep(10)
+                except asyncio.CancelledError:
+                    cancelled += 1
+                    raise
+
+        task = TestTask()
+        scheduler.add(task, timeout_seconds=0.1)
+
+        await await_start_with_timeout(start_future=scheduler.start(), timeout=0.5)
+
+        # Cancelled at the deadline and scheduled again, the last one on shutdown
+        assert runs == 3
+        assert cancelled == 3
+        assert logger.error.call_count == 2
+        assert logger.exception.call_count == 0
+
+        logger.error.assert_called_with(
+            "Task timed out",
+            extra={
+                "task_name": "Test Task",
+                "timeout_seconds": 0.1,
+                "elapsed_time_ms": ANY,
+                "cpu_time_ms": ANY,
+                "sql_count": 0,
+                "sql_time_ms": 0,
+            },
+        )
+
+        assert scheduler.snapshot()["tasks"]["Test Task"]["errors"] == 2
+
+    async def test_task_raising_timeout_error(self, logger, scheduler, await_start_with_timeout):
+        class TestTask(AbstractTask):
+            @property
+            def name(self):
+                return "Test Task"
+
+            @property
+            def interval_seconds(self):
+                return 10.0
+
+            async def run(self):
+                # e.g. an HTTP client timeout
+                raise asyncio.TimeoutError()
+
+        scheduler.add(TestTask(), timeout_seconds=5.0)
+
+        await await_start_with_timeout(start_future=scheduler.start(), timeout=0.2)
+
+        # Not the deadline of the scheduler
+        assert logger.error.call_count == 0
+        assert logger.exception.call_count == 1
+
+    async def test_heavy_tasks_budget(self, logger, await_start_with_timeout):
+        scheduler = TasksScheduler(logger=logger, max_heavy_tasks=1)
+
+        running = set()
+        overlaps = []
+
+        def make_task(task_name: str, duration_seconds: float):
+            class TestTask(AbstractTask):
+                @property
+                def name(self):
+                    return task_name
+
+                @property
+                def interval_seconds(self):
+                    return 10.0
+
+                async def run(self):
+                    overlaps.append((task_name, set(running)))
+                    running.add(task_name)
+
+                    await asyncio.sleep(duration_seconds)
+
+                    running.remove(task_name)
+
+            return TestTask()
+
+        scheduler.add(make_task("Heavy 1", duration_seconds=0.1), heavy=True)
+        scheduler.add(make_task("Heavy 2", duration_seconds=0.1), heavy=True)
+        scheduler.add(make_task("Light", duration_seconds=0.15))
+
+        await await_start_with_timeout(start_future=scheduler.start(), timeout=0.5)
+
+        overlaps = dict(overlaps)
+
+        # Heavy tasks one at a time, the light one alongside
+        assert overlaps["Heavy 1"] == set()
+        assert overlaps["Heavy 2"] == {"Light"}
+        assert overlaps["Light"] == {"Heavy 1"}
+
+        snapshot = scheduler.snapshot()["tasks"]
+
+        assert snapshot["Heavy 1"]["heavy"] is True
+        assert snapshot["Light"]["heavy"] is False
+        assert snapshot["Light"]["timeout_seconds"] is None
+
+    async def test_watchdog_stuck_task(
+        self, logger, scheduler, await_start_with_timeout, monkeypatch
+    ):
+        monkeypatch.setattr(
+            "neurons.validator.scheduler.tasks_scheduler.WATCHDOG_INTERVAL_SECONDS", 0.05
+        )
+        monkeypatch.setattr("neurons.validator.scheduler.tasks_scheduler.STUCK_TASK_SECONDS", 0.1)
+
+        async def hung_call():
+            await asyncio.sleep(10)
+
+        class TestTask(AbstractTask):
+            @property
+            def name(self):
+                return "Test Task"
+
+            @property
+            def interval_seconds(self):
+                return 10.0
+
+            async def run(self):
+                await hung_call()
+
+        scheduler.add(TestTask())
+
+        await await_start_with_timeout(start_future=scheduler.start(), timeout=0.3)
+
+        warnings = [call for call in logger.warning.call_args_list if call[0][0] == "Task stuck"]
+
+        assert len(warnings) >= 2
+
+        extra = warnings[0][1]["extra"]
+
+        assert extra["task_name"] == "Test Task"
+        assert extra["running_seconds"] == 0
+        assert extra["timeout_seconds"] is None
+
+        # Stack down to the awaited call
+        assert extra["stack"][0].endswith("in run")
+        assert extra["stack"][1].endswith("in hung_call")
+        assert extra["stack"][2].endswith("in sleep")
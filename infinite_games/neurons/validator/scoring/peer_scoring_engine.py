@@ -0,0 +1,277 @@
+import math
+from dataclasses import dataclass
+
+import numpy as np
+import pandas as pd
+
+# controls the clipping of predictions [CLIP_EPS, 1 - CLIP_EPS]
+CLIP_EPS = 1e-2
+# controls the distance mean-min answer penalty for miners which are unresponsive
+UPTIME_PENALTY_DISTANCE = 1 / 3
+
+
+@dataclass(frozen=True)
+class EventMatrix:
+    """
+    Dense representation of a single event for peer scoring.
+
+    Rows are miners, columns are aggregation intervals. Missing predictions are NaN,
+    so the NaN mask doubles as the "miner answered in this interval" mask.
+    """
+
+    miner_uids: np.ndarray  # (n_miners,) int64
+    miner_hotkeys: np.ndarray  # (n_miners,) object
+    miner_registered_minutes: np.ndarray  # (n_miners,) int64
+    interval_starts: np.ndarray  # (n_intervals,) int64
+    weights: np.ndarray  # (n_intervals,) float64
+    predictions: np.ndarray  # (n_miners, n_intervals) float64, NaN when missing
+
+    @property
+    def n_miners(self) -> int:
+        return self.predictions.shape[0]
+
+    @property
+    def n_intervals(self) -> int:
+        return self.predictions.shape[1]
+
+    @property
+    def mask(self) -> np.ndarray:
+        return ~np.isnan(self.predictions)
+
+
+def reverse_exponential_weights(n_intervals: int) -> np.ndarray:
+    """
+    Weight of each interval of an event:
+    first 2 intervals are 1, then it decays exponentially.
+    """
+    idx = np.arange(n_intervals, dtype=np.float64)
+    weights = np.ones(n_intervals, dtype=np.float64)
+
+    decaying = idx >= 2
+    weights[decaying] = np.exp(-(n_intervals / (n_intervals - idx[decaying])) + 1)
+
+    return weights
+
+
+def build_event_matrix(
+    miners: pd.DataFrame,
+    intervals: pd.DataFrame,
+    predictions: pd.DataFrame,
+) -> EventMatrix:
+    """
+    Scatter the (already clipped) predictions into a dense miners x intervals matrix.
+
+    Expects the same frames the pandas pipeline works with: miners with
+    miner_uid/miner_hotkey/miner_registered_minutes, intervals with interval_start/weight
+    and predictions with miner_uid/miner_hotkey/interval_start/interval_agg_prediction.
+    Predictions for unknown miners or intervals are ignored, as in the left joins.
+    """
+    miner_uids = miners["miner_uid"].to_numpy(dtype=np.int64)
+    miner_hotkeys = miners["miner_hotkey"].to_numpy(dtype=object)
+    miner_registered_minutes = miners["miner_registered_minutes"].to_numpy(dtype=np.int64)
+    interval_starts = intervals["interval_start"].to_numpy(dtype=np.int64)
+    weights = intervals["weight"].to_numpy(dtype=np.float64)
+
+    matrix = np.full((len(miner_uids), len(interval_starts)), np.nan, dtype=np.float64)
+
+    answered = predictions.dropna(subset=["interval_start", "interval_agg_prediction"])
+
+    if not answered.empty and matrix.size > 0:
+        miners_index = pd.MultiIndex.from_arrays([miner_uids, miner_hotkeys])
+        row_idx = miners_index.get_indexer(
+            pd.MultiIndex.from_arrays(
+                [
+                    answered["miner_uid"].to_numpy(dtype=np.int64),
+                    answered["miner_hotkey"].to_numpy(dtype=object),
+                ]
+            )
+        )
+        col_idx = pd.Index(interval_starts).get_indexer(
+            answered["interval_start"].to_numpy(dtype=np.int64)
+        )
+
+        valid = (row_idx >= 0) & (col_idx >= 0)
+
+        matrix[row_idx[valid], col_idx[valid]] = answered["interval_agg_prediction"].to_numpy(
+            dtype=np.float64
+        )[valid]
+
+    return EventMatrix(
+        miner_uids=miner_uids,
+        miner_hotkeys=miner_hotkeys,
+        miner_registered_minutes=miner_registered_minutes,
+        interval_starts=interval_starts,
+        weights=weights,
+        predictions=matrix,
+    )
+
+
+def log_scores(predictions: np.ndarray, outcome_round: int) -> np.ndarray:
+    if outcome_round == 1:
+        return np.log(predictions)
+
+    return np.log(1 - predictions)
+
+
+def inverse_log_scores(scores: np.ndarray, outcome_round: int) -> np.ndarray:
+    if outcome_round == 1:
+        return np.exp(scores)
+
+    return 1 - np.exp(scores)
+
+
+def impute_unresponsive(matrix: EventMatrix, outcome_round: int) -> np.ndarray:
+    """
+    Fill predictions of miners registered before an interval start that did not answer,
+    with the mean plus 1/3 of the distance to the worst prediction of the interval.
+    Miners registered after the interval start are left missing.
+    """
+    predictions = matrix.predictions
+    mask = ~np.isnan(predictions)
+
+    count = mask.sum(axis=0)
+    total = np.where(mask, predictions, 0.0).sum(axis=0)
+
+    with np.errstate(invalid="ignore", divide="ignore"):
+        mean_prediction = np.where(count > 0, total / count, np.nan)
+
+    # a lower prediction is worse when outcome is 1, a higher one when outcome is 0
+    if outcome_round == 1:
+        worst_prediction = np.where(mask, predictions, np.inf).min(axis=0)
+    else:
+        worst_prediction = np.where(mask, predictions, -np.inf).max(axis=0)
+
+    imputed_prediction = (
+        mean_prediction + (worst_prediction - mean_prediction) * UPTIME_PENALTY_DISTANCE
+    )
+
+    # no responsive miners in an interval - fallback to the totally wrong answer
+    wrong_outcome = 1 - abs(outcome_round - CLIP_EPS)
+    imputed_prediction = np.where(count > 0, imputed_prediction, wrong_outcome)
+
+    unresponsive = (
+        matrix.miner_registered_minutes[:, None] < matrix.interval_starts[None, :]
+    ) & ~mask
+
+    return np.where(unresponsive, imputed_prediction[None, :], predictions)
+
+
+def peer_score_matrix(matrix: EventMatrix, outcome_round: int) -> tuple[np.ndarray, np.ndarray]:
+    """
+    Score an event and reduce it per miner.
+
+    Returns the reverse exponential weighted average of the predictions and of the
+    peer scores, one value per miner row of the matrix.
+    """
+    worst_log_score = math.log(CLIP_EPS)
+
+    predictions = impute_unresponsive(matrix, outcome_round)
+
+    with np.errstate(invalid="ignore", divide="ignore"):
+        scores = log_scores(predictions, outcome_round)
+
+    answered = ~np.isnan(scores)
+
+    # leave-one-out mean of the log scores of the other miners in the interval
+    group_count = answered.sum(axis=0)[None, :]
+    group_sum = np.where(answered, scores, 0.0).sum(axis=0)[None, :]
+
+    with np.errstate(invalid="ignore", divide="ignore"):
+        mean_log_score_others = np.where(
+            answered,
+            np.where(
+                group_count > 1,
+                (group_sum - scores) / (group_count - 1),
+                worst_log_score,
+            ),
+            np.where(group_count > 0, group_sum / group_count, worst_log_score),
+        )
+
+    # new miners get the mean of the others, which is a peer score of 0
+    scores = np.where(answered, scores, mean_log_score_others)
+    predictions = np.where(answered, predictions, inverse_log_scores(scores, outcome_round))
+
+    peer_scores = scores - mean_log_score_others
+
+    weights = matrix.weights
+    weight_sum = weights.sum()
+
+    with np.errstate(invalid="ignore", divide="ignore"):
+        rema_prediction = (predictions @ weights) / weight_sum
+        rema_peer_score = (peer_scores @ weights) / weight_sum
+
+    return rema_prediction, rema_peer_score
+
+
+def score_event(matrix: EventMatrix, outcome_round: int) -> pd.DataFrame:
+    """
+    Drop-in replacement of the pandas pipeline PeerScoring used to run
+    (interval scores base -> peer score intervals -> reduce scored intervals),
+    kept in benchmarks/peer_scoring_engine.py as the reference of the parity tests.
+
+    Output rows are ordered by miner_uid, miner_hotkey like the groupby reduction.
+    """
+    columns = ["miner_uid", "miner_hotkey", "rema_prediction", "rema_peer_score"]
+
+    if matrix.n_miners == 0 or matrix.n_intervals == 0:
+        return pd.DataFrame(columns=columns)
+
+    rema_prediction, rema_peer_score = peer_score_matrix(matrix, outcome_round)
+
+    order = np.lexsort((matrix.miner_hotkeys, matrix.miner_uids))
+
+    return pd.DataFrame(
+        {
+            "miner_uid": pd.array(matrix.miner_uids[order], dtype=pd.Int64Dtype()),
+            "miner_hotkey": matrix.miner_hotkeys[order],
+            "rema_prediction": rema_prediction[order],
+            "rema_peer_score": rema_peer_score[order],
+        },
+        columns=columns,
+    )
+
+
+def score_intervals(
+    predictions_df: pd.DataFrame,
+    miners: pd.DataFrame,
+    intervals: pd.DataFrame,
+    outcome_round: int,
+) -> pd.DataFrame:
+    """
+    Builds the event matrix and scores it, the compute stage of PeerScoring.
+    Module level to run in a process pool, the frames are pickled to the worker.
+    """
+    event_matrix = build_event_matrix(
+        miners=miners, intervals=intervals, predictions=predictions_df
+    )
+
+    return score_event(event_matrix, outcome_round=outcome_round)
+
+
+def prepare_predictions(predictions: pd.DataFrame, miners: pd.DataFrame) -> pd.DataFrame:
+    """
+    Predictions frame of the miners to score with clipped predictions, the first compute stage
+    of PeerScoring. Module level to run in a process pool, as score_intervals.
+
+    Expects the predictions with the PredictionsModel fields names,
+    as returned by DatabaseOperations.get_predictions_for_scoring_frames.
+    """
+    # consider predictions only for valid miners
+    predictions_df = predictions.rename(
+        columns={
+            "minerUid": "miner_uid",
+            "minerHotkey": "miner_hotkey",
+            "interval_start_minutes": "interval_start",
+        },
+    )
+    predictions_df["miner_uid"] = predictions_df["miner_uid"].astype(pd.Int64Dtype())
+    predictions_df = pd.merge(
+        miners[["miner_uid", "miner_hotkey"]],
+        predictions_df,
+        on=["miner_uid", "miner_hotkey"],
+        how="left",
+    )
+    predictions_df["interval_agg_prediction"] = predictions_df["interval_agg_prediction"].clip(
+        CLIP_EPS, 1 - CLIP_EPS
+    )
+    return predictions_df
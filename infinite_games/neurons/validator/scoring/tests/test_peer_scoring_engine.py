@@ -0,0 +1,976 @@
+import math
+from unittest.mock import MagicMock
+
+import numpy as np
+import pandas as pd
+import pytest
+import torch
+from bittensor.core.metagraph import MetagraphMixin
+from pandas.testing import assert_frame_equal
+
+from neurons.validator.benchmarks.peer_scoring_engine import (
+    fill_unresponsive_miners,
+    get_interval_scores_base,
+    inverse_log_score,
+    log_score,
+    peer_score_intervals,
+    reduce_scored_intervals_df,
+    reverse_exponential_weight,
+    score_intervals_pandas,
+)
+from neurons.validator.db.operations import DatabaseOperations
+from neurons.validator.scoring.peer_scoring_engine import (
+    CLIP_EPS,
+    EventMatrix,
+    build_event_matrix,
+    impute_unresponsive,
+    reverse_exponential_weights,
+    score_event,
+)
+from neurons.validator.tasks.peer_scoring import PeerScoring, PSNames
+from neurons.validator.utils.common.interval import AGGREGATION_INTERVAL_LENGTH_MINUTES
+from neurons.validator.utils.logger.logger import InfiniteGamesLogger
+
+PARITY_TOLERANCE = 1e-9
+
+
+def make_event(
+    seed: int,
+    n_miners: int,
+    n_intervals: int,
+    answer_rate: float,
+    late_miners_rate: float = 0.0,
+    extreme_rate: float = 0.0,
+):
+    """
+    Random event shaped like the PeerScoring inputs: miners, intervals and clipped predictions.
+    """
+    rng = np.random.default_rng(seed)
+
+    event_registered_start_minutes = 100_080
+    interval_starts = (
+        event_registered_start_minutes
+        + np.arange(n_intervals, dtype=np.int64) * AGGREGATION_INTERVAL_LENGTH_MINUTES
+    )
+
+    # most miners registered before the event, some registered while it was running
+    registered_minutes = np.full(n_miners, event_registered_start_minutes - 1_000, dtype=np.int64)
+    late_miners = rng.random(n_miners) < late_miners_rate
+    registered_minutes[late_miners] = rng.choice(interval_starts, size=late_miners.sum())
+
+    # shuffle uids so that the sort order of the reduction is exercised
+    miner_uids = rng.permutation(n_miners).astype(np.int64)
+
+    miners = pd.DataFrame(
+        {
+            PSNames.miner_uid: pd.array(miner_uids, dtype=pd.Int64Dtype()),
+            PSNames.miner_hotkey: [f"hotkey{uid}" for uid in miner_uids],
+            PSNames.miner_registered_minutes: registered_minutes,
+        }
+    )
+
+    intervals = pd.DataFrame(
+        {
+            PSNames.interval_idx: np.arange(n_intervals),
+            PSNames.interval_start: interval_starts,
+            PSNames.interval_end: interval_starts + AGGREGATION_INTERVAL_LENGTH_MINUTES,
+            PSNames.weight: reverse_exponential_weights(n_intervals),
+        }
+    )
+
+    answered = rng.random((n_miners, n_intervals)) < answer_rate
+    miner_idx, interval_idx = np.nonzero(answered)
+
+    values = rng.random(len(miner_idx))
+    extreme = rng.random(len(miner_idx)) < extreme_rate
+    values[extreme] = rng.choice([0.0, 1.0], size=extreme.sum())
+
+    predictions_df = pd.DataFrame(
+        {
+            PSNames.miner_uid: pd.array(miner_uids[miner_idx], dtype=pd.Int64Dtype()),
+            PSNames.miner_hotkey: [f"hotkey{uid}" for uid in miner_uids[miner_idx]],
+            PSNames.interval_start: interval_starts[interval_idx],
+            PSNames.interval_agg_prediction: np.clip(values, CLIP_EPS, 1 - CLIP_EPS),
+        }
+    )
+
+    return miners, intervals, predictions_df
+
+
+class TestPeerScoringEngine:
+    @pytest.fixture
+    def peer_scoring_task(self):
+        metagraph = MagicMock(spec=MetagraphMixin)
+        metagraph.sync = MagicMock()
+        metagraph.uids = torch.tensor([1], dtype=torch.int32).to("cpu")
+        metagraph.hotkeys = ["hotkey1"]
+
+        return PeerScoring(
+            interval_seconds=60.0,
+            db_operations=MagicMock(spec=DatabaseOperations),
+            metagraph=metagraph,
+            logger=MagicMock(spec=InfiniteGamesLogger),
+        )
+
+    def assert_parity(self, expected: pd.DataFrame, actual: pd.DataFrame):
+        assert actual.columns.tolist() == expected.columns.tolist()
+        assert actual[PSNames.miner_uid].tolist() == expected[PSNames.miner_uid].tolist()
+        assert actual[PSNames.miner_hotkey].tolist() == expected[PSNames.miner_hotkey].tolist()
+
+        for column in [PSNames.rema_prediction, PSNames.rema_peer_score]:
+            np.testing.assert_allclose(
+                actual[column].to_numpy(dtype=np.float64),
+                expected[column].to_numpy(dtype=np.float64),
+                rtol=0,
+                atol=PARITY_TOLERANCE,
+                err_msg=f"Mismatch for {column}",
+            )
+
+    @pytest.mark.parametrize("n_intervals", [1, 2, 3, 10, 84])
+    def test_reverse_exponential_weights(self, n_intervals: int):
+        expected = [reverse_exponential_weight(idx, n_intervals) for idx in range(n_intervals)]
+
+        np.testing.assert_allclose(
+            reverse_exponential_weights(n_intervals), expected, rtol=0, atol=1e-15
+        )
+
+    def test_build_event_matrix(self):
+        miners = pd.DataFrame(
+            {
+                PSNames.miner_uid: [3, 1],
+                PSNames.miner_hotkey: ["hotkey3", "hotkey1"],
+                PSNames.miner_registered_minutes: [10, 20],
+            }
+        )
+        intervals = pd.DataFrame(
+            {PSNames.interval_start: [240, 480, 720], PSNames.weight: [1.0, 1.0, 0.5]}
+        )
+        predictions_df = pd.DataFrame(
+            {
+                PSNames.miner_uid: [1, 3, 3, 2, 1],
+                PSNames.miner_hotkey: ["hotkey1", "hotkey3", "hotkey3", "hotkey2", "other"],
+                PSNames.interval_start: [720, 240, 960, 240, 240],
+                PSNames.interval_agg_prediction: [0.4, 0.6, 0.7, 0.8, 0.9],
+            }
+        )
+
+        matrix = build_event_matrix(miners, intervals, predictions_df)
+
+        assert matrix.n_miners == 2
+        assert matrix.n_intervals == 3
+        assert matrix.miner_uids.tolist() == [3, 1]
+        # unknown interval, unknown miner and hotkey mismatch are dropped
+        np.testing.assert_array_equal(
+            matrix.predictions, [[0.6, np.nan, np.nan], [np.nan, np.nan, 0.4]]
+        )
+        np.testing.assert_array_equal(matrix.mask, [[True, False, False], [False, False, True]])
+
+    def test_build_event_matrix_no_predictions(self):
+        miners = pd.DataFrame(
+            {
+                PSNames.miner_uid: [1],
+                PSNames.miner_hotkey: ["hotkey1"],
+                PSNames.miner_registered_minutes: [10],
+            }
+        )
+        intervals = pd.DataFrame({PSNames.interval_start: [240], PSNames.weight: [1.0]})
+        # miners without predictions come out of the left join with NaN interval_start
+        predictions_df = pd.DataFrame(
+            {
+                PSNames.miner_uid: [1],
+                PSNames.miner_hotkey: ["hotkey1"],
+                PSNames.interval_start: [np.nan],
+                PSNames.interval_agg_prediction: [np.nan],
+            }
+        )
+
+        matrix = build_event_matrix(miners, intervals, predictions_df)
+
+        assert np.isnan(matrix.predictions).all()
+
+    @pytest.mark.parametrize("outcome_round", [0, 1])
+    def test_impute_unresponsive(self, outcome_round: int):
+        matrix = EventMatrix(
+            miner_uids=np.array([1, 2, 3, 4]),
+            miner_hotkeys=np.array(["hk1", "hk2", "hk3", "hk4"], dtype=object),
+            # miner 4 registered after the first interval start
+            miner_registered_minutes=np.array([0, 0, 0, 300]),
+            interval_starts=np.array([240, 480]),
+            weights=np.array([1.0, 1.0]),
+            predictions=np.array(
+                [[0.2, np.nan], [0.8, np.nan], [np.nan, np.nan], [np.nan, np.nan]]
+            ),
+        )
+
+        imputed = impute_unresponsive(matrix, outcome_round)
+
+        worst = 0.2 if outcome_round == 1 else 0.8
+        expected_first = 0.5 + (worst - 0.5) / 3
+        wrong_outcome = 1 - abs(outcome_round - CLIP_EPS)
+
+        np.testing.assert_allclose(imputed[:2, 0], [0.2, 0.8])
+        np.testing.assert_allclose(imputed[2, 0], expected_first)
+        assert np.isnan(imputed[3, 0])
+        np.testing.assert_allclose(imputed[:, 1], [wrong_outcome] * 4)
+
+    def test_score_event_empty(self):
+        matrix = EventMatrix(
+            miner_uids=np.array([], dtype=np.int64),
+            miner_hotkeys=np.array([], dtype=object),
+            miner_registered_minutes=np.array([], dtype=np.int64),
+            interval_starts=np.array([240]),
+            weights=np.array([1.0]),
+            predictions=np.empty((0, 1)),
+        )
+
+        result = score_event(matrix, outcome_round=1)
+
+        assert result.empty
+        assert result.columns.tolist() == [
+            PSNames.miner_uid,
+            PSNames.miner_hotkey,
+            PSNames.rema_prediction,
+            PSNames.rema_peer_score,
+        ]
+
+    @pytest.mark.parametrize("outcome_round", [0, 1])
+    @pytest.mark.parametrize(
+        "seed, n_miners, n_intervals, answer_rate, late_miners_rate, extreme_rate",
+        [
+            # single miner, single interval
+            (1, 1, 1, 1.0, 0.0, 0.0),
+            # two miners, nobody answered
+            (2, 2, 3, 0.0, 0.0, 0.0),
+            # everybody answered everything
+            (3, 16, 6, 1.0, 0.0, 0.0),
+            # sparse answers, some intervals without any answer
+            (4, 32, 12, 0.05, 0.0, 0.0),
+            # miners registered while the event was running
+            (5, 64, 24, 0.6, 0.3, 0.0),
+            # clipped extreme answers
+            (6, 64, 24, 0.8, 0.1, 0.5),
+            # full subnet, long event
+            (7, 256, 84, 0.7, 0.05, 0.1),
+        ],
+    )
+    def test_parity_with_pandas_pipeline(
+        self,
+        peer_scoring_task: PeerScoring,
+        outcome_round: int,
+        seed: int,
+        n_miners: int,
+        n_intervals: int,
+        answer_rate: float,
+        late_miners_rate: float,
+        extreme_rate: float,
+    ):
+        miners, intervals, predictions_df = make_event(
+            seed=seed,
+            n_miners=n_miners,
+            n_intervals=n_intervals,
+            answer_rate=answer_rate,
+            late_miners_rate=late_miners_rate,
+            extreme_rate=extreme_rate,
+        )
+
+        # same left join as prepare_predictions_df
+        predictions_df = pd.merge(
+            miners[[PSNames.miner_uid, PSNames.miner_hotkey]],
+            predictions_df,
+            on=[PSNames.miner_uid, PSNames.miner_hotkey],
+            how="left",
+        )
+
+        expected = score_intervals_pandas(
+            predictions_df=predictions_df,
+            miners=miners,
+            intervals=intervals,
+            outcome_round=outcome_round,
+        )
+
+        actual = peer_scoring_task.score_intervals(
+            predictions_df=predictions_df,
+            miners=miners,
+            intervals=intervals,
+            outcome_round=outcome_round,
+        )
+
+        self.assert_parity(expected, actual)
+
+
+class TestPandasReference:
+    def test_reverse_exponential_weight_decay(self):
+        n_intervals = 1
+        weight = reverse_exponential_weight(0, n_intervals)
+        assert weight == 1
+
+        n_intervals = 2
+        for idx in range(n_intervals):
+            weight = reverse_exponential_weight(idx, n_intervals)
+            assert weight == 1
+
+        n_intervals = 10
+        for idx in [0, 1]:
+            weight = reverse_exponential_weight(idx, n_intervals)
+            assert weight == 1
+        for idx in range(2, n_intervals):
+            expected_weight = math.exp(-(n_intervals / (n_intervals - idx)) + 1)
+            weight = reverse_exponential_weight(idx, n_intervals)
+            np.testing.assert_almost_equal(weight, expected_weight)
+
+    @pytest.mark.parametrize(
+        "predictions_data, expected_value",
+        [
+            # Case 1: No predictions for any miner.
+            (
+                [
+                    {
+                        PSNames.miner_uid: 1,
+                        PSNames.miner_hotkey: "hotkey1",
+                        PSNames.interval_start: 100240,
+                        PSNames.interval_agg_prediction: pd.NA,
+                    }
+                ],
+                None,
+            ),
+            # Case 2: Predictions list with a valid prediction for miner 1 at interval_start 100.
+            (
+                [
+                    {
+                        PSNames.miner_uid: 1,
+                        PSNames.miner_hotkey: "hotkey1",
+                        PSNames.interval_start: 100480,
+                        PSNames.interval_agg_prediction: 0.8,
+                    }
+                ],
+                0.8,
+            ),
+        ],
+    )
+    def test_get_interval_scores_base_parametrized(self, predictions_data, expected_value):
+        miners = pd.DataFrame(
+            {
+                PSNames.miner_uid: [1, 2],
+                PSNames.miner_hotkey: ["hotkey1", "hotkey2"],
+                PSNames.miner_registered_minutes: [100, 200],
+            }
+        )
+
+        intervals = pd.DataFrame(
+            {
+                PSNames.interval_idx: [0, 1],
+                PSNames.interval_start: [100240, 100480],
+                PSNames.interval_end: [100480, 100720],
+                PSNames.weight: [0.8, 0.5],
+            }
+        )
+        predictions_df = pd.DataFrame(predictions_data)
+
+        result_df = get_interval_scores_base(predictions_df, miners, intervals)
+        assert result_df.shape[0] == 4
+        assert result_df.columns.to_list() == [
+            PSNames.miner_uid,
+            PSNames.miner_hotkey,
+            PSNames.miner_registered_minutes,
+            PSNames.interval_idx,
+            PSNames.interval_start,
+            PSNames.interval_end,
+            PSNames.weight,
+            PSNames.interval_agg_prediction,
+        ]
+
+        if expected_value is None:
+            assert result_df[PSNames.interval_agg_prediction].isna().all()
+        else:
+            row = result_df[
+                (result_df[PSNames.miner_uid] == 1)
+                & (result_df[PSNames.miner_hotkey] == "hotkey1")
+                & (result_df[PSNames.interval_start] == 100480)
+            ]
+            assert not row.empty
+            np.testing.assert_almost_equal(
+                row.iloc[0][PSNames.interval_agg_prediction], expected_value
+            )
+
+            row_other = result_df[
+                (result_df[PSNames.miner_uid] == 2)
+                & (result_df[PSNames.miner_hotkey] == "hotkey2")
+                & (result_df[PSNames.interval_start] == 100240)
+            ]
+            assert not row_other.empty
+            assert pd.isna(row_other.iloc[0][PSNames.interval_agg_prediction])
+
+    @pytest.mark.parametrize(
+        "outcome, prediction, expected_ls",
+        [
+            (1, 0.01, np.log(0.01)),
+            (1, 0.5, np.log(0.5)),
+            (1, 0.99, np.log(0.99)),
+            (0, 0.01, np.log(1 - 0.01)),
+            (0, 0.5, np.log(1 - 0.5)),
+            (0, 0.99, np.log(1 - 0.99)),
+        ],
+    )
+    def test_log_score_and_inverse_log_score_with_expected_ls(
+        self, outcome, prediction, expected_ls
+    ):
+        ls = log_score(prediction, outcome)
+        np.testing.assert_allclose(
+            ls,
+            expected_ls,
+            rtol=1e-5,
+            atol=1e-8,
+            err_msg=f"log_score incorrect for outcome={outcome} prediction={prediction}",
+        )
+
+        recovered_prediction = inverse_log_score(ls, outcome)
+        np.testing.assert_allclose(
+            recovered_prediction,
+            prediction,
+            rtol=1e-5,
+            atol=1e-8,
+            err_msg=f"Failed for outcome {outcome} with prediction {prediction}",
+        )
+
+    def test_fill_unresponsive_miners_outcome_1(self):
+        df = pd.DataFrame(
+            {
+                PSNames.miner_uid: [1, 2],
+                PSNames.miner_registered_minutes: [50, 50],
+                PSNames.interval_start: [100, 100],
+                PSNames.interval_agg_prediction: [pd.NA, 0.8],
+                PSNames.interval_idx: [0, 0],
+                PSNames.weight: [1, 1],
+            }
+        )
+        # For outcome_round == 1, wrong_outcome = 1 - abs(1 - CLIP_EPS).
+        # Assuming CLIP_EPS = 0.01 then wrong_outcome = 0.01.
+        # Since there is one responsive miner with 0.8, group mean = 0.8 and worst (min) = 0.8.
+        # Thus, imputed = 0.8 + (0.8 - 0.8) * UPTIME_PENALTY_DISTANCE = 0.8.
+        result_df = fill_unresponsive_miners(df, outcome_round=1)
+        np.testing.assert_allclose(
+            result_df.loc[result_df[PSNames.miner_uid] == 1, PSNames.interval_agg_prediction].iloc[
+                0
+            ],
+            0.8,
+            rtol=1e-5,
+            err_msg="Unresponsive miner was not imputed correctly for outcome_round 1",
+        )
+        np.testing.assert_allclose(
+            result_df.loc[result_df[PSNames.miner_uid] == 2, PSNames.interval_agg_prediction].iloc[
+                0
+            ],
+            0.8,
+            rtol=1e-5,
+            err_msg="Responsive miner's prediction was altered for outcome_round 1",
+        )
+
+    def test_fill_unresponsive_miners_no_responsive(self):
+        df = pd.DataFrame(
+            {
+                PSNames.miner_uid: [1, 2],
+                PSNames.miner_registered_minutes: [50, 50],
+                PSNames.interval_start: [100, 100],
+                PSNames.interval_agg_prediction: [pd.NA, pd.NA],
+                PSNames.interval_idx: [0, 0],
+                PSNames.weight: [1, 1],
+            }
+        )
+        expected_wrong = 1 - abs(1 - CLIP_EPS)
+        result_df = fill_unresponsive_miners(df, outcome_round=1)
+        for uid in [1, 2]:
+            np.testing.assert_allclose(
+                result_df.loc[
+                    result_df[PSNames.miner_uid] == uid, PSNames.interval_agg_prediction
+                ].iloc[0],
+                expected_wrong,
+                rtol=1e-5,
+                err_msg=f"Miner {uid} in an interval with no responsive miners was not imputed to wrong_outcome",
+            )
+
+    def test_fill_unresponsive_miners_outcome_0(self):
+        df = pd.DataFrame(
+            {
+                PSNames.miner_uid: [1, 2],
+                PSNames.miner_registered_minutes: [50, 50],
+                PSNames.interval_start: [100, 100],
+                PSNames.interval_agg_prediction: [pd.NA, 0.2],
+                PSNames.interval_idx: [0, 0],
+                PSNames.weight: [1, 1],
+            }
+        )
+        # For outcome_round == 0, wrong_outcome = 1 - abs(0 - CLIP_EPS) = 1 - CLIP_EPS.
+        # With CLIP_EPS = 0.01, wrong_outcome = 0.99.
+        # With one responsive miner (0.2), group mean = 0.2 and worst (max) = 0.2,
+        # so imputed = 0.2 + (0.2 - 0.2) * UPTIME_PENALTY_DISTANCE = 0.2.
+        result_df = fill_unresponsive_miners(df, outcome_round=0)
+        np.testing.assert_allclose(
+            result_df.loc[result_df[PSNames.miner_uid] == 1, PSNames.interval_agg_prediction].iloc[
+                0
+            ],
+            0.2,
+            rtol=1e-5,
+            err_msg="Unresponsive miner was not imputed correctly for outcome_round 0",
+        )
+        np.testing.assert_allclose(
+            result_df.loc[result_df[PSNames.miner_uid] == 2, PSNames.interval_agg_prediction].iloc[
+                0
+            ],
+            0.2,
+            rtol=1e-5,
+            err_msg="Responsive miner's prediction was altered for outcome_round 0",
+        )
+
+    def test_fill_unresponsive_miners_multiple_intervals(self):
+        # Create DataFrame with two intervals.
+        # Interval 0: one miner missing prediction, one responsive with 0.8.
+        # Interval 1: one responsive miner with 0.6 and one missing.
+        df = pd.DataFrame(
+            {
+                PSNames.miner_uid: [1, 2, 3, 4],
+                PSNames.miner_registered_minutes: [50, 50, 150, 150],
+                PSNames.interval_start: [100, 100, 200, 200],
+                PSNames.interval_agg_prediction: [pd.NA, 0.8, 0.6, pd.NA],
+                PSNames.interval_idx: [0, 0, 1, 1],
+                PSNames.weight: [1, 1, 1, 1],
+            }
+        )
+        # For outcome_round == 1:
+        # - Interval 0: group mean = 0.8, worst (min) = 0.8, so imputed = 0.8.
+        # - Interval 1: group mean = 0.6, worst (min) = 0.6, so imputed = 0.6.
+        result_df = fill_unresponsive_miners(df, outcome_round=1)
+        np.testing.assert_allclose(
+            result_df.loc[result_df[PSNames.miner_uid] == 1, PSNames.interval_agg_prediction].iloc[
+                0
+            ],
+            0.8,
+            rtol=1e-5,
+            err_msg="Interval 0 unresponsive miner was not imputed correctly.",
+        )
+        np.testing.assert_allclose(
+            result_df.loc[result_df[PSNames.miner_uid] == 2, PSNames.interval_agg_prediction].iloc[
+                0
+            ],
+            0.8,
+            rtol=1e-5,
+            err_msg="Interval 0 responsive miner was altered.",
+        )
+        np.testing.assert_allclose(
+            result_df.loc[result_df[PSNames.miner_uid] == 3, PSNames.interval_agg_prediction].iloc[
+                0
+            ],
+            0.6,
+            rtol=1e-5,
+            err_msg="Interval 1 responsive miner was altered.",
+        )
+        np.testing.assert_allclose(
+            result_df.loc[result_df[PSNames.miner_uid] == 4, PSNames.interval_agg_prediction].iloc[
+                0
+            ],
+            0.6,
+            rtol=1e-5,
+            err_msg="Interval 1 unresponsive miner was not imputed correctly.",
+        )
+
+    def test_fill_unresponsive_miners_no_unresponsive_multiple_intervals(self):
+        df = pd.DataFrame(
+            {
+                PSNames.miner_uid: [1, 2, 3, 4],
+                PSNames.miner_registered_minutes: [50, 50, 150, 150],
+                PSNames.interval_start: [100, 100, 200, 200],
+                PSNames.interval_agg_prediction: [0.7, 0.8, 0.6, 0.65],
+                PSNames.interval_idx: [0, 0, 1, 1],
+                PSNames.weight: [1, 1, 1, 1],
+            }
+        )
+        # the output should be identical to the input.
+        result_df = fill_unresponsive_miners(df, outcome_round=1)
+        assert_frame_equal(result_df, df, check_dtype=False)
+
+    @pytest.mark.parametrize(
+        "outcome_round, input_df, expected",
+        [
+            # Test case for outcome_round == 1:
+            (
+                1,
+                pd.DataFrame(
+                    {
+                        # Two miners in the same interval (interval_idx 0)
+                        PSNames.miner_uid: [1, 2],
+                        PSNames.miner_registered_minutes: [50, 50],
+                        PSNames.interval_start: [100, 100],
+                        # For outcome_round 0, row 1 missing prediction will be imputed
+                        # from the group of responsive miners
+                        PSNames.interval_agg_prediction: [pd.NA, 0.8],
+                        PSNames.weight: [1, 1],
+                        PSNames.interval_idx: [0, 0],
+                    }
+                ),
+                {
+                    # For outcome_round 1:
+                    # - Responsive miner has prediction 0.8.
+                    #   Group mean = 0.8, worst (min) = 0.8,
+                    #   so imputed value = 0.8 + (0.8 - 0.8) * UPTIME_PENALTY_DISTANCE = 0.8.
+                    # - Then, log_score = log(0.8) = -0.223143551 for both.
+                    # - And peer_score = log_score - mean_log_score_others = 0.
+                    1: {
+                        PSNames.interval_agg_prediction: 0.8,
+                        PSNames.log_score: np.log(0.8),
+                        PSNames.peer_score: 0.0,
+                    },
+                    2: {
+                        PSNames.interval_agg_prediction: 0.8,
+                        PSNames.log_score: np.log(0.8),
+                        PSNames.peer_score: 0.0,
+                    },
+                },
+            ),
+            # Test case for outcome_round == 0:
+            (
+                0,
+                pd.DataFrame(
+                    {
+                        PSNames.miner_uid: [1, 2],
+                        PSNames.miner_registered_minutes: [50, 50],
+                        PSNames.interval_start: [100, 100],
+                        # For outcome_round 0, row 1 missing prediction will be imputed
+                        # from the group of responsive miners
+                        PSNames.interval_agg_prediction: [pd.NA, 0.2],
+                        PSNames.weight: [1, 1],
+                        PSNames.interval_idx: [0, 0],
+                    }
+                ),
+                {
+                    # For outcome_round 0:
+                    # - Responsive miner has prediction 0.2.
+                    #   Group mean = 0.2, worst (max) = 0.2,
+                    #   so imputed value = 0.2 + (0.2 - 0.2) * UPTIME_PENALTY_DISTANCE = 0.2.
+                    # - Then, log_score = log(1 - 0.2) = log(0.8) = -0.223143551 for both.
+                    # - And peer_score = log_score - mean_log_score_others = 0.
+                    1: {
+                        PSNames.interval_agg_prediction: 0.2,
+                        PSNames.log_score: np.log(0.8),
+                        PSNames.peer_score: 0.0,
+                    },
+                    2: {
+                        PSNames.interval_agg_prediction: 0.2,
+                        PSNames.log_score: np.log(0.8),
+                        PSNames.peer_score: 0.0,
+                    },
+                },
+            ),
+            # outcome_round == 1 with a miner registered after event start.
+            (
+                1,
+                pd.DataFrame(
+                    {
+                        # Three miners in the same interval (interval_idx 0)
+                        # Miner 1 and 2 registered early (should be imputed if missing);
+                        # Miner 3 registered after the interval start and thus is not marked unresponsive.
+                        PSNames.miner_uid: [1, 2, 3],
+                        PSNames.miner_registered_minutes: [50, 40, 150],
+                        PSNames.interval_start: [100, 100, 100],
+                        # Miner 1: provided prediction 0.7;
+                        # Miner 2: missing prediction (registered early -> imputed);
+                        # Miner 3: missing prediction (registered late -> remains untouched in fill, later imputed via group fill)
+                        PSNames.interval_agg_prediction: [0.7, pd.NA, pd.NA],
+                        PSNames.weight: [1, 1, 1],
+                        PSNames.interval_idx: [0, 0, 0],
+                    }
+                ),
+                {
+                    # The group contains one responsive miner (0.7). Thus:
+                    # For miners 1 and 2: imputed value = 0.7 + (0.7 - 0.7)*UPTIME_PENALTY_DISTANCE = 0.7.
+                    # Miner 3, though not flagged in fill_unresponsive_miners, will later be filled using
+                    # the group's mean log score resulting in the same final imputation of 0.7.
+                    1: {
+                        PSNames.interval_agg_prediction: 0.7,
+                        PSNames.log_score: np.log(0.7),
+                        PSNames.peer_score: 0.0,
+                    },
+                    2: {
+                        PSNames.interval_agg_prediction: 0.7,
+                        PSNames.log_score: np.log(0.7),
+                        PSNames.peer_score: 0.0,
+                    },
+                    3: {
+                        PSNames.interval_agg_prediction: 0.7,
+                        PSNames.log_score: np.log(0.7),
+                        PSNames.peer_score: 0.0,
+                    },
+                },
+            ),
+            # outcome_round == 0 with a miner registered after event start.
+            (
+                0,
+                pd.DataFrame(
+                    {
+                        # Three miners in the same interval (interval_idx 0)
+                        PSNames.miner_uid: [1, 2, 3],
+                        PSNames.miner_registered_minutes: [50, 40, 150],
+                        PSNames.interval_start: [100, 100, 100],
+                        # Miner 1: provided prediction 0.2;
+                        # Miner 2: missing prediction (registered early -> imputed);
+                        # Miner 3: missing prediction (registered late -> remains untouched in fill, later imputed via group fill)
+                        PSNames.interval_agg_prediction: [0.2, pd.NA, pd.NA],
+                        PSNames.weight: [1, 1, 1],
+                        PSNames.interval_idx: [0, 0, 0],
+                    }
+                ),
+                {
+                    # With one responsive miner (0.2) in the group:
+                    # Imputed value becomes 0.2 for miners missing a prediction.
+                    # log_score for outcome_round 0: log(1 - 0.2) = log(0.8) for all.
+                    1: {
+                        PSNames.interval_agg_prediction: 0.2,
+                        PSNames.log_score: np.log(0.8),
+                        PSNames.peer_score: 0.0,
+                    },
+                    2: {
+                        PSNames.interval_agg_prediction: 0.2,
+                        PSNames.log_score: np.log(0.8),
+                        PSNames.peer_score: 0.0,
+                    },
+                    3: {
+                        PSNames.interval_agg_prediction: 0.2,
+                        PSNames.log_score: np.log(0.8),
+                        PSNames.peer_score: 0.0,
+                    },
+                },
+            ),
+            # Outcome round == 1 with 4 miners.
+            (
+                1,
+                pd.DataFrame(
+                    {
+                        # Four miners in the same interval (interval_idx 0)
+                        PSNames.miner_uid: [1, 2, 3, 4],
+                        # Early registered miners (should be flagged) and a late registered miner:
+                        PSNames.miner_registered_minutes: [50, 40, 150, 60],
+                        PSNames.interval_start: [100, 100, 100, 100],
+                        # Predictions:
+                        # Miner 1: provided 0.6,
+                        # Miner 2: missing (early - imputed),
+                        # Miner 3: missing (late - not imputed in fill, later filled via group),
+                        # Miner 4: provided 0.8.
+                        PSNames.interval_agg_prediction: [0.6, pd.NA, pd.NA, 0.8],
+                        PSNames.weight: [1, 1, 1, 1],
+                        PSNames.interval_idx: [0, 0, 0, 0],
+                    }
+                ),
+                {
+                    # Expected final values:
+                    # Miner 1: prediction 0.6, log_score = log(0.6) = -0.51083, peer_score = -0.19652.
+                    1: {
+                        PSNames.interval_agg_prediction: 0.6,
+                        PSNames.log_score: np.log(0.6),
+                        PSNames.peer_score: -0.1965215,
+                    },
+                    # Miner 2: imputed prediction = 0.66667, log_score = log(0.66667) = -0.40547, peer_score = -0.03848.
+                    2: {
+                        PSNames.interval_agg_prediction: 0.66667,
+                        PSNames.log_score: np.log(0.66667),
+                        PSNames.peer_score: -0.03848,
+                    },
+                    # Miner 3: late registered, filled later to = 0.684, log_score = log(0.684) = -0.37981, peer_score = 0.0.
+                    3: {
+                        PSNames.interval_agg_prediction: 0.684,
+                        PSNames.log_score: np.log(0.684),
+                        PSNames.peer_score: 0.0,
+                    },
+                    # Miner 4: prediction remains 0.8, log_score = log(0.8) = -0.22314, peer_score = 0.23500.
+                    4: {
+                        PSNames.interval_agg_prediction: 0.8,
+                        PSNames.log_score: np.log(0.8),
+                        PSNames.peer_score: 0.2350015,
+                    },
+                },
+            ),
+            # Outcome round == 0 with 4 miners.
+            (
+                0,
+                pd.DataFrame(
+                    {
+                        PSNames.miner_uid: [1, 2, 3, 4],
+                        PSNames.miner_registered_minutes: [50, 40, 150, 60],
+                        PSNames.interval_start: [100, 100, 100, 100],
+                        # Predictions:
+                        # Miner 1: provided 0.2,
+                        # Miner 2: missing (early -> imputed),
+                        # Miner 3: missing (late -> later filled),
+                        # Miner 4: provided 0.4.
+                        PSNames.interval_agg_prediction: [0.2, pd.NA, pd.NA, 0.4],
+                        PSNames.weight: [1, 1, 1, 1],
+                        PSNames.interval_idx: [0, 0, 0, 0],
+                    }
+                ),
+                {
+                    # Expected final values:
+                    # For outcome_round==0 we work with 1 - prediction:
+                    # Miner 1: prediction 0.2, log_score = log(0.8) = -0.22314, peer_score = 0.23500.
+                    1: {
+                        PSNames.interval_agg_prediction: 0.2,
+                        PSNames.log_score: np.log(0.8),
+                        PSNames.peer_score: 0.2350015,
+                    },
+                    # Miner 2: imputed prediction = 0.33333, log_score = log(0.66667) = -0.40547, peer_score = -0.03848.
+                    2: {
+                        PSNames.interval_agg_prediction: 0.33333,
+                        PSNames.log_score: np.log(0.66667),
+                        PSNames.peer_score: -0.03848,
+                    },
+                    # Miner 3: late registered, filled later to = 0.316, log_score = log(0.684) = -0.37981, peer_score = 0.0.
+                    3: {
+                        PSNames.interval_agg_prediction: 0.316,
+                        PSNames.log_score: np.log(0.684),
+                        PSNames.peer_score: 0.0,
+                    },
+                    # Miner 4: prediction remains 0.4, log_score = log(0.6) = -0.51083, peer_score = -0.19652.
+                    4: {
+                        PSNames.interval_agg_prediction: 0.4,
+                        PSNames.log_score: np.log(0.6),
+                        PSNames.peer_score: -0.1965215,
+                    },
+                },
+            ),
+            # Regular test case: 3 miners, 2 intervals, no special imputation.
+            (
+                1,
+                pd.DataFrame(
+                    {
+                        # Three miners over two intervals.
+                        PSNames.miner_uid: [1, 2, 3],
+                        PSNames.miner_registered_minutes: [50, 50, 50],
+                        # Interval 0 for miners 1 & 2, interval 1 for miner 3.
+                        PSNames.interval_start: [100, 100, 200],
+                        # All predictions provided.
+                        PSNames.interval_agg_prediction: [0.7, 0.8, 0.6],
+                        PSNames.weight: [1, 1, 1],
+                        PSNames.interval_idx: [0, 0, 1],
+                    }
+                ),
+                {
+                    # For interval 0:
+                    # Miner 1: log_score = log(0.7), peer_score = log(0.7) - log(0.8).
+                    1: {
+                        PSNames.interval_agg_prediction: 0.7,
+                        PSNames.log_score: np.log(0.7),
+                        PSNames.peer_score: np.log(0.7) - np.log(0.8),
+                    },
+                    # Miner 2: log_score = log(0.8), peer_score = log(0.8) - log(0.7).
+                    2: {
+                        PSNames.interval_agg_prediction: 0.8,
+                        PSNames.log_score: np.log(0.8),
+                        PSNames.peer_score: np.log(0.8) - np.log(0.7),
+                    },
+                    # For interval 1: Only miner 3.
+                    # With no other miner, mean_log_score_others falls back to worst_log_score = log(CLIP_EPS).
+                    # Peer score = log(0.6) - log(CLIP_EPS).
+                    3: {
+                        PSNames.interval_agg_prediction: 0.6,
+                        PSNames.log_score: np.log(0.6),
+                        PSNames.peer_score: np.log(0.6) - np.log(CLIP_EPS),
+                    },
+                },
+            ),
+        ],
+    )
+    def test_peer_score_intervals(self, outcome_round, input_df, expected):
+        result_df = peer_score_intervals(input_df, outcome_round)
+
+        # For each expected row (keyed by miner_uid), compare the key columns.
+        for uid, exp in expected.items():
+            row = result_df[result_df[PSNames.miner_uid] == uid].iloc[0]
+            np.testing.assert_allclose(
+                row[PSNames.interval_agg_prediction],
+                exp[PSNames.interval_agg_prediction],
+                rtol=1e-4,
+                err_msg=f"Incorrect interval_agg_prediction for miner_uid {uid} and outcome_round {outcome_round}",
+            )
+            np.testing.assert_allclose(
+                row[PSNames.log_score],
+                exp[PSNames.log_score],
+                rtol=1e-4,
+                err_msg=f"Incorrect log_score for miner_uid {uid} and outcome_round {outcome_round}",
+            )
+            np.testing.assert_allclose(
+                row[PSNames.peer_score],
+                exp[PSNames.peer_score],
+                rtol=1e-4,
+                err_msg=f"Incorrect peer_score for miner_uid {uid} and outcome_round {outcome_round}",
+            )
+
+    @pytest.mark.parametrize(
+        "input_data, expected_data",
+        [
+            # Test case 1: Single-group (one miner with two rows)
+            (
+                {
+                    PSNames.miner_uid: [1, 1],
+                    PSNames.miner_hotkey: ["hotkey1", "hotkey1"],
+                    PSNames.weighted_prediction: [0.2, 0.3],
+                    PSNames.weighted_peer_score: [0.1, 0.2],
+                    PSNames.weight: [2, 3],
+                },
+                {
+                    PSNames.miner_uid: [1],
+                    PSNames.miner_hotkey: ["hotkey1"],
+                    PSNames.rema_prediction: [(0.2 + 0.3) / (2 + 3)],  # 0.5/5 = 0.1
+                    PSNames.rema_peer_score: [(0.1 + 0.2) / (2 + 3)],  # 0.3/5 = 0.06
+                },
+            ),
+            # Test case 2: Multi-group (two miners, each with two rows)
+            (
+                {
+                    PSNames.miner_uid: [1, 1, 2, 2],
+                    PSNames.miner_hotkey: ["hotkey1", "hotkey1", "hotkey2", "hotkey2"],
+                    PSNames.weighted_prediction: [0.2, 0.3, 0.5, 0.5],
+                    PSNames.weighted_peer_score: [0.1, 0.2, 0.4, 0.6],
+                    PSNames.weight: [2, 3, 4, 6],
+                },
+                {
+                    PSNames.miner_uid: [1, 2],
+                    PSNames.miner_hotkey: ["hotkey1", "hotkey2"],
+                    PSNames.rema_prediction: [
+                        (0.2 + 0.3) / (2 + 3),  # 0.5/5 = 0.1 for miner 1
+                        (0.5 + 0.5) / (4 + 6),  # 1/10 = 0.1 for miner 2
+                    ],
+                    PSNames.rema_peer_score: [
+                        (0.1 + 0.2) / (2 + 3),  # 0.3/5 = 0.06 for miner 1
+                        (0.4 + 0.6) / (4 + 6),  # 1/10 = 0.1 for miner 2
+                    ],
+                },
+            ),
+            # Test case 3: Empty DataFrames
+            (
+                {
+                    PSNames.miner_uid: [],
+                    PSNames.miner_hotkey: [],
+                    PSNames.weighted_prediction: [],
+                    PSNames.weighted_peer_score: [],
+                    PSNames.weight: [],
+                },
+                {
+                    PSNames.miner_uid: [],
+                    PSNames.miner_hotkey: [],
+                    PSNames.rema_prediction: [],
+                    PSNames.rema_peer_score: [],
+                },
+            ),
+        ],
+    )
+    def test_reduce_scored_intervals_df_parametrized(self, input_data, expected_data):
+        input_df = pd.DataFrame(input_data)
+
+        result_df = reduce_scored_intervals_df(input_df)
+
+        expected_df = pd.DataFrame(expected_data)
+
+        result_df_sorted = result_df.sort_values(
+            by=[PSNames.miner_uid, PSNames.miner_hotkey]
+        ).reset_index(drop=True)
+        expected_df_sorted = expected_df.sort_values(
+            by=[PSNames.miner_uid, PSNames.miner_hotkey]
+        ).reset_index(drop=True)
+
+        pd.testing.assert_frame_equal(result_df_sorted, expected_df_sorted)
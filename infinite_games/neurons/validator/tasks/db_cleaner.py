@@ -1,5 +1,5 @@
 from neurons.validator.db.operations import DatabaseOperations
-from neurons.validator.scheduler.task import AbstractTask
+from neurons.validator.scheduler.task import AbstractTask, TaskBacklog
 from neurons.validator.utils.logger.logger import InfiniteGamesLogger
 
 
@@ -49,3 +49,6 @@ class DbCleaner(AbstractTask):
 
         if len(deleted) > 0:
             self.logger.debug("Predictions deleted", extra={"deleted_count": len(deleted)})
+
+        # A full batch leaves predictions to delete
+        self.backlog = TaskBacklog(processed=len(deleted), pending=len(deleted) == self.batch_size)
@@ -0,0 +1,201 @@
+import asyncio
+import random
+from typing import Callable
+
+from neurons.validator.db.operations import DatabaseOperations
+from neurons.validator.if_games.client import IfGamesClient
+from neurons.validator.models.outbox import OutboxKind, OutboxModel
+from neurons.validator.scheduler.task import AbstractTask, TaskBacklog
+from neurons.validator.utils.logger.logger import InfiniteGamesLogger
+
+# Errors recorded on the messages are truncated to
+MAX_ERROR_LENGTH = 500
+
+
+def backoff_delay_seconds(
+    attempts: int,
+    base_delay_seconds: float,
+    max_delay_seconds: float,
+    rand: Callable[[], float] = random.random,
+) -> float:
+    """
+    Exponential backoff with jitter: the delay doubles with each failed attempt up to the max,
+    its second half drawn at random so that the messages failed together spread out
+    """
+
+    delay = min(max_delay_seconds, base_delay_seconds * 2 ** max(0, attempts - 1))
+
+    return delay / 2 + rand() * delay / 2
+
+
+class DispatchOutbox(AbstractTask):
+    interval: float
+    db_operations: DatabaseOperations
+    api_client: IfGamesClient
+    logger: InfiniteGamesLogger
+    batch_size: int
+    max_concurrency: int
+    max_attempts: int
+    base_delay_seconds: float
+    max_delay_seconds: float
+    counts: dict[str, int]
+
+    def __init__(
+        self,
+        interval_seconds: float,
+        db_operations: DatabaseOperations,
+        api_client: IfGamesClient,
+        logger: InfiniteGamesLogger,
+        batch_size: int = 100,
+        max_concurrency: int = 4,
+        max_attempts: int = 12,
+        base_delay_seconds: float = 30.0,
+        max_delay_seconds: float = 3600.0,
+    ):
+        if not isinstance(interval_seconds, float) or interval_seconds <= 0:
+            raise ValueError("interval_seconds must be a positive number (float).")
+
+        # Validate db_operations
+        if not isinstance(db_operations, DatabaseOperations):
+            raise TypeError("db_operations must be an instance of DatabaseOperations.")
+
+        # Validate api_client
+        if not isinstance(api_client, IfGamesClient):
+            raise TypeError("api_client must be an instance of IfGamesClient.")
+
+        # Validate logger
+        if not isinstance(logger, InfiniteGamesLogger):
+            raise TypeError("logger must be an instance of InfiniteGamesLogger.")
+
+        # Validate batch_size
+        if not isinstance(batch_size, int) or batch_size <= 0:
+            raise ValueError("batch_size must be a positive integer.")
+
+        # Validate max_concurrency
+        if not isinstance(max_concurrency, int) or max_concurrency <= 0:
+            raise ValueError("max_concurrency must be a positive integer.")
+
+        # Validate max_attempts
+        if not isinstance(max_attempts, int) or max_attempts <= 0:
+            raise ValueError("max_attempts must be a positive integer.")
+
+        # Validate delays
+        if not isinstance(base_delay_seconds, float) or base_delay_seconds <= 0:
+            raise ValueError("base_delay_seconds must be a positive number (float).")
+
+        if not isinstance(max_delay_seconds, float) or max_delay_seconds < base_delay_seconds:
+            raise ValueError("max_delay_seconds must be a number (float) >= base_delay_seconds.")
+
+        self.interval = interval_seconds
+        self.db_operations = db_operations
+        self.api_client = api_client
+        self.logger = logger
+        self.batch_size = batch_size
+        self.max_concurrency = max_concurrency
+        self.max_attempts = max_attempts
+        self.base_delay_seconds = base_delay_seconds
+        self.max_delay_seconds = max_delay_seconds
+
+        self.counts = {"delivered": 0, "retried": 0, "dead_lettered": 0}
+
+    @property
+    def name(self):
+        return "dispatch-outbox"
+
+    @property
+    def interval_seconds(self):
+        return self.interval
+
+    def metrics(self) -> dict:
+        return dict(self.counts)
+
+    async def send(self, message: OutboxModel) -> None:
+        # Payloads stored encoded are sent as they are
+        if message.kind == OutboxKind.PREDICTIONS:
+            await self.api_client.post_predictions(predictions=message.payload)
+        elif message.kind == OutboxKind.SCORES:
+            await self.api_client.post_scores(scores=message.payload)
+        else:
+            raise ValueError(f"Unknown outbox message kind: {message.kind}")
+
+    async def dispatch(self, message: OutboxModel, semaphore: asyncio.Semaphore) -> bool:
+        """
+        Delivers a message, deleted once acknowledged; rescheduled with backoff on failure
+        or moved to the dead letters past max_attempts. Returns whether it was delivered.
+        """
+
+        async with semaphore:
+            try:
+                await self.send(message=message)
+            except Exception as e:
+                error = f"{type(e).__name__}: {e}"[:MAX_ERROR_LENGTH]
+            else:
+                error = None
+
+        if error is None:
+            await self.db_operations.delete_outbox(ids=[message.id])
+
+            self.counts["delivered"] += 1
+
+            return True
+
+        attempts = message.attempts + 1
+        extra = {"id": message.id, "kind": message.kind, "attempts": attempts, "error": error}
+
+        if attempts >= self.max_attempts:
+            await self.db_operations.move_outbox_to_dead_letters(message_id=message.id, error=error)
+
+            self.counts["dead_lettered"] += 1
+            self.logger.error("Outbox message moved to the dead letters.", extra=extra)
+
+            return False
+
+        delay_seconds = backoff_delay_seconds(
+            attempts=attempts,
+            base_delay_seconds=self.base_delay_seconds,
+            max_delay_seconds=self.max_delay_seconds,
+        )
+
+        await self.db_operations.reschedule_outbox(
+            message_id=message.id, delay_seconds=delay_seconds, error=error
+        )
+
+        self.counts["retried"] += 1
+        self.logger.warning(
+            "Outbox message delivery failed.",
+            extra={**extra, "retry_in_seconds": round(delay_seconds)},
+        )
+
+        return False
+
+    async def run(self):
+        messages = await self.db_operations.get_outbox_due(limit=self.batch_size)
+
+        if not messages:
+            self.backlog = TaskBacklog(processed=0, pending=False)
+
+            return
+
+        semaphore = asyncio.Semaphore(self.max_concurrency)
+
+        results = await asyncio.gather(
+            *[self.dispatch(message=message, semaphore=semaphore) for message in messages],
+            return_exceptions=True,
+        )
+
+        for result in results:
+            if isinstance(result, BaseException):
+                raise result
+
+        delivered = sum(results)
+
+        self.logger.debug(
+            "Outbox dispatched.",
+            extra={"messages": len(messages), "delivered": delivered},
+        )
+
+        # A full batch of due messages, all delivered, leaves more due
+        self.backlog = TaskBacklog(
+            processed=delivered,
+            pending=len(messages) == self.batch_size and delivered == len(messages),
+        )
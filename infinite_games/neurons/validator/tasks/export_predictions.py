@@ -1,5 +1,8 @@
+import asyncio
+
 from neurons.validator.db.operations import DatabaseOperations
 from neurons.validator.if_games.client import IfGamesClient
+from neurons.validator.models.outbox import OutboxKind
 from neurons.validator.scheduler.task import AbstractTask
 from neurons.validator.utils.common.interval import (
     get_interval_iso_datetime,
@@ -7,6 +10,8 @@ from neurons.validator.utils.common.interval import (
 )
 from neurons.validator.utils.logger.logger import InfiniteGamesLogger
 
+MAX_CONCURRENT_POSTS = 4
+
 
 class ExportPredictions(AbstractTask):
     interval: float
@@ -16,6 +21,8 @@ class ExportPredictions(AbstractTask):
     validator_uid: int
     validator_hotkey: str
     logger: InfiniteGamesLogger
+    max_concurrent_posts: int
+    api_failing: bool
 
     def __init__(
         self,
@@ -26,6 +33,7 @@ class ExportPredictions(AbstractTask):
         validator_uid: int,
         validator_hotkey: str,
         logger: InfiniteGamesLogger,
+        max_concurrent_posts: int = MAX_CONCURRENT_POSTS,
     ):
         if not isinstance(interval_seconds, float) or interval_seconds <= 0:
             raise ValueError("interval_seconds must be a positive number (float).")
@@ -54,6 +62,10 @@ class ExportPredictions(AbstractTask):
         if not isinstance(logger, InfiniteGamesLogger):
             raise TypeError("logger must be an instance of InfiniteGamesLogger.")
 
+        # Validate max_concurrent_posts
+        if not isinstance(max_concurrent_posts, int) or max_concurrent_posts <= 0:
+            raise ValueError("max_concurrent_posts must be a positive integer.")
+
         self.interval = interval_seconds
         self.db_operations = db_operations
         self.api_client = api_client
@@ -61,6 +73,8 @@ class ExportPredictions(AbstractTask):
         self.validator_uid = validator_uid
         self.validator_hotkey = validator_hotkey
         self.logger = logger
+        self.max_concurrent_posts = max_concurrent_posts
+        self.api_failing = False
 
     @property
     def name(self):
@@ -70,29 +84,108 @@ class ExportPredictions(AbstractTask):
     def interval_seconds(self):
         return self.interval
 
-    async def run(self):
-        while True:
-            current_interval_minutes = get_interval_start_minutes()
+    async def export_batch(
+        self,
+        predictions: list[tuple[any]],
+        current_interval_minutes: int,
+        semaphore: asyncio.Semaphore,
+    ) -> None:
+        """
+        Posts a batch of predictions and marks them exported, releases its post slot when done
+        """
+
+        try:
+            parsed_predictions = self.parse_predictions_for_exporting(predictions=predictions)
 
-            # Get predictions to export
-            predictions = await self.db_operations.get_predictions_to_export(
-                current_interval_minutes=current_interval_minutes, batch_size=self.batch_size
-            )
+            # Encoded once: the same bytes are signed, posted or stored in the outbox
+            body = self.api_client.encode_body(parsed_predictions)
 
-            if len(predictions) == 0:
-                break
+            delivered = False
 
-            # Export predictions
-            parsed_predictions = self.parse_predictions_for_exporting(predictions=predictions)
+            # Once a post failed the next batches go to the outbox without waiting on the API
+            if not self.api_failing:
+                try:
+                    await self.api_client.post_predictions(predictions=body)
+
+                    delivered = True
+                except Exception:
+                    self.api_failing = True
 
-            await self.api_client.post_predictions(predictions=parsed_predictions)
+                    self.logger.exception(
+                        "Failed to export predictions.", extra={"n_predictions": len(predictions)}
+                    )
 
-            # Mark predictions as exported
-            ids = [prediction[0] for prediction in predictions]
-            await self.db_operations.mark_predictions_as_exported(ids=ids)
+            # Mark predictions as exported, the payload not delivered handed to the outbox
+            async with self.db_operations.transaction():
+                if not delivered:
+                    await self.db_operations.insert_outbox(
+                        kind=OutboxKind.PREDICTIONS, payloads=[body]
+                    )
 
-            if len(predictions) < self.batch_size:
-                break
+                await self.db_operations.mark_predictions_as_exported_range(
+                    first_rowid=predictions[0][0],
+                    last_rowid=predictions[-1][0],
+                    current_interval_minutes=current_interval_minutes,
+                )
+        finally:
+            semaphore.release()
+
+    async def run(self):
+        """
+        Pipelined: the next batch is read while the previous ones are posted,
+        up to max_concurrent_posts batches in flight
+        """
+
+        current_interval_minutes = get_interval_start_minutes()
+
+        self.api_failing = False
+
+        semaphore = asyncio.Semaphore(self.max_concurrent_posts)
+        exports = []
+        after_rowid = 0
+
+        try:
+            while True:
+                # Get predictions to export
+                predictions = await self.db_operations.get_predictions_to_export(
+                    current_interval_minutes=current_interval_minutes,
+                    batch_size=self.batch_size,
+                    after_rowid=after_rowid,
+                )
+
+                if len(predictions) == 0:
+                    break
+
+                # Seek past the batch on the next query
+                after_rowid = predictions[-1][0]
+
+                # Wait for a post slot, released by the batch once exported
+                await semaphore.acquire()
+
+                exports.append(
+                    asyncio.create_task(
+                        self.export_batch(
+                            predictions=predictions,
+                            current_interval_minutes=current_interval_minutes,
+                            semaphore=semaphore,
+                        )
+                    )
+                )
+
+                if len(predictions) < self.batch_size:
+                    break
+        except BaseException:
+            # Batches not marked exported are read again on the next run
+            for export in exports:
+                export.cancel()
+
+            raise
+
+        results = await asyncio.gather(*exports, return_exceptions=True)
+
+        for result in results:
+            if isinstance(result, BaseException):
+                raise result
 
     def parse_predictions_for_exporting(self, predictions: list[tuple[any]]):
         submissions = []
@@ -1,14 +1,26 @@
+import asyncio
 import json
+from datetime import datetime, timezone
 
 from neurons.validator.db.operations import DatabaseOperations
 from neurons.validator.if_games.client import IfGamesClient
 from neurons.validator.models.backend_models import MinerEventResult, MinerEventResultItems
 from neurons.validator.models.event import EventsModel
+from neurons.validator.models.outbox import OutboxKind
 from neurons.validator.models.score import ScoresModel
-from neurons.validator.scheduler.task import AbstractTask
+from neurons.validator.scheduler.task import AbstractTask, TaskBacklog
 from neurons.validator.tasks.pull_events import TITLE_SEPARATOR
+from neurons.validator.utils.common.histogram import LatencyHistogram
 from neurons.validator.utils.logger.logger import InfiniteGamesLogger
 
+# Upper bounds of the resolve to score latency buckets, in seconds
+RESOLVE_TO_SCORE_BUCKETS = (60.0, 300.0, 600.0, 1200.0, 1800.0, 3600.0, 7200.0, 21600.0, 86400.0)
+
+# Scores of an event are never split, an event above the cap is posted alone
+MAX_SCORES_PER_PAYLOAD = 1000
+
+MAX_CONCURRENT_POSTS = 4
+
 
 class ExportScores(AbstractTask):
     interval: float
@@ -18,6 +30,9 @@ class ExportScores(AbstractTask):
     logger: InfiniteGamesLogger
     validator_uid: int
     validator_hotkey: str
+    max_scores_per_payload: int
+    max_concurrent_posts: int
+    resolve_to_score_latency: LatencyHistogram
 
     def __init__(
         self,
@@ -28,6 +43,8 @@ class ExportScores(AbstractTask):
         logger: InfiniteGamesLogger,
         validator_uid: int,
         validator_hotkey: str,
+        max_scores_per_payload: int = MAX_SCORES_PER_PAYLOAD,
+        max_concurrent_posts: int = MAX_CONCURRENT_POSTS,
     ):
         if not isinstance(interval_seconds, float) or interval_seconds <= 0:
             raise ValueError("interval_seconds must be a positive number (float).")
@@ -36,16 +53,31 @@ class ExportScores(AbstractTask):
         if not isinstance(db_operations, DatabaseOperations):
             raise TypeError("db_operations must be an instance of DatabaseOperations.")
 
+        # Validate max_scores_per_payload
+        if not isinstance(max_scores_per_payload, int) or max_scores_per_payload <= 0:
+            raise ValueError("max_scores_per_payload must be a positive integer.")
+
+        # Validate max_concurrent_posts
+        if not isinstance(max_concurrent_posts, int) or max_concurrent_posts <= 0:
+            raise ValueError("max_concurrent_posts must be a positive integer.")
+
         self.interval = interval_seconds
         self.page_size = page_size
         self.db_operations = db_operations
         self.api_client = api_client
         self.validator_uid = validator_uid
         self.validator_hotkey = validator_hotkey
+        self.max_scores_per_payload = max_scores_per_payload
+        self.max_concurrent_posts = max_concurrent_posts
 
         self.errors_count = 0
         self.logger = logger
 
+        # From the event resolution to its scores exported, the end of the scoring pipeline
+        self.resolve_to_score_latency = LatencyHistogram(
+            buckets=RESOLVE_TO_SCORE_BUCKETS, max_values=1000
+        )
+
     @property
     def name(self):
         return "export-scores"
@@ -54,7 +86,23 @@ class ExportScores(AbstractTask):
     def interval_seconds(self):
         return self.interval
 
-    def prepare_scores_payload(self, event: EventsModel, scores: list[ScoresModel]) -> list[dict]:
+    def metrics(self) -> dict:
+        return {"resolve_to_score_latency_seconds": self.resolve_to_score_latency.snapshot()}
+
+    def observe_resolve_to_score_latency(self, event: EventsModel) -> None:
+        if event.resolved_at is None:
+            return
+
+        resolved_at = event.resolved_at
+
+        if resolved_at.tzinfo is None:
+            resolved_at = resolved_at.replace(tzinfo=timezone.utc)
+
+        latency = (datetime.now(timezone.utc) - resolved_at).total_seconds()
+
+        self.resolve_to_score_latency.observe(max(0.0, latency))
+
+    def prepare_scores_payload(self, event: EventsModel, scores: list[ScoresModel]) -> dict:
         results = []
         failures = 0
         metadata = json.loads(event.metadata)
@@ -102,8 +150,8 @@ class ExportScores(AbstractTask):
             return None
 
         try:
-            payload = MinerEventResultItems(results=results).model_dump_json()
-            return json.loads(payload)
+            # JSON compatible values, encoded to bytes once the batch is packed
+            return MinerEventResultItems(results=results).model_dump(mode="json")
         except Exception:
             self.errors_count += 1
             self.logger.exception(
@@ -111,20 +159,95 @@ class ExportScores(AbstractTask):
             )
             return None
 
-    async def export_scores_to_backend(self, payload: list[dict]):
-        await self.api_client.post_scores(scores=payload)
+    async def export_scores_to_backend(self, payload: dict, body: bytes):
+        await self.api_client.post_scores(scores=body)
         self.logger.debug(
             "Exported scores.",
             extra={
-                "event_id": payload["results"][0]["event_id"],
+                "n_events": len({result["event_id"] for result in payload["results"]}),
                 "n_scores": len(payload["results"]),
             },
         )
 
+    def pack_payloads(
+        self, payloads: list[tuple[EventsModel, dict]]
+    ) -> list[list[tuple[EventsModel, dict]]]:
+        """
+        Groups the payloads of the events in batches of up to max_scores_per_payload scores
+        """
+
+        batches = []
+        batch = []
+        batch_scores = 0
+
+        for event, payload in payloads:
+            n_scores = len(payload["results"])
+
+            if batch and batch_scores + n_scores > self.max_scores_per_payload:
+                batches.append(batch)
+                batch = []
+                batch_scores = 0
+
+            batch.append((event, payload))
+            batch_scores += n_scores
+
+        if batch:
+            batches.append(batch)
+
+        return batches
+
+    async def export_batch(
+        self, batch: list[tuple[EventsModel, dict]], semaphore: asyncio.Semaphore
+    ) -> int:
+        """
+        Posts the scores of a batch of events in one payload and marks them exported,
+        returns the number of events exported
+        """
+
+        events = [event for event, _ in batch]
+        payload = {"results": [result for _, payload in batch for result in payload["results"]]}
+
+        # Encoded once: the same bytes are signed, posted and stored in the outbox
+        body = self.api_client.encode_body(payload)
+
+        delivered = True
+
+        async with semaphore:
+            try:
+                await self.export_scores_to_backend(payload=payload, body=body)
+            except Exception:
+                delivered = False
+
+                self.errors_count += 1
+                self.logger.exception(
+                    "Failed to export scores.",
+                    extra={"event_ids": [event.event_id for event in events]},
+                )
+
+        # The payload not delivered is handed to the outbox with the events marked exported
+        async with self.db_operations.transaction():
+            if not delivered:
+                await self.db_operations.insert_outbox(kind=OutboxKind.SCORES, payloads=[body])
+
+            await self.db_operations.mark_peer_scores_as_exported_batch(
+                event_ids=[event.event_id for event in events]
+            )
+
+            await self.db_operations.mark_events_as_exported(
+                unique_event_ids=[event.unique_event_id for event in events]
+            )
+
+        if delivered:
+            for event in events:
+                self.observe_resolve_to_score_latency(event=event)
+
+        return len(events)
+
     async def run(self):
         scored_events = await self.db_operations.get_peer_scored_events_for_export(
             max_events=self.page_size
         )
+        exported = 0
         if not scored_events:
             self.logger.debug("No peer scored events to export scores.")
         else:
@@ -133,10 +256,14 @@ class ExportScores(AbstractTask):
                 extra={"n_events": len(scored_events)},
             )
 
+            scores_by_event = await self.db_operations.get_peer_scores_for_export_batch(
+                event_ids=[event.event_id for event in scored_events]
+            )
+
+            payloads = []
+
             for event in scored_events:
-                scores = await self.db_operations.get_peer_scores_for_export(
-                    event_id=event.event_id
-                )
+                scores = scores_by_event.get(event.event_id)
                 if not scores:
                     self.errors_count += 1
                     self.logger.warning(
@@ -154,25 +281,43 @@ class ExportScores(AbstractTask):
                     )
                     continue
 
-                try:
-                    await self.export_scores_to_backend(payload)
-                except Exception:
-                    self.errors_count += 1
-                    self.logger.exception(
-                        "Failed to export scores.",
-                        extra={"event_id": event.event_id},
-                    )
-                    continue
+                payloads.append((event, payload))
 
-                await self.db_operations.mark_peer_scores_as_exported(event_id=event.event_id)
+            # Posts in flight bounded, each batch marked exported once posted or handed to the outbox
+            semaphore = asyncio.Semaphore(self.max_concurrent_posts)
 
-                await self.db_operations.mark_event_as_exported(
-                    unique_event_id=event.unique_event_id
-                )
+            results = await asyncio.gather(
+                *[
+                    self.export_batch(batch=batch, semaphore=semaphore)
+                    for batch in self.pack_payloads(payloads=payloads)
+                ],
+                return_exceptions=True,
+            )
+
+            for result in results:
+                if isinstance(result, BaseException):
+                    raise result
+
+            exported = sum(results)
 
         self.logger.debug(
             "Export scores task completed.",
             extra={"errors_count": self.errors_count},
         )
 
+        if exported > 0:
+            self.logger.debug(
+                "Resolve to score latency",
+                extra={
+                    "exported": exported,
+                    "p50_s": self.resolve_to_score_latency.percentile(50),
+                    "p95_s": self.resolve_to_score_latency.percentile(95),
+                },
+            )
+
+        # A full page leaves events to export, unless none of them could be exported
+        self.backlog = TaskBacklog(
+            processed=exported, pending=len(scored_events) == self.page_size and exported > 0
+        )
+
         self.errors_count = 0
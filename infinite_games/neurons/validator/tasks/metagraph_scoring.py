@@ -1,5 +1,5 @@
 from neurons.validator.db.operations import DatabaseOperations
-from neurons.validator.scheduler.task import AbstractTask
+from neurons.validator.scheduler.task import AbstractTask, TaskBacklog
 from neurons.validator.utils.logger.logger import InfiniteGamesLogger
 
 # how many previous events to consider for the moving average
@@ -60,7 +60,7 @@ class MetagraphScoring(AbstractTask):
                 )
 
                 try:
-                    res = await self.db_operations.set_metagraph_peer_scores(
+                    res = await self.db_operations.set_metagraph_peer_scores_incremental(
                         event["event_id"], n_events=MOVING_AVERAGE_EVENTS
                     )
                     if res == []:
@@ -82,4 +82,11 @@ class MetagraphScoring(AbstractTask):
             extra={"errors_count": self.errors_count},
         )
 
+        # A full page leaves events to score, unless none of them could be scored
+        processed = len(events_to_score) - self.errors_count
+        self.backlog = TaskBacklog(
+            processed=processed,
+            pending=len(events_to_score) == self.page_size and processed > 0,
+        )
+
         self.errors_count = 0
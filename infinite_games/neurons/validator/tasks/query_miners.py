@@ -1,8 +1,10 @@
+import asyncio
 import json
 import time
-from dataclasses import asdict, dataclass
+from collections import deque
+from dataclasses import asdict, dataclass, field
 from datetime import datetime
-from typing import Iterable
+from typing import Iterable, Optional
 
 from bittensor.core.chain_data import AxonInfo
 from bittensor.core.dendrite import DendriteMixin
@@ -11,7 +13,9 @@ from bittensor.core.metagraph import MetagraphMixin
 from neurons.protocol import EventPredictionSynapse
 from neurons.validator.db.operations import DatabaseOperations
 from neurons.validator.scheduler.task import AbstractTask
+from neurons.validator.tasks.sync_metagraph import MetagraphSnapshot, SyncMetagraph
 from neurons.validator.utils.common.converters import torch_or_numpy_to_int
+from neurons.validator.utils.common.histogram import LatencyHistogram
 from neurons.validator.utils.common.interval import get_interval_start_minutes
 from neurons.validator.utils.logger.logger import InfiniteGamesLogger
 
@@ -25,13 +29,200 @@ class ExtendedAxonInfo(AxonInfo):
 AxonInfoByUidType = dict[int, ExtendedAxonInfo]
 SynapseResponseByUidType = dict[int, EventPredictionSynapse]
 
+QUERY_TIMEOUT_SECONDS = 120
+
+
+@dataclass
+class PredictionsBuffer:
+    """Predictions parsed from all the neurons responses, stored column by column"""
+
+    unique_event_ids: list[str] = field(default_factory=list)
+    miner_hotkeys: list[str] = field(default_factory=list)
+    miner_uids: list[int] = field(default_factory=list)
+    predicted_outcomes: list[float] = field(default_factory=list)
+    interval_start_minutes: list[int] = field(default_factory=list)
+    interval_agg_predictions: list[float] = field(default_factory=list)
+    blocktimes: list[int] = field(default_factory=list)
+
+    def __len__(self) -> int:
+        return len(self.unique_event_ids)
+
+    def extend(self, predictions: list[tuple[any]]) -> None:
+        # Rows as returned by parse_neuron_predictions, the last value is only used on upsert
+        for prediction in predictions:
+            self.unique_event_ids.append(prediction[0])
+            self.miner_hotkeys.append(prediction[1])
+            self.miner_uids.append(prediction[2])
+            self.predicted_outcomes.append(prediction[3])
+            self.interval_start_minutes.append(prediction[4])
+            self.interval_agg_predictions.append(prediction[5])
+            self.blocktimes.append(prediction[6])
+
+    def rows(self) -> Iterable[tuple[any]]:
+        return zip(
+            self.unique_event_ids,
+            self.miner_hotkeys,
+            self.miner_uids,
+            self.predicted_outcomes,
+            self.interval_start_minutes,
+            self.interval_agg_predictions,
+            self.blocktimes,
+        )
+
+
+def compile_event(event: tuple[any]) -> dict:
+    """Synapse event of an event to predict row"""
+
+    event_id = event[0]
+    description = event[2]
+    cutoff = int(datetime.fromisoformat(event[3]).timestamp()) if event[3] else None
+    resolve_date = int(datetime.fromisoformat(event[4]).timestamp()) if event[4] else None
+    end_date = int(datetime.fromisoformat(event[5]).timestamp()) if event[5] else None
+    metadata = {**json.loads(event[6])}
+    market_type = (metadata.get("market_type", event[1])).lower()
+
+    return {
+        "event_id": event_id,
+        "market_type": market_type,
+        "probability": None,
+        "miner_answered": False,
+        "description": description,
+        "cutoff": cutoff,
+        "starts": cutoff if (cutoff and market_type == "azuro") else None,
+        "resolve_date": resolve_date,
+        "end_date": end_date,
+    }
+
+
+class PredictionsSynapseBuilder:
+    """
+    Keeps the compiled synapse events between runs, only the events whose local_updated_at
+    changed are compiled again. Each update changing the events starts a new epoch, the keys
+    changed in the last max_epochs epochs are kept to send deltas to the miners.
+    """
+
+    __entries: dict[str, tuple[str, dict]]
+    __epoch_id: int
+    __oldest_base_epoch_id: int
+    __changes: deque[tuple[int, frozenset[str]]]
+    __max_epochs: int
+
+    def __init__(self, max_epochs: int = 64) -> None:
+        # Validate max_epochs
+        if not isinstance(max_epochs, int) or max_epochs <= 0:
+            raise ValueError("max_epochs must be a positive integer.")
+
+        self.__entries = {}
+        # Epochs ids start from the clock, a restarted validator does not reuse the epochs
+        # acknowledged by the miners
+        self.__epoch_id = time.time_ns() // 1_000_000
+        self.__oldest_base_epoch_id = self.__epoch_id
+        self.__changes = deque()
+        self.__max_epochs = max_epochs
+
+    @property
+    def epoch_id(self) -> int:
+        return self.__epoch_id
+
+    def update(self, events: Iterable[tuple[any]]) -> int:
+        """Updates the events to predict, returns the count of events compiled"""
+
+        compiled_count = 0
+        changed_keys = set()
+        keys = set()
+
+        for event in events:
+            key = f"{event[1]}-{event[0]}"
+            local_updated_at = event[7]
+
+            keys.add(key)
+
+            entry = self.__entries.get(key)
+
+            if entry is not None and entry[0] == local_updated_at:
+                continue
+
+            compiled_event = compile_event(event)
+            compiled_count += 1
+
+            if entry is None or entry[1] != compiled_event:
+                changed_keys.add(key)
+
+            self.__entries[key] = (local_updated_at, compiled_event)
+
+        removed_keys = self.__entries.keys() - keys
+
+        for key in removed_keys:
+            del self.__entries[key]
+
+        changed_keys.update(removed_keys)
+
+        if changed_keys:
+            self.__epoch_id += 1
+            self.__changes.append((self.__epoch_id, frozenset(changed_keys)))
+
+            if len(self.__changes) > self.__max_epochs:
+                self.__oldest_base_epoch_id, _ = self.__changes.popleft()
+
+        return compiled_count
+
+    def full_synapse(self) -> EventPredictionSynapse:
+        # Copies, the responses events must not leak into the cache
+        events = {key: dict(compiled_event) for key, (_, compiled_event) in self.__entries.items()}
+
+        return EventPredictionSynapse(events=events, epoch_id=self.__epoch_id)
+
+    def delta_synapse(self, base_epoch_id: int) -> Optional[EventPredictionSynapse]:
+        """
+        Synapse of the events changed since base_epoch_id,
+        None if the changes since base_epoch_id are not known
+        """
+
+        if not self.__oldest_base_epoch_id <= base_epoch_id <= self.__epoch_id:
+            return None
+
+        changed_keys = set()
+
+        for epoch_id, keys in reversed(self.__changes):
+            if epoch_id <= base_epoch_id:
+                break
+
+            changed_keys.update(keys)
+
+        events = {}
+        removed_events = []
+
+        for key in sorted(changed_keys):
+            entry = self.__entries.get(key)
+
+            if entry is None:
+                removed_events.append(key)
+            else:
+                events[key] = dict(entry[1])
+
+        return EventPredictionSynapse(
+            events=events,
+            epoch_id=self.__epoch_id,
+            base_epoch_id=base_epoch_id,
+            removed_events=removed_events,
+        )
+
 
 class QueryMiners(AbstractTask):
     interval: float
     db_operations: DatabaseOperations
     dendrite: DendriteMixin
     metagraph: MetagraphMixin
+    metagraph_sync: SyncMetagraph | None
+    current_metagraph: MetagraphMixin | MetagraphSnapshot
     logger: InfiniteGamesLogger
+    streaming: bool
+    max_concurrency: int
+    store_batch_size: int
+    latency_histogram: LatencyHistogram | None
+    synapse_builder: PredictionsSynapseBuilder
+    acknowledged_epochs: dict[int, tuple[str, int]]
+    acknowledged_predictions: dict[int, tuple[str, dict[str, float]]]
 
     def __init__(
         self,
@@ -40,6 +231,10 @@ class QueryMiners(AbstractTask):
         dendrite: DendriteMixin,
         metagraph: MetagraphMixin,
         logger: InfiniteGamesLogger,
+        streaming: bool = False,
+        max_concurrency: int = 256,
+        store_batch_size: int = 32,
+        metagraph_sync: SyncMetagraph | None = None,
     ):
         if not isinstance(interval_seconds, float) or interval_seconds <= 0:
             raise ValueError("interval_seconds must be a positive number (float).")
@@ -56,15 +251,42 @@ class QueryMiners(AbstractTask):
         if not isinstance(metagraph, MetagraphMixin):
             raise TypeError("metagraph must be an instance of MetagraphMixin.")
 
+        # Validate metagraph_sync
+        if metagraph_sync is not None and not isinstance(metagraph_sync, SyncMetagraph):
+            raise TypeError("metagraph_sync must be an instance of SyncMetagraph.")
+
         # Validate logger
         if not isinstance(logger, InfiniteGamesLogger):
             raise TypeError("logger must be an instance of InfiniteGamesLogger.")
 
+        # Validate max_concurrency
+        if not isinstance(max_concurrency, int) or max_concurrency <= 0:
+            raise ValueError("max_concurrency must be a positive integer.")
+
+        # Validate store_batch_size
+        if not isinstance(store_batch_size, int) or store_batch_size <= 0:
+            raise ValueError("store_batch_size must be a positive integer.")
+
         self.interval = interval_seconds
         self.db_operations = db_operations
         self.dendrite = dendrite
         self.metagraph = metagraph
+        self.metagraph_sync = metagraph_sync
+        # Metagraph or shared snapshot read by the current run
+        self.current_metagraph = metagraph if metagraph_sync is None else metagraph_sync.snapshot
         self.logger = logger
+        self.streaming = streaming
+        self.max_concurrency = max_concurrency
+        self.store_batch_size = store_batch_size
+
+        # Latencies of the neurons queried in the last streaming run
+        self.latency_histogram = None
+
+        # Compiled events & epochs acknowledged by the neurons, by uid with their hotkey
+        self.synapse_builder = PredictionsSynapseBuilder()
+        self.acknowledged_epochs = {}
+        # Last predictions of the neurons acknowledging epochs, merged into their delta answers
+        self.acknowledged_predictions = {}
 
     @property
     def name(self):
@@ -74,6 +296,12 @@ class QueryMiners(AbstractTask):
     def interval_seconds(self):
         return self.interval
 
+    def metrics(self) -> dict:
+        if self.latency_histogram is None:
+            return {}
+
+        return {"latency_histogram": self.latency_histogram.snapshot()}
+
     async def run(self):
         # Get events to predict
         events = await self.db_operations.get_events_to_predict()
@@ -85,8 +313,13 @@ class QueryMiners(AbstractTask):
         synapse = self.make_predictions_synapse(events)
 
         # Sync metagraph & store the current block
-        self.metagraph.sync(lite=True)
-        block = torch_or_numpy_to_int(self.metagraph.block)
+        if self.metagraph_sync is None:
+            self.metagraph.sync(lite=True)
+        else:
+            # Shared snapshot, synced off the event loop
+            self.current_metagraph = self.metagraph_sync.snapshot
+
+        block = torch_or_numpy_to_int(self.current_metagraph.block)
 
         # Get axons to query
         axons = self.get_axons()
@@ -97,6 +330,12 @@ class QueryMiners(AbstractTask):
         # Store miners
         await self.store_miners(block=block, axons=axons)
 
+        if self.streaming:
+            # Query neurons & store predictions as responses arrive
+            await self.query_neurons_streaming(axons_by_uid=axons, synapse=synapse, block=block)
+
+            return
+
         # Query neurons
         predictions_synapses: SynapseResponseByUidType = await self.query_neurons(
             axons_by_uid=axons, synapse=synapse
@@ -113,15 +352,16 @@ class QueryMiners(AbstractTask):
 
     def get_axons(self) -> AxonInfoByUidType:
         axons: AxonInfoByUidType = {}
+        metagraph = self.current_metagraph
 
-        for uid in self.metagraph.uids:
+        for uid in metagraph.uids:
             int_uid = torch_or_numpy_to_int(uid)
 
-            axon = self.metagraph.axons[int_uid]
+            axon = metagraph.axons[int_uid]
 
             if axon is not None and axon.is_serving is True:
-                is_validating = True if self.metagraph.validator_trust[uid].float() > 0.0 else False
-                validator_permit = torch_or_numpy_to_int(self.metagraph.validator_permit[uid]) > 0
+                is_validating = True if metagraph.validator_trust[uid].float() > 0.0 else False
+                validator_permit = torch_or_numpy_to_int(metagraph.validator_permit[uid]) > 0
 
                 extended_axon = ExtendedAxonInfo(
                     **asdict(axon), is_validating=is_validating, validator_permit=validator_permit
@@ -132,31 +372,81 @@ class QueryMiners(AbstractTask):
         return axons
 
     def make_predictions_synapse(self, events: Iterable[tuple[any]]) -> EventPredictionSynapse:
-        compiled_events = {}
+        compiled_count = self.synapse_builder.update(events)
 
-        for event in events:
-            event_id = event[0]
-            truncated_market_type = event[1]
-            description = event[2]
-            cutoff = int(datetime.fromisoformat(event[3]).timestamp()) if event[3] else None
-            resolve_date = int(datetime.fromisoformat(event[4]).timestamp()) if event[4] else None
-            end_date = int(datetime.fromisoformat(event[5]).timestamp()) if event[5] else None
-            metadata = {**json.loads(event[6])}
-            market_type = (metadata.get("market_type", event[1])).lower()
-
-            compiled_events[f"{truncated_market_type}-{event_id}"] = {
-                "event_id": event_id,
-                "market_type": market_type,
-                "probability": None,
-                "miner_answered": False,
-                "description": description,
-                "cutoff": cutoff,
-                "starts": cutoff if (cutoff and market_type == "azuro") else None,
-                "resolve_date": resolve_date,
-                "end_date": end_date,
-            }
-
-        return EventPredictionSynapse(events=compiled_events)
+        self.logger.debug(
+            "Events compiled",
+            extra={
+                "compiled_count": compiled_count,
+                "epoch_id": self.synapse_builder.epoch_id,
+            },
+        )
+
+        return self.synapse_builder.full_synapse()
+
+    def make_neuron_synapse(
+        self, uid: int, axon: ExtendedAxonInfo, synapse: EventPredictionSynapse
+    ) -> EventPredictionSynapse:
+        acknowledged = self.acknowledged_epochs.get(uid)
+
+        # Delta since the epoch acknowledged by the same neuron, if still known
+        if acknowledged is not None and acknowledged[0] == axon.hotkey:
+            delta_synapse = self.synapse_builder.delta_synapse(base_epoch_id=acknowledged[1])
+
+            if delta_synapse is not None:
+                return delta_synapse
+
+        return synapse.model_copy()
+
+    def acknowledge_epoch(
+        self, uid: int, axon: ExtendedAxonInfo, response: EventPredictionSynapse
+    ) -> None:
+        acknowledged_epoch_id = response.acknowledged_epoch_id
+
+        if isinstance(acknowledged_epoch_id, int):
+            self.acknowledged_epochs[uid] = (axon.hotkey, acknowledged_epoch_id)
+            self.acknowledged_predictions[uid] = (
+                axon.hotkey,
+                {
+                    key: event["probability"]
+                    for key, event in response.events.items()
+                    if isinstance(event, dict) and event.get("probability") is not None
+                },
+            )
+        elif response.is_success:
+            # Neuron answered without acknowledging, back to full synapses
+            self.acknowledged_epochs.pop(uid, None)
+            self.acknowledged_predictions.pop(uid, None)
+
+    def merge_delta_response(
+        self,
+        uid: int,
+        axon: ExtendedAxonInfo,
+        synapse: EventPredictionSynapse,
+        base_epoch_id: int | None,
+        response: EventPredictionSynapse,
+    ) -> None:
+        """
+        A neuron sent a delta may answer only the events changed, its last predictions of the
+        events unchanged and still to predict are kept for the interval
+        """
+
+        if base_epoch_id is None or not response.is_success:
+            return
+
+        acknowledged = self.acknowledged_predictions.get(uid)
+
+        if acknowledged is None or acknowledged[0] != axon.hotkey:
+            return
+
+        events = {
+            key: {"probability": probability}
+            for key, probability in acknowledged[1].items()
+            if key in synapse.events
+        }
+        events.update(response.events)
+
+        response.events = events
 
     def parse_neuron_predictions(
         self,
@@ -165,7 +455,7 @@ class QueryMiners(AbstractTask):
         uid: int,
         neuron_predictions: EventPredictionSynapse,
     ):
-        axon_hotkey = self.metagraph.axons[uid].hotkey
+        axon_hotkey = self.current_metagraph.axons[uid].hotkey
 
         predictions_to_insert = []
 
@@ -193,7 +483,7 @@ class QueryMiners(AbstractTask):
         return predictions_to_insert
 
     async def query_neurons(self, axons_by_uid: AxonInfoByUidType, synapse: EventPredictionSynapse):
-        timeout = 120
+        timeout = QUERY_TIMEOUT_SECONDS
 
         axons_list = list(axons_by_uid.values())
 
@@ -224,6 +514,122 @@ class QueryMiners(AbstractTask):
 
         return responses_by_uid
 
+    async def query_neurons_streaming(
+        self, axons_by_uid: AxonInfoByUidType, synapse: EventPredictionSynapse, block: int
+    ) -> int:
+        """
+        Queries the neurons with at most max_concurrency requests in flight.
+        Responses go to a bounded queue as they arrive, their predictions are stored every
+        store_batch_size responses while the other neurons are still answering.
+        Neurons which acknowledged an epoch are sent only the events changed since, their
+        predictions of the events unchanged are kept from their last answer.
+        Returns the count of predictions stored.
+        """
+
+        start_time = time.time()
+
+        responses_queue: asyncio.Queue[
+            tuple[int, EventPredictionSynapse | None, float]
+        ] = asyncio.Queue(maxsize=self.max_concurrency)
+        semaphore = asyncio.Semaphore(self.max_concurrency)
+        histogram = LatencyHistogram()
+
+        async def query_neuron(uid: int, axon: ExtendedAxonInfo):
+            response = None
+
+            async with semaphore:
+                query_start_time = time.time()
+
+                try:
+                    neuron_synapse = self.make_neuron_synapse(uid=uid, axon=axon, synapse=synapse)
+                    # Read before the call, the response can be the synapse sent
+                    base_epoch_id = neuron_synapse.base_epoch_id
+
+                    response = await self.dendrite.call(
+                        target_axon=axon,
+                        synapse=neuron_synapse,
+                        timeout=QUERY_TIMEOUT_SECONDS,
+                        deserialize=False,
+                    )
+
+                    self.merge_delta_response(
+                        uid=uid,
+                        axon=axon,
+                        synapse=synapse,
+                        base_epoch_id=base_epoch_id,
+                        response=response,
+                    )
+                    self.acknowledge_epoch(uid=uid, axon=axon, response=response)
+                except Exception:
+                    self.logger.exception("Failed to query miner", extra={"neuron_uid": uid})
+
+                latency = time.time() - query_start_time
+
+            # Always push, the consumer waits for a response of each neuron
+            await responses_queue.put((uid, response, latency))
+
+        async def store_responses() -> int:
+            buffer = PredictionsBuffer()
+            buffered_responses = 0
+            predictions_count = 0
+
+            for _ in range(len(axons_by_uid)):
+                uid, response, latency = await responses_queue.get()
+
+                histogram.observe(latency)
+
+                if response is not None:
+                    buffer.extend(
+                        self.parse_neuron_predictions(
+                            block=block,
+                            interval_start_minutes=get_interval_start_minutes(),
+                            uid=uid,
+                            neuron_predictions=response,
+                        )
+                    )
+                    buffered_responses += 1
+
+                if buffered_responses >= self.store_batch_size:
+                    predictions_count += await self.store_predictions_buffer(
+                        buffer=buffer, neurons_count=buffered_responses
+                    )
+
+                    buffer = PredictionsBuffer()
+                    buffered_responses = 0
+
+            predictions_count += await self.store_predictions_buffer(
+                buffer=buffer, neurons_count=buffered_responses
+            )
+
+            return predictions_count
+
+        queries = [
+            asyncio.create_task(query_neuron(uid=uid, axon=axon))
+            for uid, axon in axons_by_uid.items()
+        ]
+        consumer = asyncio.create_task(store_responses())
+
+        try:
+            predictions_count, *_ = await asyncio.gather(consumer, *queries)
+        finally:
+            # Do not leave queries waiting on the queue if storing failed
+            for task in [consumer, *queries]:
+                task.cancel()
+
+        self.latency_histogram = histogram
+
+        self.logger.debug(
+            "Miners queried",
+            extra={
+                "miners_count": len(axons_by_uid),
+                "predictions_count": predictions_count,
+                "elapsed_time_ms": round((time.time() - start_time) * 1000),
+                "latency_histogram": histogram.snapshot(),
+            },
+        )
+
+        return predictions_count
+
     async def store_miners(self, block: int, axons: AxonInfoByUidType):
         miners_count_in_db = await self.db_operations.get_miners_count()
 
@@ -255,26 +661,42 @@ class QueryMiners(AbstractTask):
     async def store_predictions(
         self, block: int, interval_start_minutes: int, neurons_predictions: SynapseResponseByUidType
     ):
-        # For each neuron predictions
+        buffer = PredictionsBuffer()
+
+        # Collect the predictions of all the neurons
         for uid, neuron_predictions in neurons_predictions.items():
-            # Parse neuron predictions for insert
-            parsed_neuron_predictions_for_insertion = self.parse_neuron_predictions(
-                block=block,
-                interval_start_minutes=interval_start_minutes,
-                uid=uid,
-                neuron_predictions=neuron_predictions,
+            buffer.extend(
+                self.parse_neuron_predictions(
+                    block=block,
+                    interval_start_minutes=interval_start_minutes,
+                    uid=uid,
+                    neuron_predictions=neuron_predictions,
+                )
             )
 
-            if len(parsed_neuron_predictions_for_insertion) > 0:
-                # Batch upsert neuron predictions
-                await self.db_operations.upsert_predictions(
-                    predictions=parsed_neuron_predictions_for_insertion
-                )
+        await self.store_predictions_buffer(buffer=buffer, neurons_count=len(neurons_predictions))
 
-                self.logger.debug(
-                    "Predictions stored",
-                    extra={
-                        "neuron_uid": uid,
-                        "predictions_count": len(parsed_neuron_predictions_for_insertion),
-                    },
-                )
+    async def store_predictions_buffer(self, buffer: PredictionsBuffer, neurons_count: int) -> int:
+        if len(buffer) == 0:
+            return 0
+
+        start_time = time.time()
+
+        # Bulk upsert in a single transaction
+        predictions_count = await self.db_operations.upsert_predictions_bulk(
+            predictions=buffer.rows()
+        )
+
+        elapsed_time = time.time() - start_time
+
+        self.logger.debug(
+            "Predictions stored",
+            extra={
+                "neurons_count": neurons_count,
+                "predictions_count": predictions_count,
+                "elapsed_time_ms": round(elapsed_time * 1000),
+                "rows_per_second": round(predictions_count / max(elapsed_time, 1e-6)),
+            },
+        )
+
+        return predictions_count
@@ -2,7 +2,7 @@ from datetime import datetime, timedelta
 
 from neurons.validator.db.operations import DatabaseOperations
 from neurons.validator.if_games.client import IfGamesClient
-from neurons.validator.scheduler.task import AbstractTask
+from neurons.validator.scheduler.task import AbstractTask, TaskBacklog
 from neurons.validator.utils.logger.logger import InfiniteGamesLogger
 
 
@@ -75,6 +75,7 @@ class ResolveEvents(AbstractTask):
         )
 
         offset = 0
+        resolved = 0
 
         while True:
             # Query resolved events in batches
@@ -99,6 +100,7 @@ class ResolveEvents(AbstractTask):
                 )
 
                 if len(db_resolved_event) > 0:
+                    resolved += 1
                     self.logger.debug("Event resolved", extra={"event_id": event_id})
 
             if len(resolved_events) < self.page_size:
@@ -106,3 +108,8 @@ class ResolveEvents(AbstractTask):
                 break
 
             offset += self.page_size
+
+        # Reported only with events resolved, to wake peer scoring: the API is polled at
+        # a fixed interval, not backed off when idle
+        if resolved > 0:
+            self.backlog = TaskBacklog(processed=resolved, pending=False)
@@ -11,7 +11,7 @@ from bittensor_wallet.wallet import Wallet
 
 from neurons.validator.db.operations import DatabaseOperations
 from neurons.validator.scheduler.task import AbstractTask
-from neurons.validator.utils.common.converters import pydantic_models_to_dataframe
+from neurons.validator.tasks.sync_metagraph import MetagraphSnapshot, SyncMetagraph
 from neurons.validator.utils.common.interval import BLOCK_DURATION
 from neurons.validator.utils.logger.logger import InfiniteGamesLogger
 from neurons.validator.version import __spec_version__ as spec_version
@@ -35,6 +35,8 @@ class SetWeights(AbstractTask):
     db_operations: DatabaseOperations
     logger: InfiniteGamesLogger
     metagraph: MetagraphMixin
+    metagraph_sync: SyncMetagraph | None
+    current_metagraph: MetagraphMixin | MetagraphSnapshot
     netuid: int
     subtensor: bt.Subtensor
     wallet: Wallet  # type: ignore
@@ -48,6 +50,7 @@ class SetWeights(AbstractTask):
         netuid: int,
         subtensor: bt.Subtensor,
         wallet: Wallet,  # type: ignore
+        metagraph_sync: SyncMetagraph | None = None,
     ):
         if not isinstance(interval_seconds, float) or interval_seconds <= 0:
             raise ValueError("interval_seconds must be a positive number (float).")
@@ -55,11 +58,17 @@ class SetWeights(AbstractTask):
         if not isinstance(db_operations, DatabaseOperations):
             raise TypeError("db_operations must be an instance of DatabaseOperations.")
 
+        if metagraph_sync is not None and not isinstance(metagraph_sync, SyncMetagraph):
+            raise TypeError("metagraph_sync must be an instance of SyncMetagraph.")
+
         self.interval = interval_seconds
         self.db_operations = db_operations
         self.logger = logger
 
         self.metagraph = metagraph
+        self.metagraph_sync = metagraph_sync
+        # Metagraph or shared snapshot read by the current run
+        self.current_metagraph = metagraph
         self.netuid = netuid
         self.subtensor = subtensor
         self.wallet = wallet
@@ -83,6 +92,16 @@ class SetWeights(AbstractTask):
         return self.interval
 
     def metagraph_lite_sync(self):
+        if self.metagraph_sync is not None:
+            # read the shared snapshot, synced off the event loop
+            snapshot = self.metagraph_sync.snapshot
+            self.current_metagraph = snapshot
+            self.current_hotkeys = list(snapshot.hotkeys)
+            self.n_hotkeys = len(self.current_hotkeys)
+            self.current_uids = snapshot.uids
+            self.current_miners_df = snapshot.miners_df
+            return
+
         # sync the metagraph in lite mode - # duplicate of PeerScoring.metagraph_lite_sync
         self.metagraph.sync(lite=True)
         #  WARNING! hotkeys is a list[str] and uids is a torch.tensor
@@ -127,14 +146,13 @@ class SetWeights(AbstractTask):
             self.last_set_weights_at = round(time.time())
             return True
 
-    def filter_last_scores(self, last_metagraph_scores) -> pd.DataFrame:
+    def filter_last_scores(self, last_metagraph_scores: pd.DataFrame) -> pd.DataFrame:
         # this is re-normalizing the weights for the current miners
 
-        filtered_scores = pydantic_models_to_dataframe(last_metagraph_scores)
         # merge the current metagraph with the last metagraph scores
         filtered_scores = pd.merge(
             self.current_miners_df,
-            filtered_scores,
+            last_metagraph_scores,
             on=[SWNames.miner_uid, SWNames.miner_hotkey],
             how="left",
         )
@@ -233,7 +251,7 @@ class SetWeights(AbstractTask):
         processed_uids, processed_weights = bt.utils.weight_utils.process_weights_for_netuid(
             uids=miner_uids_tf,
             weights=raw_weights_tf,
-            metagraph=self.metagraph,
+            metagraph=self.current_metagraph,
             netuid=self.netuid,
             subtensor=self.subtensor,
         )
@@ -324,7 +342,7 @@ class SetWeights(AbstractTask):
         if not can_set_weights:
             return
 
-        last_metagraph_scores = await self.db_operations.get_last_metagraph_scores()
+        last_metagraph_scores = await self.db_operations.get_last_metagraph_scores_frame()
         if last_metagraph_scores is None:
             raise ValueError("Failed to get the last metagraph scores.")
 
@@ -0,0 +1,137 @@
+import asyncio
+import time
+from dataclasses import dataclass
+
+import bittensor as bt
+import pandas as pd
+import torch
+from bittensor.core.chain_data import AxonInfo
+from bittensor.core.metagraph import MetagraphMixin
+
+from neurons.validator.scheduler.task import AbstractTask
+from neurons.validator.utils.common.converters import torch_or_numpy_to_int
+from neurons.validator.utils.logger.logger import InfiniteGamesLogger
+
+
+def clone_tensor(value) -> torch.Tensor:
+    if isinstance(value, torch.Tensor):
+        return value.detach().clone()
+
+    return torch.tensor(value)
+
+
+@dataclass(frozen=True, eq=False)
+class MetagraphSnapshot:
+    """
+    State of the metagraph at a block, shared by the tasks and replaced on each sync.
+    Exposes the metagraph attributes read by the tasks, on copies of the metagraph ones,
+    and the miners DataFrame (miner_hotkey, miner_uid). Readers must not modify them.
+    """
+
+    version: int
+    block: torch.Tensor
+    n: torch.Tensor
+    hotkeys: tuple[str, ...]
+    uids: torch.Tensor
+    axons: tuple[AxonInfo, ...]
+    validator_trust: torch.Tensor
+    validator_permit: torch.Tensor
+    miners_df: pd.DataFrame
+
+    @classmethod
+    def from_metagraph(cls, metagraph: MetagraphMixin, version: int) -> "MetagraphSnapshot":
+        hotkeys = tuple(metagraph.hotkeys)
+        uids = clone_tensor(metagraph.uids)
+
+        return cls(
+            version=version,
+            block=clone_tensor(metagraph.block),
+            n=clone_tensor(metagraph.n),
+            hotkeys=hotkeys,
+            uids=uids,
+            axons=tuple(metagraph.axons),
+            validator_trust=clone_tensor(metagraph.validator_trust),
+            validator_permit=clone_tensor(metagraph.validator_permit),
+            miners_df=pd.DataFrame({"miner_hotkey": list(hotkeys), "miner_uid": uids.tolist()}),
+        )
+
+
+class SyncMetagraph(AbstractTask):
+    """
+    Syncs the metagraph once per interval, off the event loop,
+    and publishes a new snapshot for the tasks reading it.
+    The subtensor and metagraph are its own: the substrate connection is not thread safe,
+    and the tasks calling the chain on the event loop must not share them.
+    """
+
+    interval: float
+    subtensor: bt.Subtensor
+    metagraph: MetagraphMixin
+    logger: InfiniteGamesLogger
+    __snapshot: MetagraphSnapshot
+
+    def __init__(
+        self,
+        interval_seconds: float,
+        subtensor: bt.Subtensor,
+        metagraph: MetagraphMixin,
+        logger: InfiniteGamesLogger,
+    ):
+        if not isinstance(interval_seconds, float) or interval_seconds <= 0:
+            raise ValueError("interval_seconds must be a positive number (float).")
+
+        # Validate subtensor
+        if not isinstance(subtensor, bt.Subtensor):
+            raise TypeError("subtensor must be an instance of Subtensor.")
+
+        # Validate metagraph
+        if not isinstance(metagraph, MetagraphMixin):
+            raise TypeError("metagraph must be an instance of MetagraphMixin.")
+
+        # Validate logger
+        if not isinstance(logger, InfiniteGamesLogger):
+            raise TypeError("logger must be an instance of InfiniteGamesLogger.")
+
+        self.interval = interval_seconds
+        self.subtensor = subtensor
+        self.metagraph = metagraph
+        self.logger = logger
+
+        # First snapshot of the metagraph as synced on startup
+        self.__snapshot = MetagraphSnapshot.from_metagraph(metagraph=metagraph, version=1)
+
+    @property
+    def name(self):
+        return "sync-metagraph"
+
+    @property
+    def interval_seconds(self):
+        return self.interval
+
+    @property
+    def snapshot(self) -> MetagraphSnapshot:
+        return self.__snapshot
+
+    def sync_snapshot(self, version: int) -> MetagraphSnapshot:
+        # Blocking chain calls, on the own subtensor of the task
+        self.metagraph.sync(lite=True, subtensor=self.subtensor)
+
+        return MetagraphSnapshot.from_metagraph(metagraph=self.metagraph, version=version)
+
+    async def run(self):
+        start_time = time.time()
+
+        snapshot = await asyncio.to_thread(self.sync_snapshot, self.__snapshot.version + 1)
+
+        # Published at once, readers get either the previous or the new snapshot
+        self.__snapshot = snapshot
+
+        self.logger.debug(
+            "Metagraph synced",
+            extra={
+                "version": snapshot.version,
+                "block": torch_or_numpy_to_int(snapshot.block),
+                "neurons_count": len(snapshot.hotkeys),
+                "elapsed_time_ms": round((time.time() - start_time) * 1000),
+            },
+        )
@@ -3,6 +3,7 @@ from unittest.mock import AsyncMock, MagicMock
 import pytest
 
 from neurons.validator.db.operations import DatabaseOperations
+from neurons.validator.scheduler.task import TaskBacklog
 from neurons.validator.tasks.db_cleaner import DbCleaner
 from neurons.validator.utils.logger.logger import InfiniteGamesLogger
 
@@ -33,3 +34,22 @@ class TestDbCleanerTask:
         # Assert
         db_operations_mock.delete_predictions.assert_awaited_once_with(batch_size)
         logger_mock.debug.assert_called_once_with("Predictions deleted", extra={"deleted_count": 2})
+        assert db_cleaner_task.backlog == TaskBacklog(processed=2, pending=False)
+
+    async def test_db_cleaner_run_full_batch(self, db_operations_mock: AsyncMock):
+        # Prepare mocks
+        db_operations_mock.delete_predictions = AsyncMock(return_value=[1, 2])
+        logger_mock = MagicMock(spec=InfiniteGamesLogger)
+
+        db_cleaner_task = DbCleaner(
+            interval_seconds=1.0,
+            db_operations=db_operations_mock,
+            batch_size=2,
+            logger=logger_mock,
+        )
+
+        # Act
+        await db_cleaner_task.run()
+
+        # Assert predictions left to delete
+        assert db_cleaner_task.backlog == TaskBacklog(processed=2, pending=True)
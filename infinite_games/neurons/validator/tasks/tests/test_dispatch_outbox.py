@@ -0,0 +1,220 @@
+import asyncio
+import json
+import tempfile
+from unittest.mock import AsyncMock, MagicMock
+
+import pytest
+
+from neurons.validator.db.client import DatabaseClient
+from neurons.validator.db.operations import DatabaseOperations
+from neurons.validator.if_games.client import IfGamesClient
+from neurons.validator.models.outbox import OutboxKind
+from neurons.validator.scheduler.task import TaskBacklog
+from neurons.validator.tasks.dispatch_outbox import DispatchOutbox, backoff_delay_seconds
+from neurons.validator.utils.logger.logger import InfiniteGamesLogger
+
+
+class TestDispatchOutbox:
+    @pytest.fixture(scope="function")
+    async def db_client(self):
+        temp_db = tempfile.NamedTemporaryFile(delete=False)
+        db_path = temp_db.name
+        temp_db.close()
+
+        logger = MagicMock(spec=InfiniteGamesLogger)
+
+        db_client = DatabaseClient(db_path, logger)
+
+        await db_client.migrate()
+
+        return db_client
+
+    @pytest.fixture
+    def db_operations(self, db_client: DatabaseClient):
+        logger = MagicMock(spec=InfiniteGamesLogger)
+
+        return DatabaseOperations(db_client=db_client, logger=logger)
+
+    @pytest.fixture
+    def dispatch_outbox_task(self, db_operations: DatabaseOperations):
+        return DispatchOutbox(
+            interval_seconds=60.0,
+            db_operations=db_operations,
+            api_client=AsyncMock(spec=IfGamesClient),
+            logger=MagicMock(spec=InfiniteGamesLogger),
+            batch_size=10,
+            max_concurrency=2,
+            max_attempts=3,
+            base_delay_seconds=30.0,
+            max_delay_seconds=100.0,
+        )
+
+    def test_init_invalid(self, dispatch_outbox_task: DispatchOutbox):
+        kwargs = {
+            "interval_seconds": 60.0,
+            "db_operations": dispatch_outbox_task.db_operations,
+            "api_client": dispatch_outbox_task.api_client,
+            "logger": dispatch_outbox_task.logger,
+        }
+
+        with pytest.raises(ValueError, match="max_concurrency must be a positive integer."):
+            DispatchOutbox(**kwargs, max_concurrency=0)
+
+        with pytest.raises(ValueError, match="max_attempts must be a positive integer."):
+            DispatchOutbox(**kwargs, max_attempts=0)
+
+        with pytest.raises(ValueError, match="max_delay_seconds must be a number"):
+            DispatchOutbox(**kwargs, base_delay_seconds=30.0, max_delay_seconds=10.0)
+
+    @pytest.mark.parametrize(
+        "attempts, rand, expected_delay",
+        [
+            (1, 0.0, 15.0),
+            (1, 1.0, 30.0),
+            (2, 0.5, 45.0),
+            (3, 1.0, 100.0),
+            # Capped
+            (10, 0.0, 50.0),
+        ],
+    )
+    def test_backoff_delay_seconds(self, attempts: int, rand: float, expected_delay: float):
+        delay = backoff_delay_seconds(
+            attempts=attempts,
+            base_delay_seconds=30.0,
+            max_delay_seconds=100.0,
+            rand=lambda: rand,
+        )
+
+        assert delay == expected_delay
+
+    async def test_run_no_messages(self, dispatch_outbox_task: DispatchOutbox):
+        await dispatch_outbox_task.run()
+
+        dispatch_outbox_task.api_client.post_scores.assert_not_called()
+        assert dispatch_outbox_task.backlog == TaskBacklog(processed=0, pending=False)
+
+    async def test_run_delivered(
+        self,
+        dispatch_outbox_task: DispatchOutbox,
+        db_operations: DatabaseOperations,
+        db_client: DatabaseClient,
+    ):
+        unit = dispatch_outbox_task
+
+        in_flight = 0
+        max_in_flight = 0
+
+        async def post(**kwargs):
+            nonlocal in_flight, max_in_flight
+
+            in_flight += 1
+            max_in_flight = max(max_in_flight, in_flight)
+
+            await asyncio.sleep(0.01)
+
+            in_flight -= 1
+
+        unit.api_client.post_predictions.side_effect = post
+        unit.api_client.post_scores.side_effect = post
+
+        predictions = [
+            json.dumps({"submissions": [{"index": index}], "events": None}).encode("utf-8")
+            for index in range(3)
+        ]
+        scores = json.dumps({"results": [{"event_id": "event_id"}]}).encode("utf-8")
+
+        await db_operations.insert_outbox(kind=OutboxKind.PREDICTIONS, payloads=predictions)
+        await db_operations.insert_outbox(kind=OutboxKind.SCORES, payloads=[scores])
+
+        await unit.run()
+
+        # Sent the stored bytes as they are, posts in flight bounded
+        assert [
+            call.kwargs["predictions"] for call in unit.api_client.post_predictions.call_args_list
+        ] == predictions
+        unit.api_client.post_scores.assert_awaited_once_with(scores=scores)
+        assert max_in_flight == 2
+
+        # Acknowledged messages deleted
+        assert await db_client.many("SELECT * FROM outbox") == []
+
+        assert unit.metrics() == {"delivered": 4, "retried": 0, "dead_lettered": 0}
+        assert unit.backlog == TaskBacklog(processed=4, pending=False)
+
+    async def test_run_retried_then_dead_lettered(
+        self,
+        dispatch_outbox_task: DispatchOutbox,
+        db_operations: DatabaseOperations,
+        db_client: DatabaseClient,
+    ):
+        unit = dispatch_outbox_task
+        unit.api_client.post_scores.side_effect = Exception("Simulated failure")
+
+        await db_operations.insert_outbox(kind=OutboxKind.SCORES, payloads=['{"results": []}'])
+
+        await unit.run()
+
+        # Rescheduled with backoff
+        row = await db_client.one(
+            """
+                SELECT
+                    attempts,
+                    last_error,
+                    CAST(strftime('%s', next_attempt_at) AS INTEGER)
+                        - CAST(strftime('%s', CURRENT_TIMESTAMP) AS INTEGER)
+                FROM outbox
+            """
+        )
+
+        assert row[0] == 1
+        assert row[1] == "Exception: Simulated failure"
+        assert 15 <= row[2] <= 31
+
+        # Not due yet
+        await unit.run()
+
+        assert unit.api_client.post_scores.call_count == 1
+
+        # Due again, last attempt
+        await db_client.update(
+            "UPDATE outbox SET next_attempt_at = CURRENT_TIMESTAMP, attempts = 2"
+        )
+
+        await unit.run()
+
+        assert unit.api_client.post_scores.call_count == 2
+        assert await db_client.many("SELECT * FROM outbox") == []
+
+        dead_letters = await db_client.many(
+            "SELECT kind, payload, attempts, last_error FROM outbox_dead_letters"
+        )
+
+        assert dead_letters == [
+            (OutboxKind.SCORES, '{"results": []}', 3, "Exception: Simulated failure")
+        ]
+
+        unit.logger.error.assert_called_once_with(
+            "Outbox message moved to the dead letters.",
+            extra={
+                "id": 1,
+                "kind": OutboxKind.SCORES,
+                "attempts": 3,
+                "error": "Exception: Simulated failure",
+            },
+        )
+        assert unit.metrics() == {"delivered": 0, "retried": 1, "dead_lettered": 1}
+        assert unit.backlog == TaskBacklog(processed=0, pending=False)
+
+    async def test_run_full_batch(
+        self, dispatch_outbox_task: DispatchOutbox, db_operations: DatabaseOperations
+    ):
+        unit = dispatch_outbox_task
+        unit.batch_size = 2
+
+        await db_operations.insert_outbox(kind=OutboxKind.SCORES, payloads=['{"results": []}'] * 3)
+
+        await unit.run()
+
+        # Messages left due
+        assert unit.api_client.post_scores.call_count == 2
+        assert unit.backlog == TaskBacklog(processed=2, pending=True)
@@ -1,3 +1,5 @@
+import asyncio
+import json
 import tempfile
 from datetime import datetime, timezone
 from unittest.mock import AsyncMock, MagicMock
@@ -8,12 +10,14 @@ from bittensor_wallet import Wallet
 from neurons.validator.db.client import DatabaseClient
 from neurons.validator.db.operations import DatabaseOperations
 from neurons.validator.if_games.client import IfGamesClient
+from neurons.validator.models.outbox import OutboxKind
 from neurons.validator.models.prediction import PredictionExportedStatus
 from neurons.validator.tasks.export_predictions import ExportPredictions
 from neurons.validator.utils.common.interval import (
     get_interval_iso_datetime,
     get_interval_start_minutes,
 )
+from neurons.validator.utils.common.json_encoder import encode_json
 from neurons.validator.utils.logger.logger import InfiniteGamesLogger
 
 
@@ -65,6 +69,19 @@ class TestExportPredictions:
             logger=mocked_logger,
         )
 
+    def test_init_invalid_max_concurrent_posts(self, export_predictions_task: ExportPredictions):
+        with pytest.raises(ValueError, match="max_concurrent_posts must be a positive integer."):
+            ExportPredictions(
+                interval_seconds=60.0,
+                db_operations=export_predictions_task.db_operations,
+                api_client=export_predictions_task.api_client,
+                batch_size=1,
+                validator_uid=0,
+                validator_hotkey="validator_hotkey_test",
+                logger=export_predictions_task.logger,
+                max_concurrent_posts=0,
+            )
+
     def test_parse_predictions_for_exporting(self, export_predictions_task: ExportPredictions):
         # Test with a single prediction
         predictions = [
@@ -132,6 +149,7 @@ class TestExportPredictions:
 
         # Mock API client
         export_predictions_task.api_client = AsyncMock(spec=IfGamesClient)
+        export_predictions_task.api_client.encode_body.side_effect = encode_json
 
         events = [
             (
@@ -240,57 +258,61 @@ class TestExportPredictions:
         assert first_call == (
             "__call__",
             {
-                "predictions": {
-                    "events": None,
-                    "submissions": [
-                        {
-                            "unique_event_id": "unique_event_id_1",
-                            "provider_type": "market_1",
-                            "prediction": "1",
-                            "interval_start_minutes": previous_interval_minutes,
-                            "interval_agg_prediction": 1.0,
-                            "interval_agg_count": 1,
-                            "interval_datetime": get_interval_iso_datetime(
-                                previous_interval_minutes
-                            ),
-                            "miner_hotkey": "neuronHotkey_1",
-                            "miner_uid": "neuronUid_1",
-                            "validator_hotkey": "validator_hotkey_test",
-                            "validator_uid": 0,
-                            "title": None,
-                            "outcome": None,
-                            "submitted_at": result[0][1],
-                        }
-                    ],
-                }
+                "predictions": encode_json(
+                    {
+                        "submissions": [
+                            {
+                                "unique_event_id": "unique_event_id_1",
+                                "provider_type": "market_1",
+                                "prediction": "1",
+                                "interval_start_minutes": previous_interval_minutes,
+                                "interval_agg_prediction": 1.0,
+                                "interval_agg_count": 1,
+                                "interval_datetime": get_interval_iso_datetime(
+                                    previous_interval_minutes
+                                ),
+                                "miner_hotkey": "neuronHotkey_1",
+                                "miner_uid": "neuronUid_1",
+                                "validator_hotkey": "validator_hotkey_test",
+                                "validator_uid": 0,
+                                "title": None,
+                                "outcome": None,
+                                "submitted_at": result[0][1],
+                            }
+                        ],
+                        "events": None,
+                    }
+                ),
             },
         )
         assert second_call == (
             "__call__",
             {
-                "predictions": {
-                    "events": None,
-                    "submissions": [
-                        {
-                            "unique_event_id": "unique_event_id_2",
-                            "provider_type": "market_2",
-                            "prediction": "1",
-                            "interval_start_minutes": previous_interval_minutes,
-                            "interval_agg_prediction": 1.0,
-                            "interval_agg_count": 1,
-                            "interval_datetime": get_interval_iso_datetime(
-                                previous_interval_minutes
-                            ),
-                            "miner_hotkey": "neuronHotkey_2",
-                            "miner_uid": "neuronUid_2",
-                            "validator_hotkey": "validator_hotkey_test",
-                            "validator_uid": 0,
-                            "title": None,
-                            "outcome": None,
-                            "submitted_at": result[1][1],
-                        }
-                    ],
-                }
+                "predictions": encode_json(
+                    {
+                        "submissions": [
+                            {
+                                "unique_event_id": "unique_event_id_2",
+                                "provider_type": "market_2",
+                                "prediction": "1",
+                                "interval_start_minutes": previous_interval_minutes,
+                                "interval_agg_prediction": 1.0,
+                                "interval_agg_count": 1,
+                                "interval_datetime": get_interval_iso_datetime(
+                                    previous_interval_minutes
+                                ),
+                                "miner_hotkey": "neuronHotkey_2",
+                                "miner_uid": "neuronUid_2",
+                                "validator_hotkey": "validator_hotkey_test",
+                                "validator_uid": 0,
+                                "title": None,
+                                "outcome": None,
+                                "submitted_at": result[1][1],
+                            }
+                        ],
+                        "events": None,
+                    }
+                ),
             },
         )
 
@@ -302,9 +324,184 @@ class TestExportPredictions:
     async def test_run_no_predictions(self, export_predictions_task: ExportPredictions):
         # Mock API client
         export_predictions_task.api_client = AsyncMock(spec=IfGamesClient)
+        export_predictions_task.api_client.encode_body.side_effect = encode_json
 
         # Act
         await export_predictions_task.run()
 
         # Assert
         export_predictions_task.api_client.post_predictions.assert_not_called()
+
+    async def test_run_post_failed(
+        self,
+        db_client: DatabaseClient,
+        db_operations: DatabaseOperations,
+        export_predictions_task: ExportPredictions,
+    ):
+        # Mock API client
+        export_predictions_task.api_client = AsyncMock(spec=IfGamesClient)
+        export_predictions_task.api_client.encode_body.side_effect = encode_json
+        export_predictions_task.api_client.post_predictions.side_effect = Exception(
+            "Simulated failure"
+        )
+
+        events = [
+            (
+                f"unique_event_id_{index}",
+                f"event_{index}",
+                "truncated_market",
+                "market",
+                "desc",
+                "2024-12-02",
+                "2024-12-03",
+                "outcome",
+                "status",
+                '{"key": "value"}',
+                "2000-12-02T14:30:00+00:00",
+                "2000-12-02T14:30:00+00:00",
+                "2000-12-03T14:30:00+00:00",
+            )
+            for index in range(2)
+        ]
+
+        previous_interval_minutes = get_interval_start_minutes() - 1
+
+        predictions = [
+            (
+                f"unique_event_id_{index}",
+                f"neuronHotkey_{index}",
+                f"neuronUid_{index}",
+                "1",
+                previous_interval_minutes,
+                "1",
+                1,
+                "1",
+            )
+            for index in range(2)
+        ]
+
+        await db_operations.upsert_events(events=events)
+        await db_operations.upsert_predictions(predictions=predictions)
+
+        # Act
+        await export_predictions_task.run()
+
+        # Next batches not posted once a post failed
+        assert export_predictions_task.api_client.post_predictions.call_count == 1
+
+        export_predictions_task.logger.exception.assert_called_once_with(
+            "Failed to export predictions.", extra={"n_predictions": 1}
+        )
+
+        # Payloads handed to the outbox, predictions marked exported
+        outbox = await db_client.many("SELECT kind, payload FROM outbox ORDER BY id")
+
+        assert [kind for kind, _ in outbox] == [OutboxKind.PREDICTIONS] * 2
+        assert [
+            json.loads(payload)["submissions"][0]["unique_event_id"] for _, payload in outbox
+        ] == ["unique_event_id_0", "unique_event_id_1"]
+
+        result = await db_client.many("SELECT exported FROM predictions")
+
+        assert result == [(PredictionExportedStatus.EXPORTED,)] * 2
+
+    async def test_run_pipelined(
+        self,
+        db_client: DatabaseClient,
+        db_operations: DatabaseOperations,
+        export_predictions_task: ExportPredictions,
+    ):
+        unit = export_predictions_task
+        unit.batch_size = 2
+        unit.max_concurrent_posts = 2
+
+        unit.api_client = AsyncMock(spec=IfGamesClient)
+        unit.api_client.encode_body.side_effect = encode_json
+
+        in_flight = 0
+        max_in_flight = 0
+        reads_during_posts = 0
+
+        async def post_predictions(predictions: bytes):
+            nonlocal in_flight, max_in_flight
+
+            in_flight += 1
+            max_in_flight = max(max_in_flight, in_flight)
+
+            await asyncio.sleep(0.02)
+
+            in_flight -= 1
+
+        unit.api_client.post_predictions.side_effect = post_predictions
+
+        get_predictions_to_export = db_operations.get_predictions_to_export
+
+        async def get_predictions_to_export_spy(**kwargs):
+            nonlocal reads_during_posts
+
+            if in_flight > 0:
+                reads_during_posts += 1
+
+            return await get_predictions_to_export(**kwargs)
+
+        unit.db_operations = MagicMock(wraps=db_operations)
+        unit.db_operations.get_predictions_to_export = get_predictions_to_export_spy
+
+        events = [
+            (
+                f"unique_event_id_{index}",
+                f"event_{index}",
+                "truncated_market",
+                "market",
+                "desc",
+                "2024-12-02",
+                "2024-12-03",
+                "outcome",
+                "status",
+                '{"key": "value"}',
+                "2000-12-02T14:30:00+00:00",
+                "2000-12-02T14:30:00+00:00",
+                "2000-12-03T14:30:00+00:00",
+            )
+            for index in range(9)
+        ]
+
+        previous_interval_minutes = get_interval_start_minutes() - 1
+
+        predictions = [
+            (
+                f"unique_event_id_{index}",
+                f"neuronHotkey_{index}",
+                f"neuronUid_{index}",
+                "1",
+                previous_interval_minutes,
+                "1",
+                1,
+                "1",
+            )
+            for index in range(9)
+        ]
+
+        await db_operations.upsert_events(events=events)
+        await db_operations.upsert_predictions(predictions=predictions)
+
+        await unit.run()
+
+        # 5 batches posted, the next batches read while the previous ones are posted
+        posted = [
+            [
+                submission["unique_event_id"]
+                for submission in json.loads(call.kwargs["predictions"])["submissions"]
+            ]
+            for call in unit.api_client.post_predictions.call_args_list
+        ]
+
+        assert sorted(sum(posted, [])) == [f"unique_event_id_{index}" for index in range(9)]
+        assert len(posted) == 5
+        assert max_in_flight == 2
+        assert reads_during_posts > 0
+
+        result = await db_client.many("SELECT exported FROM predictions")
+
+        assert result == [(PredictionExportedStatus.EXPORTED,)] * 9
+        assert await db_client.many("SELECT * FROM outbox") == []
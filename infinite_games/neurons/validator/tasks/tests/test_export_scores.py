@@ -1,3 +1,4 @@
+import asyncio
 import json
 import tempfile
 from datetime import datetime, timezone
@@ -13,7 +14,9 @@ from neurons.validator.db.operations import DatabaseOperations
 from neurons.validator.if_games.client import IfGamesClient
 from neurons.validator.models.backend_models import MinerEventResult, MinerEventResultItems
 from neurons.validator.models.event import EventsModel, EventStatus
+from neurons.validator.models.outbox import OutboxKind
 from neurons.validator.models.score import ScoresModel
+from neurons.validator.scheduler.task import TaskBacklog
 from neurons.validator.tasks.export_scores import ExportScores
 from neurons.validator.tasks.pull_events import TITLE_SEPARATOR
 from neurons.validator.utils.logger.logger import InfiniteGamesLogger
@@ -107,6 +110,8 @@ class TestExportScores:
         assert unit.errors_count == 0
         assert unit.validator_uid == 2
         assert unit.validator_hotkey == "hotkey2"
+        assert unit.max_scores_per_payload == 1000
+        assert unit.max_concurrent_posts == 4
 
     def test_prepare_scores_payload_success(
         self, export_scores_task: ExportScores, sample_event: EventsModel
@@ -252,23 +257,24 @@ class TestExportScores:
         unit.api_client.post_scores = AsyncMock(return_value=True)
 
         dummy_payload = {"results": [{"event_id": "event_export", "score": 1}]}
-        await export_scores_task.export_scores_to_backend(dummy_payload)
+        dummy_body = json.dumps(dummy_payload).encode("utf-8")
+        await export_scores_task.export_scores_to_backend(payload=dummy_payload, body=dummy_body)
         export_scores_task.logger.debug.assert_called_with(
             "Exported scores.",
-            extra={
-                "event_id": dummy_payload["results"][0]["event_id"],
-                "n_scores": len(dummy_payload["results"]),
-            },
+            extra={"n_events": 1, "n_scores": len(dummy_payload["results"])},
         )
 
         assert export_scores_task.errors_count == 0
         assert unit.api_client.post_scores.call_count == 1
-        assert unit.api_client.post_scores.call_args.kwargs["scores"] == dummy_payload
+        # Body posted as encoded
+        assert unit.api_client.post_scores.call_args.kwargs["scores"] == dummy_body
 
         # mock with side effect
         unit.api_client.post_scores = AsyncMock(side_effect=Exception("Simulated failure"))
         with pytest.raises(Exception):
-            await export_scores_task.export_scores_to_backend(dummy_payload)
+            await export_scores_task.export_scores_to_backend(
+                payload=dummy_payload, body=dummy_body
+            )
 
         assert unit.api_client.post_scores.call_count == 1
 
@@ -282,6 +288,7 @@ class TestExportScores:
         await export_scores_task.run()
         export_scores_task.logger.debug.assert_any_call("No peer scored events to export scores.")
         assert export_scores_task.errors_count == 0
+        assert export_scores_task.backlog == TaskBacklog(processed=0, pending=False)
 
     @pytest.mark.asyncio
     async def test_run_no_peer_scores_for_event(
@@ -311,7 +318,9 @@ class TestExportScores:
                 1,
             ],
         )
-        unit.db_operations.get_peer_scores_for_export = AsyncMock(return_value=[])
+        unit.db_operations.get_peer_scores_for_export_batch = AsyncMock(
+            return_value={event.event_id: []}
+        )
 
         await unit.run()
         unit.logger.warning.assert_called_with(
@@ -396,11 +405,66 @@ class TestExportScores:
         await unit.run()
         unit.logger.exception.assert_called_with(
             "Failed to export scores.",
-            extra={"event_id": event.event_id},
+            extra={"event_ids": [event.event_id]},
         )
         assert unit.logger.debug.call_args_list[1][0][0] == "Export scores task completed."
         assert unit.logger.debug.call_args_list[1][1]["extra"] == {"errors_count": 1}
 
+        # Payload stored once in the outbox, not rebuilt by the next runs
+        outbox = await db_client.many("SELECT kind, payload FROM outbox")
+
+        assert len(outbox) == 1
+        assert outbox[0][0] == OutboxKind.SCORES
+        # The very bytes posted
+        assert outbox[0][1] == unit.api_client.post_scores.call_args.kwargs["scores"]
+
+        assert await db_client.many("SELECT exported FROM events") == [(1,)]
+        assert await db_client.many("SELECT exported FROM scores") == [(1,)]
+
+    @pytest.mark.asyncio
+    async def test_run_mark_exported_atomic(
+        self,
+        export_scores_task: ExportScores,
+        db_operations: DatabaseOperations,
+        db_client: DatabaseClient,
+        sample_event: EventsModel,
+    ):
+        unit = export_scores_task
+        unit.api_client.post_scores = AsyncMock(return_value=True)
+
+        event = sample_event
+        await db_operations.upsert_pydantic_events([event])
+
+        score = ScoresModel(
+            event_id=event.event_id,
+            miner_uid=2,
+            miner_hotkey="hk2",
+            prediction=0.75,
+            event_score=0.80,
+            spec_version=1,
+        )
+
+        await db_operations.insert_peer_scores([score])
+        await db_client.update(
+            "UPDATE scores SET processed = ?, metagraph_score = ?, other_data = ?",
+            [1, 1.0, '{"extra": "data"}'],
+        )
+
+        # Event update fails after the scores are marked as exported
+        db_operations.mark_events_as_exported = AsyncMock(
+            side_effect=Exception("Simulated failure")
+        )
+
+        with pytest.raises(Exception, match="Simulated failure"):
+            await unit.run()
+
+        # Scores update is rolled back with the failed event update
+        updated_scores = await db_client.many("SELECT exported FROM scores")
+        assert updated_scores == [(0,)]
+
+        updated_events = await db_client.many("SELECT exported FROM events")
+        assert updated_events == [(0,)]
+
     @pytest.mark.asyncio
     async def test_run_e2e(
         self,
@@ -472,4 +536,154 @@ class TestExportScores:
             "Export scores task completed.", extra={"errors_count": 0}
         )
 
-        assert unit.api_client.post_scores.call_count == 2
+        # Scores of both events in one payload
+        assert unit.api_client.post_scores.call_count == 1
+        assert (
+            len(json.loads(unit.api_client.post_scores.call_args.kwargs["scores"])["results"]) == 3
+        )
+        assert unit.backlog == TaskBacklog(processed=2, pending=False)
+
+    async def test_run_batches(
+        self,
+        export_scores_task: ExportScores,
+        db_operations: DatabaseOperations,
+        db_client: DatabaseClient,
+        sample_event: EventsModel,
+    ):
+        unit = export_scores_task
+        unit.max_scores_per_payload = 4
+        unit.max_concurrent_posts = 2
+
+        in_flight = 0
+        max_in_flight = 0
+
+        async def post_scores(scores: bytes):
+            nonlocal in_flight, max_in_flight
+
+            in_flight += 1
+            max_in_flight = max(max_in_flight, in_flight)
+
+            await asyncio.sleep(0.01)
+
+            in_flight -= 1
+
+            # Batch with the last event not acknowledged
+            if any(result["event_id"] == "event_id_5" for result in json.loads(scores)["results"]):
+                raise Exception("Simulated failure")
+
+        unit.api_client.post_scores = AsyncMock(side_effect=post_scores)
+
+        # 6 events of 2 scores each, the last of 5 scores
+        events = []
+        scores = []
+
+        for i in range(6):
+            event = sample_event.model_copy(deep=True)
+            event.event_id = f"event_id_{i}"
+            event.unique_event_id = f"unique_event_id_{i}"
+            events.append(event)
+
+            scores += [
+                ScoresModel(
+                    event_id=event.event_id,
+                    miner_uid=miner_uid,
+                    miner_hotkey=f"hk{miner_uid}",
+                    prediction=0.75,
+                    event_score=0.80,
+                    spec_version=1,
+                )
+                for miner_uid in range(5 if i == 5 else 2)
+            ]
+
+        await db_operations.upsert_pydantic_events(events)
+        await db_operations.insert_peer_scores(scores)
+        await db_client.update("UPDATE scores SET processed = ?, metagraph_score = ?", [1, 1.0])
+
+        await unit.run()
+
+        # Events packed up to 4 scores, the event above the cap alone
+        posted = [
+            [result["event_id"] for result in json.loads(call.kwargs["scores"])["results"]]
+            for call in unit.api_client.post_scores.call_args_list
+        ]
+
+        assert sorted(posted) == sorted(
+            [
+                ["event_id_0"] * 2 + ["event_id_1"] * 2,
+                ["event_id_2"] * 2 + ["event_id_3"] * 2,
+                ["event_id_4"] * 2,
+                ["event_id_5"] * 5,
+            ]
+        )
+        assert max_in_flight == 2
+
+        # All batches marked exported
+        exported_events = await db_client.many(
+            "SELECT event_id FROM events WHERE exported = true ORDER BY event_id"
+        )
+        assert exported_events == [(f"event_id_{i}",) for i in range(6)]
+
+        exported_scores = await db_client.many(
+            "SELECT DISTINCT event_id FROM scores WHERE exported = 1 ORDER BY event_id"
+        )
+        assert exported_scores == exported_events
+
+        # Batch not acknowledged handed to the outbox
+        unit.logger.exception.assert_called_once_with(
+            "Failed to export scores.", extra={"event_ids": ["event_id_5"]}
+        )
+
+        outbox = await db_operations.get_outbox_due(limit=10)
+
+        assert len(outbox) == 1
+        assert outbox[0].kind == OutboxKind.SCORES
+        assert [result["event_id"] for result in json.loads(outbox[0].payload)["results"]] == [
+            "event_id_5"
+        ] * 5
+
+        assert unit.backlog == TaskBacklog(processed=6, pending=False)
+
+    def test_init_invalid_batching(self, export_scores_task: ExportScores):
+        unit = export_scores_task
+
+        kwargs = {
+            "interval_seconds": 60.0,
+            "page_size": 100,
+            "db_operations": unit.db_operations,
+            "api_client": unit.api_client,
+            "logger": unit.logger,
+            "validator_uid": 2,
+            "validator_hotkey": "hotkey2",
+        }
+
+        with pytest.raises(ValueError, match="max_scores_per_payload must be a positive integer."):
+            ExportScores(**kwargs, max_scores_per_payload=0)
+
+        with pytest.raises(ValueError, match="max_concurrent_posts must be a positive integer."):
+            ExportScores(**kwargs, max_concurrent_posts=0)
+
+    def test_observe_resolve_to_score_latency(
+        self, export_scores_task: ExportScores, sample_event: EventsModel
+    ):
+        unit = export_scores_task
+
+        # Not resolved
+        unit.observe_resolve_to_score_latency(event=sample_event)
+
+        assert unit.resolve_to_score_latency.count == 0
+
+        with freeze_time("2025-01-02 05:00:00"):
+            sample_event.resolved_at = datetime(2025, 1, 2, 4, 30, 0, tzinfo=timezone.utc)
+            unit.observe_resolve_to_score_latency(event=sample_event)
+
+            # Naive datetimes are UTC
+            sample_event.resolved_at = datetime(2025, 1, 2, 3, 0, 0)
+            unit.observe_resolve_to_score_latency(event=sample_event)
+
+        metrics = unit.metrics()["resolve_to_score_latency_seconds"]
+
+        assert metrics["count"] == 2
+        assert metrics["p50"] == 1800.0
+        assert metrics["max"] == 7200.0
+        assert metrics["buckets"]["1800.0"] == 1
+        assert metrics["buckets"]["7200.0"] == 1
@@ -8,6 +8,7 @@ from freezegun import freeze_time
 from neurons.validator.db.client import DatabaseClient
 from neurons.validator.db.operations import DatabaseOperations
 from neurons.validator.models.score import SCORE_FIELDS, ScoresModel
+from neurons.validator.scheduler.task import TaskBacklog
 from neurons.validator.tasks.metagraph_scoring import MOVING_AVERAGE_EVENTS, MetagraphScoring
 from neurons.validator.utils.logger.logger import InfiniteGamesLogger
 
@@ -636,8 +637,8 @@ class TestMetagraphScoring:
 
         # run the task
         if "exception" in log_calls:
-            # Mock the set_metagraph_peer_scores method to return non empty list
-            db_operations.set_metagraph_peer_scores = AsyncMock(return_value=[100])
+            # Mock the set_metagraph_peer_scores_incremental method to return non empty list
+            db_operations.set_metagraph_peer_scores_incremental = AsyncMock(return_value=[100])
 
         await metagraph_scoring_task.run()
         updated_scores = await db_client.many("SELECT * FROM scores", use_row_factory=True)
@@ -686,3 +687,36 @@ class TestMetagraphScoring:
             for i, updated in enumerate(updated_scores):
                 assert updated["metagraph_score"] is None
                 assert updated["other_data"] is None
+
+    @pytest.mark.parametrize(
+        "n_events,results,expected_backlog",
+        [
+            # No events
+            (0, [], TaskBacklog(processed=0, pending=False)),
+            # Last page
+            (2, [[], []], TaskBacklog(processed=2, pending=False)),
+            # Full page, events left
+            (3, [[], [100], []], TaskBacklog(processed=2, pending=True)),
+            # Full page of events erroring, not re-run
+            (3, [[100], [100], [100]], TaskBacklog(processed=0, pending=False)),
+        ],
+    )
+    async def test_run_backlog(
+        self,
+        metagraph_scoring_task: MetagraphScoring,
+        db_operations: DatabaseOperations,
+        n_events: int,
+        results: list,
+        expected_backlog: TaskBacklog,
+    ):
+        unit = metagraph_scoring_task
+        unit.page_size = 3
+
+        db_operations.get_events_for_metagraph_scoring = AsyncMock(
+            return_value=[{"event_id": f"event_id_{index}"} for index in range(n_events)]
+        )
+        db_operations.set_metagraph_peer_scores_incremental = AsyncMock(side_effect=results)
+
+        await unit.run()
+
+        assert unit.backlog == expected_backlog
@@ -1,6 +1,8 @@
 import copy
 import math
+import multiprocessing
 import tempfile
+from concurrent.futures import ProcessPoolExecutor
 from datetime import datetime, timezone
 from unittest.mock import AsyncMock, MagicMock, patch
 
@@ -17,7 +19,11 @@ from neurons.validator.db.operations import DatabaseOperations
 from neurons.validator.models.event import EventsModel, EventStatus
 from neurons.validator.models.miner import MinersModel
 from neurons.validator.models.prediction import PredictionsModel
-from neurons.validator.tasks.peer_scoring import CLIP_EPS, PeerScoring, PSNames
+from neurons.validator.scheduler.task import TaskBacklog
+from neurons.validator.scoring.peer_scoring_engine import CLIP_EPS
+from neurons.validator.tasks.peer_scoring import PeerScoresBatch, PeerScoring, PSNames
+from neurons.validator.tasks.sync_metagraph import MetagraphSnapshot, SyncMetagraph
+from neurons.validator.utils.common.converters import pydantic_models_to_dataframe
 from neurons.validator.utils.common.interval import (
     AGGREGATION_INTERVAL_LENGTH_MINUTES,
     align_to_interval,
@@ -103,6 +109,32 @@ class TestPeerScoring:
         assert unit.current_uids.tolist() == [1, 2, 3, 4]
         assert unit.n_hotkeys == 4
 
+    def test_metagraph_lite_sync_snapshot(self, peer_scoring_task: PeerScoring):
+        unit = peer_scoring_task
+        unit.metagraph.sync.reset_mock()
+
+        unit.metagraph_sync = MagicMock(spec=SyncMetagraph)
+        unit.metagraph_sync.snapshot = MetagraphSnapshot(
+            version=2,
+            block=torch.tensor(100),
+            n=torch.tensor(2),
+            hotkeys=("hotkey1", "hotkey4"),
+            uids=torch.tensor([1, 4], dtype=torch.int32),
+            axons=(),
+            validator_trust=torch.zeros(2),
+            validator_permit=torch.zeros(2),
+            miners_df=pd.DataFrame({"miner_hotkey": ["hotkey1", "hotkey4"], "miner_uid": [1, 4]}),
+        )
+
+        unit.metagraph_lite_sync()
+
+        # Shared snapshot read, metagraph not synced
+        unit.metagraph.sync.assert_not_called()
+        assert unit.current_miners_df is unit.metagraph_sync.snapshot.miners_df
+        assert unit.current_hotkeys == ["hotkey1", "hotkey4"]
+        assert unit.current_uids.tolist() == [1, 4]
+        assert unit.n_hotkeys == 2
+
     @pytest.mark.asyncio
     @pytest.mark.parametrize(
         "db_rows, current_miners_df, expected_result, expected_log",
@@ -249,25 +281,6 @@ class TestPeerScoring:
         assert list(intervals_df.columns) == expected_columns
         assert intervals_df.empty
 
-    def test_reverse_exponential_weight_decay(self, peer_scoring_task: PeerScoring):
-        n_intervals = 1
-        weight = peer_scoring_task.reverse_exponential_weight(0, n_intervals)
-        assert weight == 1
-
-        n_intervals = 2
-        for idx in range(n_intervals):
-            weight = peer_scoring_task.reverse_exponential_weight(idx, n_intervals)
-            assert weight == 1
-
-        n_intervals = 10
-        for idx in [0, 1]:
-            weight = peer_scoring_task.reverse_exponential_weight(idx, n_intervals)
-            assert weight == 1
-        for idx in range(2, n_intervals):
-            expected_weight = math.exp(-(n_intervals / (n_intervals - idx)) + 1)
-            weight = peer_scoring_task.reverse_exponential_weight(idx, n_intervals)
-            np.testing.assert_almost_equal(weight, expected_weight)
-
     def test_get_intervals_df_success(self, peer_scoring_task: PeerScoring):
         unit = peer_scoring_task
         event_registered_start_minutes = 0
@@ -338,7 +351,9 @@ class TestPeerScoring:
             }
         )
 
-        result_df = peer_scoring_task.prepare_predictions_df(predictions, miners)
+        result_df = peer_scoring_task.prepare_predictions_df(
+            pydantic_models_to_dataframe(predictions), miners
+        )
         assert result_df.shape[0] == miners.shape[0]
         assert PSNames.interval_agg_prediction in result_df.columns
         assert result_df[PSNames.interval_agg_prediction].isna().all()
@@ -367,7 +382,9 @@ class TestPeerScoring:
                 PSNames.miner_hotkey: ["hotkey1", "hotkey2"],
             }
         )
-        result_df = peer_scoring_task.prepare_predictions_df(predictions, miners)
+        result_df = peer_scoring_task.prepare_predictions_df(
+            pydantic_models_to_dataframe(predictions), miners
+        )
         assert result_df.shape[0] == 2
 
         row1 = result_df[result_df[PSNames.miner_uid] == 1].iloc[0]
@@ -380,90 +397,6 @@ class TestPeerScoring:
         row2 = result_df[result_df[PSNames.miner_uid] == 2].iloc[0]
         assert pd.isna(row2[PSNames.interval_agg_prediction])
 
-    @pytest.mark.parametrize(
-        "predictions_data, expected_value",
-        [
-            # Case 1: No predictions for any miner.
-            (
-                [
-                    {
-                        PSNames.miner_uid: 1,
-                        PSNames.miner_hotkey: "hotkey1",
-                        PSNames.interval_start: 100240,
-                        PSNames.interval_agg_prediction: pd.NA,
-                    }
-                ],
-                None,
-            ),
-            # Case 2: Predictions list with a valid prediction for miner 1 at interval_start 100.
-            (
-                [
-                    {
-                        PSNames.miner_uid: 1,
-                        PSNames.miner_hotkey: "hotkey1",
-                        PSNames.interval_start: 100480,
-                        PSNames.interval_agg_prediction: 0.8,
-                    }
-                ],
-                0.8,
-            ),
-        ],
-    )
-    def test_get_interval_scores_base_parametrized(
-        self, peer_scoring_task: PeerScoring, predictions_data, expected_value
-    ):
-        miners = pd.DataFrame(
-            {
-                PSNames.miner_uid: [1, 2],
-                PSNames.miner_hotkey: ["hotkey1", "hotkey2"],
-                PSNames.miner_registered_minutes: [100, 200],
-            }
-        )
-
-        intervals = pd.DataFrame(
-            {
-                PSNames.interval_idx: [0, 1],
-                PSNames.interval_start: [100240, 100480],
-                PSNames.interval_end: [100480, 100720],
-                PSNames.weight: [0.8, 0.5],
-            }
-        )
-        predictions_df = pd.DataFrame(predictions_data)
-
-        result_df = peer_scoring_task.get_interval_scores_base(predictions_df, miners, intervals)
-        assert result_df.shape[0] == 4
-        assert result_df.columns.to_list() == [
-            PSNames.miner_uid,
-            PSNames.miner_hotkey,
-            PSNames.miner_registered_minutes,
-            PSNames.interval_idx,
-            PSNames.interval_start,
-            PSNames.interval_end,
-            PSNames.weight,
-            PSNames.interval_agg_prediction,
-        ]
-
-        if expected_value is None:
-            assert result_df[PSNames.interval_agg_prediction].isna().all()
-        else:
-            row = result_df[
-                (result_df[PSNames.miner_uid] == 1)
-                & (result_df[PSNames.miner_hotkey] == "hotkey1")
-                & (result_df[PSNames.interval_start] == 100480)
-            ]
-            assert not row.empty
-            np.testing.assert_almost_equal(
-                row.iloc[0][PSNames.interval_agg_prediction], expected_value
-            )
-
-            row_other = result_df[
-                (result_df[PSNames.miner_uid] == 2)
-                & (result_df[PSNames.miner_hotkey] == "hotkey2")
-                & (result_df[PSNames.interval_start] == 100240)
-            ]
-            assert not row_other.empty
-            assert pd.isna(row_other.iloc[0][PSNames.interval_agg_prediction])
-
     def test_return_empty_scores_df(self, peer_scoring_task: PeerScoring):
         unit = peer_scoring_task
         df = unit.return_empty_scores_df("test", "event_id")
@@ -476,587 +409,6 @@ class TestPeerScoring:
         assert PSNames.rema_prediction in df.columns
         assert PSNames.rema_peer_score in df.columns
 
-    @pytest.mark.parametrize(
-        "outcome, prediction, expected_ls",
-        [
-            (1, 0.01, np.log(0.01)),
-            (1, 0.5, np.log(0.5)),
-            (1, 0.99, np.log(0.99)),
-            (0, 0.01, np.log(1 - 0.01)),
-            (0, 0.5, np.log(1 - 0.5)),
-            (0, 0.99, np.log(1 - 0.99)),
-        ],
-    )
-    def test_log_score_and_inverse_log_score_with_expected_ls(
-        self, outcome, prediction, expected_ls
-    ):
-        ls = PeerScoring.log_score(prediction, outcome)
-        np.testing.assert_allclose(
-            ls,
-            expected_ls,
-            rtol=1e-5,
-            atol=1e-8,
-            err_msg=f"log_score incorrect for outcome={outcome} prediction={prediction}",
-        )
-
-        recovered_prediction = PeerScoring.inverse_log_score(ls, outcome)
-        np.testing.assert_allclose(
-            recovered_prediction,
-            prediction,
-            rtol=1e-5,
-            atol=1e-8,
-            err_msg=f"Failed for outcome {outcome} with prediction {prediction}",
-        )
-
-    def test_fill_unresponsive_miners_outcome_1(self, peer_scoring_task: PeerScoring):
-        df = pd.DataFrame(
-            {
-                PSNames.miner_uid: [1, 2],
-                PSNames.miner_registered_minutes: [50, 50],
-                PSNames.interval_start: [100, 100],
-                PSNames.interval_agg_prediction: [pd.NA, 0.8],
-                PSNames.interval_idx: [0, 0],
-                PSNames.weight: [1, 1],
-            }
-        )
-        # For outcome_round == 1, wrong_outcome = 1 - abs(1 - CLIP_EPS).
-        # Assuming CLIP_EPS = 0.01 then wrong_outcome = 0.01.
-        # Since there is one responsive miner with 0.8, group mean = 0.8 and worst (min) = 0.8.
-        # Thus, imputed = 0.8 + (0.8 - 0.8) * UPTIME_PENALTY_DISTANCE = 0.8.
-        result_df = peer_scoring_task.fill_unresponsive_miners(df, outcome_round=1)
-        np.testing.assert_allclose(
-            result_df.loc[result_df[PSNames.miner_uid] == 1, PSNames.interval_agg_prediction].iloc[
-                0
-            ],
-            0.8,
-            rtol=1e-5,
-            err_msg="Unresponsive miner was not imputed correctly for outcome_round 1",
-        )
-        np.testing.assert_allclose(
-            result_df.loc[result_df[PSNames.miner_uid] == 2, PSNames.interval_agg_prediction].iloc[
-                0
-            ],
-            0.8,
-            rtol=1e-5,
-            err_msg="Responsive miner's prediction was altered for outcome_round 1",
-        )
-
-    def test_fill_unresponsive_miners_no_responsive(self, peer_scoring_task: PeerScoring):
-        df = pd.DataFrame(
-            {
-                PSNames.miner_uid: [1, 2],
-                PSNames.miner_registered_minutes: [50, 50],
-                PSNames.interval_start: [100, 100],
-                PSNames.interval_agg_prediction: [pd.NA, pd.NA],
-                PSNames.interval_idx: [0, 0],
-                PSNames.weight: [1, 1],
-            }
-        )
-        expected_wrong = 1 - abs(1 - CLIP_EPS)
-        result_df = peer_scoring_task.fill_unresponsive_miners(df, outcome_round=1)
-        for uid in [1, 2]:
-            np.testing.assert_allclose(
-                result_df.loc[
-                    result_df[PSNames.miner_uid] == uid, PSNames.interval_agg_prediction
-                ].iloc[0],
-                expected_wrong,
-                rtol=1e-5,
-                err_msg=f"Miner {uid} in an interval with no responsive miners was not imputed to wrong_outcome",
-            )
-
-    def test_fill_unresponsive_miners_outcome_0(self, peer_scoring_task: PeerScoring):
-        df = pd.DataFrame(
-            {
-                PSNames.miner_uid: [1, 2],
-                PSNames.miner_registered_minutes: [50, 50],
-                PSNames.interval_start: [100, 100],
-                PSNames.interval_agg_prediction: [pd.NA, 0.2],
-                PSNames.interval_idx: [0, 0],
-                PSNames.weight: [1, 1],
-            }
-        )
-        # For outcome_round == 0, wrong_outcome = 1 - abs(0 - CLIP_EPS) = 1 - CLIP_EPS.
-        # With CLIP_EPS = 0.01, wrong_outcome = 0.99.
-        # With one responsive miner (0.2), group mean = 0.2 and worst (max) = 0.2,
-        # so imputed = 0.2 + (0.2 - 0.2) * UPTIME_PENALTY_DISTANCE = 0.2.
-        result_df = peer_scoring_task.fill_unresponsive_miners(df, outcome_round=0)
-        np.testing.assert_allclose(
-            result_df.loc[result_df[PSNames.miner_uid] == 1, PSNames.interval_agg_prediction].iloc[
-                0
-            ],
-            0.2,
-            rtol=1e-5,
-            err_msg="Unresponsive miner was not imputed correctly for outcome_round 0",
-        )
-        np.testing.assert_allclose(
-            result_df.loc[result_df[PSNames.miner_uid] == 2, PSNames.interval_agg_prediction].iloc[
-                0
-            ],
-            0.2,
-            rtol=1e-5,
-            err_msg="Responsive miner's prediction was altered for outcome_round 0",
-        )
-
-    def test_fill_unresponsive_miners_multiple_intervals(self, peer_scoring_task: PeerScoring):
-        # Create DataFrame with two intervals.
-        # Interval 0: one miner missing prediction, one responsive with 0.8.
-        # Interval 1: one responsive miner with 0.6 and one missing.
-        df = pd.DataFrame(
-            {
-                PSNames.miner_uid: [1, 2, 3, 4],
-                PSNames.miner_registered_minutes: [50, 50, 150, 150],
-                PSNames.interval_start: [100, 100, 200, 200],
-                PSNames.interval_agg_prediction: [pd.NA, 0.8, 0.6, pd.NA],
-                PSNames.interval_idx: [0, 0, 1, 1],
-                PSNames.weight: [1, 1, 1, 1],
-            }
-        )
-        # For outcome_round == 1:
-        # - Interval 0: group mean = 0.8, worst (min) = 0.8, so imputed = 0.8.
-        # - Interval 1: group mean = 0.6, worst (min) = 0.6, so imputed = 0.6.
-        result_df = peer_scoring_task.fill_unresponsive_miners(df, outcome_round=1)
-        np.testing.assert_allclose(
-            result_df.loc[result_df[PSNames.miner_uid] == 1, PSNames.interval_agg_prediction].iloc[
-                0
-            ],
-            0.8,
-            rtol=1e-5,
-            err_msg="Interval 0 unresponsive miner was not imputed correctly.",
-        )
-        np.testing.assert_allclose(
-            result_df.loc[result_df[PSNames.miner_uid] == 2, PSNames.interval_agg_prediction].iloc[
-                0
-            ],
-            0.8,
-            rtol=1e-5,
-            err_msg="Interval 0 responsive miner was altered.",
-        )
-        np.testing.assert_allclose(
-            result_df.loc[result_df[PSNames.miner_uid] == 3, PSNames.interval_agg_prediction].iloc[
-                0
-            ],
-            0.6,
-            rtol=1e-5,
-            err_msg="Interval 1 responsive miner was altered.",
-        )
-        np.testing.assert_allclose(
-            result_df.loc[result_df[PSNames.miner_uid] == 4, PSNames.interval_agg_prediction].iloc[
-                0
-            ],
-            0.6,
-            rtol=1e-5,
-            err_msg="Interval 1 unresponsive miner was not imputed correctly.",
-        )
-
-    def test_fill_unresponsive_miners_no_unresponsive_multiple_intervals(
-        self, peer_scoring_task: PeerScoring
-    ):
-        df = pd.DataFrame(
-            {
-                PSNames.miner_uid: [1, 2, 3, 4],
-                PSNames.miner_registered_minutes: [50, 50, 150, 150],
-                PSNames.interval_start: [100, 100, 200, 200],
-                PSNames.interval_agg_prediction: [0.7, 0.8, 0.6, 0.65],
-                PSNames.interval_idx: [0, 0, 1, 1],
-                PSNames.weight: [1, 1, 1, 1],
-            }
-        )
-        # the output should be identical to the input.
-        result_df = peer_scoring_task.fill_unresponsive_miners(df, outcome_round=1)
-        assert_frame_equal(result_df, df, check_dtype=False)
-
-    @pytest.mark.parametrize(
-        "outcome_round, input_df, expected",
-        [
-            # Test case for outcome_round == 1:
-            (
-                1,
-                pd.DataFrame(
-                    {
-                        # Two miners in the same interval (interval_idx 0)
-                        PSNames.miner_uid: [1, 2],
-                        PSNames.miner_registered_minutes: [50, 50],
-                        PSNames.interval_start: [100, 100],
-                        # For outcome_round 0, row 1 missing prediction will be imputed
-                        # from the group of responsive miners
-                        PSNames.interval_agg_prediction: [pd.NA, 0.8],
-                        PSNames.weight: [1, 1],
-                        PSNames.interval_idx: [0, 0],
-                    }
-                ),
-                {
-                    # For outcome_round 1:
-                    # - Responsive miner has prediction 0.8.
-                    #   Group mean = 0.8, worst (min) = 0.8,
-                    #   so imputed value = 0.8 + (0.8 - 0.8) * UPTIME_PENALTY_DISTANCE = 0.8.
-                    # - Then, log_score = log(0.8) = -0.223143551 for both.
-                    # - And peer_score = log_score - mean_log_score_others = 0.
-                    1: {
-                        PSNames.interval_agg_prediction: 0.8,
-                        PSNames.log_score: np.log(0.8),
-                        PSNames.peer_score: 0.0,
-                    },
-                    2: {
-                        PSNames.interval_agg_prediction: 0.8,
-                        PSNames.log_score: np.log(0.8),
-                        PSNames.peer_score: 0.0,
-                    },
-                },
-            ),
-            # Test case for outcome_round == 0:
-            (
-                0,
-                pd.DataFrame(
-                    {
-                        PSNames.miner_uid: [1, 2],
-                        PSNames.miner_registered_minutes: [50, 50],
-                        PSNames.interval_start: [100, 100],
-                        # For outcome_round 0, row 1 missing prediction will be imputed
-                        # from the group of responsive miners
-                        PSNames.interval_agg_prediction: [pd.NA, 0.2],
-                        PSNames.weight: [1, 1],
-                        PSNames.interval_idx: [0, 0],
-                    }
-                ),
-                {
-                    # For outcome_round 0:
-                    # - Responsive miner has prediction 0.2.
-                    #   Group mean = 0.2, worst (max) = 0.2,
-                    #   so imputed value = 0.2 + (0.2 - 0.2) * UPTIME_PENALTY_DISTANCE = 0.2.
-                    # - Then, log_score = log(1 - 0.2) = log(0.8) = -0.223143551 for both.
-                    # - And peer_score = log_score - mean_log_score_others = 0.
-                    1: {
-                        PSNames.interval_agg_prediction: 0.2,
-                        PSNames.log_score: np.log(0.8),
-                        PSNames.peer_score: 0.0,
-                    },
-                    2: {
-                        PSNames.interval_agg_prediction: 0.2,
-                        PSNames.log_score: np.log(0.8),
-                        PSNames.peer_score: 0.0,
-                    },
-                },
-            ),
-            # outcome_round == 1 with a miner registered after event start.
-            (
-                1,
-                pd.DataFrame(
-                    {
-                        # Three miners in the same interval (interval_idx 0)
-                        # Miner 1 and 2 registered early (should be imputed if missing);
-                        # Miner 3 registered after the interval start and thus is not marked unresponsive.
-                        PSNames.miner_uid: [1, 2, 3],
-                        PSNames.miner_registered_minutes: [50, 40, 150],
-                        PSNames.interval_start: [100, 100, 100],
-                        # Miner 1: provided prediction 0.7;
-                        # Miner 2: missing prediction (registered early -> imputed);
-                        # Miner 3: missing prediction (registered late -> remains untouched in fill, later imputed via group fill)
-                        PSNames.interval_agg_prediction: [0.7, pd.NA, pd.NA],
-                        PSNames.weight: [1, 1, 1],
-                        PSNames.interval_idx: [0, 0, 0],
-                    }
-                ),
-                {
-                    # The group contains one responsive miner (0.7). Thus:
-                    # For miners 1 and 2: imputed value = 0.7 + (0.7 - 0.7)*UPTIME_PENALTY_DISTANCE = 0.7.
-                    # Miner 3, though not flagged in fill_unresponsive_miners, will later be filled using
-                    # the group's mean log score resulting in the same final imputation of 0.7.
-                    1: {
-                        PSNames.interval_agg_prediction: 0.7,
-                        PSNames.log_score: np.log(0.7),
-                        PSNames.peer_score: 0.0,
-                    },
-                    2: {
-                        PSNames.interval_agg_prediction: 0.7,
-                        PSNames.log_score: np.log(0.7),
-                        PSNames.peer_score: 0.0,
-                    },
-                    3: {
-                        PSNames.interval_agg_prediction: 0.7,
-                        PSNames.log_score: np.log(0.7),
-                        PSNames.peer_score: 0.0,
-                    },
-                },
-            ),
-            # outcome_round == 0 with a miner registered after event start.
-            (
-                0,
-                pd.DataFrame(
-                    {
-                        # Three miners in the same interval (interval_idx 0)
-                        PSNames.miner_uid: [1, 2, 3],
-                        PSNames.miner_registered_minutes: [50, 40, 150],
-                        PSNames.interval_start: [100, 100, 100],
-                        # Miner 1: provided prediction 0.2;
-                        # Miner 2: missing prediction (registered early -> imputed);
-                        # Miner 3: missing prediction (registered late -> remains untouched in fill, later imputed via group fill)
-                        PSNames.interval_agg_prediction: [0.2, pd.NA, pd.NA],
-                        PSNames.weight: [1, 1, 1],
-                        PSNames.interval_idx: [0, 0, 0],
-                    }
-                ),
-                {
-                    # With one responsive miner (0.2) in the group:
-                    # Imputed value becomes 0.2 for miners missing a prediction.
-                    # log_score for outcome_round 0: log(1 - 0.2) = log(0.8) for all.
-                    1: {
-                        PSNames.interval_agg_prediction: 0.2,
-                        PSNames.log_score: np.log(0.8),
-                        PSNames.peer_score: 0.0,
-                    },
-                    2: {
-                        PSNames.interval_agg_prediction: 0.2,
-                        PSNames.log_score: np.log(0.8),
-                        PSNames.peer_score: 0.0,
-                    },
-                    3: {
-                        PSNames.interval_agg_prediction: 0.2,
-                        PSNames.log_score: np.log(0.8),
-                        PSNames.peer_score: 0.0,
-                    },
-                },
-            ),
-            # Outcome round == 1 with 4 miners.
-            (
-                1,
-                pd.DataFrame(
-                    {
-                        # Four miners in the same interval (interval_idx 0)
-                        PSNames.miner_uid: [1, 2, 3, 4],
-                        # Early registered miners (should be flagged) and a late registered miner:
-                        PSNames.miner_registered_minutes: [50, 40, 150, 60],
-                        PSNames.interval_start: [100, 100, 100, 100],
-                        # Predictions:
-                        # Miner 1: provided 0.6,
-                        # Miner 2: missing (early - imputed),
-                        # Miner 3: missing (late - not imputed in fill, later filled via group),
-                        # Miner 4: provided 0.8.
-                        PSNames.interval_agg_prediction: [0.6, pd.NA, pd.NA, 0.8],
-                        PSNames.weight: [1, 1, 1, 1],
-                        PSNames.interval_idx: [0, 0, 0, 0],
-                    }
-                ),
-                {
-                    # Expected final values:
-                    # Miner 1: prediction 0.6, log_score = log(0.6) = -0.51083, peer_score = -0.19652.
-                    1: {
-                        PSNames.interval_agg_prediction: 0.6,
-                        PSNames.log_score: np.log(0.6),
-                        PSNames.peer_score: -0.1965215,
-                    },
-                    # Miner 2: imputed prediction = 0.66667, log_score = log(0.66667) = -0.40547, peer_score = -0.03848.
-                    2: {
-                        PSNames.interval_agg_prediction: 0.66667,
-                        PSNames.log_score: np.log(0.66667),
-                        PSNames.peer_score: -0.03848,
-                    },
-                    # Miner 3: late registered, filled later to = 0.684, log_score = log(0.684) = -0.37981, peer_score = 0.0.
-                    3: {
-                        PSNames.interval_agg_prediction: 0.684,
-                        PSNames.log_score: np.log(0.684),
-                        PSNames.peer_score: 0.0,
-                    },
-                    # Miner 4: prediction remains 0.8, log_score = log(0.8) = -0.22314, peer_score = 0.23500.
-                    4: {
-                        PSNames.interval_agg_prediction: 0.8,
-                        PSNames.log_score: np.log(0.8),
-                        PSNames.peer_score: 0.2350015,
-                    },
-                },
-            ),
-            # Outcome round == 0 with 4 miners.
-            (
-                0,
-                pd.DataFrame(
-                    {
-                        PSNames.miner_uid: [1, 2, 3, 4],
-                        PSNames.miner_registered_minutes: [50, 40, 150, 60],
-                        PSNames.interval_start: [100, 100, 100, 100],
-                        # Predictions:
-                        # Miner 1: provided 0.2,
-                        # Miner 2: missing (early -> imputed),
-                        # Miner 3: missing (late -> later filled),
-                        # Miner 4: provided 0.4.
-                        PSNames.interval_agg_prediction: [0.2, pd.NA, pd.NA, 0.4],
-                        PSNames.weight: [1, 1, 1, 1],
-                        PSNames.interval_idx: [0, 0, 0, 0],
-                    }
-                ),
-                {
-                    # Expected final values:
-                    # For outcome_round==0 we work with 1 - prediction:
-                    # Miner 1: prediction 0.2, log_score = log(0.8) = -0.22314, peer_score = 0.23500.
-                    1: {
-                        PSNames.interval_agg_prediction: 0.2,
-                        PSNames.log_score: np.log(0.8),
-                        PSNames.peer_score: 0.2350015,
-                    },
-                    # Miner 2: imputed prediction = 0.33333, log_score = log(0.66667) = -0.40547, peer_score = -0.03848.
-                    2: {
-                        PSNames.interval_agg_prediction: 0.33333,
-                        PSNames.log_score: np.log(0.66667),
-                        PSNames.peer_score: -0.03848,
-                    },
-                    # Miner 3: late registered, filled later to = 0.316, log_score = log(0.684) = -0.37981, peer_score = 0.0.
-                    3: {
-                        PSNames.interval_agg_prediction: 0.316,
-                        PSNames.log_score: np.log(0.684),
-                        PSNames.peer_score: 0.0,
-                    },
-                    # Miner 4: prediction remains 0.4, log_score = log(0.6) = -0.51083, peer_score = -0.19652.
-                    4: {
-                        PSNames.interval_agg_prediction: 0.4,
-                        PSNames.log_score: np.log(0.6),
-                        PSNames.peer_score: -0.1965215,
-                    },
-                },
-            ),
-            # Regular test case: 3 miners, 2 intervals, no special imputation.
-            (
-                1,
-                pd.DataFrame(
-                    {
-                        # Three miners over two intervals.
-                        PSNames.miner_uid: [1, 2, 3],
-                        PSNames.miner_registered_minutes: [50, 50, 50],
-                        # Interval 0 for miners 1 & 2, interval 1 for miner 3.
-                        PSNames.interval_start: [100, 100, 200],
-                        # All predictions provided.
-                        PSNames.interval_agg_prediction: [0.7, 0.8, 0.6],
-                        PSNames.weight: [1, 1, 1],
-                        PSNames.interval_idx: [0, 0, 1],
-                    }
-                ),
-                {
-                    # For interval 0:
-                    # Miner 1: log_score = log(0.7), peer_score = log(0.7) - log(0.8).
-                    1: {
-                        PSNames.interval_agg_prediction: 0.7,
-                        PSNames.log_score: np.log(0.7),
-                        PSNames.peer_score: np.log(0.7) - np.log(0.8),
-                    },
-                    # Miner 2: log_score = log(0.8), peer_score = log(0.8) - log(0.7).
-                    2: {
-                        PSNames.interval_agg_prediction: 0.8,
-                        PSNames.log_score: np.log(0.8),
-                        PSNames.peer_score: np.log(0.8) - np.log(0.7),
-                    },
-                    # For interval 1: Only miner 3.
-                    # With no other miner, mean_log_score_others falls back to worst_log_score = log(CLIP_EPS).
-                    # Peer score = log(0.6) - log(CLIP_EPS).
-                    3: {
-                        PSNames.interval_agg_prediction: 0.6,
-                        PSNames.log_score: np.log(0.6),
-                        PSNames.peer_score: np.log(0.6) - np.log(CLIP_EPS),
-                    },
-                },
-            ),
-        ],
-    )
-    def test_peer_score_intervals(
-        self, peer_scoring_task: PeerScoring, outcome_round, input_df, expected
-    ):
-        result_df = peer_scoring_task.peer_score_intervals(input_df, outcome_round)
-
-        # For each expected row (keyed by miner_uid), compare the key columns.
-        for uid, exp in expected.items():
-            row = result_df[result_df[PSNames.miner_uid] == uid].iloc[0]
-            np.testing.assert_allclose(
-                row[PSNames.interval_agg_prediction],
-                exp[PSNames.interval_agg_prediction],
-                rtol=1e-4,
-                err_msg=f"Incorrect interval_agg_prediction for miner_uid {uid} and outcome_round {outcome_round}",
-            )
-            np.testing.assert_allclose(
-                row[PSNames.log_score],
-                exp[PSNames.log_score],
-                rtol=1e-4,
-                err_msg=f"Incorrect log_score for miner_uid {uid} and outcome_round {outcome_round}",
-            )
-            np.testing.assert_allclose(
-                row[PSNames.peer_score],
-                exp[PSNames.peer_score],
-                rtol=1e-4,
-                err_msg=f"Incorrect peer_score for miner_uid {uid} and outcome_round {outcome_round}",
-            )
-
-    @pytest.mark.parametrize(
-        "input_data, expected_data",
-        [
-            # Test case 1: Single-group (one miner with two rows)
-            (
-                {
-                    PSNames.miner_uid: [1, 1],
-                    PSNames.miner_hotkey: ["hotkey1", "hotkey1"],
-                    PSNames.weighted_prediction: [0.2, 0.3],
-                    PSNames.weighted_peer_score: [0.1, 0.2],
-                    PSNames.weight: [2, 3],
-                },
-                {
-                    PSNames.miner_uid: [1],
-                    PSNames.miner_hotkey: ["hotkey1"],
-                    PSNames.rema_prediction: [(0.2 + 0.3) / (2 + 3)],  # 0.5/5 = 0.1
-                    PSNames.rema_peer_score: [(0.1 + 0.2) / (2 + 3)],  # 0.3/5 = 0.06
-                },
-            ),
-            # Test case 2: Multi-group (two miners, each with two rows)
-            (
-                {
-                    PSNames.miner_uid: [1, 1, 2, 2],
-                    PSNames.miner_hotkey: ["hotkey1", "hotkey1", "hotkey2", "hotkey2"],
-                    PSNames.weighted_prediction: [0.2, 0.3, 0.5, 0.5],
-                    PSNames.weighted_peer_score: [0.1, 0.2, 0.4, 0.6],
-                    PSNames.weight: [2, 3, 4, 6],
-                },
-                {
-                    PSNames.miner_uid: [1, 2],
-                    PSNames.miner_hotkey: ["hotkey1", "hotkey2"],
-                    PSNames.rema_prediction: [
-                        (0.2 + 0.3) / (2 + 3),  # 0.5/5 = 0.1 for miner 1
-                        (0.5 + 0.5) / (4 + 6),  # 1/10 = 0.1 for miner 2
-                    ],
-                    PSNames.rema_peer_score: [
-                        (0.1 + 0.2) / (2 + 3),  # 0.3/5 = 0.06 for miner 1
-                        (0.4 + 0.6) / (4 + 6),  # 1/10 = 0.1 for miner 2
-                    ],
-                },
-            ),
-            # Test case 3: Empty DataFrames
-            (
-                {
-                    PSNames.miner_uid: [],
-                    PSNames.miner_hotkey: [],
-                    PSNames.weighted_prediction: [],
-                    PSNames.weighted_peer_score: [],
-                    PSNames.weight: [],
-                },
-                {
-                    PSNames.miner_uid: [],
-                    PSNames.miner_hotkey: [],
-                    PSNames.rema_prediction: [],
-                    PSNames.rema_peer_score: [],
-                },
-            ),
-        ],
-    )
-    def test_reduce_scored_intervals_df_parametrized(
-        self, peer_scoring_task: PeerScoring, input_data, expected_data
-    ):
-        input_df = pd.DataFrame(input_data)
-
-        result_df = peer_scoring_task.reduce_scored_intervals_df(input_df)
-
-        expected_df = pd.DataFrame(expected_data)
-
-        result_df_sorted = result_df.sort_values(
-            by=[PSNames.miner_uid, PSNames.miner_hotkey]
-        ).reset_index(drop=True)
-        expected_df_sorted = expected_df.sort_values(
-            by=[PSNames.miner_uid, PSNames.miner_hotkey]
-        ).reset_index(drop=True)
-
-        pd.testing.assert_frame_equal(result_df_sorted, expected_df_sorted)
-
     async def test_peer_score_event_no_intervals(
         self, peer_scoring_task: PeerScoring, db_operations, db_client
     ):
@@ -1076,7 +428,8 @@ class TestPeerScoring:
         predictions = []
 
         unit = peer_scoring_task
-        result = await unit.peer_score_event(event, predictions)
+        batch = PeerScoresBatch()
+        result = await unit.peer_score_event(event, predictions, batch)
 
         assert result.empty
         assert PSNames.rema_prediction in result.columns
@@ -1088,9 +441,13 @@ class TestPeerScoring:
             == unit.logger.error.call_args_list[1].args[0]
         )
 
+        # the status change is deferred to the batch write
+        assert batch.discarded_unique_event_ids == ["evt_no_intervals"]
+        assert batch.n_events_done == 1
+
         updated_events = await db_client.many("""SELECT * FROM events""", use_row_factory=True)
         assert len(updated_events) == 1
-        assert updated_events[0]["status"] == str(EventStatus.DISCARDED.value)
+        assert updated_events[0]["status"] == str(EventStatus.SETTLED.value)
 
     async def test_peer_score_event_no_miners(self, peer_scoring_task: PeerScoring):
         event = EventsModel(
@@ -1119,7 +476,7 @@ class TestPeerScoring:
                 PSNames.miner_registered_minutes: [event_cutoff_start_minutes + 1],
             }
         )
-        result = await unit.peer_score_event(event, predictions)
+        result = await unit.peer_score_event(event, predictions, PeerScoresBatch())
 
         assert result.empty
         assert PSNames.rema_prediction in result.columns
@@ -1156,7 +513,7 @@ class TestPeerScoring:
         # Patch prepare_predictions_df to return an empty DataFrame.
         unit.prepare_predictions_df = lambda predictions, miners: pd.DataFrame()
 
-        result = await unit.peer_score_event(event, predictions)
+        result = await unit.peer_score_event(event, predictions, PeerScoresBatch())
         assert result.empty
         assert PSNames.rema_prediction in result.columns
         # Expect an error message indicating no predictions.
@@ -1218,38 +575,19 @@ class TestPeerScoring:
             }
         )
 
-        # Patch get_interval_scores_base to return a dummy interval scores DataFrame.
-        unit.get_interval_scores_base = lambda predictions_df, miners, intervals: pd.DataFrame(
-            {
-                PSNames.miner_uid: [1],
-                PSNames.miner_hotkey: ["hotkey1"],
-                PSNames.interval_start: [event_cutoff_start_minutes],
-                PSNames.interval_agg_prediction: [0.8],
-            }
-        )
-
-        # Patch peer_score_intervals to return a dummy scored intervals DataFrame.
-        unit.peer_score_intervals = lambda interval_scores, outcome_round: pd.DataFrame(
-            {
-                PSNames.miner_uid: [1],
-                PSNames.miner_hotkey: ["hotkey1"],
-                PSNames.peer_score: [0.1],
-                PSNames.weighted_peer_score: [0.2],
-                PSNames.weighted_prediction: [0.8],
-            }
-        )
-
-        # Patch reduce_scored_intervals_df to return the final scores DataFrame.
-        unit.reduce_scored_intervals_df = lambda scored_df: pd.DataFrame(
-            {
-                PSNames.miner_uid: [1],
-                PSNames.miner_hotkey: ["hotkey1"],
-                PSNames.rema_prediction: [0.8],
-                PSNames.rema_peer_score: [0.1],
-            }
+        # Patch score_intervals to return the final scores DataFrame.
+        unit.score_intervals = lambda predictions_df, miners, intervals, outcome_round: (
+            pd.DataFrame(
+                {
+                    PSNames.miner_uid: [1],
+                    PSNames.miner_hotkey: ["hotkey1"],
+                    PSNames.rema_prediction: [0.8],
+                    PSNames.rema_peer_score: [0.1],
+                }
+            )
         )
 
-        result = await unit.peer_score_event(event, predictions)
+        result = await unit.peer_score_event(event, predictions, PeerScoresBatch())
 
         assert not result.empty
         for col in [
@@ -1266,6 +604,60 @@ class TestPeerScoring:
         assert unit.errors_count == 0
         assert unit.logger.error.call_count == 0
 
+    async def test_peer_score_event_compute_executor(self, peer_scoring_task: PeerScoring):
+        event = EventsModel(
+            unique_event_id="evt_executor",
+            event_id="e5",
+            market_type="dummy",
+            event_type="dummy",
+            description="dummy event",
+            metadata="{}",
+            status=1,
+            outcome="1",
+            cutoff=datetime(2025, 1, 1, 16, 0, tzinfo=timezone.utc),
+            registered_date=datetime(2025, 1, 1, 8, 0, tzinfo=timezone.utc),
+        )
+        predictions = pydantic_models_to_dataframe(
+            [
+                PredictionsModel(
+                    unique_event_id="evt_executor",
+                    minerHotkey=f"hotkey{uid}",
+                    minerUid=str(uid),
+                    predictedOutcome="1",
+                    interval_start_minutes=align_to_interval(minutes_since_epoch(event.cutoff)),
+                    interval_agg_prediction=prediction,
+                    interval_count=1,
+                    blocktime=12345,
+                )
+                for uid, prediction in [(1, 0.8), (2, 0.3)]
+            ]
+        )
+
+        unit = peer_scoring_task
+        unit.miners_last_reg = pd.DataFrame(
+            {
+                PSNames.miner_uid: [1, 2, 3],
+                PSNames.miner_hotkey: ["hotkey1", "hotkey2", "hotkey3"],
+                PSNames.miner_registered_minutes: [
+                    align_to_interval(minutes_since_epoch(event.registered_date))
+                ]
+                * 3,
+            }
+        )
+
+        inline_result = await unit.peer_score_event(event, predictions, PeerScoresBatch())
+
+        # Same scores when the compute stage runs in a worker process
+        with ProcessPoolExecutor(
+            max_workers=1, mp_context=multiprocessing.get_context("spawn")
+        ) as executor:
+            unit.compute_executor = executor
+
+            result = await unit.peer_score_event(event, predictions, PeerScoresBatch())
+
+        assert len(result) == 3
+        assert_frame_equal(result, inline_result)
+
     @pytest.mark.parametrize(
         "input_data, event_id, expected_valid_count, expected_error_messages",
         [
@@ -1310,9 +702,8 @@ class TestPeerScoring:
             ),
         ],
     )
-    async def test_export_peer_scores_to_db(
+    def test_prepare_peer_scores(
         self,
-        db_client,
         peer_scoring_task: PeerScoring,
         input_data,
         event_id,
@@ -1326,14 +717,12 @@ class TestPeerScoring:
         # Reset errors_count.
         unit.errors_count = 0
 
-        await unit.export_peer_scores_to_db(df, event_id)
+        scores = unit.prepare_peer_scores(df, event_id)
 
-        inserted_scores = await db_client.many("SELECT * FROM scores")
-        if expected_valid_count > 0:
-            assert len(inserted_scores) == expected_valid_count
-            assert inserted_scores[0][0] == event_id
-        else:
-            assert len(inserted_scores) == 0
+        assert len(scores) == expected_valid_count
+        for score in scores:
+            assert score.event_id == event_id
+            assert score.spec_version == 1037
 
         error_calls = unit.logger.error.call_args_list
         if expected_error_messages:
@@ -1345,6 +734,121 @@ class TestPeerScoring:
             assert unit.errors_count == 0
             assert len(error_calls) == 0
 
+    @pytest.mark.parametrize(
+        "pages, batches, expected_batches_scored",
+        [
+            # full pages until a partial one
+            (
+                [(["e1", "e2"], True), (["e3", "e4"], True), (["e5"], False)],
+                [["e1", "e2"], ["e3", "e4"], ["e5"]],
+                3,
+            ),
+            # full pages until no events left
+            (
+                [(["e1", "e2"], True), (["e3", "e4"], True), ([], False)],
+                [["e1", "e2"], ["e3", "e4"]],
+                2,
+            ),
+            # no event of the page done - next page seeks past it
+            ([(["e1", "e2"], True), (["e3"], False)], [[], ["e3"]], 2),
+            # full pages with rows failing to parse, one with none parsed, more events follow
+            (
+                [(["e1"], True), ([], True), (["e5", "e6"], True), ([], False)],
+                [["e1"], ["e5", "e6"]],
+                2,
+            ),
+        ],
+    )
+    async def test_run_pages(
+        self,
+        peer_scoring_task: PeerScoring,
+        pages: list[tuple[list[str], bool]],
+        batches: list[list[str]],
+        expected_batches_scored: int,
+    ):
+        unit = peer_scoring_task
+        unit.page_size = 2
+        unit.miners_last_reg_sync = AsyncMock(return_value=True)
+        unit.db_operations.get_events_for_scoring_page = AsyncMock(
+            side_effect=[
+                (page, ("resolved_at", index), has_more)
+                for index, (page, has_more) in enumerate(pages)
+            ]
+        )
+        unit.score_events_batch = AsyncMock(
+            side_effect=[PeerScoresBatch(processed_unique_event_ids=batch) for batch in batches]
+        )
+
+        await unit.run()
+
+        assert unit.score_events_batch.call_count == expected_batches_scored
+        for call, page in zip(
+            unit.score_events_batch.call_args_list, [page for page, _ in pages if page]
+        ):
+            assert call.args[0] == page
+
+        # Paged until the last page, not full
+        assert unit.db_operations.get_events_for_scoring_page.call_count == len(pages)
+
+        # Each page after the key of the previous one
+        page_calls = unit.db_operations.get_events_for_scoring_page.call_args_list
+
+        assert page_calls[0].kwargs == {"max_events": 2}
+        for index, call in enumerate(page_calls[1:]):
+            assert call.kwargs == {"max_events": 2, "after": ("resolved_at", index)}
+
+        # All the pages scored in the run
+        assert unit.backlog == TaskBacklog(
+            processed=sum(len(batch) for batch in batches), pending=False
+        )
+
+    async def test_score_events_batch(self, peer_scoring_task: PeerScoring):
+        unit = peer_scoring_task
+        db_ops = unit.db_operations
+        db_ops.get_predictions_for_scoring_frames = AsyncMock(
+            return_value={
+                "event_scored": pd.DataFrame({"minerUid": ["1"]}),
+                "event_no_predictions": pd.DataFrame({"minerUid": []}),
+            }
+        )
+        db_ops.insert_peer_scores_batch = AsyncMock()
+
+        score = MagicMock()
+        unit.peer_score_event = AsyncMock(return_value=pd.DataFrame({"col": [1]}))
+        unit.prepare_peer_scores = MagicMock(return_value=[score])
+
+        events = [
+            EventsModel(
+                unique_event_id=unique_event_id,
+                event_id=unique_event_id,
+                market_type="market",
+                event_type="market",
+                description="desc",
+                outcome="1",
+                status=EventStatus.SETTLED,
+                metadata='{"key": "value"}',
+                registered_date="2024-12-02T14:30:00+00:00",
+                cutoff="2024-12-27T14:30:00+00:00",
+                resolved_at="2024-12-30T14:30:00+00:00",
+            )
+            for unique_event_id in ["event_scored", "event_no_predictions"]
+        ]
+
+        batch = await unit.score_events_batch(events)
+
+        db_ops.get_predictions_for_scoring_frames.assert_awaited_once_with(
+            unique_event_ids=["event_scored", "event_no_predictions"]
+        )
+        assert unit.peer_score_event.call_count == 1
+        assert batch.scores == [score]
+        assert batch.processed_unique_event_ids == ["event_scored"]
+        assert batch.discarded_unique_event_ids == ["event_no_predictions"]
+        db_ops.insert_peer_scores_batch.assert_awaited_once_with(
+            scores=[score],
+            processed_unique_event_ids=["event_scored"],
+            discarded_unique_event_ids=["event_no_predictions"],
+        )
+
     async def test_e2e_run(
         self,
         peer_scoring_task: PeerScoring,
@@ -2,9 +2,10 @@ import asyncio
 import json
 import tempfile
 from datetime import datetime, timedelta, timezone
-from unittest.mock import ANY, AsyncMock, MagicMock, call, patch
+from unittest.mock import ANY, AsyncMock, MagicMock, patch
 
 import numpy as np
+import pandas as pd
 import pytest
 import torch
 from bittensor.core.chain_data import AxonInfo
@@ -15,7 +16,8 @@ from neurons.protocol import EventPredictionSynapse
 from neurons.validator.db.client import DatabaseClient
 from neurons.validator.db.operations import DatabaseOperations
 from neurons.validator.models.event import EventStatus
-from neurons.validator.tasks.query_miners import QueryMiners
+from neurons.validator.tasks.query_miners import PredictionsSynapseBuilder, QueryMiners
+from neurons.validator.tasks.sync_metagraph import MetagraphSnapshot, SyncMetagraph
 from neurons.validator.utils.logger.logger import InfiniteGamesLogger
 
 
@@ -127,6 +129,7 @@ class TestQueryMiners:
                         "market_type": "acled",
                     }
                 ),  # metadata
+                "2012-12-01 14:30:00",  # local_updated_at
             ),
             (
                 "event2",  # event_id
@@ -140,6 +143,7 @@ class TestQueryMiners:
                         "market_type": "azuro",
                     }
                 ),  # metadata
+                "2012-12-01 14:30:00",  # local_updated_at
             ),
         ]
 
@@ -286,6 +290,324 @@ class TestQueryMiners:
         assert response["1"] == synapse
         assert response["50"] == synapse
 
+    @pytest.fixture
+    def streaming_task(self, query_miners_task: QueryMiners) -> QueryMiners:
+        task = QueryMiners(
+            interval_seconds=60.0,
+            db_operations=query_miners_task.db_operations,
+            dendrite=query_miners_task.dendrite,
+            metagraph=query_miners_task.metagraph,
+            logger=query_miners_task.logger,
+            streaming=True,
+            max_concurrency=2,
+            store_batch_size=1,
+        )
+
+        task.metagraph.axons = {uid: MagicMock(hotkey=f"hotkey_{uid}") for uid in range(4)}
+        task.db_operations.upsert_predictions_bulk = AsyncMock(
+            side_effect=lambda predictions: len(list(predictions))
+        )
+
+        return task
+
+    def make_response(self, probability: float) -> EventPredictionSynapse:
+        return EventPredictionSynapse(
+            events={"ifgames-event1": {"event_id": "event1", "probability": probability}}
+        )
+
+    async def test_query_neurons_streaming(self, streaming_task: QueryMiners):
+        others_stored = asyncio.Event()
+        in_flight = 0
+        max_in_flight = 0
+
+        async def call(target_axon, synapse, timeout, deserialize):
+            nonlocal in_flight, max_in_flight
+
+            in_flight += 1
+            max_in_flight = max(max_in_flight, in_flight)
+
+            # Slowest miner answers only once the other responses are stored
+            if target_axon == "axon_0":
+                await others_stored.wait()
+            else:
+                await asyncio.sleep(0.01)
+
+            in_flight -= 1
+
+            return self.make_response(0.5)
+
+        stored_uids = []
+
+        async def upsert_predictions_bulk(predictions):
+            rows = list(predictions)
+            stored_uids.extend(row[2] for row in rows)
+
+            if len(stored_uids) == 3:
+                others_stored.set()
+
+            return len(rows)
+
+        streaming_task.dendrite.call = AsyncMock(side_effect=call)
+        streaming_task.db_operations.upsert_predictions_bulk = AsyncMock(
+            side_effect=upsert_predictions_bulk
+        )
+
+        predictions_count = await asyncio.wait_for(
+            streaming_task.query_neurons_streaming(
+                axons_by_uid={uid: f"axon_{uid}" for uid in range(4)},
+                synapse=EventPredictionSynapse(events={}),
+                block=1,
+            ),
+            timeout=5,
+        )
+
+        # Assertions
+        assert predictions_count == 4
+        assert max_in_flight == 2
+        assert streaming_task.dendrite.call.await_count == 4
+        assert streaming_task.db_operations.upsert_predictions_bulk.await_count == 4
+
+        # Slowest miner stored last, after the others
+        assert stored_uids[-1] == 0
+        assert sorted(stored_uids) == [0, 1, 2, 3]
+
+        assert streaming_task.latency_histogram.count == 4
+
+        streaming_task.logger.debug.assert_called_with(
+            "Miners queried",
+            extra={
+                "miners_count": 4,
+                "predictions_count": 4,
+                "elapsed_time_ms": ANY,
+                "latency_histogram": streaming_task.latency_histogram.snapshot(),
+            },
+        )
+
+    async def test_query_neurons_streaming_batches(self, streaming_task: QueryMiners):
+        streaming_task.store_batch_size = 2
+        streaming_task.dendrite.call = AsyncMock(
+            side_effect=[
+                self.make_response(0.1),
+                self.make_response(None),
+                Exception("Connection error"),
+                self.make_response(0.4),
+            ]
+        )
+
+        predictions_count = await streaming_task.query_neurons_streaming(
+            axons_by_uid={uid: f"axon_{uid}" for uid in range(4)},
+            synapse=EventPredictionSynapse(events={}),
+            block=1,
+        )
+
+        # Assertions
+        assert predictions_count == 2
+
+        # Failed query does not count in the batch, last response flushed at the end
+        upsert_calls = streaming_task.db_operations.upsert_predictions_bulk.await_args_list
+        assert len(upsert_calls) == 2
+
+        streaming_task.logger.exception.assert_called_once_with(
+            "Failed to query miner", extra={"neuron_uid": 2}
+        )
+        assert streaming_task.latency_histogram.count == 4
+
+    async def test_metrics(self, streaming_task: QueryMiners):
+        # No streaming run yet
+        assert streaming_task.metrics() == {}
+
+        streaming_task.dendrite.call = AsyncMock(
+            side_effect=[self.make_response(0.1), Exception("Connection error")]
+        )
+
+        await streaming_task.query_neurons_streaming(
+            axons_by_uid={uid: f"axon_{uid}" for uid in range(2)},
+            synapse=EventPredictionSynapse(events={}),
+            block=1,
+        )
+
+        metrics = streaming_task.metrics()["latency_histogram"]
+
+        assert metrics == streaming_task.latency_histogram.snapshot()
+        assert metrics["count"] == 2
+
+    async def test_query_neurons_streaming_store_error(self, streaming_task: QueryMiners):
+        streaming_task.dendrite.call = AsyncMock(return_value=self.make_response(0.5))
+        streaming_task.db_operations.upsert_predictions_bulk = AsyncMock(
+            side_effect=Exception("Database error")
+        )
+
+        with pytest.raises(Exception, match="Database error"):
+            await asyncio.wait_for(
+                streaming_task.query_neurons_streaming(
+                    axons_by_uid={uid: f"axon_{uid}" for uid in range(4)},
+                    synapse=EventPredictionSynapse(events={}),
+                    block=1,
+                ),
+                timeout=5,
+            )
+
+    async def test_query_neurons_streaming_delta(self, streaming_task: QueryMiners):
+        event = ("event1", "ifgames", "desc", None, None, None, "{}", "2024-12-01 10:00:00")
+        synapse = streaming_task.make_predictions_synapse(events=[event])
+        epoch_id = synapse.epoch_id
+        axons_by_uid = {uid: MagicMock(hotkey=f"hotkey_{uid}") for uid in range(3)}
+
+        sent_synapses = {}
+
+        async def call(target_axon, synapse, timeout, deserialize):
+            uid = int(target_axon.hotkey.split("_")[1])
+            sent_synapses[uid] = synapse
+
+            response = self.make_response(0.5)
+
+            # Neuron 0 does not acknowledge
+            if uid > 0:
+                response.acknowledged_epoch_id = synapse.epoch_id
+
+            return response
+
+        streaming_task.dendrite.call = AsyncMock(side_effect=call)
+
+        await streaming_task.query_neurons_streaming(
+            axons_by_uid=axons_by_uid, synapse=synapse, block=1
+        )
+
+        # Assertions
+        assert all(synapse.base_epoch_id is None for synapse in sent_synapses.values())
+        assert streaming_task.acknowledged_epochs == {
+            1: ("hotkey_1", epoch_id),
+            2: ("hotkey_2", epoch_id),
+        }
+
+        # New event, neuron 2 hotkey changed
+        new_event = ("event2", "ifgames", "desc", None, None, None, "{}", "2024-12-01 10:00:00")
+        synapse = streaming_task.make_predictions_synapse(events=[event, new_event])
+        axons_by_uid[2] = MagicMock(hotkey="hotkey_2_new")
+
+        await streaming_task.query_neurons_streaming(
+            axons_by_uid=axons_by_uid, synapse=synapse, block=2
+        )
+
+        # Assertions
+        assert sent_synapses[0].base_epoch_id is None
+        assert list(sent_synapses[0].events) == ["ifgames-event1", "ifgames-event2"]
+
+        assert sent_synapses[1].base_epoch_id == epoch_id
+        assert sent_synapses[1].epoch_id == epoch_id + 1
+        assert list(sent_synapses[1].events) == ["ifgames-event2"]
+
+        assert sent_synapses[2].base_epoch_id is None
+        assert list(sent_synapses[2].events) == ["ifgames-event1", "ifgames-event2"]
+
+    async def test_query_neurons_streaming_delta_predictions(self, streaming_task: QueryMiners):
+        def make_event(event_id: str, local_updated_at: str) -> tuple:
+            return (event_id, "ifgames", local_updated_at, None, None, None, "{}", local_updated_at)
+
+        axons_by_uid = {uid: MagicMock(hotkey=f"hotkey_{uid}") for uid in range(2)}
+        probability = 0.5
+
+        async def call(target_axon, synapse, timeout, deserialize):
+            # Answers the events received in place, like the reference miner
+            for event in synapse.events.values():
+                event["probability"] = probability
+
+            # Neuron 0 does not acknowledge
+            if target_axon.hotkey == "hotkey_1":
+                synapse.acknowledged_epoch_id = synapse.epoch_id
+
+            synapse.dendrite.status_code = 200
+
+            return synapse
+
+        stored_rows = []
+
+        async def upsert_predictions_bulk(predictions):
+            rows = list(predictions)
+            stored_rows.extend(rows)
+
+            return len(rows)
+
+        streaming_task.dendrite.call = AsyncMock(side_effect=call)
+        streaming_task.db_operations.upsert_predictions_bulk = AsyncMock(
+            side_effect=upsert_predictions_bulk
+        )
+
+        synapse = streaming_task.make_predictions_synapse(
+            events=[make_event("event1", "t1"), make_event("event2", "t1")]
+        )
+
+        await streaming_task.query_neurons_streaming(
+            axons_by_uid=axons_by_uid, synapse=synapse, block=1
+        )
+
+        # Event 1 unchanged, event 2 updated, event 3 new
+        probability = 0.75
+        stored_rows.clear()
+
+        synapse = streaming_task.make_predictions_synapse(
+            events=[
+                make_event("event1", "t1"),
+                make_event("event2", "t2"),
+                make_event("event3", "t1"),
+            ]
+        )
+
+        predictions_count = await streaming_task.query_neurons_streaming(
+            axons_by_uid=axons_by_uid, synapse=synapse, block=2
+        )
+
+        # Assertions
+        assert predictions_count == 6
+
+        # Neuron 1 answered only the changed events, its prediction of event 1 is still stored
+        assert sorted((row[2], row[0], row[3]) for row in stored_rows) == [
+            (0, "ifgames-event1", 0.75),
+            (0, "ifgames-event2", 0.75),
+            (0, "ifgames-event3", 0.75),
+            (1, "ifgames-event1", 0.5),
+            (1, "ifgames-event2", 0.75),
+            (1, "ifgames-event3", 0.75),
+        ]
+
+        # Event 1 removed, event 2 unchanged
+        stored_rows.clear()
+
+        synapse = streaming_task.make_predictions_synapse(
+            events=[make_event("event2", "t2"), make_event("event3", "t1")]
+        )
+
+        await streaming_task.query_neurons_streaming(
+            axons_by_uid={1: axons_by_uid[1]}, synapse=synapse, block=3
+        )
+
+        # Assertions
+        assert sorted((row[2], row[0], row[3]) for row in stored_rows) == [
+            (1, "ifgames-event2", 0.75),
+            (1, "ifgames-event3", 0.75),
+        ]
+
+        # Neuron hotkey changed: full synapse, nothing merged
+        axons_by_uid[1] = MagicMock(hotkey="hotkey_1_new")
+        stored_rows.clear()
+
+        async def call_first_event(target_axon, synapse, timeout, deserialize):
+            synapse.events = {"ifgames-event2": {"probability": 0.9}}
+            synapse.dendrite.status_code = 200
+
+            return synapse
+
+        streaming_task.dendrite.call = AsyncMock(side_effect=call_first_event)
+
+        await streaming_task.query_neurons_streaming(
+            axons_by_uid={1: axons_by_uid[1]}, synapse=synapse, block=4
+        )
+
+        # Assertions
+        assert [(row[2], row[0], row[3]) for row in stored_rows] == [
+            (1, "ifgames-event2", 0.9),
+        ]
+
     async def test_store_miners(self, db_client: DatabaseClient, query_miners_task: QueryMiners):
         block = 12345
         axons = {
@@ -387,7 +709,7 @@ class TestQueryMiners:
 
     async def test_store_predictions(self, query_miners_task: QueryMiners):
         # Set up mocks
-        query_miners_task.db_operations.upsert_predictions = AsyncMock()
+        query_miners_task.db_operations.upsert_predictions_bulk = AsyncMock(return_value=4)
         query_miners_task.metagraph.axons = {
             "uid_1": MagicMock(hotkey="hotkey_1"),
             "uid_2": MagicMock(hotkey="hotkey_2"),
@@ -431,60 +753,44 @@ class TestQueryMiners:
             neurons_predictions=neurons_predictions,
         )
 
-        # Assertions
-        assert query_miners_task.db_operations.upsert_predictions.await_count == 2
-
-        assert query_miners_task.db_operations.upsert_predictions.await_args_list == [
-            call(
-                predictions=[
-                    (
-                        "acled-event1",
-                        "hotkey_1",
-                        "uid_1",
-                        0.5,
-                        interval_start_minutes,
-                        0.5,
-                        block,
-                        0.5,
-                    ),
-                    (
-                        "azuro-event2",
-                        "hotkey_1",
-                        "uid_1",
-                        0.75,
-                        interval_start_minutes,
-                        0.75,
-                        block,
-                        0.75,
-                    ),
-                ]
-            ),
-            call(
-                predictions=[
-                    (
-                        "acled-event1",
-                        "hotkey_2",
-                        "uid_2",
-                        0.5,
-                        interval_start_minutes,
-                        0.5,
-                        block,
-                        0.5,
-                    ),
-                    (
-                        "azuro-event2",
-                        "hotkey_2",
-                        "uid_2",
-                        0.75,
-                        interval_start_minutes,
-                        0.75,
-                        block,
-                        0.75,
-                    ),
-                ]
-            ),
+        # Assertions, one bulk upsert for all the neurons
+        query_miners_task.db_operations.upsert_predictions_bulk.assert_awaited_once()
+
+        rows = query_miners_task.db_operations.upsert_predictions_bulk.await_args.kwargs[
+            "predictions"
+        ]
+
+        assert list(rows) == [
+            ("acled-event1", "hotkey_1", "uid_1", 0.5, interval_start_minutes, 0.5, block),
+            ("azuro-event2", "hotkey_1", "uid_1", 0.75, interval_start_minutes, 0.75, block),
+            ("acled-event1", "hotkey_2", "uid_2", 0.5, interval_start_minutes, 0.5, block),
+            ("azuro-event2", "hotkey_2", "uid_2", 0.75, interval_start_minutes, 0.75, block),
         ]
 
+        query_miners_task.logger.debug.assert_called_with(
+            "Predictions stored",
+            extra={
+                "neurons_count": 2,
+                "predictions_count": 4,
+                "elapsed_time_ms": ANY,
+                "rows_per_second": ANY,
+            },
+        )
+
+    async def test_store_predictions_no_predictions(self, query_miners_task: QueryMiners):
+        query_miners_task.db_operations.upsert_predictions_bulk = AsyncMock()
+        query_miners_task.metagraph.axons = {"uid_1": MagicMock(hotkey="hotkey_1")}
+
+        synapse = EventPredictionSynapse(
+            events={"acled-event1": {"event_id": "event1", "probability": None}}
+        )
+
+        await query_miners_task.store_predictions(
+            block=1, interval_start_minutes=2, neurons_predictions={"uid_1": synapse}
+        )
+
+        query_miners_task.db_operations.upsert_predictions_bulk.assert_not_awaited()
+
     async def test_run(
         self,
         db_client: DatabaseClient,
@@ -727,3 +1033,204 @@ class TestQueryMiners:
         # Assertions
         query_miners_task.make_predictions_synapse.assert_called_once()
         query_miners_task.query_neurons.assert_not_called()
+
+    async def test_run_metagraph_sync(
+        self, db_operations: DatabaseOperations, query_miners_task: QueryMiners
+    ):
+        metagraph_sync = MagicMock(spec=SyncMetagraph)
+        metagraph_sync.snapshot = MetagraphSnapshot(
+            version=2,
+            block=torch.tensor(100),
+            n=torch.tensor(1),
+            hotkeys=("hotkey_1",),
+            uids=torch.tensor([0], dtype=torch.int32),
+            axons=(
+                AxonInfo(
+                    hotkey="hotkey_1", coldkey="coldkey", version=1, ip="ip_1", port=1, ip_type=1
+                ),
+            ),
+            validator_trust=torch.zeros(1),
+            validator_permit=torch.zeros(1),
+            miners_df=pd.DataFrame({"miner_hotkey": ["hotkey_1"], "miner_uid": [0]}),
+        )
+
+        task = QueryMiners(
+            interval_seconds=60.0,
+            db_operations=db_operations,
+            dendrite=query_miners_task.dendrite,
+            metagraph=query_miners_task.metagraph,
+            logger=query_miners_task.logger,
+            metagraph_sync=metagraph_sync,
+        )
+        task.store_miners = AsyncMock()
+        task.query_neurons = AsyncMock(return_value={})
+        task.store_predictions = AsyncMock()
+
+        # Set events to query & predict
+        events = [
+            (
+                "unique1",
+                "event1",
+                "ifgames",
+                "sports",
+                "desc1",
+                "2024-12-03",
+                "2024-12-04",
+                "outcome2",
+                EventStatus.PENDING,
+                json.dumps({"market_type": "sports"}),
+                "2012-12-02T14:30:00+00:00",
+                (datetime.now(timezone.utc) + timedelta(seconds=2)).isoformat(),
+                "2000-12-31T14:30:00+00:00",
+            ),
+        ]
+
+        await db_operations.upsert_events(events)
+
+        # Run the task
+        await task.run()
+
+        # Assertions
+        # Shared snapshot read, metagraph not synced
+        task.metagraph.sync.assert_not_called()
+        assert task.current_metagraph is metagraph_sync.snapshot
+
+        task.store_miners.assert_awaited_once_with(block=100, axons=ANY)
+        assert list(task.store_miners.await_args.kwargs["axons"]) == [0]
+
+    def test_invalid_metagraph_sync(self, query_miners_task: QueryMiners):
+        with pytest.raises(TypeError, match="metagraph_sync must be an instance of SyncMetagraph."):
+            QueryMiners(
+                interval_seconds=60.0,
+                db_operations=query_miners_task.db_operations,
+                dendrite=query_miners_task.dendrite,
+                metagraph=query_miners_task.metagraph,
+                logger=query_miners_task.logger,
+                metagraph_sync=MagicMock(),
+            )
+
+
+class TestPredictionsSynapseBuilder:
+    def make_event(self, event_id: str, local_updated_at: str, description: str = "desc"):
+        return (
+            event_id,
+            "ifgames",
+            description,
+            "2012-12-02T14:30:00+00:00",
+            None,
+            None,
+            json.dumps({"market_type": "acled"}),
+            local_updated_at,
+        )
+
+    def test_invalid_max_epochs(self):
+        with pytest.raises(ValueError, match="max_epochs must be a positive integer."):
+            PredictionsSynapseBuilder(max_epochs=0)
+
+    def test_update(self):
+        builder = PredictionsSynapseBuilder()
+        epoch_id = builder.epoch_id
+
+        events = [self.make_event("event1", "t1"), self.make_event("event2", "t1")]
+
+        assert builder.update(events) == 2
+        assert builder.epoch_id == epoch_id + 1
+
+        # Unchanged events are not compiled again, nor start a new epoch
+        assert builder.update(events) == 0
+        assert builder.epoch_id == epoch_id + 1
+
+        # Updated but identical event does not start a new epoch
+        assert builder.update([self.make_event("event1", "t2"), events[1]]) == 1
+        assert builder.epoch_id == epoch_id + 1
+
+        synapse = builder.full_synapse()
+
+        assert synapse.epoch_id == epoch_id + 1
+        assert synapse.base_epoch_id is None
+        assert list(synapse.events) == ["ifgames-event1", "ifgames-event2"]
+        assert synapse.events["ifgames-event1"] == {
+            "event_id": "event1",
+            "market_type": "acled",
+            "probability": None,
+            "miner_answered": False,
+            "description": "desc",
+            "cutoff": 1354458600,
+            "starts": None,
+            "resolve_date": None,
+            "end_date": None,
+        }
+
+        # Synapse events are copies of the compiled events
+        synapse.events["ifgames-event1"]["probability"] = 0.8
+
+        assert builder.full_synapse().events["ifgames-event1"]["probability"] is None
+
+    def test_delta_synapse(self):
+        builder = PredictionsSynapseBuilder()
+
+        builder.update([self.make_event("event1", "t1"), self.make_event("event2", "t1")])
+        base_epoch_id = builder.epoch_id
+
+        # No changes since the current epoch
+        synapse = builder.delta_synapse(base_epoch_id=base_epoch_id)
+
+        assert synapse.epoch_id == base_epoch_id
+        assert synapse.base_epoch_id == base_epoch_id
+        assert synapse.events == {}
+        assert synapse.removed_events == []
+
+        # Event 1 updated, event 2 removed, then event 3 added
+        builder.update([self.make_event("event1", "t2", description="new desc")])
+        builder.update([self.make_event("event1", "t2"), self.make_event("event3", "t1")])
+
+        synapse = builder.delta_synapse(base_epoch_id=base_epoch_id)
+
+        assert synapse.epoch_id == base_epoch_id + 2
+        assert synapse.base_epoch_id == base_epoch_id
+        assert list(synapse.events) == ["ifgames-event1", "ifgames-event3"]
+        # Cached on local_updated_at
+        assert synapse.events["ifgames-event1"]["description"] == "new desc"
+        assert synapse.removed_events == ["ifgames-event2"]
+
+        synapse = builder.delta_synapse(base_epoch_id=base_epoch_id + 1)
+
+        assert list(synapse.events) == ["ifgames-event3"]
+        assert synapse.removed_events == []
+
+        # Unknown epochs
+        assert builder.delta_synapse(base_epoch_id=base_epoch_id + 3) is None
+        assert builder.delta_synapse(base_epoch_id=0) is None
+
+    def test_delta_synapse_max_epochs(self):
+        builder = PredictionsSynapseBuilder(max_epochs=2)
+        first_epoch_id = builder.epoch_id
+
+        for index in range(3):
+            builder.update([self.make_event("event1", f"t{index}", description=f"desc{index}")])
+
+        # Changes of the first epoch dropped
+        assert builder.delta_synapse(base_epoch_id=first_epoch_id) is None
+        assert builder.delta_synapse(base_epoch_id=first_epoch_id + 1) is not None
+
+    def test_apply_delta(self):
+        builder = PredictionsSynapseBuilder()
+
+        builder.update([self.make_event("event1", "t1"), self.make_event("event2", "t1")])
+
+        synapse = builder.full_synapse()
+        known_events = synapse.apply_delta(known_events={"ifgames-old": {}})
+        base_epoch_id = synapse.epoch_id
+
+        builder.update([self.make_event("event1", "t2", description="desc2")])
+        builder.update(
+            [
+                self.make_event("event1", "t2", description="desc2"),
+                self.make_event("event3", "t1"),
+            ]
+        )
+
+        # Miner events after applying the delta match the full synapse
+        delta_synapse = builder.delta_synapse(base_epoch_id=base_epoch_id)
+
+        assert delta_synapse.apply_delta(known_events) == builder.full_synapse().events
@@ -11,6 +11,7 @@ from neurons.validator.db.client import DatabaseClient
 from neurons.validator.db.operations import DatabaseOperations
 from neurons.validator.if_games.client import IfGamesClient
 from neurons.validator.models.event import EventStatus
+from neurons.validator.scheduler.task import TaskBacklog
 from neurons.validator.tasks.resolve_events import ResolveEvents
 from neurons.validator.utils.logger.logger import InfiniteGamesLogger
 
@@ -99,6 +100,7 @@ class TestResolveEventsTask:
 
         # Assert
         api_client_mock.get_resolved_events.assert_not_called()
+        assert resolve_events_task.backlog is None
 
     async def test_resolved_from_last_resolved(
         self, db_operations: DatabaseOperations, resolve_events_task: ResolveEvents
@@ -419,6 +421,9 @@ class TestResolveEventsTask:
             assert response[3][1] == "1"
             assert response[3][2] == "2012-09-10 20:43:02+00:00"
 
+            # Events resolved reported as output
+            assert resolve_events_task.backlog == TaskBacklog(processed=2, pending=False)
+
             # Act run again
             await resolve_events_task.run()
 
@@ -438,3 +443,5 @@ class TestResolveEventsTask:
             # Event 2 is settled now
             assert response[1][1] == "1"
             assert response[1][2] == "2024-09-10 20:43:02+00:00"
+
+            assert resolve_events_task.backlog == TaskBacklog(processed=1, pending=False)
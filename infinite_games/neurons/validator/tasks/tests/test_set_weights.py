@@ -1,4 +1,6 @@
+import asyncio
 import tempfile
+import threading
 import time
 from datetime import datetime, timedelta, timezone
 from unittest.mock import ANY, MagicMock
@@ -16,6 +18,9 @@ from neurons.validator.db.client import DatabaseClient
 from neurons.validator.db.operations import DatabaseOperations
 from neurons.validator.models.score import SCORE_FIELDS, ScoresModel
 from neurons.validator.tasks.set_weights import SetWeights, SWNames
+from neurons.validator.tasks.sync_metagraph import MetagraphSnapshot, SyncMetagraph
+from neurons.validator.tasks.tests.test_sync_metagraph import make_metagraph
+from neurons.validator.utils.common.converters import pydantic_models_to_dataframe
 from neurons.validator.utils.common.interval import BLOCK_DURATION
 from neurons.validator.utils.logger.logger import InfiniteGamesLogger
 from neurons.validator.version import __spec_version__ as spec_version
@@ -132,6 +137,33 @@ class TestSetWeights:
         assert unit.current_uids.tolist() == [1, 2, 3, 4]
         assert unit.n_hotkeys == 4
 
+    def test_metagraph_lite_sync_snapshot(self, set_weights_task: SetWeights):
+        unit = set_weights_task
+        unit.metagraph.sync.reset_mock()
+
+        unit.metagraph_sync = MagicMock(spec=SyncMetagraph)
+        unit.metagraph_sync.snapshot = MetagraphSnapshot(
+            version=2,
+            block=torch.tensor(100),
+            n=torch.tensor(2),
+            hotkeys=("hotkey1", "hotkey4"),
+            uids=torch.tensor([1, 4], dtype=torch.int32),
+            axons=(),
+            validator_trust=torch.zeros(2),
+            validator_permit=torch.zeros(2),
+            miners_df=pd.DataFrame({"miner_hotkey": ["hotkey1", "hotkey4"], "miner_uid": [1, 4]}),
+        )
+
+        unit.metagraph_lite_sync()
+
+        # Shared snapshot read, metagraph not synced
+        unit.metagraph.sync.assert_not_called()
+        assert unit.current_metagraph is unit.metagraph_sync.snapshot
+        assert unit.current_miners_df is unit.metagraph_sync.snapshot.miners_df
+        assert unit.current_hotkeys == ["hotkey1", "hotkey4"]
+        assert unit.current_uids.tolist() == [1, 4]
+        assert unit.n_hotkeys == 2
+
     @pytest.mark.parametrize(
         "delta,expected",
         [
@@ -182,7 +214,9 @@ class TestSetWeights:
             ),
         ]
 
-        filtered_scores = unit.filter_last_scores(last_metagraph_scores)
+        filtered_scores = unit.filter_last_scores(
+            pydantic_models_to_dataframe(last_metagraph_scores)
+        )
 
         assert len(filtered_scores) == 3
         assert filtered_scores.loc[0].miner_uid == 1
@@ -547,3 +581,107 @@ class TestSetWeights:
             unit.subtensor.set_weights.call_args.kwargs["weights"],
             torch.tensor([0.8350, 0.1650], dtype=torch.float),
         )
+
+    async def test_run_during_metagraph_sync(self, set_weights_task: SetWeights, monkeypatch):
+        unit = set_weights_task
+        unit.last_set_weights_at = time.time() - 101 * BLOCK_DURATION
+        unit.subtensor.set_weights.return_value = (True, "Success")
+
+        # Metagraph sync on its own subtensor & metagraph
+        sync_subtensor = MagicMock(spec=bt.Subtensor)
+        sync_metagraph = make_metagraph(n_neurons=3, block=100)
+        synced_metagraph = make_metagraph(n_neurons=4, block=101)
+        sync_metagraph_task = SyncMetagraph(
+            interval_seconds=60.0,
+            subtensor=sync_subtensor,
+            metagraph=sync_metagraph,
+            logger=MagicMock(spec=InfiniteGamesLogger),
+        )
+        unit.metagraph_sync = sync_metagraph_task
+        unit.metagraph.sync.reset_mock()
+
+        sync_started = threading.Event()
+        set_weights_done = threading.Event()
+
+        def sync(lite: bool, subtensor: bt.Subtensor):
+            sync_started.set()
+
+            # Metagraph updated while the weights are set
+            sync_metagraph.n = synced_metagraph.n
+            sync_metagraph.uids = synced_metagraph.uids
+            sync_metagraph.hotkeys = synced_metagraph.hotkeys
+
+            set_weights_done.wait(timeout=5)
+
+            sync_metagraph.block = synced_metagraph.block
+            sync_metagraph.axons = synced_metagraph.axons
+
+        sync_metagraph.sync.side_effect = sync
+
+        sync_task = None
+
+        async def get_last_metagraph_scores_frame():
+            nonlocal sync_task
+
+            # Sync starts once the run read the snapshot
+            sync_task = asyncio.create_task(sync_metagraph_task.run())
+            await asyncio.to_thread(sync_started.wait, 5)
+
+            return pydantic_models_to_dataframe(
+                [
+                    ScoresModel(
+                        event_id="event_id",
+                        miner_uid=uid,
+                        miner_hotkey=f"hotkey{uid}",
+                        prediction=0.75,
+                        event_score=0.5,
+                        metagraph_score=0.5,
+                        created_at=datetime.now(timezone.utc),
+                        spec_version=1,
+                        processed=True,
+                    )
+                    for uid in range(2)
+                ]
+            )
+
+        monkeypatch.setattr(
+            unit.db_operations, "get_last_metagraph_scores_frame", get_last_metagraph_scores_frame
+        )
+
+        process_weights_kwargs = {}
+
+        def process_weights_for_netuid(uids, weights, **kwargs):
+            process_weights_kwargs.update(kwargs)
+
+            return uids[weights != 0], weights[weights != 0]
+
+        import bittensor.utils.weight_utils as wu
+
+        monkeypatch.setattr(wu, "process_weights_for_netuid", process_weights_for_netuid)
+
+        await unit.run()
+        set_weights_done.set()
+
+        await sync_task
+
+        # Weights processed with the snapshot read at the start of the run, not the metagraph syncing
+        snapshot = process_weights_kwargs["metagraph"]
+
+        assert snapshot.version == 1
+        assert snapshot.n.item() == 3
+        assert process_weights_kwargs["subtensor"] is unit.subtensor
+
+        assert unit.subtensor.set_weights.call_count == 1
+        assert unit.subtensor.set_weights.call_args.kwargs["uids"].tolist() == [0, 1]
+
+        # Synced on its own subtensor, the set weights subtensor & metagraph left alone
+        sync_metagraph.sync.assert_called_once_with(lite=True, subtensor=sync_subtensor)
+        assert sync_subtensor.mock_calls == []
+        unit.metagraph.sync.assert_not_called()
+
+        # Next run reads the new snapshot
+        unit.metagraph_lite_sync()
+
+        assert unit.current_metagraph.version == 2
+        assert unit.current_metagraph.n.item() == 4
+        assert unit.current_uids.tolist() == [0, 1, 2, 3]
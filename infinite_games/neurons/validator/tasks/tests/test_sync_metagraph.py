@@ -0,0 +1,177 @@
+import dataclasses
+import threading
+from unittest.mock import MagicMock
+
+import bittensor as bt
+import numpy as np
+import pytest
+import torch
+from bittensor.core.chain_data import AxonInfo
+from bittensor.core.metagraph import MetagraphMixin
+
+from neurons.validator.tasks.sync_metagraph import MetagraphSnapshot, SyncMetagraph
+from neurons.validator.utils.logger.logger import InfiniteGamesLogger
+
+
+def make_metagraph(n_neurons: int, block: int) -> MetagraphMixin:
+    metagraph = MagicMock(spec=MetagraphMixin)
+    metagraph.sync = MagicMock()
+    metagraph.block = torch.nn.Parameter(torch.tensor(block), requires_grad=False)
+    metagraph.n = torch.nn.Parameter(torch.tensor(n_neurons), requires_grad=False)
+    metagraph.uids = torch.arange(n_neurons, dtype=torch.int32)
+    metagraph.hotkeys = [f"hotkey{uid}" for uid in range(n_neurons)]
+    metagraph.axons = [
+        AxonInfo(hotkey=f"hotkey{uid}", coldkey="coldkey", version=1, ip="ip", port=1, ip_type=4)
+        for uid in range(n_neurons)
+    ]
+    metagraph.validator_trust = torch.nn.Parameter(torch.zeros(n_neurons))
+    metagraph.validator_permit = np.zeros(n_neurons)
+
+    return metagraph
+
+
+class TestSyncMetagraph:
+    @pytest.fixture
+    def metagraph(self):
+        return make_metagraph(n_neurons=3, block=100)
+
+    @pytest.fixture
+    def subtensor(self):
+        return MagicMock(spec=bt.Subtensor)
+
+    @pytest.fixture
+    def sync_metagraph_task(self, subtensor: bt.Subtensor, metagraph: MetagraphMixin):
+        logger = MagicMock(spec=InfiniteGamesLogger)
+
+        return SyncMetagraph(
+            interval_seconds=60.0, subtensor=subtensor, metagraph=metagraph, logger=logger
+        )
+
+    def test_invalid_args(self, subtensor: bt.Subtensor, metagraph: MetagraphMixin):
+        logger = MagicMock(spec=InfiniteGamesLogger)
+
+        with pytest.raises(ValueError, match="interval_seconds must be a positive number"):
+            SyncMetagraph(
+                interval_seconds=0.0, subtensor=subtensor, metagraph=metagraph, logger=logger
+            )
+
+        with pytest.raises(TypeError, match="subtensor must be an instance of Subtensor."):
+            SyncMetagraph(
+                interval_seconds=60.0, subtensor=MagicMock(), metagraph=metagraph, logger=logger
+            )
+
+        with pytest.raises(TypeError, match="metagraph must be an instance of MetagraphMixin."):
+            SyncMetagraph(
+                interval_seconds=60.0, subtensor=subtensor, metagraph=MagicMock(), logger=logger
+            )
+
+        with pytest.raises(TypeError, match="logger must be an instance of InfiniteGamesLogger."):
+            SyncMetagraph(
+                interval_seconds=60.0, subtensor=subtensor, metagraph=metagraph, logger=MagicMock()
+            )
+
+    def test_init(self, sync_metagraph_task: SyncMetagraph, metagraph: MetagraphMixin):
+        unit = sync_metagraph_task
+
+        assert unit.name == "sync-metagraph"
+        assert unit.interval_seconds == 60.0
+
+        # First snapshot without syncing
+        metagraph.sync.assert_not_called()
+
+        snapshot = unit.snapshot
+
+        assert snapshot.version == 1
+        assert snapshot.block.item() == 100
+        assert snapshot.n.item() == 3
+        assert snapshot.hotkeys == ("hotkey0", "hotkey1", "hotkey2")
+        assert snapshot.uids.tolist() == [0, 1, 2]
+        assert snapshot.axons[1].hotkey == "hotkey1"
+        assert snapshot.validator_trust.tolist() == [0.0, 0.0, 0.0]
+        assert snapshot.validator_permit.tolist() == [0.0, 0.0, 0.0]
+        assert snapshot.miners_df.to_dict(orient="list") == {
+            "miner_hotkey": ["hotkey0", "hotkey1", "hotkey2"],
+            "miner_uid": [0, 1, 2],
+        }
+
+    def test_snapshot_immutable(
+        self, sync_metagraph_task: SyncMetagraph, metagraph: MetagraphMixin
+    ):
+        snapshot = sync_metagraph_task.snapshot
+
+        with pytest.raises(dataclasses.FrozenInstanceError):
+            snapshot.version = 2
+
+        # Copies of the metagraph attributes
+        metagraph.uids[0] = 10
+        metagraph.hotkeys[0] = "new_hotkey"
+
+        assert snapshot.uids.tolist() == [0, 1, 2]
+        assert snapshot.hotkeys[0] == "hotkey0"
+
+    async def test_run(
+        self,
+        sync_metagraph_task: SyncMetagraph,
+        subtensor: bt.Subtensor,
+        metagraph: MetagraphMixin,
+    ):
+        sync_thread_ids = []
+        new_metagraph = make_metagraph(n_neurons=4, block=101)
+
+        def sync(lite: bool, subtensor: bt.Subtensor):
+            sync_thread_ids.append(threading.get_ident())
+
+            metagraph.block = new_metagraph.block
+            metagraph.n = new_metagraph.n
+            metagraph.uids = new_metagraph.uids
+            metagraph.hotkeys = new_metagraph.hotkeys
+            metagraph.axons = new_metagraph.axons
+            metagraph.validator_trust = new_metagraph.validator_trust
+            metagraph.validator_permit = new_metagraph.validator_permit
+
+        metagraph.sync.side_effect = sync
+        previous_snapshot = sync_metagraph_task.snapshot
+
+        await sync_metagraph_task.run()
+
+        # Synced off the event loop, on the own subtensor of the task
+        metagraph.sync.assert_called_once_with(lite=True, subtensor=subtensor)
+        assert sync_thread_ids != [threading.get_ident()]
+
+        snapshot = sync_metagraph_task.snapshot
+
+        assert snapshot.version == 2
+        assert snapshot.block.item() == 101
+        assert snapshot.n.item() == 4
+        assert snapshot.uids.tolist() == [0, 1, 2, 3]
+        assert len(snapshot.miners_df) == 4
+
+        # Previous snapshot unchanged
+        assert previous_snapshot.version == 1
+        assert previous_snapshot.uids.tolist() == [0, 1, 2]
+
+        sync_metagraph_task.logger.debug.assert_called_once_with(
+            "Metagraph synced",
+            extra={
+                "version": 2,
+                "block": 101,
+                "neurons_count": 4,
+                "elapsed_time_ms": pytest.approx(0, abs=1000),
+            },
+        )
+
+    async def test_run_error(self, sync_metagraph_task: SyncMetagraph, metagraph: MetagraphMixin):
+        metagraph.sync.side_effect = Exception("Chain error")
+
+        with pytest.raises(Exception, match="Chain error"):
+            await sync_metagraph_task.run()
+
+        # Previous snapshot kept
+        assert sync_metagraph_task.snapshot.version == 1
+
+    def test_from_metagraph(self, metagraph: MetagraphMixin):
+        snapshot = MetagraphSnapshot.from_metagraph(metagraph=metagraph, version=5)
+
+        assert snapshot.version == 5
+        assert isinstance(snapshot.validator_permit, torch.Tensor)
+        assert snapshot.validator_trust.requires_grad is False
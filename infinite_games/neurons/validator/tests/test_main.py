@@ -5,6 +5,8 @@ import pytest
 from bittensor.core.metagraph import MetagraphMixin
 
 from neurons.validator.main import main
+from neurons.validator.utils.common.json_encoder import encode_json
+from neurons.validator.utils.env import ENVIRONMENT_VARIABLES
 
 
 class TestValidatorMain:
@@ -32,6 +34,7 @@ class TestValidatorMain:
             patch("neurons.validator.main.MetagraphScoring", spec=True),
             patch("neurons.validator.main.ExportScores", spec=True),
             patch("neurons.validator.main.SetWeights", spec=True),
+            patch("neurons.validator.main.SyncMetagraph", spec=True),
             patch(
                 "neurons.validator.main.API",
                 spec=True,
@@ -47,6 +50,7 @@ class TestValidatorMain:
             # Mock Database Client
             mock_db_client = MockDatabaseClient.return_value
             mock_db_client.migrate = AsyncMock()
+            mock_db_client.close = AsyncMock()
 
             # Mock TasksScheduler
             mock_scheduler = MockTasksScheduler.return_value
@@ -72,11 +76,13 @@ class TestValidatorMain:
             get_config.assert_called_once()
 
             # Verify DatabaseClient args
-            MockDatabaseClient.assert_called_once_with(db_path=db_path, logger=mock_logger)
+            MockDatabaseClient.assert_called_once_with(
+                db_path=db_path, logger=mock_logger, pool_size=ENVIRONMENT_VARIABLES.DB_POOL_SIZE
+            )
 
             # Verify IfGamesClient args
             MockIfGamesClient.assert_called_once_with(
-                env=config_env, logger=mock_logger, bt_wallet=ANY
+                env=config_env, logger=mock_logger, bt_wallet=ANY, json_encoder=encode_json
             )
 
             # Verify migrate() was called
@@ -85,8 +91,12 @@ class TestValidatorMain:
             # Verify start() was called
             mock_scheduler.start.assert_awaited_once()
 
+            # Verify connections are closed on exit
+            mock_db_client.close.assert_awaited_once()
+            MockIfGamesClient.return_value.close.assert_awaited_once()
+
             # Verify tasks
-            assert mock_scheduler.add.call_count == 11
+            assert mock_scheduler.add.call_count == 13
 
             # Verify logging
             mock_logger.info.assert_called_with(
@@ -1,4 +1,4 @@
-from typing import List, Union
+from typing import Any, List, Mapping, Sequence, Union
 
 import numpy as np
 import pandas as pd
@@ -73,3 +73,16 @@ def pydantic_models_to_dataframe(models: List[BaseModel]) -> pd.DataFrame:
                 df[field_name] = df[field_name].astype(mapped_dtype, errors="ignore")
 
     return df
+
+
+def rows_to_dataframe(rows: Sequence[Sequence[Any]], dtypes: Mapping[str, str]) -> pd.DataFrame:
+    """
+    Frame of query rows, with the columns in the order of dtypes, built straight from
+    the row tuples instead of a pydantic model per row.
+
+    Values are not validated, NULLs become the missing values of the nullable dtypes.
+    """
+
+    df = pd.DataFrame.from_records(rows, columns=list(dtypes), coerce_float=False)
+
+    return df.astype(dict(dtypes))
@@ -0,0 +1,87 @@
+import math
+from collections import deque
+from typing import Optional
+
+# Upper bounds of the latency buckets, in seconds
+DEFAULT_LATENCY_BUCKETS = (0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0, 120.0)
+
+
+class LatencyHistogram:
+    """
+    Counts latencies, in seconds, in fixed buckets and keeps the last values observed
+    to report percentiles
+    """
+
+    __buckets: tuple[float, ...]
+    __counts: list[int]
+    __values: deque[float]
+    __count: int
+    __sum: float
+    __max: float
+
+    def __init__(
+        self,
+        buckets: tuple[float, ...] = DEFAULT_LATENCY_BUCKETS,
+        max_values: Optional[int] = None,
+    ) -> None:
+        # Validate buckets
+        if len(buckets) == 0 or list(buckets) != sorted(set(buckets)) or buckets[0] <= 0:
+            raise ValueError("buckets must be positive and strictly increasing.")
+
+        # Validate max_values
+        if max_values is not None and (not isinstance(max_values, int) or max_values < 1):
+            raise ValueError("max_values must be a positive integer.")
+
+        self.__buckets = tuple(buckets)
+        # Last count is for the values above the last bucket
+        self.__counts = [0] * (len(buckets) + 1)
+        self.__values = deque(maxlen=max_values)
+        self.__count = 0
+        self.__sum = 0.0
+        self.__max = 0.0
+
+    @property
+    def count(self) -> int:
+        return self.__count
+
+    def observe(self, value: float) -> None:
+        index = len(self.__buckets)
+
+        for bucket_index, bucket in enumerate(self.__buckets):
+            if value <= bucket:
+                index = bucket_index
+                break
+
+        self.__counts[index] += 1
+        self.__values.append(value)
+        self.__count += 1
+        self.__sum += value
+        self.__max = max(self.__max, value)
+
+    def percentile(self, q: float) -> Optional[float]:
+        """Nearest-rank percentile of the values kept, q between 0 and 100"""
+
+        if not 0 <= q <= 100:
+            raise ValueError("q must be between 0 and 100.")
+
+        if not self.__values:
+            return None
+
+        values = sorted(self.__values)
+        rank = max(1, math.ceil(q / 100 * len(values)))
+
+        return values[rank - 1]
+
+    def snapshot(self) -> dict:
+        buckets = {str(bucket): count for bucket, count in zip(self.__buckets, self.__counts)}
+        buckets["+Inf"] = self.__counts[-1]
+
+        return {
+            "count": self.__count,
+            "sum": round(self.__sum, 6),
+            "max": round(self.__max, 6),
+            "p50": self.percentile(50),
+            "p95": self.percentile(95),
+            "p99": self.percentile(99),
+            "buckets": buckets,
+        }
@@ -0,0 +1,47 @@
+import json
+from typing import Any, Callable
+
+import pydantic_core
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+# Encodes a request body to the bytes signed and sent
+JsonEncoder = Callable[[Any], bytes]
+
+
+def encode_json(value: Any) -> bytes:
+    # Same bytes as json.dumps, which the bodies have always been signed with
+    return json.dumps(value).encode("utf-8")
+
+
+def encode_pydantic_json(value: Any) -> bytes:
+    # Compact, serialized by pydantic-core: no extra dependency
+    return pydantic_core.to_json(value)
+
+
+def encode_orjson(value: Any) -> bytes:
+    # Compact, requires the optional orjson package
+    if orjson is None:
+        raise ImportError("orjson is not installed.")
+
+    return orjson.dumps(value, option=orjson.OPT_NON_STR_KEYS)
+
+
+JSON_ENCODERS: dict[str, JsonEncoder] = {
+    "json": encode_json,
+    "pydantic": encode_pydantic_json,
+    "orjson": encode_orjson,
+}
+
+
+def get_json_encoder(name: str) -> JsonEncoder:
+    if name not in JSON_ENCODERS:
+        raise ValueError(f"Unknown JSON encoder {name}, expected one of {list(JSON_ENCODERS)}.")
+
+    if name == "orjson" and orjson is None:
+        raise ValueError("JSON encoder orjson requires the orjson package.")
+
+    return JSON_ENCODERS[name]
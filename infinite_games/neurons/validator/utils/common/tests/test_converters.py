@@ -9,6 +9,7 @@ from pydantic import BaseModel
 
 from neurons.validator.utils.common.converters import (
     pydantic_models_to_dataframe,
+    rows_to_dataframe,
     torch_or_numpy_to_int,
 )
 
@@ -107,6 +108,38 @@ class TestPydanticModelToDataFrame:
         assert df["custom_field"].dtype in (object, np.dtype("complex128"))
 
 
+class TestRowsToDataFrame:
+    DTYPES = {"id": "Int64", "name": "string", "score": "float64", "is_active": "boolean"}
+
+    def test_rows(self):
+        rows = [(1, "first", 0.5, 1), (2, None, None, 0), (None, "third", 1.5, None)]
+
+        df = rows_to_dataframe(rows=rows, dtypes=self.DTYPES)
+
+        assert df.dtypes.astype(str).to_dict() == self.DTYPES
+        assert df["id"].tolist() == [1, 2, pd.NA]
+        assert df["name"].tolist() == ["first", pd.NA, "third"]
+        assert df["score"].tolist()[::2] == [0.5, 1.5]
+        assert np.isnan(df["score"][1])
+        assert df["is_active"].tolist() == [True, False, pd.NA]
+
+    def test_same_dtypes_as_models(self):
+        model = ExperimentalModel(
+            id=1, name="first", score=0.5, is_active=True, created_at=datetime(2024, 1, 1)
+        )
+
+        df = rows_to_dataframe(rows=[(1, "first", 0.5, 1)], dtypes=self.DTYPES)
+        models_df = pydantic_models_to_dataframe([model])[list(self.DTYPES)]
+
+        pd.testing.assert_frame_equal(df, models_df)
+
+    def test_no_rows(self):
+        df = rows_to_dataframe(rows=[], dtypes=self.DTYPES)
+
+        assert df.empty
+        assert df.dtypes.astype(str).to_dict() == self.DTYPES
+
+
 class TestTorchOrNumpyToInteger:
     def test_torch_tensor_single_value(self):
         tensor = torch.tensor([42.0])
@@ -0,0 +1,64 @@
+import pytest
+
+from neurons.validator.utils.common.histogram import LatencyHistogram
+
+
+class TestLatencyHistogram:
+    @pytest.mark.parametrize(
+        "buckets,max_values,error",
+        [
+            ((), None, "buckets must be positive and strictly increasing."),
+            ((1.0, 0.5), None, "buckets must be positive and strictly increasing."),
+            ((1.0, 1.0), None, "buckets must be positive and strictly increasing."),
+            ((0.0, 1.0), None, "buckets must be positive and strictly increasing."),
+            ((1.0,), 0, "max_values must be a positive integer."),
+        ],
+    )
+    def test_invalid_args(self, buckets, max_values, error):
+        with pytest.raises(ValueError, match=error):
+            LatencyHistogram(buckets=buckets, max_values=max_values)
+
+    def test_observe(self):
+        histogram = LatencyHistogram(buckets=(0.5, 1.0, 5.0))
+
+        for value in [0.1, 0.5, 0.7, 3.0, 4.0, 10.0]:
+            histogram.observe(value)
+
+        assert histogram.count == 6
+        assert histogram.snapshot() == {
+            "count": 6,
+            "sum": 18.3,
+            "max": 10.0,
+            "p50": 0.7,
+            "p95": 10.0,
+            "p99": 10.0,
+            "buckets": {"0.5": 2, "1.0": 1, "5.0": 2, "+Inf": 1},
+        }
+
+    def test_percentile(self):
+        histogram = LatencyHistogram()
+
+        assert histogram.percentile(50) is None
+
+        for value in range(1, 101):
+            histogram.observe(value / 100)
+
+        assert histogram.percentile(0) == 0.01
+        assert histogram.percentile(50) == 0.5
+        assert histogram.percentile(95) == 0.95
+        assert histogram.percentile(99) == 0.99
+        assert histogram.percentile(100) == 1.0
+
+        with pytest.raises(ValueError, match="q must be between 0 and 100."):
+            histogram.percentile(101)
+
+    def test_max_values(self):
+        histogram = LatencyHistogram(max_values=2)
+
+        for value in [10.0, 0.1, 0.2]:
+            histogram.observe(value)
+
+        # Percentiles on the last values, counts on all of them
+        assert histogram.percentile(100) == 0.2
+        assert histogram.count == 3
+        assert histogram.snapshot()["max"] == 10.0
@@ -0,0 +1,61 @@
+import json
+
+import pytest
+
+from neurons.validator.utils.common import json_encoder
+from neurons.validator.utils.common.json_encoder import (
+    encode_json,
+    encode_orjson,
+    encode_pydantic_json,
+    get_json_encoder,
+)
+
+PAYLOAD = {
+    "results": [
+        {
+            "event_id": "event_id",
+            "title": "Will it — happen?",
+            "prediction": 0.95,
+            "miner_uid": 1,
+            "start_date": None,
+            "metadata": {"market_type": "acled", "other_data": {"extra": [1, 2]}},
+        }
+    ]
+}
+
+
+class TestJsonEncoder:
+    def test_encode_json(self):
+        # Same bytes as json.dumps
+        assert encode_json(PAYLOAD) == json.dumps(PAYLOAD).encode("utf-8")
+
+    def test_encode_pydantic_json(self):
+        encoded = encode_pydantic_json(PAYLOAD)
+
+        assert isinstance(encoded, bytes)
+        assert json.loads(encoded) == PAYLOAD
+
+    def test_encode_orjson(self, monkeypatch):
+        pytest.importorskip("orjson")
+
+        encoded = encode_orjson(PAYLOAD)
+
+        assert isinstance(encoded, bytes)
+        assert json.loads(encoded) == PAYLOAD
+
+        monkeypatch.setattr(json_encoder, "orjson", None)
+
+        with pytest.raises(ImportError, match="orjson is not installed."):
+            encode_orjson(PAYLOAD)
+
+    def test_get_json_encoder(self, monkeypatch):
+        assert get_json_encoder("json") is encode_json
+        assert get_json_encoder("pydantic") is encode_pydantic_json
+
+        with pytest.raises(ValueError, match="Unknown JSON encoder ujson"):
+            get_json_encoder("ujson")
+
+        monkeypatch.setattr(json_encoder, "orjson", None)
+
+        with pytest.raises(ValueError, match="JSON encoder orjson requires the orjson package."):
+            get_json_encoder("orjson")
@@ -10,6 +10,10 @@ class EnvironmentVariables(BaseModel):
     API_ACCESS_KEYS: str
     INLINE_LOGS: bool
     GIT_COMMIT_HASH: str
+    DB_POOL_SIZE: int
+    COMPUTE_WORKERS: int
+    TRACE_MEMORY: bool
+    JSON_ENCODER: str
 
 
 ENVIRONMENT_VARIABLES = EnvironmentVariables(
@@ -20,6 +24,14 @@ ENVIRONMENT_VARIABLES = EnvironmentVariables(
         "1",
     ],
     GIT_COMMIT_HASH=os.getenv("GIT_COMMIT_HASH", "-"),
+    DB_POOL_SIZE=int(os.getenv("DB_POOL_SIZE", "4")),
+    COMPUTE_WORKERS=int(os.getenv("COMPUTE_WORKERS", "2")),
+    TRACE_MEMORY=os.getenv("TRACE_MEMORY", "false").lower()
+    in [
+        "true",
+        "1",
+    ],
+    JSON_ENCODER=os.getenv("JSON_ENCODER", "json"),
 )
 
 